@@ -3,34 +3,37 @@ from db_utils import get_db
 import os
 from datetime import datetime
 from api.utils import allowed_file
+from pagination_utils import page_request, fetch_page, page_response
+import logging
 # 导入Socket.IO通知工具
 # from socket_utils import notify_team_update  # Vercel 不支持 WebSocket
 
+logger = logging.getLogger(__name__)
+
 advisor_bp = Blueprint('advisor', __name__)
 
 # 文件上传配置
 UPLOAD_FOLDER = 'static/uploads/advisors'
 
+# 列表排序键（与 idx_advisors_order / idx_advisors_status 一致）
+ADVISOR_ORDER = (('COALESCE(sort_order, 0)', 'ASC'), ('created_at', 'DESC'))
+
 @advisor_bp.route('/advisors', methods=['GET'])
 def get_advisors():
-    """获取所有指导老师"""
+    """获取所有指导老师（带 limit/cursor 参数时按游标分页）"""
+    page = page_request('advisors', ADVISOR_ORDER)
     try:
         with get_db() as conn:
-            cursor = conn.execute('''
-                SELECT * FROM advisors 
-                WHERE status = 'active'
-                ORDER BY COALESCE(sort_order, 0) ASC, created_at DESC
-            ''')
-            advisors = cursor.fetchall()
+            advisors, page_info = fetch_page(conn, page, 'advisors', ADVISOR_ORDER, where="status = 'active'")
             
             result = []
             for advisor in advisors:
                 advisor_dict = dict(advisor)
                 result.append(advisor_dict)
             
-            return jsonify(result)
+            return page_response(result, page_info)
     except Exception as e:
-        print(f"Error fetching advisors: {e}")
+        logger.error(f"Error fetching advisors: {e}")
         return jsonify({'error': str(e)}), 500
 
 @advisor_bp.route('/frontend/advisors', methods=['GET'])
@@ -38,7 +41,7 @@ def get_frontend_advisors():
     """前端获取指导老师数据"""
     try:
         with get_db() as conn:
-            cursor = conn.execute("SELECT * FROM advisors WHERE status = 'active' ORDER BY sort_order")
+            cursor = conn.execute("SELECT * FROM advisors WHERE status = 'active' ORDER BY COALESCE(sort_order, 0) ASC, created_at DESC")
             advisors = cursor.fetchall()
             
             # 将数据库行转换为字典列表
@@ -53,23 +56,20 @@ def get_frontend_advisors():
 
 @advisor_bp.route('/advisors/admin', methods=['GET'])
 def get_advisors_admin():
-    """管理员获取所有指导老师（包括非活跃状态）"""
+    """管理员获取所有指导老师（包括非活跃状态，带 limit/cursor 参数时按游标分页）"""
+    page = page_request('advisors', ADVISOR_ORDER)
     try:
         with get_db() as conn:
-            cursor = conn.execute('''
-                SELECT * FROM advisors 
-                ORDER BY COALESCE(sort_order, 0) ASC, created_at DESC
-            ''')
-            advisors = cursor.fetchall()
+            advisors, page_info = fetch_page(conn, page, 'advisors', ADVISOR_ORDER)
             
             result = []
             for advisor in advisors:
                 advisor_dict = dict(advisor)
                 result.append(advisor_dict)
             
-            return jsonify(result)
+            return page_response(result, page_info)
     except Exception as e:
-        print(f"Error fetching advisors (admin): {e}")
+        logger.error(f"Error fetching advisors (admin): {e}")
         return jsonify({'error': str(e)}), 500
 
 @advisor_bp.route('/advisors', methods=['POST'])
@@ -120,7 +120,7 @@ def create_advisor():
             advisor_id = cursor.lastrowid
             conn.commit()
             
-            print(f"✅ 指导老师创建成功: {name}")
+            logger.info(f"✅ 指导老师创建成功: {name}")
             
             # 通知前端刷新
             # notify_team_update({'advisor_created': True, 'advisor_id': advisor_id})  # Vercel 不支持 WebSocket
@@ -132,7 +132,7 @@ def create_advisor():
             }), 201
             
     except Exception as e:
-        print(f"Error creating advisor: {e}")
+        logger.error(f"Error creating advisor: {e}")
         return jsonify({"error": f"创建失败: {str(e)}"}), 500
 
 @advisor_bp.route('/advisors/<int:advisor_id>', methods=['PUT'])
@@ -210,7 +210,7 @@ def update_advisor(advisor_id):
                 conn.execute(sql, update_values)
                 conn.commit()
                 
-                print(f"✅ 指导老师更新成功: ID={advisor_id}")
+                logger.info(f"✅ 指导老师更新成功: ID={advisor_id}")
                 
                 # 通知前端刷新
                 # notify_team_update({'advisor_updated': True, 'advisor_id': advisor_id})  # Vercel 不支持 WebSocket
@@ -220,7 +220,7 @@ def update_advisor(advisor_id):
                 return jsonify({"error": "没有需要更新的字段"}), 400
                 
     except Exception as e:
-        print(f"Error updating advisor: {e}")
+        logger.error(f"Error updating advisor: {e}")
         return jsonify({"error": f"更新失败: {str(e)}"}), 500
 
 @advisor_bp.route('/advisors/<int:advisor_id>', methods=['DELETE'])
@@ -241,7 +241,7 @@ def delete_advisor(advisor_id):
             conn.execute('DELETE FROM advisors WHERE id = ?', (advisor_id,))
             conn.commit()
             
-            print(f"✅ 指导老师删除成功: {advisor['name']}")
+            logger.info(f"✅ 指导老师删除成功: {advisor['name']}")
             
             # 通知前端刷新
             # notify_team_update({'advisor_deleted': True, 'advisor_id': advisor_id})  # Vercel 不支持 WebSocket
@@ -249,7 +249,7 @@ def delete_advisor(advisor_id):
             return jsonify({"success": True, "message": "删除成功"})
             
     except Exception as e:
-        print(f"Error deleting advisor: {e}")
+        logger.error(f"Error deleting advisor: {e}")
         return jsonify({"error": f"删除失败: {str(e)}"}), 500
 
 @advisor_bp.route('/advisors/reorder', methods=['POST'])
@@ -274,7 +274,7 @@ def reorder_advisors():
             
             conn.commit()
             
-            print(f"✅ 指导老师排序更新成功，共{len(advisor_ids)}个指导老师")
+            logger.info(f"✅ 指导老师排序更新成功，共{len(advisor_ids)}个指导老师")
             
             # 通知前端刷新
             # notify_team_update({'advisors_reordered': True, 'advisor_ids': advisor_ids})  # Vercel 不支持 WebSocket
@@ -282,7 +282,7 @@ def reorder_advisors():
             return jsonify({"success": True, "message": "排序更新成功"})
             
     except Exception as e:
-        print(f"Error reordering advisors: {e}")
+        logger.error(f"Error reordering advisors: {e}")
         return jsonify({"error": f"排序更新失败: {str(e)}"}), 500
 
 @advisor_bp.route('/advisors/upload-image', methods=['POST'])
@@ -319,7 +319,7 @@ def upload_advisor_image():
         # 返回相对URL
         image_url = f"/static/uploads/advisors/{new_filename}"
         
-        print(f"✅ 指导老师头像上传成功: {image_url}")
+        logger.info(f"✅ 指导老师头像上传成功: {image_url}")
         
         return jsonify({
             "success": True,
@@ -328,5 +328,5 @@ def upload_advisor_image():
         })
         
     except Exception as e:
-        print(f"Error uploading advisor image: {e}")
+        logger.error(f"Error uploading advisor image: {e}")
         return jsonify({"error": f"上传失败: {str(e)}"}), 500
@@ -1,9 +1,11 @@
 from flask import Blueprint, request, jsonify, abort, session
 from db_utils import get_db
 from datetime import datetime
-import traceback
+import logging
 
 # 创建算法蓝图
+logger = logging.getLogger(__name__)
+
 algorithm_bp = Blueprint('algorithm', __name__, url_prefix='/api')
 
 # 前端API端点
@@ -39,8 +41,7 @@ def get_frontend_algorithms():
             
             return jsonify(algorithms_data)
     except Exception as e:
-        print(f"Error fetching frontend algorithms: {e}")
-        traceback.print_exc()
+        logger.exception(f"Error fetching frontend algorithms: {e}")
         return jsonify({'error': str(e)}), 500
 
 @algorithm_bp.route('/frontend/algorithm-awards', methods=['GET'])
@@ -61,8 +62,7 @@ def get_frontend_algorithm_awards():
             
             return jsonify(awards_data)
     except Exception as e:
-        print(f"Error fetching frontend algorithm awards: {e}")
-        traceback.print_exc()
+        logger.exception(f"Error fetching frontend algorithm awards: {e}")
         return jsonify({'error': str(e)}), 500
 
 @algorithm_bp.route('/frontend/project-overview', methods=['GET'])
@@ -83,8 +83,7 @@ def get_frontend_project_overview():
             
             return jsonify(overviews_data)
     except Exception as e:
-        print(f"Error fetching frontend project overview: {e}")
-        traceback.print_exc()
+        logger.exception(f"Error fetching frontend project overview: {e}")
         return jsonify({'error': str(e)}), 500
 
 # 管理员API端点
@@ -105,8 +104,7 @@ def get_admin_algorithms():
             
             return jsonify(algorithms_data)
     except Exception as e:
-        print(f"Error fetching admin algorithms: {e}")
-        traceback.print_exc()
+        logger.exception(f"Error fetching admin algorithms: {e}")
         return jsonify({'error': str(e)}), 500
 
 @algorithm_bp.route('/admin/algorithms', methods=['POST'])
@@ -151,7 +149,7 @@ def create_admin_algorithm():
             algorithm_id = cursor.lastrowid
             conn.commit()
             
-            print(f"✅ 算法创建成功: {title}")
+            logger.info(f"✅ 算法创建成功: {title}")
             
             return jsonify({
                 'success': True,
@@ -159,7 +157,7 @@ def create_admin_algorithm():
                 'algorithm_id': algorithm_id
             }), 201
     except Exception as e:
-        print(f"Error creating algorithm: {e}")
+        logger.error(f"Error creating algorithm: {e}")
         return jsonify({'error': f'创建算法失败: {str(e)}'}), 500
 
 @algorithm_bp.route('/admin/algorithms/<int:algorithm_id>', methods=['GET'])
@@ -177,7 +175,7 @@ def get_admin_algorithm(algorithm_id):
                 'algorithm': dict(algorithm)
             })
     except Exception as e:
-        print(f"Error fetching algorithm: {e}")
+        logger.error(f"Error fetching algorithm: {e}")
         return jsonify({'error': f'获取算法失败: {str(e)}'}), 500
 
 @algorithm_bp.route('/admin/algorithms/<int:algorithm_id>', methods=['PUT'])
@@ -241,7 +239,7 @@ def update_admin_algorithm(algorithm_id):
                 conn.execute(sql, update_values)
                 conn.commit()
                 
-                print(f"✅ 算法更新成功: ID={algorithm_id}")
+                logger.info(f"✅ 算法更新成功: ID={algorithm_id}")
                 
                 return jsonify({
                     'success': True,
@@ -251,7 +249,7 @@ def update_admin_algorithm(algorithm_id):
                 return jsonify({'error': '没有需要更新的字段'}), 400
                 
     except Exception as e:
-        print(f"Error updating algorithm: {e}")
+        logger.error(f"Error updating algorithm: {e}")
         return jsonify({'error': f'更新算法失败: {str(e)}'}), 500
 
 @algorithm_bp.route('/admin/algorithms/<int:algorithm_id>', methods=['DELETE'])
@@ -272,14 +270,14 @@ def delete_admin_algorithm(algorithm_id):
             conn.execute('DELETE FROM algorithms WHERE id = ?', (algorithm_id,))
             conn.commit()
             
-            print(f"✅ 算法删除成功: {algorithm['title']}")
+            logger.info(f"✅ 算法删除成功: {algorithm['title']}")
             
             return jsonify({
                 'success': True,
                 'message': '算法删除成功'
             })
     except Exception as e:
-        print(f"Error deleting algorithm: {e}")
+        logger.error(f"Error deleting algorithm: {e}")
         return jsonify({'error': f'删除算法失败: {str(e)}'}), 500
 
 @algorithm_bp.route('/admin/algorithms/reorder', methods=['PUT'])
@@ -305,14 +303,14 @@ def reorder_admin_algorithms():
             
             conn.commit()
             
-            print(f"✅ 算法排序更新成功")
+            logger.info(f"✅ 算法排序更新成功")
             
             return jsonify({
                 'success': True,
                 'message': '算法排序更新成功'
             })
     except Exception as e:
-        print(f"Error reordering algorithms: {e}")
+        logger.error(f"Error reordering algorithms: {e}")
         return jsonify({'error': f'更新算法排序失败: {str(e)}'}), 500
 
 # 算法竞赛获奖记录管理API
@@ -320,7 +318,7 @@ def reorder_admin_algorithms():
 def get_admin_algorithm_awards():
     """获取所有竞赛获奖记录（管理后台）"""
     try:
-        print("🔍 开始获取获奖记录数据...")
+        logger.debug("🔍 开始获取获奖记录数据...")
         with get_db() as conn:
             cursor = conn.execute('''
                 SELECT * FROM algorithm_awards 
@@ -333,10 +331,10 @@ def get_admin_algorithm_awards():
                 award_dict = dict(award)
                 result.append(award_dict)
             
-        print(f"✅ 成功获取 {len(result)} 个获奖记录")
+        logger.info(f"✅ 成功获取 {len(result)} 个获奖记录")
         return jsonify(result)
     except Exception as e:
-        print(f"❌ 获取获奖记录数据失败: {e}")
+        logger.error(f"❌ 获取获奖记录数据失败: {e}")
         return jsonify({'error': str(e)}), 500
 
 @algorithm_bp.route('/admin/algorithm-awards', methods=['POST'])
@@ -384,7 +382,7 @@ def create_admin_algorithm_award():
             award_id = cursor.lastrowid
             conn.commit()
             
-            print(f"✅ 竞赛获奖记录创建成功: {title}")
+            logger.info(f"✅ 竞赛获奖记录创建成功: {title}")
             
             return jsonify({
                 'success': True,
@@ -392,7 +390,7 @@ def create_admin_algorithm_award():
                 'award_id': award_id
             }), 201
     except Exception as e:
-        print(f"Error creating algorithm award: {e}")
+        logger.error(f"Error creating algorithm award: {e}")
         return jsonify({'error': f'创建竞赛获奖记录失败: {str(e)}'}), 500
 
 @algorithm_bp.route('/admin/algorithm-awards/<int:award_id>', methods=['GET'])
@@ -410,7 +408,7 @@ def get_admin_algorithm_award_detail(award_id):
                 'award': dict(award)
             })
     except Exception as e:
-        print(f"Error fetching algorithm award: {e}")
+        logger.error(f"Error fetching algorithm award: {e}")
         return jsonify({'error': f'获取竞赛获奖记录失败: {str(e)}'}), 500
 
 @algorithm_bp.route('/admin/algorithm-awards/<int:award_id>', methods=['PUT'])
@@ -480,7 +478,7 @@ def update_admin_algorithm_award(award_id):
                 conn.execute(sql, update_values)
                 conn.commit()
                 
-                print(f"✅ 竞赛获奖记录更新成功: ID={award_id}")
+                logger.info(f"✅ 竞赛获奖记录更新成功: ID={award_id}")
                 
                 return jsonify({
                     'success': True,
@@ -490,7 +488,7 @@ def update_admin_algorithm_award(award_id):
                 return jsonify({'error': '没有需要更新的字段'}), 400
                 
     except Exception as e:
-        print(f"Error updating algorithm award: {e}")
+        logger.error(f"Error updating algorithm award: {e}")
         return jsonify({'error': f'更新竞赛获奖记录失败: {str(e)}'}), 500
 
 @algorithm_bp.route('/admin/algorithm-awards/<int:award_id>', methods=['DELETE'])
@@ -511,14 +509,14 @@ def delete_admin_algorithm_award(award_id):
             conn.execute('DELETE FROM algorithm_awards WHERE id = ?', (award_id,))
             conn.commit()
             
-            print(f"✅ 竞赛获奖记录删除成功: {award['title']}")
+            logger.info(f"✅ 竞赛获奖记录删除成功: {award['title']}")
             
             return jsonify({
                 'success': True,
                 'message': '竞赛获奖记录删除成功'
             })
     except Exception as e:
-        print(f"Error deleting algorithm award: {e}")
+        logger.error(f"Error deleting algorithm award: {e}")
         return jsonify({'error': f'删除竞赛获奖记录失败: {str(e)}'}), 500
 
 @algorithm_bp.route('/admin/algorithm-awards/reorder', methods=['PUT'])
@@ -544,14 +542,14 @@ def reorder_admin_algorithm_awards():
             
             conn.commit()
             
-            print(f"✅ 竞赛获奖记录排序更新成功")
+            logger.info(f"✅ 竞赛获奖记录排序更新成功")
             
             return jsonify({
                 'success': True,
                 'message': '竞赛获奖记录排序更新成功'
             })
     except Exception as e:
-        print(f"Error reordering algorithm awards: {e}")
+        logger.error(f"Error reordering algorithm awards: {e}")
         return jsonify({'error': f'更新竞赛获奖记录排序失败: {str(e)}'}), 500
 
 # 项目概览管理API
@@ -559,7 +557,7 @@ def reorder_admin_algorithm_awards():
 def get_admin_project_overview():
     """获取所有项目概览统计（管理后台）"""
     try:
-        print("🔍 开始获取项目概览数据...")
+        logger.debug("🔍 开始获取项目概览数据...")
         with get_db() as conn:
             cursor = conn.execute('''
                 SELECT * FROM project_overview 
@@ -572,10 +570,10 @@ def get_admin_project_overview():
                 overview_dict = dict(overview)
                 result.append(overview_dict)
             
-        print(f"✅ 成功获取 {len(result)} 个项目概览")
+        logger.info(f"✅ 成功获取 {len(result)} 个项目概览")
         return jsonify(result)
     except Exception as e:
-        print(f"❌ 获取项目概览数据失败: {e}")
+        logger.error(f"❌ 获取项目概览数据失败: {e}")
         return jsonify({'error': str(e)}), 500
 
 @algorithm_bp.route('/admin/project-overview', methods=['POST'])
@@ -615,7 +613,7 @@ def create_admin_project_overview():
             overview_id = cursor.lastrowid
             conn.commit()
             
-            print(f"✅ 项目概览统计创建成功: {name}")
+            logger.info(f"✅ 项目概览统计创建成功: {name}")
             
             return jsonify({
                 'success': True,
@@ -623,7 +621,7 @@ def create_admin_project_overview():
                 'overview_id': overview_id
             }), 201
     except Exception as e:
-        print(f"Error creating project overview: {e}")
+        logger.error(f"Error creating project overview: {e}")
         return jsonify({'error': f'创建项目概览统计失败: {str(e)}'}), 500
 
 @algorithm_bp.route('/admin/project-overview/<int:overview_id>', methods=['GET'])
@@ -641,7 +639,7 @@ def get_admin_project_overview_detail(overview_id):
                 'overview': dict(overview)
             })
     except Exception as e:
-        print(f"Error fetching project overview: {e}")
+        logger.error(f"Error fetching project overview: {e}")
         return jsonify({'error': f'获取项目概览统计失败: {str(e)}'}), 500
 
 @algorithm_bp.route('/admin/project-overview/<int:overview_id>', methods=['PUT'])
@@ -696,7 +694,7 @@ def update_admin_project_overview(overview_id):
                 conn.execute(sql, update_values)
                 conn.commit()
                 
-                print(f"✅ 项目概览统计更新成功: ID={overview_id}")
+                logger.info(f"✅ 项目概览统计更新成功: ID={overview_id}")
                 
                 return jsonify({
                     'success': True,
@@ -706,7 +704,7 @@ def update_admin_project_overview(overview_id):
                 return jsonify({'error': '没有需要更新的字段'}), 400
                 
     except Exception as e:
-        print(f"Error updating project overview: {e}")
+        logger.error(f"Error updating project overview: {e}")
         return jsonify({'error': f'更新项目概览统计失败: {str(e)}'}), 500
 
 @algorithm_bp.route('/admin/project-overview/<int:overview_id>', methods=['DELETE'])
@@ -727,14 +725,14 @@ def delete_admin_project_overview(overview_id):
             conn.execute('DELETE FROM project_overview WHERE id = ?', (overview_id,))
             conn.commit()
             
-            print(f"✅ 项目概览统计删除成功: {overview['name']}")
+            logger.info(f"✅ 项目概览统计删除成功: {overview['name']}")
             
             return jsonify({
                 'success': True,
                 'message': '项目概览统计删除成功'
             })
     except Exception as e:
-        print(f"Error deleting project overview: {e}")
+        logger.error(f"Error deleting project overview: {e}")
         return jsonify({'error': f'删除项目概览统计失败: {str(e)}'}), 500
 
 @algorithm_bp.route('/admin/project-overview/reorder', methods=['PUT'])
@@ -760,12 +758,12 @@ def reorder_admin_project_overview():
             
             conn.commit()
             
-            print(f"✅ 项目概览统计排序更新成功")
+            logger.info(f"✅ 项目概览统计排序更新成功")
             
             return jsonify({
                 'success': True,
                 'message': '项目概览统计排序更新成功'
             })
     except Exception as e:
-        print(f"Error reordering project overview: {e}")
+        logger.error(f"Error reordering project overview: {e}")
         return jsonify({'error': f'更新项目概览统计排序失败: {str(e)}'}), 500 
\ No newline at end of file
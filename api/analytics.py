@@ -0,0 +1,308 @@
+# 访问统计API - 页面访问先写入内存环形缓冲，由后台线程批量写入访问记录并累加按小时/天的汇总
+# 管理端只读取汇总表；独立访客数由 HyperLogLog 草图合并估计，不做 COUNT(DISTINCT)
+
+import os
+import time
+import atexit
+import logging
+import threading
+from collections import deque
+from datetime import datetime, timedelta
+
+from flask import Blueprint, request, jsonify, session
+import db_utils
+from job_utils import job_queue, DAILY
+from sketch_utils import HyperLogLog
+
+logger = logging.getLogger(__name__)
+
+analytics_bp = Blueprint('analytics', __name__)
+
+# 环形缓冲容量，写入跟不上时丢弃最旧的访问
+DEFAULT_BUFFER_SIZE = 10000
+# 写入间隔（秒），缓冲超过一半时提前写入
+DEFAULT_FLUSH_INTERVAL = 10.0
+# 原始访问记录和小时汇总的保留天数（天汇总长期保留）
+RAW_RETENTION_DAYS = 30
+HOURLY_RETENTION_DAYS = 90
+
+# 汇总表：(表名, 时间桶列, 时间桶格式)
+ROLLUPS = (
+    ('visit_hourly', 'hour', '%Y-%m-%d %H:00'),
+    ('visit_daily', 'day', '%Y-%m-%d'),
+)
+
+
+class VisitRecorder:
+    """访问记录缓冲和后台写入线程"""
+
+    def __init__(self, size=DEFAULT_BUFFER_SIZE, flush_interval=DEFAULT_FLUSH_INTERVAL):
+        self.enabled = True
+        self.flush_interval = flush_interval
+        self._buffer = deque(maxlen=size)
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._flusher_pid = None
+        self.dropped = 0
+        self.flushed = 0
+        self.batches = 0
+        self.errors = 0
+        if hasattr(os, 'register_at_fork'):
+            # 子进程不继承父进程未写入的访问
+            os.register_at_fork(after_in_child=self._after_fork)
+
+    def _after_fork(self):
+        self._buffer = deque(maxlen=self._buffer.maxlen)
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wakeup = threading.Event()
+
+    def init_app(self, app):
+        enabled = app.config.get('ANALYTICS_ENABLED', os.environ.get('ANALYTICS_ENABLED', '1'))
+        # 只读数据库（Vercel）无法写入访问记录
+        self.enabled = str(enabled).lower() not in ('0', 'false', 'no', 'off') \
+            and db_utils.get_db_profile() != 'readonly'
+        size = int(app.config.get('ANALYTICS_BUFFER_SIZE', os.environ.get('ANALYTICS_BUFFER_SIZE', DEFAULT_BUFFER_SIZE)))
+        if size != self._buffer.maxlen:
+            self._buffer = deque(maxlen=size)
+        self.flush_interval = float(app.config.get(
+            'ANALYTICS_FLUSH_INTERVAL', os.environ.get('ANALYTICS_FLUSH_INTERVAL', self.flush_interval)
+        ))
+        app.extensions['visit_recorder'] = self
+        if self.enabled:
+            atexit.register(self.flush)
+
+    def record(self, path, session_id=None, referrer=None, user_agent=None):
+        """记录一次页面访问（只写入内存）"""
+        if not self.enabled:
+            return
+        self._ensure_flusher()
+        visit = (path[:255], session_id, (referrer or '')[:255] or None, (user_agent or '')[:255] or None, time.time())
+        with self._lock:
+            if len(self._buffer) == self._buffer.maxlen:
+                self.dropped += 1
+            self._buffer.append(visit)
+            half_full = len(self._buffer) * 2 >= self._buffer.maxlen
+        if half_full:
+            self._wakeup.set()
+
+    # ============ 写入 ============
+
+    def flush(self):
+        """把缓冲中的访问写入数据库，返回写入条数"""
+        with self._flush_lock:
+            with self._lock:
+                batch = list(self._buffer)
+                self._buffer.clear()
+            if not batch:
+                return 0
+            try:
+                self._write(batch)
+            except Exception as e:
+                # 访问统计允许少量丢失，写入失败的批次直接丢弃
+                with self._lock:
+                    self.errors += 1
+                    self.dropped += len(batch)
+                logger.warning(f"写入访问统计失败（丢弃 {len(batch)} 条）: {e}")
+                return 0
+            with self._lock:
+                self.batches += 1
+                self.flushed += len(batch)
+            return len(batch)
+
+    @staticmethod
+    def _aggregate(batch):
+        """按 (时间桶, 路径) 汇总访问次数和访客草图：{表名: {(时间桶, 路径): [次数, 草图]}}"""
+        rollups = {table: {} for table, _, _ in ROLLUPS}
+        for path, session_id, _, _, visited_at in batch:
+            moment = datetime.fromtimestamp(visited_at)
+            for table, _, bucket_format in ROLLUPS:
+                key = (moment.strftime(bucket_format), path)
+                entry = rollups[table].get(key)
+                if entry is None:
+                    entry = rollups[table][key] = [0, HyperLogLog()]
+                entry[0] += 1
+                if session_id:
+                    entry[1].add(session_id)
+        return rollups
+
+    def _write(self, batch):
+        rollups = self._aggregate(batch)
+        with db_utils.get_db() as conn:
+            # 草图需要读出后合并再写回，IMMEDIATE 事务避免多个进程同时合并同一行时丢失更新
+            if not conn.in_transaction:
+                conn.execute('BEGIN IMMEDIATE')
+            try:
+                conn.executemany('''
+                    INSERT INTO visits (path, session_id, referrer, user_agent, visited_at)
+                    VALUES (?, ?, ?, ?, ?)
+                ''', batch)
+                for table, bucket, _ in ROLLUPS:
+                    self._merge_rollup(conn, table, bucket, rollups[table])
+                conn.commit()
+            except Exception:
+                conn.rollback()
+                raise
+
+    @staticmethod
+    def _merge_rollup(conn, table, bucket, entries):
+        buckets = {}
+        for bucket_value, path in entries:
+            buckets.setdefault(bucket_value, []).append(path)
+        for bucket_value, paths in buckets.items():
+            placeholders = ', '.join('?' * len(paths))
+            existing = conn.execute(
+                f'SELECT path, visitors FROM {table} WHERE {bucket} = ? AND path IN ({placeholders})',
+                [bucket_value] + paths
+            ).fetchall()
+            for row in existing:
+                entries[(bucket_value, row['path'])][1].merge(HyperLogLog.from_bytes(row['visitors']))
+        conn.executemany(f'''
+            INSERT INTO {table} ({bucket}, path, views, visitors) VALUES (?, ?, ?, ?)
+            ON CONFLICT ({bucket}, path) DO UPDATE SET
+                views = views + excluded.views, visitors = excluded.visitors
+        ''', [(bucket_value, path, views, sketch.to_bytes())
+              for (bucket_value, path), (views, sketch) in entries.items()])
+
+    def _ensure_flusher(self):
+        if self._flusher_pid == os.getpid():
+            return
+        with self._lock:
+            if self._flusher_pid == os.getpid():
+                return
+            self._flusher_pid = os.getpid()
+        thread = threading.Thread(target=self._flush_loop, name='analytics-flusher', daemon=True)
+        thread.start()
+
+    def _flush_loop(self):
+        pid = os.getpid()
+        while self._flusher_pid == pid:
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            self.flush()
+
+    def stats(self):
+        with self._lock:
+            return {
+                'enabled': self.enabled,
+                'buffered': len(self._buffer),
+                'capacity': self._buffer.maxlen,
+                'flushed': self.flushed,
+                'batches': self.batches,
+                'dropped': self.dropped,
+                'errors': self.errors,
+            }
+
+
+visit_recorder = VisitRecorder()
+
+
+def record_visit(path, session_id=None, referrer=None, user_agent=None):
+    """记录一次页面访问（由 app.track_visits 调用）"""
+    visit_recorder.record(path, session_id, referrer, user_agent)
+
+
+@job_queue.handler('analytics.purge', max_attempts=1, interval=DAILY)
+def purge_visits(payload):
+    """维护任务：清理过期的原始访问记录和小时汇总"""
+    now = datetime.now()
+    with db_utils.get_db() as conn:
+        visits = conn.execute(
+            'DELETE FROM visits WHERE visited_at < ?',
+            ((now - timedelta(days=RAW_RETENTION_DAYS)).timestamp(),)
+        ).rowcount
+        hourly = conn.execute(
+            'DELETE FROM visit_hourly WHERE hour < ?',
+            ((now - timedelta(days=HOURLY_RETENTION_DAYS)).strftime('%Y-%m-%d %H:00'),)
+        ).rowcount
+        conn.commit()
+    return {'visits': visits, 'hourly': hourly}
+
+
+# ============ 管理端统计（只读取汇总表） ============
+
+def _is_admin():
+    return 'username' in session and session.get('role') == 'admin'
+
+def _int_arg(name, default, upper):
+    try:
+        value = int(request.args.get(name, default))
+    except ValueError:
+        value = default
+    return max(1, min(value, upper))
+
+def _summarize(rows, bucket):
+    """把 (时间桶, 路径, 次数, 草图) 行汇总为按时间桶、按路径和总计的访问次数与独立访客数"""
+    by_bucket = {}
+    by_path = {}
+    total = HyperLogLog()
+    total_views = 0
+    for row in rows:
+        sketch = HyperLogLog.from_bytes(row['visitors'])
+        total_views += row['views']
+        total.merge(sketch)
+        for groups, key in ((by_bucket, row[bucket]), (by_path, row['path'])):
+            entry = groups.get(key)
+            if entry is None:
+                entry = groups[key] = [0, HyperLogLog()]
+            entry[0] += row['views']
+            entry[1].merge(sketch)
+    return {
+        'views': total_views,
+        'visitors': total.count(),
+        'series': [{bucket: key, 'views': views, 'visitors': sketch.count()}
+                   for key, (views, sketch) in sorted(by_bucket.items())],
+        'paths': sorted(({'path': key, 'views': views, 'visitors': sketch.count()}
+                         for key, (views, sketch) in by_path.items()),
+                        key=lambda item: item['views'], reverse=True),
+    }
+
+@analytics_bp.route('/summary', methods=['GET'])
+def get_daily_summary():
+    """最近N天（默认7天）的每日访问次数、独立访客数及热门页面"""
+    if not _is_admin():
+        return jsonify({"error": "未授权"}), 401
+
+    days = _int_arg('days', 7, 366)
+    top = _int_arg('top', 10, 100)
+    # 先写入本进程缓冲中的访问，其他进程的在各自的写入间隔内可见
+    visit_recorder.flush()
+    since = (datetime.now() - timedelta(days=days - 1)).strftime('%Y-%m-%d')
+    with db_utils.get_db() as conn:
+        rows = conn.execute(
+            'SELECT day, path, views, visitors FROM visit_daily WHERE day >= ?', (since,)
+        ).fetchall()
+
+    summary = _summarize(rows, 'day')
+    summary['paths'] = summary['paths'][:top]
+    summary['days'] = days
+    return jsonify({"success": True, "data": summary})
+
+@analytics_bp.route('/hourly', methods=['GET'])
+def get_hourly_summary():
+    """最近N小时（默认24小时）的每小时访问次数和独立访客数"""
+    if not _is_admin():
+        return jsonify({"error": "未授权"}), 401
+
+    hours = _int_arg('hours', 24, 24 * HOURLY_RETENTION_DAYS)
+    top = _int_arg('top', 10, 100)
+    visit_recorder.flush()
+    since = (datetime.now() - timedelta(hours=hours - 1)).strftime('%Y-%m-%d %H:00')
+    with db_utils.get_db() as conn:
+        rows = conn.execute(
+            'SELECT hour, path, views, visitors FROM visit_hourly WHERE hour >= ?', (since,)
+        ).fetchall()
+
+    summary = _summarize(rows, 'hour')
+    summary['paths'] = summary['paths'][:top]
+    summary['hours'] = hours
+    return jsonify({"success": True, "data": summary})
+
+@analytics_bp.route('/recorder', methods=['GET'])
+def get_recorder_stats():
+    """本进程访问缓冲的状态（缓冲条数、已写入、丢弃次数）"""
+    if not _is_admin():
+        return jsonify({"error": "未授权"}), 401
+
+    return jsonify({"success": True, "data": visit_recorder.stats()})
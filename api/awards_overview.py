@@ -1,9 +1,11 @@
 from flask import Blueprint, request, jsonify, abort, session
 from db_utils import get_db
 from datetime import datetime
-import traceback
+import logging
 
 # 创建算法蓝图
+logger = logging.getLogger(__name__)
+
 algorithm_bp = Blueprint('algorithm', __name__, url_prefix='/api')
 
 
@@ -26,8 +28,7 @@ def get_frontend_algorithm_awards():
             
             return jsonify(awards_data)
     except Exception as e:
-        print(f"Error fetching frontend algorithm awards: {e}")
-        traceback.print_exc()
+        logger.exception(f"Error fetching frontend algorithm awards: {e}")
         return jsonify({'error': str(e)}), 500
 
 @algorithm_bp.route('/frontend/project-overview', methods=['GET'])
@@ -48,8 +49,7 @@ def get_frontend_project_overview():
             
             return jsonify(overviews_data)
     except Exception as e:
-        print(f"Error fetching frontend project overview: {e}")
-        traceback.print_exc()
+        logger.exception(f"Error fetching frontend project overview: {e}")
         return jsonify({'error': str(e)}), 500
 
 
@@ -69,7 +69,7 @@ def get_frontend_project_overview():
 def get_admin_algorithm_awards():
     """获取所有竞赛获奖记录（管理后台）"""
     try:
-        print("🔍 开始获取获奖记录数据...")
+        logger.debug("🔍 开始获取获奖记录数据...")
         with get_db() as conn:
             cursor = conn.execute('''
                 SELECT * FROM algorithm_awards 
@@ -82,10 +82,10 @@ def get_admin_algorithm_awards():
                 award_dict = dict(award)
                 result.append(award_dict)
             
-        print(f"✅ 成功获取 {len(result)} 个获奖记录")
+        logger.info(f"✅ 成功获取 {len(result)} 个获奖记录")
         return jsonify(result)
     except Exception as e:
-        print(f"❌ 获取获奖记录数据失败: {e}")
+        logger.error(f"❌ 获取获奖记录数据失败: {e}")
         return jsonify({'error': str(e)}), 500
 
 @algorithm_bp.route('/admin/algorithm-awards', methods=['POST'])
@@ -133,7 +133,7 @@ def create_admin_algorithm_award():
             award_id = cursor.lastrowid
             conn.commit()
             
-            print(f"✅ 竞赛获奖记录创建成功: {title}")
+            logger.info(f"✅ 竞赛获奖记录创建成功: {title}")
             
             return jsonify({
                 'success': True,
@@ -141,7 +141,7 @@ def create_admin_algorithm_award():
                 'award_id': award_id
             }), 201
     except Exception as e:
-        print(f"Error creating algorithm award: {e}")
+        logger.error(f"Error creating algorithm award: {e}")
         return jsonify({'error': f'创建竞赛获奖记录失败: {str(e)}'}), 500
 
 @algorithm_bp.route('/admin/algorithm-awards/<int:award_id>', methods=['GET'])
@@ -159,7 +159,7 @@ def get_admin_algorithm_award_detail(award_id):
                 'award': dict(award)
             })
     except Exception as e:
-        print(f"Error fetching algorithm award: {e}")
+        logger.error(f"Error fetching algorithm award: {e}")
         return jsonify({'error': f'获取竞赛获奖记录失败: {str(e)}'}), 500
 
 @algorithm_bp.route('/admin/algorithm-awards/<int:award_id>', methods=['PUT'])
@@ -229,7 +229,7 @@ def update_admin_algorithm_award(award_id):
                 conn.execute(sql, update_values)
                 conn.commit()
                 
-                print(f"✅ 竞赛获奖记录更新成功: ID={award_id}")
+                logger.info(f"✅ 竞赛获奖记录更新成功: ID={award_id}")
                 
                 return jsonify({
                     'success': True,
@@ -239,7 +239,7 @@ def update_admin_algorithm_award(award_id):
                 return jsonify({'error': '没有需要更新的字段'}), 400
                 
     except Exception as e:
-        print(f"Error updating algorithm award: {e}")
+        logger.error(f"Error updating algorithm award: {e}")
         return jsonify({'error': f'更新竞赛获奖记录失败: {str(e)}'}), 500
 
 @algorithm_bp.route('/admin/algorithm-awards/<int:award_id>', methods=['DELETE'])
@@ -260,14 +260,14 @@ def delete_admin_algorithm_award(award_id):
             conn.execute('DELETE FROM algorithm_awards WHERE id = ?', (award_id,))
             conn.commit()
             
-            print(f"✅ 竞赛获奖记录删除成功: {award['title']}")
+            logger.info(f"✅ 竞赛获奖记录删除成功: {award['title']}")
             
             return jsonify({
                 'success': True,
                 'message': '竞赛获奖记录删除成功'
             })
     except Exception as e:
-        print(f"Error deleting algorithm award: {e}")
+        logger.error(f"Error deleting algorithm award: {e}")
         return jsonify({'error': f'删除竞赛获奖记录失败: {str(e)}'}), 500
 
 @algorithm_bp.route('/admin/algorithm-awards/reorder', methods=['PUT'])
@@ -293,14 +293,14 @@ def reorder_admin_algorithm_awards():
             
             conn.commit()
             
-            print(f"✅ 竞赛获奖记录排序更新成功")
+            logger.info(f"✅ 竞赛获奖记录排序更新成功")
             
             return jsonify({
                 'success': True,
                 'message': '竞赛获奖记录排序更新成功'
             })
     except Exception as e:
-        print(f"Error reordering algorithm awards: {e}")
+        logger.error(f"Error reordering algorithm awards: {e}")
         return jsonify({'error': f'更新竞赛获奖记录排序失败: {str(e)}'}), 500
 
 # 项目概览管理API
@@ -308,7 +308,7 @@ def reorder_admin_algorithm_awards():
 def get_admin_project_overview():
     """获取所有项目概览统计（管理后台）"""
     try:
-        print("🔍 开始获取项目概览数据...")
+        logger.debug("🔍 开始获取项目概览数据...")
         with get_db() as conn:
             cursor = conn.execute('''
                 SELECT * FROM project_overview 
@@ -321,10 +321,10 @@ def get_admin_project_overview():
                 overview_dict = dict(overview)
                 result.append(overview_dict)
             
-        print(f"✅ 成功获取 {len(result)} 个项目概览")
+        logger.info(f"✅ 成功获取 {len(result)} 个项目概览")
         return jsonify(result)
     except Exception as e:
-        print(f"❌ 获取项目概览数据失败: {e}")
+        logger.error(f"❌ 获取项目概览数据失败: {e}")
         return jsonify({'error': str(e)}), 500
 
 @algorithm_bp.route('/admin/project-overview', methods=['POST'])
@@ -364,7 +364,7 @@ def create_admin_project_overview():
             overview_id = cursor.lastrowid
             conn.commit()
             
-            print(f"✅ 项目概览统计创建成功: {name}")
+            logger.info(f"✅ 项目概览统计创建成功: {name}")
             
             return jsonify({
                 'success': True,
@@ -372,7 +372,7 @@ def create_admin_project_overview():
                 'overview_id': overview_id
             }), 201
     except Exception as e:
-        print(f"Error creating project overview: {e}")
+        logger.error(f"Error creating project overview: {e}")
         return jsonify({'error': f'创建项目概览统计失败: {str(e)}'}), 500
 
 @algorithm_bp.route('/admin/project-overview/<int:overview_id>', methods=['GET'])
@@ -390,7 +390,7 @@ def get_admin_project_overview_detail(overview_id):
                 'overview': dict(overview)
             })
     except Exception as e:
-        print(f"Error fetching project overview: {e}")
+        logger.error(f"Error fetching project overview: {e}")
         return jsonify({'error': f'获取项目概览统计失败: {str(e)}'}), 500
 
 @algorithm_bp.route('/admin/project-overview/<int:overview_id>', methods=['PUT'])
@@ -445,7 +445,7 @@ def update_admin_project_overview(overview_id):
                 conn.execute(sql, update_values)
                 conn.commit()
                 
-                print(f"✅ 项目概览统计更新成功: ID={overview_id}")
+                logger.info(f"✅ 项目概览统计更新成功: ID={overview_id}")
                 
                 return jsonify({
                     'success': True,
@@ -455,7 +455,7 @@ def update_admin_project_overview(overview_id):
                 return jsonify({'error': '没有需要更新的字段'}), 400
                 
     except Exception as e:
-        print(f"Error updating project overview: {e}")
+        logger.error(f"Error updating project overview: {e}")
         return jsonify({'error': f'更新项目概览统计失败: {str(e)}'}), 500
 
 @algorithm_bp.route('/admin/project-overview/<int:overview_id>', methods=['DELETE'])
@@ -476,14 +476,14 @@ def delete_admin_project_overview(overview_id):
             conn.execute('DELETE FROM project_overview WHERE id = ?', (overview_id,))
             conn.commit()
             
-            print(f"✅ 项目概览统计删除成功: {overview['name']}")
+            logger.info(f"✅ 项目概览统计删除成功: {overview['name']}")
             
             return jsonify({
                 'success': True,
                 'message': '项目概览统计删除成功'
             })
     except Exception as e:
-        print(f"Error deleting project overview: {e}")
+        logger.error(f"Error deleting project overview: {e}")
         return jsonify({'error': f'删除项目概览统计失败: {str(e)}'}), 500
 
 @algorithm_bp.route('/admin/project-overview/reorder', methods=['PUT'])
@@ -509,12 +509,12 @@ def reorder_admin_project_overview():
             
             conn.commit()
             
-            print(f"✅ 项目概览统计排序更新成功")
+            logger.info(f"✅ 项目概览统计排序更新成功")
             
             return jsonify({
                 'success': True,
                 'message': '项目概览统计排序更新成功'
             })
     except Exception as e:
-        print(f"Error reordering project overview: {e}")
+        logger.error(f"Error reordering project overview: {e}")
         return jsonify({'error': f'更新项目概览统计排序失败: {str(e)}'}), 500 
\ No newline at end of file
@@ -0,0 +1,204 @@
+# 前端首屏数据API - 一次请求返回多个数据区块，按区块缓存已编码的JSON
+
+import json
+import logging
+import threading
+
+from flask import Blueprint, request, jsonify, current_app, g, render_template, stream_template
+from markupsafe import Markup
+from cache_utils import current_generations, note_cached_read, cache_skips, skipped_since
+
+logger = logging.getLogger(__name__)
+
+bootstrap_bp = Blueprint('bootstrap', __name__)
+
+# 区块注册表：名称 -> {'path': 对应的独立API路径, 'tables': 依赖的表}
+_sections = {}
+
+# 页面预设：页面名称 -> 首屏需要的区块
+PAGE_PRESETS = {}
+
+# 区块缓存：名称 -> (依赖表的代数, 编码后的JSON字节)
+_cache = {}
+_cache_lock = threading.Lock()
+
+def register_section(name, path, tables):
+    """
+    注册一个可通过 bootstrap 获取的数据区块
+
+    区块内容由 path 对应的GET视图生成，与单独请求该API的响应完全一致；
+    视图不能依赖查询参数（bootstrap 请求不会转发参数，视图只会看到默认值）。
+
+    Args:
+        name: 区块名称
+        path: 独立API路径，如 /api/team
+        tables: 视图读取的表，任一表的修改代数变化都会使缓存失效
+    """
+    _sections[name] = {'path': path, 'tables': tuple(tables), 'view': None}
+
+def register_preset(page, sections):
+    """注册页面预设"""
+    PAGE_PRESETS[page] = tuple(sections)
+
+def _resolve_view(section):
+    """按路径找到视图函数（首次使用时解析）"""
+    if section['view'] is None:
+        adapter = current_app.url_map.bind('localhost')
+        endpoint, view_args = adapter.match(section['path'], method='GET')
+        view = current_app.view_functions[endpoint]
+        section['view'] = (view, view_args)
+    return section['view']
+
+def _render_section(name, section):
+    """调用视图生成区块JSON；视图未返回200或返回了兜底数据（调用了 skip_cache）时返回 None"""
+    view, view_args = _resolve_view(section)
+    mark = cache_skips()
+    response = current_app.make_response(view(**view_args))
+    if skipped_since(mark):
+        logger.warning(f"bootstrap 区块 {name} 返回了兜底数据")
+        return None
+    if response.status_code != 200:
+        logger.warning(f"bootstrap 区块 {name} 生成失败，状态码 {response.status_code}")
+        return None
+    return response.get_data().strip()
+
+def get_section_bytes(name, generations):
+    """
+    获取区块编码后的JSON，依赖表未变化时直接复用缓存
+
+    Returns:
+        tuple: (JSON字节, 是否命中缓存)；生成失败时字节为 None，不缓存也不输出该区块
+    """
+    section = _sections[name]
+    note_cached_read(section['tables'])
+    key = tuple(generations.get(table, 0) for table in section['tables'])
+    cached = _cache.get(name)
+    if cached is not None and cached[0] == key:
+        return cached[1], True
+
+    body = _render_section(name, section)
+    if body is not None:
+        with _cache_lock:
+            _cache[name] = (key, body)
+    return body, False
+
+def clear_cache():
+    """清空区块缓存"""
+    with _cache_lock:
+        _cache.clear()
+
+def _requested_sections():
+    """解析 sections 和 preset 参数，保持请求顺序并去重"""
+    names = []
+    preset = request.args.get('preset', '').strip()
+    if preset:
+        if preset not in PAGE_PRESETS:
+            return None, f"未知的页面预设: {preset}"
+        names.extend(PAGE_PRESETS[preset])
+    for name in request.args.get('sections', '').split(','):
+        name = name.strip()
+        if name:
+            names.append(name)
+    unknown = [name for name in names if name not in _sections]
+    if unknown:
+        return None, f"未知的数据区块: {', '.join(unknown)}"
+    return list(dict.fromkeys(names)), None
+
+def build_payload(names):
+    """
+    拼接多个区块为一个JSON对象
+
+    只读取一次修改代数；未变化的区块直接拼接缓存的字节，不再重新查询和编码。
+    生成失败的区块不输出，前端对缺失的区块回退为请求原API。
+
+    Returns:
+        tuple: (JSON字节, 命中缓存的区块数)
+    """
+    generations = current_generations()
+
+    parts = []
+    hits = 0
+    for name in names:
+        body, hit = get_section_bytes(name, generations)
+        if body is None:
+            continue
+        hits += hit
+        parts.append(json.dumps(name).encode() + b':' + body)
+    return b'{' + b','.join(parts) + b'}', hits
+
+# 内联到 <script type="application/json"> 时需要转义的字符，避免提前闭合标签
+_HTML_UNSAFE = {ord('<'): '\\u003c', ord('>'): '\\u003e', ord('&'): '\\u0026', ord("'"): '\\u0027'}
+
+def inline_enabled():
+    """是否在页面中内联首屏数据：?inline=1/0 优先，其次为 INLINE_PAGE_DATA 配置"""
+    flag = request.args.get('inline')
+    if flag is not None:
+        return flag.lower() not in ('0', 'false', 'no', 'off')
+    return bool(current_app.config.get('INLINE_PAGE_DATA'))
+
+def page_data_script(preset):
+    """生成内联首屏数据的 script 标签；失败时返回空串，由前端回退为请求API"""
+    try:
+        payload, _ = build_payload(PAGE_PRESETS[preset])
+    except Exception as e:
+        logger.exception(f"生成页面 {preset} 内联数据失败: {e}")
+        return Markup('')
+    data = payload.decode('utf-8').translate(_HTML_UNSAFE)
+    return Markup(f'<script type="application/json" id="page-bootstrap-data">{data}</script>')
+
+def render_page(template, preset, **context):
+    """
+    渲染前端页面，开启内联模式时流式输出并嵌入首屏数据
+
+    模板中的 page_data() 在输出到该位置时才查询数据，
+    之前的 <head> 和首屏内容会先发送给浏览器。
+    """
+    if not inline_enabled():
+        return render_template(template, **context)
+    g._page_data_inlined = True
+    return current_app.response_class(
+        stream_template(template, page_data=lambda: page_data_script(preset), **context)
+    )
+
+@bootstrap_bp.route('/api/frontend/bootstrap', methods=['GET'])
+def get_bootstrap():
+    """一次返回多个前端数据区块，如 ?sections=team,advisors 或 ?preset=index"""
+    names, error = _requested_sections()
+    if error:
+        return jsonify({'error': error, 'sections': sorted(_sections), 'presets': sorted(PAGE_PRESETS)}), 400
+    if not names:
+        return jsonify({'error': '请通过 sections 或 preset 参数指定数据区块'}), 400
+
+    payload, hits = build_payload(names)
+    response = current_app.response_class(payload, mimetype='application/json')
+    response.headers['X-Bootstrap-Cache'] = f'{hits}/{len(names)}'
+    return response
+
+# ============ 区块与页面预设 ============
+
+register_section('team', '/api/team', ['team_members'])
+register_section('grades', '/api/grades', ['grades', 'team_members'])
+register_section('research', '/api/research', ['research_areas'])
+register_section('research_categories', '/api/research/categories', ['research_areas'])
+register_section('papers', '/api/papers', ['papers'])
+register_section('frontend_papers', '/api/frontend/papers', ['papers'])
+register_section('activities', '/api/frontend/activities', ['notifications'])
+register_section('advisors', '/api/frontend/advisors', ['advisors'])
+register_section('innovation_projects', '/api/frontend/innovation-projects', ['innovation_projects'])
+register_section('innovation_stats', '/api/innovation/frontend/stats', ['innovation_stats'])
+register_section('achievements', '/api/innovation/frontend/achievements', ['achievements'])
+register_section('carousel', '/api/innovation/frontend/carousel', ['innovation_carousel'])
+register_section('training_projects', '/api/innovation/frontend/training-projects', ['innovation_training_projects'])
+register_section('intellectual_properties', '/api/innovation/frontend/intellectual-properties', ['intellectual_properties'])
+register_section('enterprise_cooperations', '/api/innovation/frontend/enterprise-cooperations', ['enterprise_cooperations'])
+register_section('algorithms', '/api/frontend/algorithms', ['algorithms'])
+register_section('algorithm_awards', '/api/frontend/algorithm-awards', ['algorithm_awards'])
+register_section('project_overview', '/api/frontend/project-overview', ['project_overview'])
+
+register_preset('index', ['advisors', 'team', 'frontend_papers', 'innovation_projects', 'activities'])
+register_preset('team', ['team', 'grades', 'research_categories', 'research'])
+register_preset('paper', ['papers'])
+register_preset('innovation', [
+    'innovation_stats', 'achievements', 'carousel', 'training_projects',
+    'intellectual_properties', 'enterprise_cooperations',
+])
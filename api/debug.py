@@ -0,0 +1,127 @@
+# 调试API - 提供SQL分析等运行时诊断数据（仅管理员）
+
+from flask import Blueprint, request, jsonify, session
+from profiler_utils import query_profiler
+from etag_utils import conditional_get
+from cache_utils import cache_stats, clear_all
+from materialize_utils import materializer
+from job_utils import job_queue
+from counter_utils import view_counter
+from suggest_utils import suggest_index
+import db_utils
+
+debug_bp = Blueprint('debug', __name__)
+
+def _is_admin():
+    return 'username' in session and session.get('role') == 'admin'
+
+@debug_bp.route('/debug/queries', methods=['GET'])
+def get_query_report():
+    """获取按数据库耗时排序的端点SQL汇总及最近的N+1事件"""
+    if not _is_admin():
+        return jsonify({"error": "未授权"}), 401
+
+    try:
+        limit = int(request.args.get('limit', 20))
+    except ValueError:
+        limit = 20
+
+    return jsonify({
+        "success": True,
+        "data": query_profiler.report(limit=limit)
+    })
+
+@debug_bp.route('/debug/queries', methods=['DELETE'])
+def reset_query_report():
+    """清空SQL汇总统计"""
+    if not _is_admin():
+        return jsonify({"error": "未授权"}), 401
+
+    query_profiler.reset()
+    return jsonify({"success": True, "message": "SQL统计已清空"})
+
+@debug_bp.route('/debug/etags', methods=['GET'])
+def get_etag_report():
+    """查看各端点自动学习到的依赖表及304次数"""
+    if not _is_admin():
+        return jsonify({"error": "未授权"}), 401
+
+    return jsonify({
+        "success": True,
+        "data": conditional_get.stats()
+    })
+
+@debug_bp.route('/debug/materialized', methods=['GET'])
+def get_materialized_report():
+    """查看预生成响应的命中、重建次数及是否过期"""
+    if not _is_admin():
+        return jsonify({"error": "未授权"}), 401
+
+    return jsonify({
+        "success": True,
+        "data": dict(materializer.stats(), state=materializer.check())
+    })
+
+@debug_bp.route('/debug/jobs', methods=['GET'])
+def get_job_report():
+    """查看后台任务各状态的数量及本进程的完成、重试、失败次数"""
+    if not _is_admin():
+        return jsonify({"error": "未授权"}), 401
+
+    return jsonify({
+        "success": True,
+        "data": job_queue.stats()
+    })
+
+@debug_bp.route('/debug/counters', methods=['GET'])
+def get_counter_report():
+    """查看浏览量缓冲中未写入的计数及批量写入次数"""
+    if not _is_admin():
+        return jsonify({"error": "未授权"}), 401
+
+    return jsonify({
+        "success": True,
+        "data": view_counter.stats()
+    })
+
+@debug_bp.route('/debug/suggest', methods=['GET'])
+def get_suggest_report():
+    """查看联想索引各类内容的条目数、键数及重新加载次数"""
+    if not _is_admin():
+        return jsonify({"error": "未授权"}), 401
+
+    return jsonify({
+        "success": True,
+        "data": suggest_index.stats()
+    })
+
+@debug_bp.route('/debug/db-pool', methods=['GET'])
+def get_db_pool_report():
+    """查看本进程数据库连接池的借出、等待、溢出次数及打开的连接数"""
+    if not _is_admin():
+        return jsonify({"error": "未授权"}), 401
+
+    return jsonify({
+        "success": True,
+        "data": db_utils.get_pool_stats()
+    })
+
+@debug_bp.route('/debug/cache', methods=['GET'])
+def get_cache_report():
+    """查看各缓存的命中、未命中、淘汰和失效次数"""
+    if not _is_admin():
+        return jsonify({"error": "未授权"}), 401
+
+    return jsonify({
+        "success": True,
+        "data": cache_stats()
+    })
+
+@debug_bp.route('/debug/cache', methods=['DELETE'])
+def clear_cache_report():
+    """清空所有缓存"""
+    if not _is_admin():
+        return jsonify({"error": "未授权"}), 401
+
+    clear_all()
+    return jsonify({"success": True, "message": "缓存已清空"})
@@ -2,29 +2,35 @@
 from flask import Flask, jsonify
 import sys
 import os
-import sqlite3
 import json
+import logging
+from contextlib import closing
 from datetime import datetime
 
 # 添加项目根目录到路径
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
+from db_utils import open_connection, init_app
+from log_utils import setup_logging
+
+logger = logging.getLogger(__name__)
+
 app = Flask(__name__)
+setup_logging(app)
+init_app(app)  # 请求结束时检查未关闭的连接
 
 def get_db_connection():
-    """获取数据库连接"""
+    """获取只读数据库连接（调用方需使用 closing() 确保关闭）"""
     db_path = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'acm_lab.db')
-    conn = sqlite3.connect(f'file:{db_path}?mode=ro', uri=True)
-    conn.row_factory = sqlite3.Row
-    return conn
+    return open_connection(db_path, profile='readonly', stacklevel=2)
 
 @app.route('/api/frontend/papers')
 def get_frontend_papers():
     """获取前端论文数据"""
     try:
-        conn = get_db_connection()
-        cursor = conn.execute("SELECT * FROM papers ORDER BY order_index ASC, updated_at DESC LIMIT 3")
-        papers = cursor.fetchall()
+        with closing(get_db_connection()) as conn:
+            cursor = conn.execute("SELECT * FROM papers ORDER BY order_index ASC, updated_at DESC LIMIT 3")
+            papers = cursor.fetchall()
         
         papers_data = []
         for paper in papers:
@@ -72,45 +78,43 @@ def get_frontend_papers():
             paper_dict['category_names'] = category_names
             papers_data.append(paper_dict)
         
-        conn.close()
         return jsonify(papers_data)
     except Exception as e:
-        print(f"Error fetching frontend papers: {e}")
+        logger.error(f"Error fetching frontend papers: {e}")
         return jsonify([])
 
 @app.route('/api/frontend/team')
 def get_frontend_team():
     """获取前端团队数据"""
     try:
-        conn = get_db_connection()
-        cursor = conn.execute('SELECT * FROM team_members ORDER BY order_index ASC, created_at DESC')
-        members = cursor.fetchall()
+        with closing(get_db_connection()) as conn:
+            cursor = conn.execute('SELECT * FROM team_members ORDER BY order_index ASC, created_at DESC')
+            members = cursor.fetchall()
         
         members_data = []
         for member in members:
             member_dict = dict(member)
             members_data.append(member_dict)
         
-        conn.close()
         return jsonify(members_data)
     except Exception as e:
-        print(f"Error fetching frontend team: {e}")
+        logger.error(f"Error fetching frontend team: {e}")
         return jsonify([])
 
 @app.route('/api/frontend/activities')
 def get_frontend_activities():
     """获取前端活动数据"""
     try:
-        conn = get_db_connection()
-        cursor = conn.execute('''
-            SELECT id, title, excerpt, category, author, publish_date, reading_time, tags
-            FROM notifications 
-            WHERE status = 'published'
-            ORDER BY order_index ASC, publish_date DESC
-            LIMIT 3
-        ''')
+        with closing(get_db_connection()) as conn:
+            rows = conn.execute('''
+                SELECT id, title, excerpt, category, author, publish_date, reading_time, tags
+                FROM notifications 
+                WHERE status = 'published'
+                ORDER BY order_index ASC, publish_date DESC
+                LIMIT 3
+            ''').fetchall()
         activities = []
-        for row in cursor.fetchall():
+        for row in rows:
             activity = dict(row)
             # 格式化日期
             if activity['publish_date']:
@@ -123,29 +127,27 @@ def get_frontend_activities():
                 activity['formatted_date'] = '未知日期'
             activities.append(activity)
         
-        conn.close()
         return jsonify(activities)
     except Exception as e:
-        print(f"Error fetching frontend activities: {e}")
+        logger.error(f"Error fetching frontend activities: {e}")
         return jsonify([])
 
 @app.route('/api/frontend/innovation-projects')
 def get_frontend_innovation_projects():
     """获取前端科创项目数据"""
     try:
-        conn = get_db_connection()
-        cursor = conn.execute("SELECT * FROM innovation_projects WHERE status = 'active' ORDER BY sort_order")
-        projects = cursor.fetchall()
+        with closing(get_db_connection()) as conn:
+            cursor = conn.execute("SELECT * FROM innovation_projects WHERE status = 'active' ORDER BY COALESCE(sort_order, 0) ASC, created_at DESC")
+            projects = cursor.fetchall()
         
         projects_data = []
         for project in projects:
             project_dict = dict(project)
             projects_data.append(project_dict)
         
-        conn.close()
         return jsonify(projects_data)
     except Exception as e:
-        print(f"Error fetching frontend innovation projects: {e}")
+        logger.error(f"Error fetching frontend innovation projects: {e}")
         return jsonify([])
 
 # Vercel处理函数
@@ -10,8 +10,6 @@ from db_utils import get_db
 import logging
 import json
 
-# 配置日志
-logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 grades_bp = Blueprint('grades', __name__)
@@ -3,26 +3,30 @@ from db_utils import get_db
 from datetime import datetime
 # from socket_utils import notify_page_refresh  # Vercel 不支持 WebSocket
 from api.utils import allowed_file, ensure_upload_dir
+from pagination_utils import page_request, fetch_page, page_response
 import json
 
 innovation_bp = Blueprint('innovation', __name__, url_prefix='/api/innovation')
 
+# 各管理列表的排序键（与各表的 sort_order 索引一致）
+SORT_ORDER = (('sort_order', 'ASC'),)
+
 # ============ 项目统计管理 ============
 
 @innovation_bp.route('/stats', methods=['GET'])
 def get_stats():
-    """获取项目统计列表"""
+    """获取项目统计列表（带 limit/cursor 参数时按游标分页）"""
+    page = page_request('innovation_stats', SORT_ORDER)
     try:
         with get_db() as conn:
-            cursor = conn.execute("SELECT * FROM innovation_stats ORDER BY sort_order ASC")
-            stats = cursor.fetchall()
+            stats, page_info = fetch_page(conn, page, 'innovation_stats', SORT_ORDER)
             
             result = []
             for stat in stats:
                 stat_dict = dict(stat)
                 result.append(stat_dict)
         
-        return jsonify(result)
+        return page_response(result, page_info)
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -258,11 +262,11 @@ def get_frontend_enterprise_cooperations():
 
 @innovation_bp.route('/carousel', methods=['GET'])
 def get_carousel():
-    """获取轮播图列表"""
+    """获取轮播图列表（带 limit/cursor 参数时按游标分页）"""
+    page = page_request('innovation_carousel', SORT_ORDER)
     try:
         with get_db() as conn:
-            cursor = conn.execute("SELECT * FROM innovation_carousel ORDER BY sort_order ASC")
-            carousels = cursor.fetchall()
+            carousels, page_info = fetch_page(conn, page, 'innovation_carousel', SORT_ORDER)
             
             result = []
             for carousel in carousels:
@@ -270,7 +274,7 @@ def get_carousel():
                 carousel_dict['image_display_url'] = carousel_dict.get('image_url', '')
                 result.append(carousel_dict)
         
-        return jsonify(result)
+        return page_response(result, page_info)
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -420,18 +424,18 @@ def upload_carousel_image():
 
 @innovation_bp.route('/achievements', methods=['GET'])
 def get_achievements():
-    """获取成果与荣誉列表"""
+    """获取成果与荣誉列表（带 limit/cursor 参数时按游标分页）"""
+    page = page_request('achievements', SORT_ORDER)
     try:
         with get_db() as conn:
-            cursor = conn.execute("SELECT * FROM achievements ORDER BY sort_order ASC")
-            achievements = cursor.fetchall()
+            achievements, page_info = fetch_page(conn, page, 'achievements', SORT_ORDER)
             
             result = []
             for achievement in achievements:
                 achievement_dict = dict(achievement)
                 result.append(achievement_dict)
         
-        return jsonify(result)
+        return page_response(result, page_info)
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -554,11 +558,11 @@ def reorder_achievements():
 
 @innovation_bp.route('/training-projects', methods=['GET'])
 def get_training_projects():
-    """获取训练计划列表"""
+    """获取训练计划列表（带 limit/cursor 参数时按游标分页）"""
+    page = page_request('innovation_training_projects', SORT_ORDER)
     try:
         with get_db() as conn:
-            cursor = conn.execute("SELECT * FROM innovation_training_projects ORDER BY sort_order ASC")
-            projects = cursor.fetchall()
+            projects, page_info = fetch_page(conn, page, 'innovation_training_projects', SORT_ORDER)
             
             result = []
             for project in projects:
@@ -566,7 +570,7 @@ def get_training_projects():
                 project_dict['image_display_url'] = project_dict.get('image_url', '')
                 result.append(project_dict)
         
-        return jsonify(result)
+        return page_response(result, page_info)
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -730,11 +734,11 @@ def upload_training_project_image():
 
 @innovation_bp.route('/intellectual-properties', methods=['GET'])
 def get_intellectual_properties():
-    """获取知识产权列表"""
+    """获取知识产权列表（带 limit/cursor 参数时按游标分页）"""
+    page = page_request('intellectual_properties', SORT_ORDER)
     try:
         with get_db() as conn:
-            cursor = conn.execute("SELECT * FROM intellectual_properties ORDER BY sort_order ASC")
-            properties = cursor.fetchall()
+            properties, page_info = fetch_page(conn, page, 'intellectual_properties', SORT_ORDER)
             
             result = []
             for property in properties:
@@ -742,7 +746,7 @@ def get_intellectual_properties():
                 property_dict['image_display_url'] = property_dict.get('image_url', '')
                 result.append(property_dict)
         
-        return jsonify(result)
+        return page_response(result, page_info)
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -898,11 +902,11 @@ def upload_intellectual_property_image():
 
 @innovation_bp.route('/enterprise-cooperations', methods=['GET'])
 def get_enterprise_cooperations():
-    """获取校企合作列表"""
+    """获取校企合作列表（带 limit/cursor 参数时按游标分页）"""
+    page = page_request('enterprise_cooperations', SORT_ORDER)
     try:
         with get_db() as conn:
-            cursor = conn.execute("SELECT * FROM enterprise_cooperations ORDER BY sort_order ASC")
-            cooperations = cursor.fetchall()
+            cooperations, page_info = fetch_page(conn, page, 'enterprise_cooperations', SORT_ORDER)
             
             result = []
             for cooperation in cooperations:
@@ -910,7 +914,7 @@ def get_enterprise_cooperations():
                 cooperation_dict['image_display_url'] = cooperation_dict.get('image_url', '')
                 result.append(cooperation_dict)
         
-        return jsonify(result)
+        return page_response(result, page_info)
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -4,53 +4,54 @@ import os
 # from socket_utils import notify_page_refresh  # Vercel 不支持 WebSocket
 from datetime import datetime
 from api.utils import allowed_file
+from pagination_utils import page_request, fetch_page, page_response
+import logging
+
+logger = logging.getLogger(__name__)
 
 innovation_project_bp = Blueprint('innovation_project', __name__)
 
 # 文件上传配置
 UPLOAD_FOLDER = 'static/uploads/innovation_projects'
 
+# 列表排序键（与 idx_innovation_projects_order / idx_innovation_projects_status 一致）
+PROJECT_ORDER = (('COALESCE(sort_order, 0)', 'ASC'), ('created_at', 'DESC'))
+
 @innovation_project_bp.route('/api/innovation-projects', methods=['GET'])
 def get_innovation_projects():
-    """获取所有科创成果"""
+    """获取所有科创成果（带 limit/cursor 参数时按游标分页）"""
+    page = page_request('innovation_projects', PROJECT_ORDER)
     try:
         with get_db() as conn:
-            cursor = conn.execute('''
-                SELECT * FROM innovation_projects 
-                WHERE status = 'active'
-                ORDER BY COALESCE(sort_order, 0) ASC, created_at DESC
-            ''')
-            projects = cursor.fetchall()
+            projects, page_info = fetch_page(conn, page, 'innovation_projects', PROJECT_ORDER,
+                                             where="status = 'active'")
             
             result = []
             for project in projects:
                 project_dict = dict(project)
                 result.append(project_dict)
             
-            return jsonify(result)
+            return page_response(result, page_info)
     except Exception as e:
-        print(f"Error fetching innovation projects: {e}")
+        logger.error(f"Error fetching innovation projects: {e}")
         return jsonify({'error': str(e)}), 500
 
 @innovation_project_bp.route('/api/innovation-projects/admin', methods=['GET'])
 def get_innovation_projects_admin():
-    """管理员获取所有科创成果（包括非活跃状态）"""
+    """管理员获取所有科创成果（包括非活跃状态，带 limit/cursor 参数时按游标分页）"""
+    page = page_request('innovation_projects', PROJECT_ORDER)
     try:
         with get_db() as conn:
-            cursor = conn.execute('''
-                SELECT * FROM innovation_projects 
-                ORDER BY COALESCE(sort_order, 0) ASC, created_at DESC
-            ''')
-            projects = cursor.fetchall()
+            projects, page_info = fetch_page(conn, page, 'innovation_projects', PROJECT_ORDER)
             
             result = []
             for project in projects:
                 project_dict = dict(project)
                 result.append(project_dict)
             
-            return jsonify(result)
+            return page_response(result, page_info)
     except Exception as e:
-        print(f"Error fetching innovation projects (admin): {e}")
+        logger.error(f"Error fetching innovation projects (admin): {e}")
         return jsonify({'error': str(e)}), 500
 
 @innovation_project_bp.route('/api/innovation-projects', methods=['POST'])
@@ -99,7 +100,7 @@ def create_innovation_project():
             project_id = cursor.lastrowid
             conn.commit()
             
-            print(f"✅ 科创成果创建成功: {title}")
+            logger.info(f"✅ 科创成果创建成功: {title}")
             
             # 通知前端刷新
             # notify_page_refresh('innovation', {'action': 'created', 'project_id': project_id})  # Vercel 不支持 WebSocket
@@ -111,7 +112,7 @@ def create_innovation_project():
             }), 201
             
     except Exception as e:
-        print(f"Error creating innovation project: {e}")
+        logger.error(f"Error creating innovation project: {e}")
         return jsonify({"error": f"创建失败: {str(e)}"}), 500
 
 @innovation_project_bp.route('/api/innovation-projects/<int:project_id>', methods=['PUT'])
@@ -181,7 +182,7 @@ def update_innovation_project(project_id):
                 conn.execute(sql, update_values)
                 conn.commit()
                 
-                print(f"✅ 科创成果更新成功: ID={project_id}")
+                logger.info(f"✅ 科创成果更新成功: ID={project_id}")
                 
                 # 通知前端刷新
                 # notify_page_refresh('innovation', {'action': 'updated', 'project_id': project_id})  # Vercel 不支持 WebSocket
@@ -191,7 +192,7 @@ def update_innovation_project(project_id):
                 return jsonify({"error": "没有需要更新的字段"}), 400
                 
     except Exception as e:
-        print(f"Error updating innovation project: {e}")
+        logger.error(f"Error updating innovation project: {e}")
         return jsonify({"error": f"更新失败: {str(e)}"}), 500
 
 @innovation_project_bp.route('/api/innovation-projects/<int:project_id>', methods=['DELETE'])
@@ -212,7 +213,7 @@ def delete_innovation_project(project_id):
             conn.execute('DELETE FROM innovation_projects WHERE id = ?', (project_id,))
             conn.commit()
             
-            print(f"✅ 科创成果删除成功: {project['title']}")
+            logger.info(f"✅ 科创成果删除成功: {project['title']}")
             
             # 通知前端刷新
             # notify_page_refresh('innovation', {'action': 'deleted', 'project_id': project_id})  # Vercel 不支持 WebSocket
@@ -220,7 +221,7 @@ def delete_innovation_project(project_id):
             return jsonify({"success": True, "message": "删除成功"})
             
     except Exception as e:
-        print(f"Error deleting innovation project: {e}")
+        logger.error(f"Error deleting innovation project: {e}")
         return jsonify({"error": f"删除失败: {str(e)}"}), 500
 
 @innovation_project_bp.route('/api/innovation-projects/reorder', methods=['POST'])
@@ -245,7 +246,7 @@ def reorder_innovation_projects():
             
             conn.commit()
             
-            print(f"✅ 科创成果排序更新成功，共{len(project_ids)}个项目")
+            logger.info(f"✅ 科创成果排序更新成功，共{len(project_ids)}个项目")
             
             # 通知前端刷新
             # notify_page_refresh('innovation', {'action': 'reordered', 'project_ids': project_ids})  # Vercel 不支持 WebSocket
@@ -253,7 +254,7 @@ def reorder_innovation_projects():
             return jsonify({"success": True, "message": "排序更新成功"})
             
     except Exception as e:
-        print(f"Error reordering innovation projects: {e}")
+        logger.error(f"Error reordering innovation projects: {e}")
         return jsonify({"error": f"排序更新失败: {str(e)}"}), 500
 
 @innovation_project_bp.route('/api/innovation-projects/upload-image', methods=['POST'])
@@ -290,7 +291,7 @@ def upload_project_image():
         # 返回相对URL
         rel_url = f"/static/uploads/innovation_projects/{new_filename}"
         
-        print(f"✅ 项目图片上传成功: {rel_url}")
+        logger.info(f"✅ 项目图片上传成功: {rel_url}")
         
         return jsonify({
             "success": True, 
@@ -298,5 +299,5 @@ def upload_project_image():
             "message": "图片上传成功"
         })
     except Exception as e:
-        print(f"Error uploading project image: {e}")
+        logger.error(f"Error uploading project image: {e}")
         return jsonify({"error": f"图片上传失败: {str(e)}"}), 500 
\ No newline at end of file
@@ -0,0 +1,24 @@
+# 后台任务API - 查询上传文档等后台任务的执行状态（仅管理员）
+
+from flask import Blueprint, jsonify, session
+from job_utils import job_queue
+
+jobs_bp = Blueprint('jobs', __name__, url_prefix='/api/jobs')
+
+def _is_admin():
+    return 'username' in session and session.get('role') == 'admin'
+
+@jobs_bp.route('/<job_id>', methods=['GET'])
+def get_job(job_id):
+    """查询任务状态；succeeded 时 result 为任务结果，failed 时 error 为最后一次的错误信息（仅管理员）"""
+    if not _is_admin():
+        return jsonify({"error": "未授权"}), 401
+
+    job = job_queue.get(job_id)
+    if job is None:
+        return jsonify({"error": "任务不存在"}), 404
+
+    response = jsonify({"success": True, "data": job})
+    # 任务状态随时变化，轮询时不能使用缓存
+    response.cache_control.no_store = True
+    return response
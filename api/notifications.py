@@ -2,20 +2,32 @@ from flask import Blueprint, request, jsonify, current_app
 from werkzeug.utils import secure_filename
 import os
 import uuid
-import sqlite3
 import json
-import markdown
 from datetime import datetime
 from werkzeug.security import check_password_hash
 import tempfile
 import re
+import click
+from concurrent.futures import ProcessPoolExecutor
+from db_utils import get_request_connection, get_db as open_db
+from markdown_utils import get_pool
+from job_utils import job_queue, PermanentJobError
+from counter_utils import view_counter
+from pagination_utils import page_request, fetch_page, page_response
+from etag_utils import skip_etag
+import logging
 # from socket_utils import notify_page_refresh  # Vercel 不支持 WebSocket
 
+logger = logging.getLogger(__name__)
+
 notifications_bp = Blueprint('notifications', __name__, url_prefix='/api/notifications')
 
 # 允许的文档文件扩展名（只保留Markdown）
 ALLOWED_DOC_EXTENSIONS = {'md', 'markdown'}
 
+# 通知列表的排序键（与 idx_notifications_order 一致）
+NOTIFICATION_ORDER = (('order_index', 'ASC'), ('publish_date', 'DESC'))
+
 def allowed_doc_file(filename):
     if '.' not in filename:
         return False
@@ -32,54 +44,154 @@ def ensure_upload_dir():
     return upload_dir
 
 def get_db():
-    """获取数据库连接"""
-    conn = sqlite3.connect(current_app.config.get('DATABASE', 'acm_lab.db'))
-    conn.row_factory = sqlite3.Row
-    return conn
+    """获取当前请求共享的数据库连接（请求结束时由 db_utils 统一归还）"""
+    return get_request_connection()
 
 def require_auth():
     """验证用户权限"""
     # 这里简化处理，实际项目中应该有完整的权限验证
     return True
 
-def markdown_to_html(content):
-    """将Markdown内容转换为HTML"""
+# 渲染器版本：修改Markdown扩展、HTML后处理或目录格式后加一，
+# 已保存的渲染结果会在下次访问时重新生成，启动时也会登记后台重新渲染任务（schedule_rerender），
+# 或用 flask notifications rerender 批量重新生成
+RENDERER_VERSION = 1
+
+# markdown扩展配置
+MARKDOWN_EXTENSIONS = [
+    'extra',  # 支持表格、代码块等
+    'codehilite',  # 代码高亮
+    'toc',  # 目录生成
+    'nl2br',  # 换行转换
+    'tables',  # 表格支持
+    'fenced_code',  # 代码块支持
+    'attr_list',  # 属性列表支持
+]
+MARKDOWN_EXTENSION_CONFIGS = {
+    'codehilite': {
+        'css_class': 'highlight',
+        'use_pygments': False,
+        'noclasses': True
+    },
+    'toc': {
+        'anchorlink': True,
+        'title': '目录'
+    }
+}
+
+def _convert_markdown(content):
+    """将Markdown转换为HTML，返回 (HTML, 目录项)"""
     try:
-        import re
-        
         # 预处理：处理图片链接，确保相对路径正确
         content = preprocess_markdown_images(content)
         
-        # 配置markdown扩展
-        md = markdown.Markdown(extensions=[
-            'extra',  # 支持表格、代码块等
-            'codehilite',  # 代码高亮
-            'toc',  # 目录生成
-            'nl2br',  # 换行转换
-            'tables',  # 表格支持
-            'fenced_code',  # 代码块支持
-            'attr_list',  # 属性列表支持
-        ], extension_configs={
-            'codehilite': {
-                'css_class': 'highlight',
-                'use_pygments': False,
-                'noclasses': True
-            },
-            'toc': {
-                'anchorlink': True,
-                'title': '目录'
-            }
-        })
-        
-        html_content = md.convert(content)
+        # 复用按 MARKDOWN_EXTENSIONS 配置好的实例
+        with get_pool(MARKDOWN_EXTENSIONS, MARKDOWN_EXTENSION_CONFIGS).converter() as md:
+            html_content = md.convert(content)
+            toc_tokens = md.toc_tokens
         
         # 优化HTML内容
         html_content = optimize_html_content(html_content)
         
-        return html_content
+        return html_content, toc_tokens
     except Exception as e:
-        print(f"Markdown转HTML错误: {e}")
-        return content
+        logger.error(f"Markdown转HTML错误: {e}")
+        return content, []
+
+def markdown_to_html(content):
+    """将Markdown内容转换为HTML"""
+    return _convert_markdown(content)[0]
+
+def build_toc_html(toc_tokens):
+    """按详情页目录栏的样式生成目录HTML；没有标题时返回空串（由前端显示"暂无目录"）"""
+    items = []
+    
+    def walk(tokens):
+        for token in tokens:
+            items.append(token)
+            walk(token.get('children', []))
+    
+    walk(toc_tokens)
+    if not items:
+        return ''
+    
+    parts = ['<ul style="list-style: none; padding: 0;">']
+    for token in items:
+        parts.append(
+            f'<li style="margin-left: {token["level"] - 1}rem;">'
+            f'<a href="#{token["id"]}" style="color: var(--text-light); text-decoration: none; '
+            f'display: block; padding: 0.25rem 0; transition: color 0.3s;">{token["name"]}</a></li>'
+        )
+    parts.append('</ul>')
+    return ''.join(parts)
+
+def render_content(raw_content, markdown_source=None):
+    """
+    渲染通知正文（纯函数，批量重新渲染时在子进程中执行）
+    
+    Args:
+        raw_content: 通知原文（Markdown、HTML或纯文本）
+        markdown_source: 是否按Markdown处理，None 时自动检测（上传的文档总是Markdown）
+    
+    Returns:
+        dict: html, toc（目录HTML）, excerpt, reading_time, word_count, markdown（是否为Markdown）, version
+    """
+    raw_content = raw_content or ''
+    if markdown_source is None:
+        markdown_source = is_markdown_content(raw_content)
+    
+    toc = ''
+    if markdown_source:
+        html_content, toc_tokens = _convert_markdown(raw_content)
+        toc = build_toc_html(toc_tokens)
+    elif '<' in raw_content and '>' in raw_content:
+        # 已经是HTML，直接使用
+        html_content = raw_content
+    elif raw_content:
+        # 简单文本格式化
+        html_content = raw_content.replace('\n\n', '</p><p>').replace('\n', '<br>')
+        html_content = f'<p>{html_content}</p>'
+    else:
+        html_content = ''
+    
+    text = re.sub(r'<[^>]+>', '', html_content)
+    return {
+        'html': html_content,
+        'toc': toc,
+        'excerpt': auto_generate_excerpt(text),
+        'reading_time': calculate_reading_time(text),
+        'word_count': len(html_content),
+        'markdown': markdown_source,
+        'version': RENDERER_VERSION,
+    }
+
+def _render_source(notification):
+    """通知的渲染参数：(原文, 是否按Markdown处理)"""
+    source = notification.get('raw_content') or notification.get('content') or ''
+    return source, (True if notification.get('source_type') == 'upload' else None)
+
+def ensure_rendered(conn, notification):
+    """
+    确保通知的预渲染结果是当前渲染器版本生成的，否则重新渲染并保存
+    
+    Args:
+        conn: 数据库连接
+        notification: 通知行（dict），会被原地更新
+    
+    Returns:
+        dict: 传入的 notification
+    """
+    if notification.get('rendered_html') is not None and notification.get('render_version') == RENDERER_VERSION:
+        return notification
+    rendered = render_content(*_render_source(notification))
+    conn.execute(
+        'UPDATE notifications SET rendered_html = ?, toc_html = ?, render_version = ? WHERE id = ?',
+        (rendered['html'], rendered['toc'], RENDERER_VERSION, notification['id'])
+    )
+    conn.commit()
+    notification.update(rendered_html=rendered['html'], toc_html=rendered['toc'], render_version=RENDERER_VERSION)
+    logger.info(f"通知 {notification['id']} 已按渲染器版本 {RENDERER_VERSION} 重新渲染")
+    return notification
 
 def preprocess_markdown_images(content):
     """预处理markdown中的图片链接"""
@@ -110,99 +222,106 @@ def preprocess_markdown_images(content):
     
     return content
 
-def optimize_html_content(html_content):
-    """优化HTML内容的排版和样式"""
-    import re
-    
-    # 为标题添加锚点
-    def add_header_anchors(match):
-        level = len(match.group(1))
-        content = match.group(2)
-        anchor_id = re.sub(r'[^\w\u4e00-\u9fff]+', '-', content).strip('-').lower()
-        return f'<h{level} id="{anchor_id}">{content}</h{level}>'
-    
-    html_content = re.sub(r'<h([1-6])>(.*?)</h[1-6]>', add_header_anchors, html_content)
-    
-    # 为表格添加响应式包装
-    html_content = re.sub(
-        r'<table>', 
-        '<div class="table-responsive"><table class="table table-striped">', 
-        html_content
-    )
-    html_content = re.sub(r'</table>', '</table></div>', html_content)
-    
+# optimize_html_content 的各项改写合并为一个正则，按命中的分支分派，整篇只扫描一次
+# （各分支共用开头的 "<"，正则引擎可以直接跳到下一个标签）
+_HTML_REWRITE_PARTS = {
+    # 为标题添加锚点（仅无属性的标题，内容不跨行）
+    'heading': r'h(?P<level>[1-6])>(?P<heading>.*?)</h[1-6]>',
     # 为代码块添加复制按钮容器
-    html_content = re.sub(
-        r'<pre><code(.*?)>', 
-        r'<div class="code-block-container"><pre><code\1>', 
-        html_content
-    )
-    html_content = re.sub(r'</code></pre>', '</code></pre></div>', html_content)
-    
+    'code': r'pre><code(?P<code>.*?)>',
     # 为图片添加懒加载和灯箱效果
-    def enhance_image_tag(match):
-        before_src = match.group(1)
-        src = match.group(2)
-        after_src = match.group(3)
-        
-        # 检查是否已经有这些属性
-        full_tag = f'<img{before_src}src="{src}"{after_src}>'
-        
-        # 如果没有loading属性，添加它
-        if 'loading=' not in full_tag:
-            after_src += ' loading="lazy"'
-        
-        # 如果没有responsive-image类，添加它
-        if 'responsive-image' not in full_tag:
-            if 'class=' in full_tag:
-                # 如果已有class属性，添加到现有class中
-                after_src = re.sub(r'class="([^"]*)"', r'class="\1 responsive-image"', after_src)
-            else:
-                # 如果没有class属性，添加新的class
-                after_src += ' class="responsive-image"'
-        
-        # 如果没有onclick属性，添加它
-        if 'onclick=' not in full_tag:
-            after_src += ' onclick="openImageModal(this)"'
-        
-        # 如果没有cursor样式，添加它
-        if 'cursor:' not in full_tag:
-            if 'style=' in full_tag:
-                # 如果已有style属性，添加到现有style中
-                after_src = re.sub(r'style="([^"]*)"', r'style="\1; cursor: pointer;"', after_src)
-            else:
-                # 如果没有style属性，添加新的style
-                after_src += ' style="cursor: pointer;"'
-        
-        return f'<img{before_src}src="{src}"{after_src}>'
-    
-    html_content = re.sub(
-        r'<img([^>]*?)src="([^"]*?)"([^>]*?)>', 
-        enhance_image_tag, 
-        html_content
-    )
-    
-    # 为引用块添加样式类
-    html_content = re.sub(r'<blockquote>', '<blockquote class="blockquote">', html_content)
-    
-    # 处理段落间距
-    html_content = re.sub(r'<p></p>', '', html_content)
+    'image': r'img(?P<img_before>[^>]*?)src="(?P<img_src>[^"]*?)"(?P<image>[^>]*?)>',
+    # 表格响应式包装、代码块容器结束、引用块样式、空段落
+    'tag': r'(?P<tag>table>|/table>|/code></pre>|blockquote>|p></p>)',
+}
+_HTML_REWRITE = re.compile('<(?:' + '|'.join(_HTML_REWRITE_PARTS.values()) + ')')
+# 标题内容中不再处理嵌套标题
+_HTML_REWRITE_IN_HEADING = re.compile('<(?:' + '|'.join(
+    pattern for name, pattern in _HTML_REWRITE_PARTS.items() if name != 'heading'
+) + ')')
+_ANCHOR_UNSAFE = re.compile(r'[^\w\u4e00-\u9fff]+')
+_CLASS_ATTR = re.compile(r'class="([^"]*)"')
+_STYLE_ATTR = re.compile(r'style="([^"]*)"')
+
+_TAG_REWRITES = {
+    '<table>': '<div class="table-responsive"><table class="table table-striped">',
+    '</table>': '</table></div>',
+    '</code></pre>': '</code></pre></div>',
+    '<blockquote>': '<blockquote class="blockquote">',
+    '<p></p>': '',
+}
+
+def _rewrite_heading(match):
+    level = match.group('level')
+    content = match.group('heading')
+    anchor_id = _ANCHOR_UNSAFE.sub('-', content).strip('-').lower()
+    content = _HTML_REWRITE_IN_HEADING.sub(_dispatch_rewrite, content)
+    return f'<h{level} id="{anchor_id}">{content}</h{level}>'
+
+def _rewrite_code(match):
+    return f'<div class="code-block-container"><pre><code{match.group("code")}>'
+
+def _rewrite_image(match):
+    before_src = match.group('img_before')
+    src = match.group('img_src')
+    after_src = match.group('image')
+    
+    # 检查是否已经有这些属性
+    full_tag = match.group(0)
+    
+    # 如果没有loading属性，添加它
+    if 'loading=' not in full_tag:
+        after_src += ' loading="lazy"'
+    
+    # 如果没有responsive-image类，添加它
+    if 'responsive-image' not in full_tag:
+        if 'class=' in full_tag:
+            # 如果已有class属性，添加到现有class中
+            after_src = _CLASS_ATTR.sub(r'class="\1 responsive-image"', after_src)
+        else:
+            # 如果没有class属性，添加新的class
+            after_src += ' class="responsive-image"'
+    
+    # 如果没有onclick属性，添加它
+    if 'onclick=' not in full_tag:
+        after_src += ' onclick="openImageModal(this)"'
+    
+    # 如果没有cursor样式，添加它
+    if 'cursor:' not in full_tag:
+        if 'style=' in full_tag:
+            # 如果已有style属性，添加到现有style中
+            after_src = _STYLE_ATTR.sub(r'style="\1; cursor: pointer;"', after_src)
+        else:
+            # 如果没有style属性，添加新的style
+            after_src += ' style="cursor: pointer;"'
     
-    return html_content
+    return f'<img{before_src}src="{src}"{after_src}>'
+
+_REWRITE_DISPATCH = {
+    'heading': _rewrite_heading,
+    'code': _rewrite_code,
+    'image': _rewrite_image,
+    'tag': lambda match: _TAG_REWRITES[match.group(0)],
+}
+
+def _dispatch_rewrite(match):
+    return _REWRITE_DISPATCH[match.lastgroup](match)
+
+def optimize_html_content(html_content):
+    """优化HTML内容的排版和样式（标题锚点、表格包装、代码块容器、图片增强、引用块样式、去除空段落）"""
+    return _HTML_REWRITE.sub(_dispatch_rewrite, html_content)
 
 @notifications_bp.route('', methods=['GET'])
 def get_notifications():
-    """获取通知列表"""
+    """获取通知列表（带 limit/cursor 参数时按游标分页）"""
+    page = page_request('notifications', NOTIFICATION_ORDER)
     try:
         conn = get_db()
-        cursor = conn.execute('''
-            SELECT * FROM notifications 
-            ORDER BY order_index ASC, publish_date DESC
-        ''')
-        notifications = [dict(row) for row in cursor.fetchall()]
-        return jsonify(notifications)
+        rows, page_info = fetch_page(conn, page, 'notifications', NOTIFICATION_ORDER)
+        notifications = [dict(row) for row in rows]
+        return page_response(notifications, page_info)
     except Exception as e:
-        print(f"Error fetching notifications: {e}")
+        logger.error(f"Error fetching notifications: {e}")
         return jsonify({"error": "获取通知列表失败"}), 500
 
 @notifications_bp.route('/<int:notification_id>', methods=['GET'])
@@ -221,17 +340,21 @@ def get_notification(notification_id):
         if not notification:
             return jsonify({"error": "通知不存在"}), 404
         
-        # 转换为字典
+        # 转换为字典（浏览量包含本进程中尚未写入数据库的部分）
         notification_dict = dict(notification)
+        notification_dict['view_count'] = (notification_dict['view_count'] or 0) + view_counter.pending(notification_id)
         
-        # 增加浏览量
-        conn.execute('UPDATE notifications SET view_count = view_count + 1 WHERE id = ?', (notification_id,))
-        conn.commit()
+        # 增加浏览量（缓冲后批量写入）
+        view_counter.increment(notification_id)
         
-        return jsonify(notification_dict), 200
+        # 每次请求都要计入浏览量，且浏览量不随表修改代数变化：不使用ETag和HTTP缓存
+        skip_etag()
+        response = jsonify(notification_dict)
+        response.cache_control.no_store = True
+        return response, 200
         
     except Exception as e:
-        print(f"Error getting notification: {e}")
+        logger.error(f"Error getting notification: {e}")
         return jsonify({"error": "获取通知详情失败"}), 500
 
 @notifications_bp.route('', methods=['POST'])
@@ -247,21 +370,18 @@ def create_notification():
         if not data.get('title') or not data.get('content'):
             return jsonify({"error": "标题和内容不能为空"}), 400
         
-        # 处理内容 - 检测是否为markdown格式
+        # 处理内容 - 渲染详情页HTML和目录（如果内容包含markdown语法，转换为HTML）
         raw_content = data['content']
+        rendered = render_content(raw_content)
         
-        # 如果内容包含markdown语法，转换为HTML
-        if is_markdown_content(raw_content):
-            html_content = markdown_to_html(raw_content)
-        else:
-            html_content = raw_content
-            raw_content = html_content  # 如果不是markdown，原始内容就是HTML
+        # 如果不是markdown，原始内容就是HTML
+        html_content = rendered['html'] if rendered['markdown'] else raw_content
         
         # 自动生成摘要（如果未提供）
-        excerpt = data.get('excerpt') or auto_generate_excerpt(html_content)
+        excerpt = data.get('excerpt') or rendered['excerpt']
         
         # 计算阅读时间
-        reading_time = data.get('reading_time') or calculate_reading_time(html_content)
+        reading_time = data.get('reading_time') or rendered['reading_time']
         
         # 计算字数
         word_count = len(html_content)
@@ -273,8 +393,9 @@ def create_notification():
         cursor = conn.execute('''
             INSERT INTO notifications (
                 title, content, raw_content, excerpt, author, category, reading_time, 
-                tags, status, source_type, word_count, card_style, publish_date
-            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                tags, status, source_type, word_count, card_style, publish_date,
+                rendered_html, toc_html, render_version
+            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
         ''', (
             data['title'],
             html_content,
@@ -288,7 +409,10 @@ def create_notification():
             data.get('source_type', 'online'),
             word_count,
             card_style,
-            datetime.now()
+            datetime.now(),
+            rendered['html'],
+            rendered['toc'],
+            rendered['version']
         ))
         
         notification_id = cursor.lastrowid
@@ -300,7 +424,7 @@ def create_notification():
         return jsonify({"id": notification_id, "message": "通知创建成功"}), 201
         
     except Exception as e:
-        print(f"Error creating notification: {e}")
+        logger.error(f"Error creating notification: {e}")
         return jsonify({"error": "创建通知失败"}), 500
 
 def is_markdown_content(content):
@@ -342,21 +466,18 @@ def update_notification(notification_id):
         if not data.get('title') or not data.get('content'):
             return jsonify({"error": "标题和内容不能为空"}), 400
         
-        # 处理内容 - 检测是否为markdown格式
+        # 处理内容 - 渲染详情页HTML和目录（如果内容包含markdown语法，转换为HTML）
         raw_content = data['content']
+        rendered = render_content(raw_content)
         
-        # 如果内容包含markdown语法，转换为HTML
-        if is_markdown_content(raw_content):
-            html_content = markdown_to_html(raw_content)
-        else:
-            html_content = raw_content
-            raw_content = html_content  # 如果不是markdown，原始内容就是HTML
+        # 如果不是markdown，原始内容就是HTML
+        html_content = rendered['html'] if rendered['markdown'] else raw_content
         
         # 自动生成摘要（如果未提供）
-        excerpt = data.get('excerpt') or auto_generate_excerpt(html_content)
+        excerpt = data.get('excerpt') or rendered['excerpt']
         
         # 计算阅读时间
-        reading_time = data.get('reading_time') or calculate_reading_time(html_content)
+        reading_time = data.get('reading_time') or rendered['reading_time']
         
         # 计算字数
         word_count = len(html_content)
@@ -376,7 +497,8 @@ def update_notification(notification_id):
             UPDATE notifications 
             SET title = ?, content = ?, raw_content = ?, excerpt = ?, 
                 author = ?, category = ?, reading_time = ?, tags = ?, 
-                status = ?, word_count = ?, card_style = ?, updated_at = ?
+                status = ?, word_count = ?, card_style = ?, updated_at = ?,
+                rendered_html = ?, toc_html = ?, render_version = ?
             WHERE id = ?
         ''', (
             data['title'],
@@ -391,6 +513,9 @@ def update_notification(notification_id):
             word_count,
             card_style,
             datetime.now(),
+            rendered['html'],
+            rendered['toc'],
+            rendered['version'],
             notification_id
         ))
         
@@ -402,7 +527,7 @@ def update_notification(notification_id):
         return jsonify({"message": "通知更新成功"}), 200
         
     except Exception as e:
-        print(f"Error updating notification: {e}")
+        logger.error(f"Error updating notification: {e}")
         return jsonify({"error": "更新通知失败"}), 500
 
 @notifications_bp.route('/<int:notification_id>', methods=['DELETE'])
@@ -435,7 +560,7 @@ def delete_notification(notification_id):
                 if os.path.exists(file_path):
                     os.remove(file_path)
             except Exception as e:
-                print(f"删除源文件失败: {e}")
+                logger.error(f"删除源文件失败: {e}")
         
         # 通知前端刷新动态页面
         # notify_page_refresh('dynamic', {'deleted': True, 'notification_id': notification_id})  # Vercel 不支持 WebSocket
@@ -443,7 +568,7 @@ def delete_notification(notification_id):
         return jsonify({"message": "通知删除成功"})
         
     except Exception as e:
-        print(f"Error deleting notification: {e}")
+        logger.error(f"Error deleting notification: {e}")
         return jsonify({"error": "删除通知失败"}), 500
 
 @notifications_bp.route('/reorder', methods=['POST'])
@@ -476,12 +601,12 @@ def reorder_notifications():
         return jsonify({"message": "排序保存成功"})
         
     except Exception as e:
-        print(f"Error reordering notifications: {e}")
+        logger.error(f"Error reordering notifications: {e}")
         return jsonify({"error": "保存排序失败"}), 500
 
 @notifications_bp.route('/upload', methods=['POST'])
 def upload_document():
-    """上传文档并自动处理"""
+    """上传文档，解析和渲染由后台任务完成（返回任务ID，通过 /api/jobs/<任务ID> 查询结果）"""
     if not require_auth():
         return jsonify({"error": "未授权"}), 401
     
@@ -503,66 +628,94 @@ def upload_document():
         if not allowed_doc_file(file.filename):
             return jsonify({"error": "不支持的文件类型"}), 400
         
-        # 保存文件
-        upload_dir = ensure_upload_dir()
+        # secure_filename 会去掉非ASCII字符，可能连同扩展名前的点一起去掉
         filename = secure_filename(file.filename)
-        unique_filename = f"{uuid.uuid4()}_{filename}"
-        file_path = os.path.join(upload_dir, unique_filename)
-        file.save(file_path)
-        
-        # 获取文件类型
         if '.' not in filename:
             return jsonify({"error": "文件名必须包含扩展名"}), 400
         
-        file_parts = filename.rsplit('.', 1)
-        if len(file_parts) < 2:
-            return jsonify({"error": "无效的文件格式"}), 400
+        # 同一幂等键重复提交（如网络超时后重试）时返回已登记的任务，不再保存文件
+        idempotency_key = request.headers.get('Idempotency-Key', '').strip()
+        idempotency_key = f'upload:{idempotency_key}' if idempotency_key else None
+        job_id = job_queue.find(idempotency_key) if idempotency_key else None
+        
+        if job_id is None:
+            # 保存文件，解析和渲染由后台任务完成
+            unique_filename = f"{uuid.uuid4()}_{filename}"
+            file_path = os.path.join(ensure_upload_dir(), unique_filename)
+            file.save(file_path)
+            
+            job_id = job_queue.enqueue('notifications.import_document', {
+                'stored_filename': unique_filename,
+                'original_filename': filename,
+                'title': title,
+                'category': category,
+                # 处理卡片样式配置（从表单数据获取，如果有的话）
+                'card_style': request.form.get('card_style', ''),
+            }, idempotency_key=idempotency_key)
+        
+        job = job_queue.get(job_id)
+        return jsonify({
+            "job_id": job_id,
+            "status": job['status'],
+            "status_url": f"/api/jobs/{job_id}",
+            "message": "文档已上传，正在后台处理"
+        }), 202
         
-        file_type = file_parts[1].lower()
+    except Exception as e:
+        logger.error(f"Error uploading document: {e}")
+        # 清理可能的临时文件
+        if 'file_path' in locals() and os.path.exists(file_path):
+            os.remove(file_path)
+        return jsonify({"error": "文档上传处理失败"}), 500 
+
+@job_queue.handler('notifications.import_document')
+def import_document_job(payload):
+    """后台任务：解析上传的Markdown文档，渲染后写入通知及上传文件记录"""
+    unique_filename = payload['stored_filename']
+    file_path = os.path.join(ensure_upload_dir(), unique_filename)
+    
+    with open_db() as conn:
+        # 上次执行已写入（提交后任务状态未能更新）时不重复创建通知
+        existing = conn.execute(
+            'SELECT notification_id FROM uploaded_files WHERE stored_filename = ?', (unique_filename,)
+        ).fetchone()
+        if existing is not None:
+            return {"id": existing['notification_id']}
         
         # 处理文档内容（只支持Markdown）
-        print(f"开始处理Markdown文档")
         content = extract_text_from_markdown(file_path)
-        
         if not content:
-            # 清理上传的文件
+            # 内容无效时重试也不会成功：清理上传的文件并直接标记为失败
             if os.path.exists(file_path):
                 os.remove(file_path)
-            return jsonify({"error": "文档内容解析失败，请检查文件格式或内容"}), 400
-        
-        # 处理内容格式
-        raw_content = content
-        html_content = markdown_to_html(content)
-        
-        # 生成摘要和计算阅读时间
-        excerpt = auto_generate_excerpt(html_content)
-        reading_time = calculate_reading_time(html_content)
-        word_count = len(html_content)
+            raise PermanentJobError("文档内容解析失败，请检查文件格式或内容")
         
-        # 处理卡片样式配置（从表单数据获取，如果有的话）
-        card_style = request.form.get('card_style', '')
+        rendered = render_content(content, markdown_source=True)
         
-        # 保存到数据库
-        conn = get_db()
+        # 通知和上传文件记录在同一事务中写入
         cursor = conn.execute('''
             INSERT INTO notifications (
                 title, content, raw_content, excerpt, author, category, reading_time,
-                status, source_type, source_file, word_count, card_style, publish_date
-            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                status, source_type, source_file, word_count, card_style, publish_date,
+                rendered_html, toc_html, render_version
+            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
         ''', (
-            title,
-            html_content,
-            raw_content,
-            excerpt,
+            payload['title'],
+            rendered['html'],
+            content,
+            rendered['excerpt'],
             'ACM算法研究实验室',
-            category,
-            reading_time,
+            payload['category'],
+            rendered['reading_time'],
             'published',
             'upload',
             f'uploads/notifications/{unique_filename}',
-            word_count,
-            card_style,
-            datetime.now()
+            rendered['word_count'],
+            payload['card_style'],
+            datetime.now(),
+            rendered['html'],
+            rendered['toc'],
+            rendered['version']
         ))
         
         notification_id = cursor.lastrowid
@@ -574,27 +727,19 @@ def upload_document():
             ) VALUES (?, ?, ?, ?, ?)
         ''', (
             unique_filename,
-            filename,
+            payload['original_filename'],
             os.path.getsize(file_path),
             notification_id,
             'success'
         ))
         
         conn.commit()
-        
-        return jsonify({
-            "id": notification_id,
-            "message": "文档上传处理成功",
-            "word_count": word_count,
-            "reading_time": reading_time
-        }), 201
-        
-    except Exception as e:
-        print(f"Error uploading document: {e}")
-        # 清理可能的临时文件
-        if 'file_path' in locals() and os.path.exists(file_path):
-            os.remove(file_path)
-        return jsonify({"error": "文档上传处理失败"}), 500 
+    
+    return {
+        "id": notification_id,
+        "word_count": rendered['word_count'],
+        "reading_time": rendered['reading_time']
+    }
 
 @notifications_bp.route('/upload_image', methods=['POST'])
 def upload_image():
@@ -640,7 +785,7 @@ def upload_image():
         })
         
     except Exception as e:
-        print(f"Error uploading image: {e}")
+        logger.error(f"Error uploading image: {e}")
         return jsonify({"error": "图片上传失败"}), 500
 
 def allowed_image_file(filename):
@@ -694,7 +839,7 @@ def upload_card_image():
         })
         
     except Exception as e:
-        print(f"Error uploading card image: {e}")
+        logger.error(f"Error uploading card image: {e}")
         return jsonify({"error": "卡片背景图片上传失败"}), 500 
 
 def extract_text_from_markdown(file_path):
@@ -703,7 +848,7 @@ def extract_text_from_markdown(file_path):
         with open(file_path, 'r', encoding='utf-8') as file:
             return file.read()
     except Exception as e:
-        print(f"Markdown解析错误: {e}")
+        logger.error(f"Markdown解析错误: {e}")
         return None
 
 def is_markdown_content(content):
@@ -772,4 +917,71 @@ def calculate_reading_time(content):
     total_chars = chinese_chars + english_words
     reading_time = max(1, round(total_chars / 300))
     
-    return reading_time 
\ No newline at end of file
+    return reading_time
+
+
+def _render_row(item):
+    """子进程中渲染一条通知：item 为 (id, 原文, 是否按Markdown处理)"""
+    notification_id, source, markdown_source = item
+    rendered = render_content(source, markdown_source)
+    return notification_id, rendered['html'], rendered['toc']
+
+def rerender_outdated(render_all=False, workers=None):
+    """
+    按当前渲染器版本批量重新渲染通知正文
+    
+    Args:
+        render_all: 是否重新渲染全部通知（默认只处理渲染器版本过旧的）
+        workers: 并行渲染的进程数，None 为CPU核数，0 为在当前线程中渲染
+    
+    Returns:
+        int: 重新渲染的通知数量
+    """
+    with open_db() as conn:
+        sql = 'SELECT id, content, raw_content, source_type FROM notifications'
+        if not render_all:
+            sql += ' WHERE rendered_html IS NULL OR render_version != ?'
+        rows = conn.execute(sql, () if render_all else (RENDERER_VERSION,)).fetchall()
+        items = [(row['id'],) + _render_source(dict(row)) for row in rows]
+        if not items:
+            return 0
+        
+        if workers == 0:
+            results = [_render_row(item) for item in items]
+        else:
+            # Markdown转换是纯Python的CPU密集操作，用多进程并行；数据库写入在主进程中一次提交
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                results = list(executor.map(_render_row, items, chunksize=8))
+        conn.executemany(
+            'UPDATE notifications SET rendered_html = ?, toc_html = ?, render_version = ? WHERE id = ?',
+            [(html, toc, RENDERER_VERSION, notification_id) for notification_id, html, toc in results]
+        )
+        conn.commit()
+    return len(results)
+
+@job_queue.handler('notifications.rerender', max_attempts=2)
+def rerender_job(payload):
+    """后台任务：重新渲染渲染器版本过旧的通知（在工作线程中逐条渲染，不启动子进程）"""
+    return {"rendered": rerender_outdated(workers=0)}
+
+def schedule_rerender():
+    """存在渲染器版本过旧的通知时登记重新渲染任务（每个渲染器版本只登记一次），返回任务ID或None"""
+    with open_db() as conn:
+        outdated = conn.execute(
+            'SELECT 1 FROM notifications WHERE rendered_html IS NULL OR render_version != ? LIMIT 1',
+            (RENDERER_VERSION,)
+        ).fetchone()
+    if outdated is None:
+        return None
+    return job_queue.enqueue('notifications.rerender', idempotency_key=f'rerender:v{RENDERER_VERSION}')
+
+@notifications_bp.cli.command('rerender')
+@click.option('--all', 'render_all', is_flag=True, help='重新渲染全部通知（默认只处理渲染器版本过旧的）')
+@click.option('--workers', type=int, default=None, help='并行渲染的进程数，默认为CPU核数')
+def rerender_command(render_all, workers):
+    """按当前渲染器版本批量重新渲染通知正文"""
+    count = rerender_outdated(render_all, workers)
+    if not count:
+        click.echo(f"所有通知均已按渲染器版本 {RENDERER_VERSION} 渲染")
+        return
+    click.echo(f"✅ 已重新渲染 {count} 条通知（渲染器版本 {RENDERER_VERSION}）")
@@ -2,79 +2,90 @@
 
 from flask import Blueprint, request, jsonify
 from db_utils import get_db
+from pagination_utils import page_request, fetch_page, page_response, count_rows
 import json
 from datetime import datetime
+import logging
 # from socket_utils import notify_page_refresh  # Vercel 不支持 WebSocket
 
+logger = logging.getLogger(__name__)
+
 research_bp = Blueprint('research', __name__)
 
+# 研究领域列表的排序键（与 idx_research_areas_order / idx_research_areas_category 一致）
+RESEARCH_AREA_ORDER = (('order_index', 'ASC'), ('created_at', 'DESC'))
+
+def format_research_area(area):
+    """研究领域行转换为接口字段（members 解析为列表）"""
+    members = []
+    if area['members']:
+        try:
+            members = json.loads(area['members'])
+        except (json.JSONDecodeError, TypeError):
+            members = []
+    return {
+        'id': area['id'],
+        'title': area['title'],
+        'category': area['category'],
+        'description': area['description'],
+        'members': members,
+        'order_index': area['order_index'],
+        'created_at': area['created_at'],
+        'updated_at': area['updated_at']
+    }
+
 @research_bp.route('/api/research', methods=['GET'])
 def get_research_areas():
-    """获取研究领域列表，支持分页和分类筛选"""
+    """
+    获取研究领域列表，支持分类筛选
+
+    带 limit/cursor 参数时按游标分页（统一分页格式）；否则按 page/per_page 页码分页，
+    页码分页的总数来自按表修改代数缓存的计数
+    """
+    category = request.args.get('category', '')
+    where, params = '', ()
+    if category and category != '全部':
+        where, params = 'category = ?', (category,)
+    columns = 'id, title, category, description, members, order_index, created_at, updated_at'
+
+    page = page_request('research_areas', RESEARCH_AREA_ORDER)
+    if page is not None:
+        try:
+            with get_db() as conn:
+                areas, page_info = fetch_page(conn, page, 'research_areas', RESEARCH_AREA_ORDER,
+                                              where=where, params=params, columns=columns)
+            return page_response([format_research_area(area) for area in areas], page_info)
+        except Exception as e:
+            logger.error(f"获取研究领域失败: {e}")
+            return jsonify({'success': False, 'error': str(e)}), 500
+
     try:
-        page = int(request.args.get('page', 1))
+        page_number = int(request.args.get('page', 1))
         per_page = int(request.args.get('per_page', 6))
-        category = request.args.get('category', '')
         
         with get_db() as conn:
-            # 构建查询条件
-            where_clause = ""
-            params = []
-            
-            if category and category != '全部':
-                where_clause = "WHERE category = ?"
-                params.append(category)
-            
-            # 获取总数
-            count_sql = f"SELECT COUNT(*) FROM research_areas {where_clause}"
-            cursor = conn.execute(count_sql, params)
-            total = cursor.fetchone()[0]
+            total = count_rows('research_areas', where, params)
             
             # 计算分页
-            offset = (page - 1) * per_page
+            offset = (page_number - 1) * per_page
             total_pages = (total + per_page - 1) // per_page
             
             # 获取分页数据
             sql = f"""
-                SELECT id, title, category, description, members, order_index, 
-                       created_at, updated_at
+                SELECT {columns}
                 FROM research_areas 
-                {where_clause}
+                {'WHERE ' + where if where else ''}
                 ORDER BY order_index ASC, created_at DESC
                 LIMIT ? OFFSET ?
             """
-            params.extend([per_page, offset])
-            
-            cursor = conn.execute(sql, params)
-            areas = cursor.fetchall()
-            
-            # 格式化数据
-            research_data = []
-            for area in areas:
-                # 解析成员信息
-                members = []
-                if area[4]:  # members字段
-                    try:
-                        members = json.loads(area[4]) if area[4] else []
-                    except (json.JSONDecodeError, TypeError):
-                        members = []
-                
-                research_data.append({
-                    'id': area[0],
-                    'title': area[1],
-                    'category': area[2],
-                    'description': area[3],
-                    'members': members,
-                    'order_index': area[5],
-                    'created_at': area[6],
-                    'updated_at': area[7]
-                })
+            cursor = conn.execute(sql, list(params) + [per_page, offset])
+            research_data = [format_research_area(area) for area in cursor.fetchall()]
             
             return jsonify({
                 'success': True,
                 'data': research_data,
                 'pagination': {
-                    'page': page,
+                    'page': page_number,
                     'per_page': per_page,
                     'total': total,
                     'total_pages': total_pages
@@ -82,7 +93,7 @@ def get_research_areas():
             })
             
     except Exception as e:
-        print(f"获取研究领域失败: {e}")
+        logger.error(f"获取研究领域失败: {e}")
         return jsonify({
             'success': False,
             'error': str(e)
@@ -153,7 +164,7 @@ def create_research_area():
             }), 201
             
     except Exception as e:
-        print(f"创建研究领域失败: {e}")
+        logger.error(f"创建研究领域失败: {e}")
         return jsonify({
             'success': False,
             'error': str(e)
@@ -241,7 +252,7 @@ def update_research_area(area_id):
             })
             
     except Exception as e:
-        print(f"更新研究领域失败: {e}")
+        logger.error(f"更新研究领域失败: {e}")
         return jsonify({
             'success': False,
             'error': str(e)
@@ -277,7 +288,7 @@ def delete_research_area(area_id):
             })
             
     except Exception as e:
-        print(f"删除研究领域失败: {e}")
+        logger.error(f"删除研究领域失败: {e}")
         return jsonify({
             'success': False,
             'error': str(e)
@@ -316,7 +327,7 @@ def reorder_research_areas():
             })
             
     except Exception as e:
-        print(f"重新排序研究领域失败: {e}")
+        logger.error(f"重新排序研究领域失败: {e}")
         return jsonify({
             'success': False,
             'error': str(e)
@@ -347,7 +358,7 @@ def get_research_categories():
             })
             
     except Exception as e:
-        print(f"获取研究领域分类失败: {e}")
+        logger.error(f"获取研究领域分类失败: {e}")
         return jsonify({
             'success': False,
             'error': str(e)
@@ -383,7 +394,7 @@ def get_research_stats():
             })
             
     except Exception as e:
-        print(f"获取研究领域统计失败: {e}")
+        logger.error(f"获取研究领域统计失败: {e}")
         return jsonify({
             'success': False,
             'error': str(e)
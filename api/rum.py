@@ -0,0 +1,288 @@
+# 浏览器性能数据API - 接收 performance-monitor.js 用 sendBeacon 批量上报的采样指标，
+# 按天/页面/指标累积到 t-digest 草图中（不保存原始数据），管理端查看 p50/p75/p95
+
+import os
+import json
+import math
+import time
+import atexit
+import logging
+import threading
+from datetime import datetime, timedelta
+
+from flask import Blueprint, request, jsonify, session, current_app, template_rendered, has_request_context
+import db_utils
+from sketch_utils import TDigest
+
+logger = logging.getLogger(__name__)
+
+rum_bp = Blueprint('rum', __name__)
+
+# 导航阶段指标（毫秒）
+NAVIGATION_METRICS = ('dns', 'tcp', 'ttfb', 'response', 'dom_content_loaded', 'load', 'lcp')
+# 资源加载耗时按类型汇总为 resource.<类型>
+RESOURCE_TYPES = ('css', 'js', 'image', 'font', 'other')
+
+# 上报限制：请求体大小、每次上报的页面数、每类资源的数据点数、单个指标的取值上限（毫秒）
+MAX_BEACON_BYTES = 64 * 1024
+MAX_EVENTS = 20
+MAX_RESOURCE_SAMPLES = 50
+MAX_VALUE_MS = 120000
+
+DEFAULT_FLUSH_INTERVAL = 30.0
+REPORT_QUANTILES = (('p50', 0.5), ('p75', 0.75), ('p95', 0.95))
+
+
+class RumAggregator:
+    """进程内的分位数草图，后台线程定期合并写入 rum_digests"""
+
+    def __init__(self, flush_interval=DEFAULT_FLUSH_INTERVAL):
+        self.enabled = True
+        self.flush_interval = flush_interval
+        # (天, 页面, 指标) -> [原始数据点数, 草图]
+        self._digests = {}
+        # 路由规则 -> 模板名（页面渲染时记录）
+        self.templates = {}
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._flusher_pid = None
+        self.accepted = 0
+        self.rejected = 0
+        self.errors = 0
+        if hasattr(os, 'register_at_fork'):
+            os.register_at_fork(after_in_child=self._after_fork)
+
+    def _after_fork(self):
+        self._digests = {}
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+
+    def init_app(self, app):
+        enabled = app.config.get('RUM_ENABLED', os.environ.get('RUM_ENABLED', '1'))
+        self.enabled = str(enabled).lower() not in ('0', 'false', 'no', 'off') \
+            and db_utils.get_db_profile() != 'readonly'
+        self.flush_interval = float(app.config.get(
+            'RUM_FLUSH_INTERVAL', os.environ.get('RUM_FLUSH_INTERVAL', self.flush_interval)
+        ))
+        app.extensions['rum'] = self
+        template_rendered.connect(self._record_template, app)
+        if self.enabled:
+            atexit.register(self.flush)
+
+    def _record_template(self, sender, template, context, **extra):
+        if has_request_context() and request.url_rule is not None:
+            self.templates[request.url_rule.rule] = template.name
+
+    def page_key(self, path):
+        """把实际路径归并为路由规则（/notification/3 -> /notification/<int:notification_id>），非页面返回 None"""
+        if not isinstance(path, str) or not path.startswith('/') or len(path) > 255:
+            return None
+        try:
+            rule, _ = current_app.url_map.bind('localhost').match(path.split('?', 1)[0], method='GET', return_rule=True)
+        except Exception:
+            return None
+        if rule.rule.startswith(('/api/', '/static/')):
+            return None
+        return rule.rule
+
+    def add(self, page, metric, values, weight):
+        """累加一组数据点（weight 为采样率的倒数）"""
+        day = datetime.now().strftime('%Y-%m-%d')
+        self._ensure_flusher()
+        with self._lock:
+            entry = self._digests.get((day, page, metric))
+            if entry is None:
+                entry = self._digests[(day, page, metric)] = [0, TDigest()]
+            for value in values:
+                entry[1].add(value, weight)
+            entry[0] += len(values)
+
+    # ============ 写入 ============
+
+    def flush(self):
+        """把本进程累积的草图合并写入数据库，返回写入的行数"""
+        with self._flush_lock:
+            with self._lock:
+                digests, self._digests = self._digests, {}
+            if not digests:
+                return 0
+            try:
+                self._write(digests)
+            except Exception as e:
+                with self._lock:
+                    self.errors += 1
+                logger.warning(f"写入浏览器性能指标失败（丢弃 {len(digests)} 组草图）: {e}")
+                return 0
+            return len(digests)
+
+    @staticmethod
+    def _write(digests):
+        with db_utils.get_db() as conn:
+            # 草图读出合并后写回，IMMEDIATE 事务避免多个进程同时合并同一行时丢失更新
+            if not conn.in_transaction:
+                conn.execute('BEGIN IMMEDIATE')
+            try:
+                rows = []
+                for (day, page, metric), (samples, digest) in digests.items():
+                    existing = conn.execute(
+                        'SELECT samples, digest FROM rum_digests WHERE day = ? AND page = ? AND metric = ?',
+                        (day, page, metric)
+                    ).fetchone()
+                    if existing is not None:
+                        digest.merge(TDigest.from_bytes(existing['digest']))
+                        samples += existing['samples']
+                    rows.append((day, page, metric, samples, digest.to_bytes()))
+                conn.executemany(
+                    'INSERT OR REPLACE INTO rum_digests (day, page, metric, samples, digest) VALUES (?, ?, ?, ?, ?)',
+                    rows
+                )
+                conn.commit()
+            except Exception:
+                conn.rollback()
+                raise
+
+    def _ensure_flusher(self):
+        if self._flusher_pid == os.getpid():
+            return
+        with self._lock:
+            if self._flusher_pid == os.getpid():
+                return
+            self._flusher_pid = os.getpid()
+        thread = threading.Thread(target=self._flush_loop, name='rum-flusher', daemon=True)
+        thread.start()
+
+    def _flush_loop(self):
+        pid = os.getpid()
+        while self._flusher_pid == pid:
+            time.sleep(self.flush_interval)
+            self.flush()
+
+    def stats(self):
+        with self._lock:
+            return {
+                'enabled': self.enabled,
+                'pending_digests': len(self._digests),
+                'accepted': self.accepted,
+                'rejected': self.rejected,
+                'errors': self.errors,
+            }
+
+
+rum_aggregator = RumAggregator()
+
+
+def _valid_values(raw, limit):
+    """过滤出合法的毫秒数（有限、非负、不超过上限）"""
+    if not isinstance(raw, list):
+        raw = [raw]
+    values = []
+    for value in raw[:limit]:
+        if isinstance(value, (int, float)) and not isinstance(value, bool) \
+                and math.isfinite(value) and 0 <= value <= MAX_VALUE_MS:
+            values.append(float(value))
+    return values
+
+@rum_bp.route('/collect', methods=['POST'])
+def collect_metrics():
+    """
+    接收浏览器性能指标（兼容 navigator.sendBeacon，请求体为JSON，不要求 Content-Type）
+
+    请求体: {"sample_rate": 0.1, "events": [{"page": "/dynamic", "metrics": {"ttfb": 120, ...},
+                                           "resources": {"css": [12.5, ...], ...}}]}
+    """
+    if not rum_aggregator.enabled:
+        return '', 204
+    if request.content_length is not None and request.content_length > MAX_BEACON_BYTES:
+        return jsonify({"error": "上报数据过大"}), 413
+    try:
+        payload = json.loads(request.get_data(cache=False)[:MAX_BEACON_BYTES + 1] or b'null')
+    except ValueError:
+        payload = None
+    if not isinstance(payload, dict) or not isinstance(payload.get('events'), list):
+        rum_aggregator.rejected += 1
+        return jsonify({"error": "无效的上报数据"}), 400
+
+    sample_rate = payload.get('sample_rate', 1)
+    if not isinstance(sample_rate, (int, float)) or not 0 < sample_rate <= 1:
+        sample_rate = 1
+    weight = 1.0 / sample_rate
+
+    accepted = 0
+    for event in payload['events'][:MAX_EVENTS]:
+        if not isinstance(event, dict):
+            continue
+        page = rum_aggregator.page_key(event.get('page'))
+        if page is None:
+            continue
+        samples = []
+        metrics = event.get('metrics')
+        if isinstance(metrics, dict):
+            samples.extend((name, metrics[name]) for name in NAVIGATION_METRICS if name in metrics)
+        resources = event.get('resources')
+        if isinstance(resources, dict):
+            samples.extend((f'resource.{kind}', resources[kind]) for kind in RESOURCE_TYPES if kind in resources)
+        for metric, raw in samples:
+            values = _valid_values(raw, MAX_RESOURCE_SAMPLES)
+            if values:
+                rum_aggregator.add(page, metric, values, weight)
+                accepted += len(values)
+    rum_aggregator.accepted += accepted
+    return '', 204
+
+# ============ 管理端报表 ============
+
+def _is_admin():
+    return 'username' in session and session.get('role') == 'admin'
+
+@rum_bp.route('/report', methods=['GET'])
+def get_report():
+    """最近N天（默认7天）各页面各指标的 p50/p75/p95（毫秒）"""
+    if not _is_admin():
+        return jsonify({"error": "未授权"}), 401
+
+    try:
+        days = max(1, min(int(request.args.get('days', 7)), 366))
+    except ValueError:
+        days = 7
+    # 先写入本进程累积的数据，其他进程的在各自的写入间隔内可见
+    rum_aggregator.flush()
+    since = (datetime.now() - timedelta(days=days - 1)).strftime('%Y-%m-%d')
+    with db_utils.get_db() as conn:
+        rows = conn.execute(
+            'SELECT page, metric, samples, digest FROM rum_digests WHERE day >= ?', (since,)
+        ).fetchall()
+
+    merged = {}
+    for row in rows:
+        entry = merged.get((row['page'], row['metric']))
+        if entry is None:
+            entry = merged[(row['page'], row['metric'])] = [0, TDigest()]
+        entry[0] += row['samples']
+        entry[1].merge(TDigest.from_bytes(row['digest']))
+
+    pages = {}
+    for (page, metric), (samples, digest) in merged.items():
+        report = pages.get(page)
+        if report is None:
+            report = pages[page] = {
+                'page': page,
+                'template': rum_aggregator.templates.get(page),
+                'samples': 0,
+                'metrics': {},
+            }
+        report['metrics'][metric] = dict(
+            {name: round(digest.quantile(q), 1) for name, q in REPORT_QUANTILES},
+            samples=samples,
+            estimated_views=round(digest.count),
+        )
+        if metric == 'ttfb':
+            report['samples'] = samples
+
+    return jsonify({
+        "success": True,
+        "data": {
+            'days': days,
+            'pages': sorted(pages.values(), key=lambda item: item['samples'], reverse=True),
+            'collector': rum_aggregator.stats(),
+        }
+    })
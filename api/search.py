@@ -0,0 +1,75 @@
+# 站内搜索API - 在通知、论文、算法和研究领域中全文搜索，按 bm25 相关度排序并返回高亮摘要
+
+import time
+import sqlite3
+import logging
+
+from flask import Blueprint, request, jsonify
+import db_utils
+import search_utils
+from job_utils import job_queue
+
+logger = logging.getLogger(__name__)
+
+search_bp = Blueprint('search', __name__, url_prefix='/api/search')
+
+MAX_QUERY_LENGTH = 100
+DEFAULT_LIMIT = 10
+MAX_LIMIT = 50
+# 每次搜索前最多处理的积压变更行数，超出部分由 search.sync 后台任务处理
+SYNC_LIMIT = 2000
+
+
+def _int_arg(name, default, lower, upper):
+    try:
+        value = int(request.args.get(name, default))
+    except ValueError:
+        value = default
+    return max(lower, min(value, upper))
+
+@search_bp.route('', methods=['GET'])
+def search():
+    """
+    全文搜索
+
+    参数: q 关键词（必填，中文按连续子串匹配，英文按词前缀匹配，多个词之间为"与"），
+          type 限定类型（notification/paper/algorithm/research_area，可用逗号分隔多个），
+          limit（默认10，最多50）、offset
+    返回: results 按相关度排序，title/snippet 为转义后的HTML，匹配处以 <mark> 标出
+    """
+    query = request.args.get('q', '').strip()
+    if not query:
+        return jsonify({"error": "请输入搜索关键词"}), 400
+    if len(query) > MAX_QUERY_LENGTH:
+        return jsonify({"error": f"关键词不能超过{MAX_QUERY_LENGTH}个字符"}), 400
+
+    kinds = [kind for kind in request.args.get('type', '').split(',') if kind]
+    unknown = [kind for kind in kinds if kind not in search_utils.SEARCH_SOURCES]
+    if unknown:
+        return jsonify({"error": f"未知的类型: {', '.join(unknown)}"}), 400
+    limit = _int_arg('limit', DEFAULT_LIMIT, 1, MAX_LIMIT)
+    offset = _int_arg('offset', 0, 0, 10000)
+
+    with db_utils.get_db() as conn:
+        if not search_utils.is_available(conn):
+            return jsonify({"error": "搜索功能不可用"}), 503
+
+    # 先处理积压的变更，保证刚修改的内容能被搜到（没有积压时不开启写事务，只读数据库上跳过）
+    try:
+        if search_utils.sync(limit=SYNC_LIMIT) >= SYNC_LIMIT and job_queue.worker_count > 0:
+            # 积压超过本次处理的上限（如批量导入后），剩余部分交给后台任务，每分钟最多登记一次
+            job_queue.enqueue('search.sync', idempotency_key=f'search.sync@{int(time.time() // 60)}')
+    except sqlite3.OperationalError as e:
+        logger.warning(f"更新搜索索引失败，使用现有索引: {e}")
+
+    result = search_utils.search(query, kinds or None, limit, offset)
+    return jsonify({
+        "success": True,
+        "data": {
+            'query': query,
+            'total': result['total'],
+            'limit': limit,
+            'offset': offset,
+            'results': result['results'],
+        }
+    })
@@ -0,0 +1,36 @@
+# 输入联想API - 按前缀（含拼音首字母）联想成员姓名、论文标题/作者、算法标题和通知标题，查询只访问进程内索引
+
+from flask import Blueprint, request, jsonify
+from suggest_utils import suggest_index, SUGGEST_SOURCES, DEFAULT_LIMIT
+
+suggest_bp = Blueprint('suggest', __name__, url_prefix='/api/suggest')
+
+MAX_QUERY_LENGTH = 50
+MAX_LIMIT = 20
+
+@suggest_bp.route('', methods=['GET'])
+def suggest():
+    """
+    输入联想
+
+    参数: q 已输入的前缀（可为拼音首字母，如 "zs" 匹配 "张三"），
+          type 限定类型（member/paper/author/algorithm/notification，可用逗号分隔多个），limit（默认8，最多20）
+    返回: suggestions 按匹配程度排序（标题开头 > 词开头 > 拼音首字母）
+    """
+    query = request.args.get('q', '').strip()[:MAX_QUERY_LENGTH]
+    kinds = [kind for kind in request.args.get('type', '').split(',') if kind]
+    unknown = [kind for kind in kinds if kind not in SUGGEST_SOURCES]
+    if unknown:
+        return jsonify({"error": f"未知的类型: {', '.join(unknown)}"}), 400
+    try:
+        limit = max(1, min(int(request.args.get('limit', DEFAULT_LIMIT)), MAX_LIMIT))
+    except ValueError:
+        limit = DEFAULT_LIMIT
+
+    return jsonify({
+        "success": True,
+        "data": {
+            'query': query,
+            'suggestions': suggest_index.suggest(query, kinds or None, limit),
+        }
+    })
@@ -6,75 +6,98 @@
 
 from flask import Blueprint, request, jsonify, abort, session
 from db_utils import get_db
+from cache_utils import cached
+from pagination_utils import page_request, fetch_page, page_response
 # from socket_utils import notify_page_refresh
 import logging
 import json
 from datetime import datetime
 
-# 配置日志
-logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 team_bp = Blueprint('team', __name__)
 
+# 成员列表的排序键（与 idx_team_members_order 一致）
+TEAM_MEMBER_ORDER = (('COALESCE(order_index, 999999)', 'ASC'), ('grade', 'DESC'), ('created_at', 'DESC'))
+
+def format_member(member):
+    """成员行转换为前端使用的字段（role/desc/img 为兼容旧页面的别名）"""
+    member_dict = dict(member)
+    return {
+        'id': member_dict['id'],
+        'name': member_dict['name'] or '',
+        'position': member_dict['position'] or '',
+        'role': member_dict['position'] or '',
+        'desc': member_dict['description'] or '',
+        'description': member_dict['description'] or '',
+        'img': member_dict['image_url'] or '',
+        'image_url': member_dict['image_url'] or '',
+        'qq': member_dict['qq'] or '',
+        'wechat': member_dict['wechat'] or '',
+        'email': member_dict['email'] or '',
+        'grade': member_dict.get('grade') or '2024级',
+        'order_index': member_dict['order_index'] if member_dict['order_index'] is not None else 0,
+        'created_at': member_dict['created_at'],
+        'updated_at': member_dict['updated_at']
+    }
+
+@cached(tables=['team_members'])
+def get_team_grade_groups():
+    """按年级分组的团队成员（带缓存，team_members 表写入后失效）"""
+    with get_db() as conn:
+        # 修改排序逻辑：优先按order_index排序，然后按年级和创建时间
+        all_members, _ = fetch_page(conn, None, 'team_members', TEAM_MEMBER_ORDER)
+        
+        # 按年级分组
+        grade_groups = {}
+        for member in all_members:
+            member_dict = format_member(member)
+            grade = member_dict['grade']
+            
+            if grade not in grade_groups:
+                grade_groups[grade] = []
+            
+            grade_groups[grade].append(member_dict)
+        
+        # 转换为前端期望的格式
+        grade_data = []
+        for grade, members in grade_groups.items():
+            # 确保每个年级内的成员也按order_index排序
+            members.sort(key=lambda x: x.get('order_index', 0))
+            grade_data.append({
+                'grade': grade,
+                'members': members
+            })
+        
+        # 按年级名称降序排序
+        grade_data.sort(key=lambda x: x['grade'], reverse=True)
+    
+    return grade_data
+
 @team_bp.route('/api/team', methods=['GET'])
 def get_team_members():
-    """获取所有团队成员，按年级分组"""
+    """获取所有团队成员，按年级分组；带 limit/cursor 参数时按游标分页返回成员列表（不分组）"""
+    page = page_request('team_members', TEAM_MEMBER_ORDER)
+    if page is None:
+        return get_team_members_grouped()
     try:
         with get_db() as conn:
-            # 修改排序逻辑：优先按order_index排序，然后按年级和创建时间
-            cursor = conn.execute('''
-                SELECT * FROM team_members 
-                ORDER BY COALESCE(order_index, 999999) ASC, grade DESC, created_at DESC
-            ''')
-            all_members = cursor.fetchall()
-            
-            # 按年级分组
-            grade_groups = {}
-            for member in all_members:
-                member_dict = dict(member)
-                grade = member_dict.get('grade') or '2024级'
-                
-                if grade not in grade_groups:
-                    grade_groups[grade] = []
-                
-                grade_groups[grade].append({
-                    'id': member_dict['id'],
-                    'name': member_dict['name'] or '',
-                    'position': member_dict['position'] or '',
-                    'role': member_dict['position'] or '',
-                    'desc': member_dict['description'] or '',
-                    'description': member_dict['description'] or '',
-                    'img': member_dict['image_url'] or '',
-                    'image_url': member_dict['image_url'] or '',
-                    'qq': member_dict['qq'] or '',
-                    'wechat': member_dict['wechat'] or '',
-                    'email': member_dict['email'] or '',
-                    'grade': grade,
-                    'order_index': member_dict['order_index'] if member_dict['order_index'] is not None else 0,
-                    'created_at': member_dict['created_at'],
-                    'updated_at': member_dict['updated_at']
-                })
-            
-            # 转换为前端期望的格式
-            grade_data = []
-            for grade, members in grade_groups.items():
-                # 确保每个年级内的成员也按order_index排序
-                members.sort(key=lambda x: x.get('order_index', 0))
-                grade_data.append({
-                    'grade': grade,
-                    'members': members
-                })
-            
-            # 按年级名称降序排序
-            grade_data.sort(key=lambda x: x['grade'], reverse=True)
-            
-            logger.info(f"获取团队成员成功，共{len(grade_data)}个年级，{len(all_members)}个成员")
-            return jsonify(grade_data), 200
+            rows, page_info = fetch_page(conn, page, 'team_members', TEAM_MEMBER_ORDER)
+        return page_response([format_member(row) for row in rows], page_info)
+    except Exception as e:
+        logger.exception(f"获取团队成员失败: {e}")
+        return jsonify({'error': '获取团队成员失败'}), 500
+
+@cached(tables=['team_members'], shared=True, stale_while_revalidate=True)
+def get_team_members_grouped():
+    """按年级分组的完整成员列表响应（多进程共享缓存）"""
+    try:
+        grade_data = get_team_grade_groups()
+        member_count = sum(len(group['members']) for group in grade_data)
+        logger.info(f"获取团队成员成功，共{len(grade_data)}个年级，{member_count}个成员")
+        return jsonify(grade_data), 200
     except Exception as e:
-        logger.error(f"获取团队成员失败: {e}")
-        import traceback
-        traceback.print_exc()
+        logger.exception(f"获取团队成员失败: {e}")
         return jsonify({'error': '获取团队成员失败'}), 500
 
 @team_bp.route('/api/team', methods=['POST'])
@@ -342,7 +365,7 @@ def reorder_team_members():
                 new_order = index + 1
                 conn.execute('UPDATE team_members SET order_index = ?, updated_at = ? WHERE id = ?', 
                            (new_order, datetime.now().isoformat(), member_id))
-                logger.debug(f"更新成员ID {member_id} 的排序为 {new_order}")
+                logger.debug("更新成员ID %s 的排序为 %s", member_id, new_order)
             
             conn.commit()
             
@@ -359,9 +382,7 @@ def reorder_team_members():
             return jsonify({"success": True, "message": "排序更新成功"})
             
     except Exception as e:
-        logger.error(f"更新团队成员排序失败: {e}")
-        import traceback
-        traceback.print_exc()
+        logger.exception(f"更新团队成员排序失败: {e}")
         return jsonify({"error": f"排序更新失败: {str(e)}"}), 500
 
 # 研究领域管理API
@@ -1,7 +1,7 @@
 # Flask Web应用 - ACM实验室官网与后台管理系统
 
 import secrets
-from flask import Flask, render_template, request, redirect, url_for, jsonify, session, send_from_directory, send_file, abort
+from flask import Flask, render_template, request, redirect, url_for, jsonify, session, g, send_from_directory, send_file, abort, make_response
 import os
 from werkzeug.security import generate_password_hash, check_password_hash
 from datetime import timedelta
@@ -10,15 +10,18 @@ import sqlite3
 import json
 from datetime import datetime
 from flask import Blueprint
+import logging
 # from flask_socketio import SocketIO, emit  # Vercel不支持WebSocket
 # 暂时注释掉有问题的API导入
 from api.innovation import innovation_bp
 # from api.notifications import notifications_bp
 # from api.analytics import analytics_bp
 
-# 添加缓存装饰器导入
-from functools import lru_cache
-import time
+# 按表声明依赖的缓存（写入驱动失效）
+from cache_utils import cached, skip_cache
+from pagination_utils import page_request, fetch_page, page_response
+
+logger = logging.getLogger(__name__)
 
 # 静态文件路由将在app创建后定义
 
@@ -71,26 +74,8 @@ def require_auth(f):
     
     return decorated_function
 
-# 简单的时间缓存装饰器
-def timed_lru_cache(seconds: int = 300, maxsize: int = 128):
-    def wrapper_cache(func):
-        cached_func = lru_cache(maxsize=maxsize)(func)
-        cached_func.lifetime = seconds
-        cached_func.expiration = time.time() + cached_func.lifetime
-        
-        def wrapped_func(*args, **kwargs):
-            if time.time() >= cached_func.expiration:
-                cached_func.cache_clear()
-                cached_func.expiration = time.time() + cached_func.lifetime
-            return cached_func(*args, **kwargs)
-        
-        # 正确传递cache_clear方法
-        wrapped_func.cache_clear = cached_func.cache_clear
-        return wrapped_func
-    return wrapper_cache
-
-# 缓存数据库查询函数
-@timed_lru_cache(seconds=300)  # 5分钟缓存
+# 缓存数据库查询函数（对应表有写入后失效，包括其他worker的写入）
+@cached(tables=['team_members'])
 def get_all_team_members():
     """获取所有团队成员（带缓存）"""
     from db_utils import get_db
@@ -104,40 +89,50 @@ def get_all_team_members():
         
         return [dict(member) for member in members]
 
-@timed_lru_cache(seconds=300)  # 5分钟缓存
+# 论文列表的排序键（与 idx_papers_order 一致）
+PAPER_ORDER = (('order_index', 'ASC'), ('updated_at', 'DESC'))
+
+def format_paper(paper):
+    """论文行转换为接口字段（categories/authors 解析为列表）"""
+    paper_dict = dict(paper)
+    
+    # 从category_ids字段获取类别信息
+    categories = paper_dict.get('category_ids', '[]')
+    if isinstance(categories, str):
+        try:
+            categories = json.loads(categories)
+        except:
+            categories = []
+    
+    # 确保categories是列表格式
+    if not isinstance(categories, list):
+        categories = []
+    
+    paper_dict['categories'] = categories
+    
+    # 处理authors字段，确保是列表格式
+    authors = paper_dict.get('authors', '[]')
+    if isinstance(authors, str):
+        try:
+            authors = json.loads(authors)
+        except:
+            authors = [authors] if authors else []
+    
+    if not isinstance(authors, list):
+        authors = [authors] if authors else []
+    
+    paper_dict['authors'] = authors
+    return paper_dict
+
+@cached(tables=['papers'])
 def get_all_papers():
     """获取所有论文（带缓存）"""
     from db_utils import get_db
     
     with get_db() as conn:
         # 获取所有论文
-        cursor = conn.execute('''
-            SELECT * FROM papers 
-            ORDER BY order_index ASC, updated_at DESC
-        ''')
-        papers = cursor.fetchall()
-        
-        papers_data = []
-        for paper in papers:
-            paper_dict = dict(paper)
-            
-            # 从category_ids字段获取类别信息
-            categories = paper_dict.get('category_ids', '[]')
-            if isinstance(categories, str):
-                try:
-                    categories = json.loads(categories)
-                except:
-                    categories = []
-            
-            # 确保categories是列表格式
-            if not isinstance(categories, list):
-                categories = []
-            
-            paper_dict['categories'] = categories
-            
-            papers_data.append(paper_dict)
-        
-        return papers_data
+        papers, _ = fetch_page(conn, None, 'papers', PAPER_ORDER)
+        return [format_paper(paper) for paper in papers]
 
 def get_paper_by_id(paper_id: int):
     """根据ID获取论文"""
@@ -219,9 +214,6 @@ def create_paper(title: str, authors: list, journal: str = '', year: int = 2024,
         paper_id = cursor.lastrowid
         conn.commit()
         
-        # 清理缓存，确保下次获取数据时是最新的
-        get_all_papers.cache_clear()
-        
         return paper_id
 
 def update_paper(paper_id: int, **kwargs):
@@ -271,9 +263,6 @@ def update_paper(paper_id: int, **kwargs):
             sql = f'UPDATE papers SET {", ".join(update_fields)} WHERE id = ?'
             conn.execute(sql, update_values)
             conn.commit()
-        
-        # 清理缓存
-        get_all_papers.cache_clear()
 
 def delete_paper(paper_id: int):
     """删除论文"""
@@ -288,9 +277,6 @@ def delete_paper(paper_id: int):
         # 删除论文
         conn.execute('DELETE FROM papers WHERE id = ?', (paper_id,))
         conn.commit()
-        
-        # 清理缓存，确保下次获取数据时是最新的
-        get_all_papers.cache_clear()
 
 def reorder_papers(paper_ids: list):
     """重新排序论文"""
@@ -301,9 +287,7 @@ def reorder_papers(paper_ids: list):
             conn.execute('UPDATE papers SET order_index = ? WHERE id = ?', (index + 1, paper_id))
         conn.commit()
     
-    # 清理缓存，确保下次获取数据时是最新的排序
-    get_all_papers.cache_clear()
-    print(f"✅ 论文排序已更新，缓存已清理")
+    logger.info(f"✅ 论文排序已更新")
 
 app = Flask(__name__)
 app.config.update(
@@ -312,8 +296,14 @@ app.config.update(
     SESSION_REFRESH_EACH_REQUEST=True,
     JSON_AS_ASCII=False,  # 确保JSON中的中文字符正确显示
     SEND_FILE_MAX_AGE_DEFAULT=31536000,  # 启用静态文件缓存，1年过期
+    # 前端页面内联首屏数据（也可通过 ?inline=1 单独开启）
+    INLINE_PAGE_DATA=os.environ.get('INLINE_PAGE_DATA', '').lower() in ('1', 'true', 'yes', 'on'),
 )
 
+# 结构化异步日志（LOG_LEVEL / LOG_LEVELS / LOG_FORMAT 等环境变量见 log_utils）
+from log_utils import setup_logging
+setup_logging(app)
+
 # 数据库配置 - 统一使用原生sqlite3
 DATABASE = 'acm_lab.db'
 
@@ -377,6 +367,26 @@ def notify_page_refresh(page_type, data=None):
 
 # 使用独立的数据库工具模块
 from db_utils import get_db, init_db
+import db_utils
+
+# 请求指标（延迟直方图/进行中请求数），最先注册以覆盖所有请求
+from metrics_utils import metrics
+metrics.init_app(app)
+
+# 启用请求级连接复用（同一请求内共享一个连接池连接）
+db_utils.init_app(app)
+
+# 启用请求级SQL分析（N+1检测与Server-Timing响应头）
+from profiler_utils import query_profiler
+query_profiler.init_app(app)
+
+# 后台任务队列（上传文档解析、批量渲染、维护任务），工作线程在首个请求时启动
+from job_utils import job_queue
+job_queue.init_app(app)
+
+# 浏览量缓冲（读请求只在内存中计数，后台线程批量写入）
+from counter_utils import view_counter
+view_counter.init_app(app)
 
 # 注册API蓝图
 # 按照优先级逐步恢复API功能
@@ -393,7 +403,13 @@ from api.innovation_project import innovation_project_bp
 from api.advisor import advisor_bp
 from api.notifications import notifications_bp
 from api.research import research_bp  # 研究领域API
-# from api.analytics import analytics_bp
+from api.debug import debug_bp  # 调试诊断API
+from api.bootstrap import bootstrap_bp, render_page  # 前端首屏数据API
+from api.jobs import jobs_bp  # 后台任务状态API
+from api.analytics import analytics_bp, record_visit, visit_recorder  # 访问统计API
+from api.rum import rum_bp, rum_aggregator  # 浏览器性能数据API
+from api.search import search_bp  # 站内搜索API
+from api.suggest import suggest_bp  # 输入联想API
 
 # 注册所有API蓝图
 app.register_blueprint(team_bp)  # 团队成员管理API
@@ -404,9 +420,29 @@ app.register_blueprint(innovation_project_bp)  # 创新项目API
 app.register_blueprint(advisor_bp, url_prefix='/api')  # 指导老师API
 app.register_blueprint(notifications_bp)  # 通知管理API
 app.register_blueprint(research_bp)  # 研究领域API
-# app.register_blueprint(analytics_bp, url_prefix='/api/analytics')  # 访问统计API
+app.register_blueprint(debug_bp)  # 调试诊断API（仅管理员）
+app.register_blueprint(bootstrap_bp)  # 前端首屏数据API
+app.register_blueprint(jobs_bp)  # 后台任务状态API
+app.register_blueprint(analytics_bp, url_prefix='/api/analytics')  # 访问统计API（仅管理员）
+app.register_blueprint(rum_bp, url_prefix='/api/rum')  # 浏览器性能数据上报及报表
+app.register_blueprint(search_bp)  # 站内全文搜索API
+app.register_blueprint(suggest_bp)  # 输入联想API
+
+# 页面访问缓冲（track_visits 只写内存，后台线程批量写入）
+visit_recorder.init_app(app)
 
-print("✅ 所有API蓝图已注册")
+# 浏览器性能指标（按页面累积到分位数草图，后台线程定期写入）
+rum_aggregator.init_app(app)
+
+# 站内搜索索引命令行（flask search sync / rebuild）
+import search_utils
+search_utils.init_app(app)
+
+# 输入联想前缀索引（首次查询时加载，按表写入失效后只重新加载受影响的类型）
+from suggest_utils import suggest_index
+suggest_index.init_app(app)
+
+logger.info("✅ 所有API蓝图已注册")
 
 @app.before_request
 def ensure_permanent_session():
@@ -443,34 +479,20 @@ def track_visits():
         import uuid
         session['session_id'] = str(uuid.uuid4())
     
-    # 使用异步方式记录访问，避免阻塞页面加载
-    # try:
-    #     from threading import Thread
-    #     def async_record_visit():
-    #         try:
-    #             from api.analytics import record_visit
-    #             record_visit(request.path)
-    #         except Exception as e:
-    #             print(f"异步访问统计记录失败: {e}")
-    #     
-    #     # 在后台线程中记录访问
-    #     Thread(target=async_record_visit, daemon=True).start()
-    # except Exception as e:
-    #     # 访问统计失败不应影响正常页面访问
-    #     print(f"访问统计线程启动失败: {e}")
-    pass
+    # 只写入内存缓冲，由后台线程批量写入访问记录和汇总表
+    record_visit(request.path, session['session_id'], request.referrer, request.user_agent.string)
 
 @app.after_request
 def add_header(response):
     """优化响应头 - 缓存和安全设置"""
-    # 生产环境优化缓存
-    if not app.debug:
+    # 生产环境优化缓存（视图已声明 no-store 的响应除外）
+    if not app.debug and not response.cache_control.no_store:
         # 静态文件长期缓存
         if request.endpoint == 'static':
             response.cache_control.max_age = 31536000  # 1年
             response.cache_control.public = True
-        # API响应短期缓存
-        elif request.path.startswith('/api/'):
+        # API响应及内联了数据的页面短期缓存
+        elif request.path.startswith('/api/') or g.get('_page_data_inlined'):
             response.cache_control.max_age = 300  # 5分钟
             response.cache_control.public = True
         # 页面缓存
@@ -493,6 +515,14 @@ def add_header(response):
     
     return response
 
+# API条件请求（基于表修改代数的ETag），注册在会话等 before_request 钩子之后
+from etag_utils import conditional_get
+conditional_get.init_app(app)
+
+# 前端公开API的预生成响应（源表写入后重新生成，GET直接返回已编码的字节）
+from materialize_utils import materializer
+materializer.init_app(app)
+
 # 数据库操作辅助函数
 def get_user_by_username(username):
     """根据用户名获取用户信息"""
@@ -567,11 +597,34 @@ def health_check():
         "environment": "vercel" if os.environ.get('VERCEL') else "local"
     })
 
+# Prometheus 指标端点
+@app.route('/metrics')
+def metrics_endpoint():
+    """
+    以 Prometheus 文本格式输出请求指标
+
+    需管理员登录，或携带 METRICS_TOKEN 设置的 Bearer 令牌（供采集器使用）；
+    METRICS_PUBLIC=1 时允许匿名访问（仅限内网部署）
+    """
+    token = os.environ.get('METRICS_TOKEN')
+    public = app.config.get('METRICS_PUBLIC', os.environ.get('METRICS_PUBLIC', '0'))
+    authorized = (
+        ('username' in session and session.get('role') == 'admin')
+        or (token and request.headers.get('Authorization') == f'Bearer {token}')
+        or str(public).lower() in ('1', 'true', 'yes', 'on')
+    )
+    if not authorized:
+        return jsonify({"error": "未授权"}), 401
+    
+    response = app.response_class(metrics.render(), mimetype='text/plain; version=0.0.4')
+    response.cache_control.no_store = True
+    return response
+
 # 实验室官网首页路由
 @app.route('/')
 def index():
     """实验室官网首页"""
-    return render_template('frontend/index.html')
+    return render_page('frontend/index.html', 'index')
 
 # 管理后台首页路由
 @app.route('/admin')
@@ -644,7 +697,7 @@ def get_frontend_innovation_projects():
     """前端获取科创成果数据"""
     try:
         with get_db() as conn:
-            cursor = conn.execute("SELECT * FROM innovation_projects WHERE status = 'active' ORDER BY sort_order")
+            cursor = conn.execute("SELECT * FROM innovation_projects WHERE status = 'active' ORDER BY COALESCE(sort_order, 0) ASC, created_at DESC")
             projects = cursor.fetchall()
             
             # 将数据库行转换为字典列表
@@ -674,135 +727,129 @@ def matrix():
 def blog_details():
     return render_template('frontend/Blog details.html')
 
-@app.route('/notification/<int:notification_id>')
-def notification_detail(notification_id):
-    """通知详情页面"""
-    try:
-        print(f"🔍 尝试加载通知详情: ID={notification_id}")
+@cached(tables=['notifications'], maxsize=256, stale_while_revalidate=True)
+def get_notification_page(notification_id):
+    """
+    通知详情页的模板数据（预渲染的正文、上一篇/下一篇），notifications 表写入后失效
+
+    通知不存在或未发布时返回 None。浏览量更新不计入表修改，不会使缓存失效。
+    """
+    with get_db() as conn:
+        cursor = conn.execute('SELECT * FROM notifications WHERE id = ?', (notification_id,))
+        notification = cursor.fetchone()
         
-        with get_db() as conn:
-            cursor = conn.execute('SELECT * FROM notifications WHERE id = ?', (notification_id,))
-            notification = cursor.fetchone()
-            
-            print(f"📊 数据库查询结果: {notification is not None}")
-            
-            if not notification:
-                print(f"❌ 通知不存在: ID={notification_id}")
-                # 如果通知不存在，返回404页面或重定向到动态页面
-                return redirect(url_for('dynamic'))
-            
-            print(f"📋 通知状态: {notification['status']}")
-            
-            # 仅允许已发布的通知访问
-            if notification['status'] != 'published':
-                print(f"❌ 通知未发布: ID={notification_id}, status={notification['status']}")
-                return redirect(url_for('dynamic'))
-                
-            # 增加浏览量
-            conn.execute('UPDATE notifications SET view_count = view_count + 1 WHERE id = ?', (notification_id,))
-            conn.commit()
-            
-            # 将数据库行转换为字典
-            notification_data = dict(notification)
-            print(f"✅ 通知数据准备完成: {notification_data.get('title', 'Unknown')}")
-            
-            # 处理Markdown内容转换为HTML
-            if notification_data.get('content'):
-                try:
-                    from api.notifications import markdown_to_html, is_markdown_content
-                    content = notification_data['content']
-                    
-                    # 智能检测markdown内容并转换
-                    if is_markdown_content(content):
-                        notification_data['content'] = markdown_to_html(content)
-                        print("📝 Markdown内容已转换")
-                    # 如果不是markdown但包含HTML标签，直接使用
-                    elif '<' in content and '>' in content:
-                        print("📝 检测到HTML内容，直接使用")
-                        pass  # 保持HTML内容不变
-                    else:
-                        # 简单文本格式化
-                        content = content.replace('\n\n', '</p><p>')
-                        content = content.replace('\n', '<br>')
-                        notification_data['content'] = f'<p>{content}</p>'
-                        print("📝 文本内容已格式化")
-                except Exception as e:
-                    print(f"⚠️ 内容处理出错: {e}")
-                    # 如果处理失败，保持原内容
-                    pass
-            
-            # 获取上一篇和下一篇通知（按order_index和publish_date排序，与API端点保持一致）
-            # 处理order_index字段，如果为None则使用0
-            order_index = notification_data.get('order_index', 0) or 0
-            publish_date = notification_data.get('publish_date')
-            
-            # 获取上一篇（在列表中位置更靠前的：order_index更小的，或相同order_index但publish_date更新的）
-            prev_cursor = conn.execute('''
-                SELECT id, title, excerpt FROM notifications 
-                WHERE status = 'published' AND (
-                    (COALESCE(order_index, 0) < ? OR (COALESCE(order_index, 0) = ? AND publish_date > ?))
-                )
-                ORDER BY COALESCE(order_index, 0) DESC, publish_date ASC 
-                LIMIT 1
-            ''', (order_index, order_index, publish_date))
-            prev_notification = prev_cursor.fetchone()
-            
-            # 获取下一篇（在列表中位置更靠后的：order_index更大的，或相同order_index但publish_date更早的）
-            next_cursor = conn.execute('''
-                SELECT id, title, excerpt FROM notifications 
-                WHERE status = 'published' AND (
-                    (COALESCE(order_index, 0) > ? OR (COALESCE(order_index, 0) = ? AND publish_date < ?))
-                )
-                ORDER BY COALESCE(order_index, 0) ASC, publish_date DESC 
-                LIMIT 1
-            ''', (order_index, order_index, publish_date))
-            next_notification = next_cursor.fetchone()
-            
-            print(f"📄 导航链接: 上一篇={prev_notification is not None}, 下一篇={next_notification is not None}")
-            
-            # 处理发布日期格式化
-            publish_date_str = ''
-            pd = notification_data.get('publish_date')
-            if pd:
-                dt_obj = None
-                try:
-                    # 若为字符串，尝试解析为 datetime
-                    if isinstance(pd, str):
+        logger.debug("📊 数据库查询结果: %s", notification is not None)
+        
+        if not notification:
+            logger.info(f"❌ 通知不存在: ID={notification_id}")
+            return None
+        
+        logger.debug("📋 通知状态: %s", notification['status'])
+        
+        # 仅允许已发布的通知访问
+        if notification['status'] != 'published':
+            logger.info(f"❌ 通知未发布: ID={notification_id}, status={notification['status']}")
+            return None
+        
+        # 将数据库行转换为字典
+        notification_data = dict(notification)
+        logger.debug("✅ 通知数据准备完成: %s", notification_data.get('title', 'Unknown'))
+        
+        # 使用写入时预渲染的HTML（渲染器版本更新后在此补渲染一次）
+        from api.notifications import ensure_rendered
+        ensure_rendered(conn, notification_data)
+        notification_data['content'] = notification_data['rendered_html']
+        
+        # 获取上一篇和下一篇通知（按order_index和publish_date排序，与API端点保持一致）
+        # 处理order_index字段，如果为None则使用0
+        order_index = notification_data.get('order_index', 0) or 0
+        publish_date = notification_data.get('publish_date')
+        
+        # 获取上一篇（在列表中位置更靠前的：order_index更小的，或相同order_index但publish_date更新的）
+        prev_cursor = conn.execute('''
+            SELECT id, title, excerpt FROM notifications 
+            WHERE status = 'published' AND (
+                (COALESCE(order_index, 0) < ? OR (COALESCE(order_index, 0) = ? AND publish_date > ?))
+            )
+            ORDER BY COALESCE(order_index, 0) DESC, publish_date ASC 
+            LIMIT 1
+        ''', (order_index, order_index, publish_date))
+        prev_notification = prev_cursor.fetchone()
+        
+        # 获取下一篇（在列表中位置更靠后的：order_index更大的，或相同order_index但publish_date更早的）
+        next_cursor = conn.execute('''
+            SELECT id, title, excerpt FROM notifications 
+            WHERE status = 'published' AND (
+                (COALESCE(order_index, 0) > ? OR (COALESCE(order_index, 0) = ? AND publish_date < ?))
+            )
+            ORDER BY COALESCE(order_index, 0) ASC, publish_date DESC 
+            LIMIT 1
+        ''', (order_index, order_index, publish_date))
+        next_notification = next_cursor.fetchone()
+        
+        logger.debug("📄 导航链接: 上一篇=%s, 下一篇=%s", prev_notification is not None, next_notification is not None)
+        
+        # 处理发布日期格式化
+        publish_date_str = ''
+        pd = notification_data.get('publish_date')
+        if pd:
+            dt_obj = None
+            try:
+                # 若为字符串，尝试解析为 datetime
+                if isinstance(pd, str):
+                    try:
+                        dt_obj = datetime.fromisoformat(pd)
+                    except Exception:
                         try:
-                            dt_obj = datetime.fromisoformat(pd)
+                            dt_obj = datetime.strptime(pd, '%Y-%m-%d %H:%M:%S')
                         except Exception:
-                            try:
-                                dt_obj = datetime.strptime(pd, '%Y-%m-%d %H:%M:%S')
-                            except Exception:
-                                dt_obj = None
-                    else:
-                        dt_obj = pd
-                except Exception:
-                    dt_obj = None
-                
-                if dt_obj:
-                    publish_date_str = dt_obj.strftime('%Y年%m月%d日')
+                            dt_obj = None
                 else:
-                    # 退化处理：仅取日期部分并做中文格式化
-                    try:
-                        date_part = str(pd).split(' ')[0]
-                        y, m, d = date_part.split('-')
-                        publish_date_str = f"{int(y)}年{int(m)}月{int(d)}日"
-                    except Exception:
-                        publish_date_str = str(pd)
-            
-            print(f"📅 发布日期: {publish_date_str}")
-            print(f"🎯 准备渲染模板...")
+                    dt_obj = pd
+            except Exception:
+                dt_obj = None
             
-            return render_template('frontend/notification_detail.html', 
-                                 notification=notification_data, 
-                                 publish_date_str=publish_date_str,
-                                 prev_notification=dict(prev_notification) if prev_notification else None,
-                                 next_notification=dict(next_notification) if next_notification else None)
+            if dt_obj:
+                publish_date_str = dt_obj.strftime('%Y年%m月%d日')
+            else:
+                # 退化处理：仅取日期部分并做中文格式化
+                try:
+                    date_part = str(pd).split(' ')[0]
+                    y, m, d = date_part.split('-')
+                    publish_date_str = f"{int(y)}年{int(m)}月{int(d)}日"
+                except Exception:
+                    publish_date_str = str(pd)
+        
+        logger.debug("📅 发布日期: %s", publish_date_str)
+        
+        return {
+            'notification': notification_data,
+            'publish_date_str': publish_date_str,
+            'prev_notification': dict(prev_notification) if prev_notification else None,
+            'next_notification': dict(next_notification) if next_notification else None,
+        }
+
+@app.route('/notification/<int:notification_id>')
+def notification_detail(notification_id):
+    """通知详情页面"""
+    try:
+        logger.debug("🔍 尝试加载通知详情: ID=%s", notification_id)
+        
+        page = get_notification_page(notification_id)
+        if page is None:
+            # 如果通知不存在或未发布，重定向到动态页面
+            return redirect(url_for('dynamic'))
+        
+        # 增加浏览量（缓冲后批量写入）
+        view_counter.increment(notification_id)
+        
+        logger.debug("🎯 准备渲染模板...")
+        response = make_response(render_template('frontend/notification_detail.html', **page))
+        # 浏览器或代理缓存的页面不会再请求服务器，浏览量无法计入
+        response.cache_control.no_store = True
+        return response
     except Exception as e:
-        print(f"❌ Error loading notification detail: {e}")
-        import traceback
-        traceback.print_exc()
+        logger.exception(f"❌ Error loading notification detail: {e}")
         return redirect(url_for('dynamic'))
 
 @app.route('/dynamic')
@@ -822,9 +869,9 @@ def paper():
     """论文页面"""
     try:
         papers = get_all_papers()
-        return render_template('frontend/paper.html', papers=papers)
+        return render_page('frontend/paper.html', 'paper', papers=papers)
     except Exception as e:
-        print(f"Error loading papers for frontend: {e}")
+        logger.error(f"Error loading papers for frontend: {e}")
         return render_template('frontend/paper.html', papers=[])
 
 @app.route('/project-recruitment')
@@ -837,11 +884,11 @@ def algorithm_recruitment():
 
 @app.route('/innovation')
 def innovation():
-    return render_template('frontend/science and technology innovation.html')
+    return render_page('frontend/science and technology innovation.html', 'innovation')
 
 @app.route('/team')
 def team():
-    return render_template('frontend/team.html')
+    return render_page('frontend/team.html', 'team')
 
 
 
@@ -1056,7 +1103,8 @@ def get_frontend_activities():
                 activities.append(activity)
             return jsonify(activities)
     except Exception as e:
-        print(f"Error fetching frontend activities: {e}")
+        logger.error(f"Error fetching frontend activities: {e}")
+        skip_cache()
         return jsonify([])
 
 # 调试API - 查看所有通知数据
@@ -1093,76 +1141,55 @@ def get_paper_categories_api():
             
             return jsonify(categories)
     except Exception as e:
-        print(f"Error fetching paper categories: {e}")
+        logger.error(f"Error fetching paper categories: {e}")
         return jsonify([])
 
 # 论文 API
 @app.route('/api/papers', methods=['GET'])
 def get_papers_api():
-    """获取所有论文"""
+    """获取所有论文（带 limit/cursor 参数时按游标分页）"""
+    page = page_request('papers', PAPER_ORDER)
+    if page is None:
+        return get_all_papers_response()
     try:
         with get_db() as conn:
-            # 获取所有论文
-            cursor = conn.execute("SELECT * FROM papers ORDER BY order_index ASC, updated_at DESC")
-            papers = cursor.fetchall()
-            
-            papers_data = []
-            for paper in papers:
-                paper_dict = dict(paper)
-                
-                # 从category_ids字段获取类别信息
-                categories = paper_dict.get('category_ids', '[]')
-                if isinstance(categories, str):
-                    try:
-                        categories = json.loads(categories)
-                    except:
-                        categories = []
-                
-                # 确保categories是列表格式
-                if not isinstance(categories, list):
-                    categories = []
-                
-                paper_dict['categories'] = categories
-                
-                # 处理authors字段，确保是列表格式
-                authors = paper_dict.get('authors', '[]')
-                if isinstance(authors, str):
-                    try:
-                        authors = json.loads(authors)
-                    except:
-                        authors = [authors] if authors else []
-                
-                if not isinstance(authors, list):
-                    authors = [authors] if authors else []
-                
-                paper_dict['authors'] = authors
-                
-                papers_data.append(paper_dict)
-            
-            print(f"📚 返回论文数据: {len(papers_data)} 篇")
-            print(f"📊 论文ID顺序: {[p['id'] for p in papers_data]}")
-            return jsonify(papers_data)
+            papers, page_info = fetch_page(conn, page, 'papers', PAPER_ORDER)
+        return page_response([format_paper(paper) for paper in papers], page_info)
     except Exception as e:
-        print(f"Error fetching papers: {e}")
-        import traceback
-        traceback.print_exc()
+        logger.exception(f"Error fetching papers: {e}")
+        return jsonify({"error": "获取论文列表失败"}), 500
+
+@cached(tables=['papers'], shared=True)
+def get_all_papers_response():
+    """完整论文列表响应（多进程共享缓存）"""
+    try:
+        # 论文列表来自缓存，论文表有写入时自动失效
+        papers_data = get_all_papers()
+        
+        logger.debug("📚 返回论文数据: %s 篇", len(papers_data))
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("📊 论文ID顺序: %s", [p['id'] for p in papers_data])
+        return jsonify(papers_data)
+    except Exception as e:
+        logger.exception(f"Error fetching papers: {e}")
+        skip_cache()
         return jsonify([])
 
 @app.route('/api/frontend/papers', methods=['GET'])
 def get_frontend_papers_api():
     """获取前三个论文用于前端成果展示"""
     try:
-        print("🔍 前端论文API被调用")
+        logger.debug("🔍 前端论文API被调用")
         with get_db() as conn:
             # 获取前三个论文，按排序顺序
             cursor = conn.execute("SELECT * FROM papers ORDER BY order_index ASC, updated_at DESC LIMIT 3")
             papers = cursor.fetchall()
-            print(f"📊 SQL查询返回 {len(papers)} 篇论文")
+            logger.debug("📊 SQL查询返回 %s 篇论文", len(papers))
             
             papers_data = []
             for paper in papers:
                 paper_dict = dict(paper)
-                print(f"📝 处理论文 ID: {paper_dict.get('id')}, 标题: {paper_dict.get('title')}")
+                logger.debug("📝 处理论文 ID: %s, 标题: %s", paper_dict.get('id'), paper_dict.get('title'))
                 
                 # 处理authors字段，确保是列表格式
                 authors = paper_dict.get('authors', '[]')
@@ -1207,15 +1234,12 @@ def get_frontend_papers_api():
                 paper_dict['category_names'] = category_names
                 
                 papers_data.append(paper_dict)
-                print(f"✅ 论文 {paper_dict.get('id')} 处理完成")
             
-            print(f"📚 前端论文API返回 {len(papers_data)} 篇论文")
-            print(f"📋 返回数据: {papers_data}")
+            logger.debug("📚 前端论文API返回 %s 篇论文", len(papers_data))
             return jsonify(papers_data)
     except Exception as e:
-        print(f"❌ Error fetching frontend papers: {e}")
-        import traceback
-        traceback.print_exc()
+        logger.exception(f"❌ Error fetching frontend papers: {e}")
+        skip_cache()
         return jsonify([])
 
 @app.route('/api/papers', methods=['POST'])
@@ -1270,7 +1294,7 @@ def create_paper_api():
         
         return jsonify(paper), 201
     except Exception as e:
-        print(f"Error creating paper: {e}")
+        logger.error(f"Error creating paper: {e}")
         return jsonify({"error": f"创建失败: {str(e)}"}), 500
 
 @app.route('/api/papers/<int:paper_id>', methods=['PUT', 'PATCH'])
@@ -1319,7 +1343,7 @@ def update_paper_api(paper_id: int):
         
         return jsonify(updated_paper)
     except Exception as e:
-        print(f"Error updating paper: {e}")
+        logger.error(f"Error updating paper: {e}")
         return jsonify({"error": f"更新失败: {str(e)}"}), 500
 
 @app.route('/api/papers/<int:paper_id>', methods=['DELETE'])
@@ -1341,7 +1365,7 @@ def delete_paper_api(paper_id: int):
         
         return jsonify({"success": True})
     except Exception as e:
-        print(f"Error deleting paper: {e}")
+        logger.error(f"Error deleting paper: {e}")
         return jsonify({"error": f"删除失败: {str(e)}"}), 500
 
 # 论文排序 API
@@ -1355,7 +1379,7 @@ def reorder_papers_api():
         data = request.get_json(force=True) or {}
         paper_ids = data.get('paper_ids', [])
         
-        print(f"📤 收到排序请求: {paper_ids}")
+        logger.debug("📤 收到排序请求: %s", paper_ids)
         
         if not isinstance(paper_ids, list):
             return jsonify({"error": "参数错误"}), 400
@@ -1367,7 +1391,7 @@ def reorder_papers_api():
         
         return jsonify({"success": True, "message": "排序更新成功"})
     except Exception as e:
-        print(f"Error reordering papers: {e}")
+        logger.error(f"Error reordering papers: {e}")
         return jsonify({"error": f"排序失败: {str(e)}"}), 500
 
 # 研究领域 API - 已移至 api/team.py Blueprint
@@ -1530,22 +1554,35 @@ def test_socket():
 try:
     from db_utils import init_db
     init_db()
-    print("📊 数据库初始化完成")
+    logger.info("📊 数据库初始化完成")
 except Exception as e:
-    print(f"⚠️ 数据库初始化警告: {e}")
+    logger.warning(f"⚠️ 数据库初始化警告: {e}")
     # 在Vercel环境中，如果数据库初始化失败，继续运行
     if os.environ.get('VERCEL'):
-        print("🔄 Vercel环境：跳过数据库初始化错误")
+        logger.warning("🔄 Vercel环境：跳过数据库初始化错误")
         # 在Vercel环境中，尝试重新初始化数据库
         try:
             from db_utils import init_db
             init_db()
-            print("🔄 Vercel环境：数据库重新初始化成功")
+            logger.info("🔄 Vercel环境：数据库重新初始化成功")
         except Exception as e2:
-            print(f"🔄 Vercel环境：数据库重新初始化失败: {e2}")
+            logger.error(f"🔄 Vercel环境：数据库重新初始化失败: {e2}")
     else:
         raise e
 
+# 登记启动维护任务（渲染器版本升级后重新渲染通知、补建搜索索引），并开始每日维护循环（清理一周前结束的任务和过期的访问记录），由后台工作线程执行
+if job_queue.worker_count > 0:
+    try:
+        from api.notifications import schedule_rerender
+        schedule_rerender()
+        job_queue.schedule('jobs.purge')
+        if visit_recorder.enabled:
+            job_queue.schedule('analytics.purge')
+        if search_utils.pending_count():
+            job_queue.enqueue('search.sync')
+    except Exception as e:
+        logger.warning(f"⚠️ 登记启动维护任务失败: {e}")
+
 # 导出应用实例供Vercel使用
 application = app
 
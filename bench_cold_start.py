@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""
+冷启动数据库初始化耗时报告
+对比旧版 init_db（每次冷启动都执行全部建表/种子检查/ALTER探测）
+与基于 user_version 的迁移检查在已初始化数据库上的耗时
+
+用法: python bench_cold_start.py [--runs 20]
+"""
+
+import argparse
+import contextlib
+import io
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+# 添加当前目录到Python路径
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='冷启动数据库初始化耗时对比')
+    parser.add_argument('--runs', type=int, default=20)
+    args = parser.parse_args()
+
+    tmpdir = tempfile.mkdtemp(prefix='bench_cold_start_')
+    os.environ['DB_PATH'] = os.path.join(tmpdir, 'bench.db')
+
+    import db_utils
+
+    # 先完成一次完整初始化，模拟已部署的数据库
+    with contextlib.redirect_stdout(io.StringIO()):
+        db_utils.init_db()
+
+    def cold_connection():
+        # 每次使用新的连接池，模拟新进程的首个连接
+        db_utils.configure_pool()
+
+    def legacy_init():
+        with db_utils.get_db() as conn:
+            conn.execute('BEGIN')
+            for _, _, step in db_utils.MIGRATIONS:
+                step(conn)
+            conn.execute('COMMIT')
+
+    def versioned_init():
+        db_utils.init_db()
+
+    results = {}
+    for name, func in (('旧版全量初始化', legacy_init), ('user_version 检查', versioned_init)):
+        timings = []
+        for _ in range(args.runs):
+            cold_connection()
+            start = time.perf_counter()
+            with contextlib.redirect_stdout(io.StringIO()):
+                func()
+            timings.append((time.perf_counter() - start) * 1000)
+        results[name] = timings
+        print(f"   {name:<16} 中位数 {statistics.median(timings):8.2f} ms  "
+              f"最大 {max(timings):8.2f} ms")
+
+    legacy = statistics.median(results['旧版全量初始化'])
+    versioned = statistics.median(results['user_version 检查'])
+    print(f"📊 每次冷启动节省约 {legacy - versioned:.2f} ms ({legacy / max(versioned, 1e-6):.1f}x)")
+
+    db_utils.get_pool().close_all()
+    for name in os.listdir(tmpdir):
+        os.remove(os.path.join(tmpdir, name))
+    os.rmdir(tmpdir)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+"""
+HTML后处理吞吐量报告
+对比旧版 optimize_html_content（依次执行多次全文 re.sub）
+与单次扫描的分派实现在大文档上的吞吐量，并校验两者输出一致
+
+用法: python bench_html_postprocess.py [--runs 30] [--sections 200]
+"""
+
+import argparse
+import os
+import re
+import statistics
+import sys
+import time
+
+# 添加当前目录到Python路径
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+
+def legacy_optimize_html_content(html_content):
+    """旧版实现：依次执行8次全文 re.sub（作为输出一致性的参照）"""
+    
+    # 为标题添加锚点
+    def add_header_anchors(match):
+        level = len(match.group(1))
+        content = match.group(2)
+        anchor_id = re.sub(r'[^\w\u4e00-\u9fff]+', '-', content).strip('-').lower()
+        return f'<h{level} id="{anchor_id}">{content}</h{level}>'
+    
+    html_content = re.sub(r'<h([1-6])>(.*?)</h[1-6]>', add_header_anchors, html_content)
+    
+    # 为表格添加响应式包装
+    html_content = re.sub(
+        r'<table>', 
+        '<div class="table-responsive"><table class="table table-striped">', 
+        html_content
+    )
+    html_content = re.sub(r'</table>', '</table></div>', html_content)
+    
+    # 为代码块添加复制按钮容器
+    html_content = re.sub(
+        r'<pre><code(.*?)>', 
+        r'<div class="code-block-container"><pre><code\1>', 
+        html_content
+    )
+    html_content = re.sub(r'</code></pre>', '</code></pre></div>', html_content)
+    
+    # 为图片添加懒加载和灯箱效果
+    def enhance_image_tag(match):
+        before_src = match.group(1)
+        src = match.group(2)
+        after_src = match.group(3)
+        
+        # 检查是否已经有这些属性
+        full_tag = f'<img{before_src}src="{src}"{after_src}>'
+        
+        # 如果没有loading属性，添加它
+        if 'loading=' not in full_tag:
+            after_src += ' loading="lazy"'
+        
+        # 如果没有responsive-image类，添加它
+        if 'responsive-image' not in full_tag:
+            if 'class=' in full_tag:
+                # 如果已有class属性，添加到现有class中
+                after_src = re.sub(r'class="([^"]*)"', r'class="\1 responsive-image"', after_src)
+            else:
+                # 如果没有class属性，添加新的class
+                after_src += ' class="responsive-image"'
+        
+        # 如果没有onclick属性，添加它
+        if 'onclick=' not in full_tag:
+            after_src += ' onclick="openImageModal(this)"'
+        
+        # 如果没有cursor样式，添加它
+        if 'cursor:' not in full_tag:
+            if 'style=' in full_tag:
+                # 如果已有style属性，添加到现有style中
+                after_src = re.sub(r'style="([^"]*)"', r'style="\1; cursor: pointer;"', after_src)
+            else:
+                # 如果没有style属性，添加新的style
+                after_src += ' style="cursor: pointer;"'
+        
+        return f'<img{before_src}src="{src}"{after_src}>'
+    
+    html_content = re.sub(
+        r'<img([^>]*?)src="([^"]*?)"([^>]*?)>', 
+        enhance_image_tag, 
+        html_content
+    )
+    
+    # 为引用块添加样式类
+    html_content = re.sub(r'<blockquote>', '<blockquote class="blockquote">', html_content)
+    
+    # 处理段落间距
+    html_content = re.sub(r'<p></p>', '', html_content)
+    
+    return html_content
+
+
+def build_document(sections):
+    """按通知常见结构拼接的大文档（Markdown转换后的HTML）"""
+    from bench_markdown import LONG_SECTION
+    from api.notifications import _convert_markdown, MARKDOWN_EXTENSIONS, MARKDOWN_EXTENSION_CONFIGS
+    from markdown_utils import get_pool
+
+    text = '# 集训讲义\n\n' + ''.join(
+        LONG_SECTION.format(n=n) + f'\n![第{n}章配图](images/dp_{n}.png "示意图")\n\n' for n in range(1, sections + 1)
+    )
+    with get_pool(MARKDOWN_EXTENSIONS, MARKDOWN_EXTENSION_CONFIGS).converter() as md:
+        return md.convert(text)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='HTML后处理吞吐量对比')
+    parser.add_argument('--runs', type=int, default=30)
+    parser.add_argument('--sections', type=int, default=200, help='文档章节数（每章约350字符）')
+    args = parser.parse_args()
+
+    from api.notifications import optimize_html_content
+
+    document = build_document(args.sections)
+    if optimize_html_content(document) != legacy_optimize_html_content(document):
+        print("❌ 单次扫描实现的输出与旧版不一致")
+        sys.exit(1)
+
+    size_mb = len(document.encode('utf-8')) / 1024 / 1024
+    print(f"📄 文档大小 {size_mb:.2f} MB")
+    medians = {}
+    for name, func in (('旧版多次替换', legacy_optimize_html_content), ('单次扫描分派', optimize_html_content)):
+        timings = []
+        for _ in range(args.runs):
+            start = time.perf_counter()
+            func(document)
+            timings.append(time.perf_counter() - start)
+        medians[name] = statistics.median(timings)
+        print(f"   {name:<8} 中位数 {medians[name] * 1000:8.2f} ms  吞吐 {size_mb / medians[name]:7.1f} MB/s")
+    print(f"📊 {medians['旧版多次替换'] / max(medians['单次扫描分派'], 1e-9):.1f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+Markdown转换耗时报告
+对比每次调用都新建 markdown.Markdown 实例（旧版 markdown_to_html）
+与复用实例池的转换耗时，语料包含短通知和长文档
+
+用法: python bench_markdown.py [--runs 200]
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import time
+
+# 添加当前目录到Python路径
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import markdown
+
+SHORT_NOTICE = """## 本周例会通知
+
+本周例会改到 **周四晚上 7 点**，地点：实验楼 *302*。
+
+- 汇报本周训练进度
+- 讨论区域赛报名事宜
+"""
+
+LONG_SECTION = """## 第{n}章 动态规划专题
+
+动态规划的核心是**状态定义**与*转移方程*，参考 [OI Wiki](https://oi-wiki.org/dp/)。
+
+| 题目 | 难度 | 知识点 |
+| --- | --- | --- |
+| 背包问题 | 简单 | 01背包 |
+| 区间DP | 中等 | 石子合并 |
+
+```cpp
+int dp[N][N];
+for (int len = 2; len <= n; ++len)
+    for (int i = 1; i + len - 1 <= n; ++i)
+        dp[i][i + len - 1] = solve(i, i + len - 1);
+```
+
+> 先想清楚子问题，再写代码。
+
+1. 确定状态
+2. 写出转移
+3. 处理边界
+"""
+
+
+def build_corpus():
+    """语料：(名称, 文档列表)"""
+    short = [SHORT_NOTICE.replace('302', str(300 + i)) for i in range(50)]
+    long = ['# 集训讲义\n\n' + ''.join(LONG_SECTION.format(n=n) for n in range(1, 21)) for _ in range(5)]
+    return [('短通知', short), ('长文档', long)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Markdown转换实例池耗时对比')
+    parser.add_argument('--runs', type=int, default=200, help='每种语料的转换次数')
+    args = parser.parse_args()
+
+    from api.notifications import MARKDOWN_EXTENSIONS, MARKDOWN_EXTENSION_CONFIGS
+    from markdown_utils import get_pool
+
+    def per_call(text):
+        md = markdown.Markdown(extensions=MARKDOWN_EXTENSIONS, extension_configs=MARKDOWN_EXTENSION_CONFIGS)
+        return md.convert(text)
+
+    pool = get_pool(MARKDOWN_EXTENSIONS, MARKDOWN_EXTENSION_CONFIGS)
+
+    def pooled(text):
+        with pool.converter() as md:
+            return md.convert(text)
+
+    for corpus_name, documents in build_corpus():
+        # 两种方式的输出必须一致（实例复用不能残留上次转换的状态）
+        for text in documents:
+            if per_call(text) != pooled(text):
+                print(f"❌ {corpus_name}: 实例池输出与新建实例不一致")
+                sys.exit(1)
+
+        print(f"📄 {corpus_name}（{len(documents)} 篇，平均 {statistics.mean(map(len, documents)):.0f} 字符）")
+        medians = {}
+        for name, func in (('每次新建实例', per_call), ('复用实例池', pooled)):
+            timings = []
+            for i in range(args.runs):
+                text = documents[i % len(documents)]
+                start = time.perf_counter()
+                func(text)
+                timings.append((time.perf_counter() - start) * 1000)
+            medians[name] = statistics.median(timings)
+            print(f"   {name:<10} 中位数 {medians[name]:8.3f} ms  "
+                  f"p95 {sorted(timings)[int(len(timings) * 0.95) - 1]:8.3f} ms")
+        saved = medians['每次新建实例'] - medians['复用实例池']
+        print(f"   📊 每次转换节省约 {saved:.3f} ms ({medians['每次新建实例'] / max(medians['复用实例池'], 1e-6):.1f}x)")
+
+    print(f"🔁 实例池: {pool.stats()}")
+
+
+if __name__ == '__main__':
+    main()
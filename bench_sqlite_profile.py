@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""
+SQLite连接配置档案基准测试
+对比默认PRAGMA与 performance 档案在并发读写下的吞吐量
+
+用法: python bench_sqlite_profile.py [--seconds 3] [--readers 4] [--writers 1]
+"""
+
+import argparse
+import os
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+
+# 添加当前目录到Python路径
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from db_utils import _connect
+
+
+def prepare_database(db_path, rows=2000):
+    """创建测试表并写入初始数据"""
+    conn = sqlite3.connect(db_path)
+    conn.execute('''
+        CREATE TABLE team_members (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            name TEXT NOT NULL,
+            grade TEXT,
+            order_index INTEGER DEFAULT 0,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+    conn.executemany(
+        'INSERT INTO team_members (name, grade, order_index) VALUES (?, ?, ?)',
+        [(f'成员{i}', f'{2018 + i % 8}级', i) for i in range(rows)]
+    )
+    conn.commit()
+    conn.close()
+
+
+def run_profile(profile, seconds, readers, writers):
+    """在指定档案下运行并发读写，返回 (读次数, 写次数, 锁错误次数)"""
+    tmpdir = tempfile.mkdtemp(prefix='bench_sqlite_')
+    db_path = os.path.join(tmpdir, 'bench.db')
+    prepare_database(db_path)
+
+    counters = {'reads': 0, 'writes': 0, 'locked': 0}
+    lock = threading.Lock()
+    deadline = time.perf_counter() + seconds
+
+    def reader():
+        conn = _connect(db_path, profile)
+        reads = 0
+        locked = 0
+        while time.perf_counter() < deadline:
+            try:
+                conn.execute(
+                    'SELECT * FROM team_members WHERE grade = ? ORDER BY order_index ASC, created_at DESC',
+                    (f'{2018 + reads % 8}级',)
+                ).fetchall()
+                reads += 1
+            except sqlite3.OperationalError:
+                locked += 1
+        conn.close()
+        with lock:
+            counters['reads'] += reads
+            counters['locked'] += locked
+
+    def writer():
+        conn = _connect(db_path, profile)
+        writes = 0
+        locked = 0
+        while time.perf_counter() < deadline:
+            try:
+                # 模拟后台排序操作：一个事务内批量更新
+                conn.execute('BEGIN IMMEDIATE')
+                for i in range(20):
+                    conn.execute('UPDATE team_members SET order_index = ? WHERE id = ?',
+                                 (writes + i, (writes * 20 + i) % 2000 + 1))
+                conn.execute('COMMIT')
+                writes += 1
+            except sqlite3.OperationalError:
+                locked += 1
+                if conn.in_transaction:
+                    conn.execute('ROLLBACK')
+        conn.close()
+        with lock:
+            counters['writes'] += writes
+            counters['locked'] += locked
+
+    threads = [threading.Thread(target=reader) for _ in range(readers)]
+    threads += [threading.Thread(target=writer) for _ in range(writers)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    for name in os.listdir(tmpdir):
+        os.remove(os.path.join(tmpdir, name))
+    os.rmdir(tmpdir)
+    return counters
+
+
+def main():
+    parser = argparse.ArgumentParser(description='SQLite配置档案吞吐量对比')
+    parser.add_argument('--seconds', type=float, default=3.0)
+    parser.add_argument('--readers', type=int, default=4)
+    parser.add_argument('--writers', type=int, default=1)
+    args = parser.parse_args()
+
+    print(f"🔍 并发读写测试: {args.readers} 个读线程, {args.writers} 个写线程, 每档案 {args.seconds}s")
+    results = {}
+    for profile in ('default', 'performance'):
+        results[profile] = run_profile(profile, args.seconds, args.readers, args.writers)
+        r = results[profile]
+        print(f"   {profile:<12} 读 {r['reads'] / args.seconds:>9.1f} 次/秒  "
+              f"写事务 {r['writes'] / args.seconds:>7.1f} 次/秒  锁错误 {r['locked']}")
+
+    base = results['default']
+    tuned = results['performance']
+    if base['reads']:
+        print(f"📊 读吞吐提升: {tuned['reads'] / base['reads']:.2f}x")
+    if base['writes']:
+        print(f"📊 写吞吐提升: {tuned['writes'] / base['writes']:.2f}x")
+
+
+if __name__ == '__main__':
+    main()
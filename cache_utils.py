@@ -0,0 +1,573 @@
+"""
+缓存工具模块
+提供按表声明依赖的缓存，以及由数据库写入驱动的失效总线
+
+写入检测在连接层完成（db_utils 写入监听者）：任何蓝图提交了对某表的修改，
+依赖该表的进程内缓存都会立即清空，无需在写路径中手动 cache_clear()。
+每个条目还记录计算前依赖表的修改代数（table_generations），读取时代数不一致即视为失效，
+因此其他worker进程的写入同样可见。
+
+shared=True 时改用同一台机器上所有worker共享的SQLite缓存，保存编码后的字节，
+以写入时的表修改代数判断是否有效，任一进程的写入都会让其他进程的缓存失效。
+
+环境变量:
+    SHARED_CACHE_PATH       共享缓存文件路径，默认在临时目录下按数据库区分
+    SHARED_CACHE_MAX_BYTES  共享缓存总大小上限，默认 64MB，超出时按最近访问时间淘汰
+"""
+
+import os
+import json
+import time
+import hashlib
+import logging
+import sqlite3
+import tempfile
+import threading
+from collections import OrderedDict
+from functools import wraps
+
+from flask import current_app, g, has_request_context
+
+import db_utils
+
+logger = logging.getLogger(__name__)
+
+_KWARGS_MARK = object()
+
+# 共享缓存默认大小上限（字节）
+DEFAULT_SHARED_MAX_BYTES = 64 * 1024 * 1024
+# 命中时最多每隔多少秒更新一次访问时间，避免每次命中都写缓存库
+ACCESS_TOUCH_INTERVAL = 10.0
+# 等待同一键正在进行的计算的最长时间（秒），超时后自行计算
+SINGLE_FLIGHT_TIMEOUT = 30.0
+
+# 失效后保留为过期数据的条目版本
+_STALE = object()
+
+# 所有缓存实例，以及 表名 -> 依赖该表的缓存
+_caches = []
+_dependents = {}
+_registry_lock = threading.Lock()
+
+
+def current_generations():
+    """
+    读取表修改代数（请求内只读一次，本请求写入后重新读取）
+
+    数据库尚未迁移到带修改代数的版本时返回空字典，缓存只依赖本进程的写入失效。
+    """
+    if has_request_context():
+        generations = g.get('_table_generations')
+        if generations is None:
+            with db_utils.get_db() as conn:
+                generations = g._table_generations = db_utils.get_table_generations(conn)
+        return generations
+    with db_utils.get_db() as conn:
+        return db_utils.get_table_generations(conn)
+
+
+def generation_stamp(tables, generations):
+    """依赖表修改代数的字符串形式，作为缓存条目的版本"""
+    return ','.join(f'{table}={generations.get(table, 0)}' for table in sorted(tables))
+
+
+class _Flight:
+    __slots__ = ('done', 'result', 'error')
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """
+    合并同一键的并发计算（进程内）
+
+    第一个调用者执行计算，同时到达的调用者等待并共享其结果（或异常），
+    避免缓存失效瞬间多个请求同时查询数据库。
+    """
+
+    def __init__(self, timeout=SINGLE_FLIGHT_TIMEOUT):
+        self.timeout = timeout
+        self._lock = threading.Lock()
+        self._flights = {}
+
+    def in_flight(self, key):
+        return key in self._flights
+
+    def do(self, key, fn):
+        """
+        执行或等待计算
+
+        Returns:
+            tuple: (结果, 是否由本调用者计算)
+        """
+        with self._lock:
+            flight = self._flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._flights[key] = _Flight()
+
+        if not leader:
+            if not flight.done.wait(self.timeout):
+                logger.warning(f"等待缓存计算超时，改为自行计算: {key[0]}")
+                return fn(), True
+            if flight.error is not None:
+                raise flight.error
+            return flight.result, False
+
+        try:
+            flight.result = fn()
+        except BaseException as e:
+            flight.error = e
+            raise
+        finally:
+            with self._lock:
+                self._flights.pop(key, None)
+            flight.done.set()
+        return flight.result, True
+
+
+_flights = SingleFlight()
+
+
+class TableCache:
+    """
+    单个函数的进程内LRU缓存
+
+    清空时递增 epoch；计算开始前后 epoch 不一致说明期间发生过写入，
+    计算结果不再写入缓存，避免把旧数据放回刚被清空的缓存。
+    """
+
+    def __init__(self, name, tables, maxsize=128, ttl=None, keep_stale=False):
+        self.name = name
+        self.tables = frozenset(tables)
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.keep_stale = keep_stale
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+        self._epoch = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+        self.coalesced = 0
+        self.stale_served = 0
+
+    def get(self, key, stamp=None):
+        """
+        Returns:
+            tuple: ('hit' | 'stale' | 'miss', 值, 当前epoch)；
+                   keep_stale 时失效的条目以 'stale' 返回，由调用方决定是否使用
+        """
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[2] == stamp and (entry[1] is None or entry[1] > now):
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return 'hit', entry[0], self._epoch
+            if entry is not None and self.keep_stale:
+                return 'stale', entry[0], self._epoch
+            if entry is not None:
+                # 已过期，或依赖表已被其他进程修改
+                del self._entries[key]
+                self.evictions += 1
+            return 'miss', None, self._epoch
+
+    def put(self, key, value, epoch, stamp=None):
+        expires = time.monotonic() + self.ttl if self.ttl else None
+        with self._lock:
+            if epoch != self._epoch:
+                return
+            self._entries[key] = (value, expires, stamp)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def record(self, outcome):
+        """计数：'hits' / 'misses' / 'coalesced'（等待他人计算） / 'stale_served'（返回了过期数据）"""
+        with self._lock:
+            setattr(self, outcome, getattr(self, outcome) + 1)
+
+    def clear(self):
+        with self._lock:
+            self._epoch += 1
+            if self._entries:
+                self.invalidations += 1
+            if self.keep_stale:
+                for key, (value, expires, _) in list(self._entries.items()):
+                    self._entries[key] = (value, expires, _STALE)
+            else:
+                self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            return {
+                'name': self.name,
+                'tables': sorted(self.tables),
+                'size': len(self._entries),
+                'maxsize': self.maxsize,
+                'ttl': self.ttl,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'invalidations': self.invalidations,
+                'coalesced': self.coalesced,
+                'stale_served': self.stale_served,
+            }
+
+
+def get_shared_cache_path():
+    """共享缓存文件路径，默认按数据库文件区分（使用临时库的脚本不会读到正式库的缓存）"""
+    path = os.environ.get('SHARED_CACHE_PATH')
+    if path:
+        return path
+    digest = hashlib.sha1(os.path.abspath(db_utils.get_db_path()).encode('utf-8')).hexdigest()[:12]
+    return os.path.join(tempfile.gettempdir(), f'acm_lab_cache_{digest}.db')
+
+
+class SharedCache:
+    """
+    同机多进程共享的键值缓存（SQLite）
+
+    每个条目记录写入时依赖表的修改代数，读取时不一致即视为未命中；
+    总大小超过上限时按最近访问时间淘汰。缓存库出错时按未命中处理，不影响请求。
+    """
+
+    def __init__(self, path=None, max_bytes=None):
+        self.path = path
+        self.max_bytes = max_bytes
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.stale = 0
+        self.evictions = 0
+        self.errors = 0
+
+    def _connect(self):
+        """每个线程一个连接；fork 出的子进程重新连接"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is not None and self._local.pid == os.getpid():
+            return conn
+        if self.path is None:
+            self.path = get_shared_cache_path()
+        if self.max_bytes is None:
+            self.max_bytes = int(os.environ.get('SHARED_CACHE_MAX_BYTES', DEFAULT_SHARED_MAX_BYTES))
+        conn = sqlite3.connect(self.path, timeout=5, isolation_level=None, check_same_thread=False)
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.execute('PRAGMA synchronous=NORMAL')
+        conn.execute('''
+            CREATE TABLE IF NOT EXISTS cache_entries (
+                key TEXT PRIMARY KEY,
+                stamp TEXT NOT NULL,
+                value BLOB NOT NULL,
+                size INTEGER NOT NULL,
+                accessed_at REAL NOT NULL
+            )
+        ''')
+        conn.execute('CREATE INDEX IF NOT EXISTS idx_cache_entries_accessed ON cache_entries(accessed_at)')
+        self._local.conn = conn
+        self._local.pid = os.getpid()
+        return conn
+
+    def _count(self, name, amount=1):
+        with self._lock:
+            setattr(self, name, getattr(self, name) + amount)
+
+    def get(self, key, stamp, allow_stale=False):
+        """
+        Returns:
+            tuple: (编码后的字节, 是否有效)；不存在时字节为 None，
+                   依赖表已修改时仅在 allow_stale 下返回旧字节
+        """
+        try:
+            conn = self._connect()
+            row = conn.execute(
+                'SELECT stamp, value, accessed_at FROM cache_entries WHERE key = ?', (key,)
+            ).fetchone()
+            if row is None:
+                self._count('misses')
+                return None, False
+            if row[0] != stamp:
+                self._count('stale')
+                self._count('misses')
+                return (bytes(row[1]) if allow_stale else None), False
+            now = time.time()
+            if now - row[2] > ACCESS_TOUCH_INTERVAL:
+                conn.execute('UPDATE cache_entries SET accessed_at = ? WHERE key = ?', (now, key))
+            self._count('hits')
+            return bytes(row[1]), True
+        except sqlite3.Error as e:
+            self._count('errors')
+            logger.warning(f"读取共享缓存失败: {e}")
+            return None, False
+
+    def put(self, key, stamp, value):
+        """写入条目，超过大小上限时淘汰最久未访问的条目"""
+        try:
+            conn = self._connect()
+            conn.execute(
+                'INSERT OR REPLACE INTO cache_entries (key, stamp, value, size, accessed_at) VALUES (?, ?, ?, ?, ?)',
+                (key, stamp, sqlite3.Binary(value), len(value), time.time())
+            )
+            self._evict(conn)
+        except sqlite3.Error as e:
+            self._count('errors')
+            logger.warning(f"写入共享缓存失败: {e}")
+
+    def _evict(self, conn):
+        total = conn.execute('SELECT COALESCE(SUM(size), 0) FROM cache_entries').fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        removed = 0
+        for key, size in conn.execute('SELECT key, size FROM cache_entries ORDER BY accessed_at').fetchall():
+            if total <= self.max_bytes:
+                break
+            conn.execute('DELETE FROM cache_entries WHERE key = ?', (key,))
+            total -= size
+            removed += 1
+        self._count('evictions', removed)
+
+    def clear(self):
+        try:
+            self._connect().execute('DELETE FROM cache_entries')
+        except sqlite3.Error as e:
+            logger.warning(f"清空共享缓存失败: {e}")
+
+    def stats(self):
+        with self._lock:
+            result = {
+                'hits': self.hits,
+                'misses': self.misses,
+                'stale': self.stale,
+                'evictions': self.evictions,
+                'errors': self.errors,
+            }
+        try:
+            entries, size = self._connect().execute(
+                'SELECT COUNT(*), COALESCE(SUM(size), 0) FROM cache_entries'
+            ).fetchone()
+            result.update(entries=entries, bytes=size)
+        except sqlite3.Error:
+            pass
+        result.update(path=self.path, max_bytes=self.max_bytes)
+        return result
+
+
+shared_cache = SharedCache()
+
+
+def _encode(value):
+    """
+    编码为共享缓存中保存的字节：一行JSON头 + 内容
+
+    视图响应保存响应体（仅200），其他返回值按JSON保存。
+
+    Returns:
+        tuple: (返回给调用方的值, 编码后的字节；不可缓存时为 None)
+    """
+    if isinstance(value, (current_app.response_class, tuple)):
+        response = current_app.make_response(value)
+        if response.status_code != 200 or response.is_streamed:
+            return response, None
+        header = json.dumps({'type': 'response', 'mimetype': response.mimetype})
+        return response, header.encode('utf-8') + b'\n' + response.get_data()
+    body = json.dumps(value, ensure_ascii=False, separators=(',', ':'))
+    return value, b'{"type": "json"}\n' + body.encode('utf-8')
+
+
+def _decode(data):
+    header, _, body = data.partition(b'\n')
+    header = json.loads(header)
+    if header['type'] == 'response':
+        return current_app.response_class(body, mimetype=header['mimetype'])
+    return json.loads(body)
+
+
+def note_cached_read(tables):
+    """
+    记录本请求从缓存读取了哪些表的数据
+
+    缓存命中时不会执行SQL，依赖语句观察者推断依赖表的功能（如ETag）需要从这里补充。
+    """
+    if has_request_context():
+        reads = g.get('_cached_table_reads')
+        if reads is None:
+            reads = g._cached_table_reads = set()
+        reads.update(tables)
+
+
+def cached_table_reads():
+    """本请求从缓存读取过的表"""
+    if has_request_context():
+        return g.get('_cached_table_reads') or set()
+    return set()
+
+
+def skip_cache():
+    """本次返回值不写入缓存（如视图捕获异常后返回了兜底数据）"""
+    if has_request_context():
+        g._cache_skip = True
+        g._cache_skips = g.get('_cache_skips', 0) + 1
+
+
+def cache_skips():
+    """
+    本请求中 skip_cache() 的调用次数
+
+    内层的 @cached 会取走 skip 标记，外层长期保存结果的调用方（bootstrap 区块、预生成响应）
+    比较生成前后的次数判断结果中是否含有兜底数据。
+    """
+    return g.get('_cache_skips', 0) if has_request_context() else 0
+
+
+def skipped_since(mark):
+    """mark 为生成前 cache_skips() 的返回值；返回期间是否调用过 skip_cache()，并取走尚未被内层缓存取走的标记"""
+    _take_skip()
+    return cache_skips() != mark
+
+
+def _take_skip():
+    return has_request_context() and g.pop('_cache_skip', False)
+
+
+def _make_key(args, kwargs):
+    if kwargs:
+        return args + (_KWARGS_MARK,) + tuple(sorted(kwargs.items()))
+    return args
+
+
+def _source_version(func):
+    """函数所在源文件的修改时间；部署新代码后共享缓存中的旧条目不再命中"""
+    try:
+        return int(os.path.getmtime(func.__code__.co_filename))
+    except (AttributeError, OSError):
+        return 0
+
+
+def cached(tables, maxsize=128, ttl=None, shared=False, stale_while_revalidate=False):
+    """
+    缓存函数返回值，依赖的任一表被写入后失效
+
+    同一参数的并发未命中只计算一次，其余调用者等待并共享结果。
+
+    Args:
+        tables: 函数读取的表名列表
+        maxsize: 进程内最多缓存的参数组合数，超出时淘汰最久未使用的
+        ttl: 可选的过期时间（秒）
+        shared: 使用多进程共享缓存；返回值需为视图响应或可JSON序列化的对象，
+                视图保存的是编码后的响应体，命中时不再查询和序列化
+        stale_while_revalidate: 失效后由第一个调用者重新计算，
+                期间其他调用者直接返回旧值而不等待
+
+    用于视图时，视图不能依赖查询参数和会话（缓存键只包含函数参数）。
+    进程内缓存的返回值会被多个请求共享，调用方不能修改。
+    """
+    def decorator(func):
+        cache = TableCache(f'{func.__module__}.{func.__qualname__}', tables, maxsize, ttl,
+                           keep_stale=stale_while_revalidate)
+        with _registry_lock:
+            _caches.append(cache)
+            for table in cache.tables:
+                _dependents.setdefault(table, []).append(cache)
+        shared_prefix = f'{cache.name}@{_source_version(func)}:'
+
+        def call_shared(args, kwargs, key, stamp):
+            shared_key = shared_prefix + repr(key)
+            data, fresh = shared_cache.get(shared_key, stamp, allow_stale=stale_while_revalidate)
+            if fresh:
+                cache.record('hits')
+                return _decode(data)
+            if data is not None and _flights.in_flight((cache.name, key)):
+                cache.record('stale_served')
+                return _decode(data)
+            cache.record('misses')
+
+            def compute():
+                value, encoded = _encode(func(*args, **kwargs))
+                if encoded is not None and not _take_skip():
+                    shared_cache.put(shared_key, stamp, encoded)
+                return value, encoded
+
+            (value, encoded), leader = _flights.do((cache.name, key), compute)
+            if leader:
+                return value
+            cache.record('coalesced')
+            # 响应对象不能在请求间共享，等待者各自从字节重建；不可缓存的结果自行计算
+            return _decode(encoded) if encoded is not None else func(*args, **kwargs)
+
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            key = _make_key(args, kwargs)
+            note_cached_read(cache.tables)
+            # 在计算前读取代数：计算期间发生的写入会让本次结果在下次读取时失效
+            stamp = generation_stamp(cache.tables, current_generations())
+            if shared:
+                return call_shared(args, kwargs, key, stamp)
+
+            state, value, epoch = cache.get(key, stamp)
+            if state == 'hit':
+                return value
+            if state == 'stale' and _flights.in_flight((cache.name, key)):
+                cache.record('stale_served')
+                return value
+            cache.record('misses')
+
+            def compute():
+                result = func(*args, **kwargs)
+                if not _take_skip():
+                    cache.put(key, result, epoch, stamp)
+                return result
+
+            value, leader = _flights.do((cache.name, key), compute)
+            if not leader:
+                cache.record('coalesced')
+            return value
+
+        wrapper.cache = cache
+        wrapper.cache_clear = cache.clear
+        return wrapper
+    return decorator
+
+
+def invalidate_tables(tables):
+    """清空依赖这些表的进程内缓存（由写入监听者调用，也可在非SQL写入后手动调用）"""
+    if has_request_context():
+        g.pop('_table_generations', None)
+    for table in tables:
+        for cache in _dependents.get(table, ()):
+            cache.clear()
+    logger.debug("缓存失效: %s", ', '.join(sorted(tables)))
+
+
+def clear_all():
+    """清空所有缓存（包括共享缓存）"""
+    for cache in list(_caches):
+        cache.clear()
+    shared_cache.clear()
+
+
+def cache_stats():
+    """所有缓存的命中/未命中/淘汰/失效计数"""
+    caches = [cache.stats() for cache in list(_caches)]
+    hits = sum(item['hits'] for item in caches)
+    misses = sum(item['misses'] for item in caches)
+    return {
+        'hits': hits,
+        'misses': misses,
+        'hit_rate': round(hits / (hits + misses), 4) if hits + misses else None,
+        'evictions': sum(item['evictions'] for item in caches),
+        'invalidations': sum(item['invalidations'] for item in caches),
+        'coalesced': sum(item['coalesced'] for item in caches),
+        'stale_served': sum(item['stale_served'] for item in caches),
+        'caches': caches,
+        'shared': shared_cache.stats(),
+    }
+
+
+db_utils.add_write_listener(invalidate_tables)
@@ -0,0 +1,261 @@
+#!/usr/bin/env python3
+"""
+查询计划回归检查脚本
+对应用中的热点查询执行 EXPLAIN QUERY PLAN，
+出现全表扫描或临时B树排序时返回非零退出码
+
+用法:
+    python check_query_plans.py            # 在临时数据库上按 init_db 建库后检查
+    python check_query_plans.py --db acm_lab.db
+"""
+
+import argparse
+import os
+import re
+import sqlite3
+import sys
+import tempfile
+
+# 添加当前目录到Python路径
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+# 热点查询注册表：(名称, SQL, 示例参数)
+# 新增或修改列表/详情查询时，请同步更新此处
+HOT_QUERIES = [
+    ('team.list', '''
+        SELECT * FROM team_members
+        ORDER BY COALESCE(order_index, 999999) ASC, grade DESC, created_at DESC
+    ''', ()),
+    ('team.cached_list', '''
+        SELECT * FROM team_members
+        ORDER BY order_index ASC, created_at DESC
+    ''', ()),
+    ('grades.list', '''
+        SELECT id, name, description, order_index, created_at, updated_at
+        FROM grades
+        ORDER BY order_index ASC, created_at DESC
+    ''', ()),
+    ('grades.member_count', 'SELECT COUNT(*) as count FROM team_members WHERE grade = ?', ('2023级',)),
+    ('grades.rename_members', '''
+        UPDATE team_members
+        SET grade = ?, updated_at = CURRENT_TIMESTAMP
+        WHERE grade = ?
+    ''', ('2024级', '2023级')),
+    ('papers.list', 'SELECT * FROM papers ORDER BY order_index ASC, updated_at DESC', ()),
+    ('papers.frontend', 'SELECT * FROM papers ORDER BY order_index ASC, updated_at DESC LIMIT 3', ()),
+    ('papers.category_relations', 'SELECT * FROM paper_category_relations WHERE paper_id = ?', (1,)),
+    ('paper_categories.list', '''
+        SELECT id, name, level, description
+        FROM paper_categories
+        ORDER BY level, name
+    ''', ()),
+    ('research_projects.list', 'SELECT * FROM research_projects ORDER BY order_index, created_at', ()),
+    ('research.list', '''
+        SELECT * FROM research_areas
+        ORDER BY order_index ASC, created_at DESC
+    ''', ()),
+    ('research.page_by_category', '''
+        SELECT id, title, category, description, members, order_index,
+               created_at, updated_at
+        FROM research_areas
+        WHERE category = ?
+        ORDER BY order_index ASC, created_at DESC
+        LIMIT ? OFFSET ?
+    ''', ('深度学习', 6, 0)),
+    ('research.count_by_category', 'SELECT COUNT(*) FROM research_areas WHERE category = ?', ('深度学习',)),
+    ('algorithms.frontend', '''
+        SELECT * FROM algorithms
+        WHERE status = 'active'
+        ORDER BY COALESCE(order_index, 0) ASC, created_at DESC
+    ''', ()),
+    ('algorithms.admin', '''
+        SELECT * FROM algorithms
+        ORDER BY COALESCE(order_index, 0) ASC, created_at DESC
+    ''', ()),
+    ('algorithm_awards.frontend', '''
+        SELECT * FROM algorithm_awards
+        WHERE status = 'active'
+        ORDER BY COALESCE(order_index, 0) ASC, created_at DESC
+    ''', ()),
+    ('algorithm_awards.admin', '''
+        SELECT * FROM algorithm_awards
+        ORDER BY COALESCE(order_index, 0) ASC, created_at DESC
+    ''', ()),
+    ('project_overview.frontend', '''
+        SELECT * FROM project_overview
+        WHERE status = 'active'
+        ORDER BY COALESCE(order_index, 0) ASC, created_at DESC
+    ''', ()),
+    ('project_overview.admin', '''
+        SELECT * FROM project_overview
+        ORDER BY COALESCE(order_index, 0) ASC, created_at DESC
+    ''', ()),
+    ('innovation_projects.frontend', '''
+        SELECT * FROM innovation_projects
+        WHERE status = 'active'
+        ORDER BY COALESCE(sort_order, 0) ASC, created_at DESC
+    ''', ()),
+    ('innovation_projects.admin', '''
+        SELECT * FROM innovation_projects
+        ORDER BY COALESCE(sort_order, 0) ASC, created_at DESC
+    ''', ()),
+    ('innovation_projects.page', "SELECT * FROM innovation_projects WHERE status = 'active' ORDER BY COALESCE(sort_order, 0) ASC, created_at DESC", ()),
+    ('advisors.list', '''
+        SELECT * FROM advisors
+        WHERE status = 'active'
+        ORDER BY COALESCE(sort_order, 0) ASC, created_at DESC
+    ''', ()),
+    ('advisors.frontend', "SELECT * FROM advisors WHERE status = 'active' ORDER BY COALESCE(sort_order, 0) ASC, created_at DESC", ()),
+    ('advisors.admin', '''
+        SELECT * FROM advisors
+        ORDER BY COALESCE(sort_order, 0) ASC, created_at DESC
+    ''', ()),
+    ('innovation_stats.admin', 'SELECT * FROM innovation_stats ORDER BY sort_order ASC', ()),
+    ('innovation_stats.frontend', "SELECT * FROM innovation_stats WHERE status = 'active' ORDER BY sort_order ASC", ()),
+    ('achievements.frontend', "SELECT * FROM achievements WHERE status = 'active' ORDER BY sort_order ASC", ()),
+    ('achievements.admin', 'SELECT * FROM achievements ORDER BY sort_order ASC', ()),
+    ('innovation_carousel.frontend', "SELECT * FROM innovation_carousel WHERE status = 'active' ORDER BY sort_order ASC", ()),
+    ('innovation_carousel.admin', 'SELECT * FROM innovation_carousel ORDER BY sort_order ASC', ()),
+    ('training_projects.frontend', "SELECT * FROM innovation_training_projects WHERE status = 'active' ORDER BY sort_order ASC", ()),
+    ('training_projects.admin', 'SELECT * FROM innovation_training_projects ORDER BY sort_order ASC', ()),
+    ('intellectual_properties.frontend', "SELECT * FROM intellectual_properties WHERE status = 'active' ORDER BY sort_order ASC", ()),
+    ('intellectual_properties.admin', 'SELECT * FROM intellectual_properties ORDER BY sort_order ASC', ()),
+    ('enterprise_cooperations.frontend', "SELECT * FROM enterprise_cooperations WHERE status = 'active' ORDER BY sort_order ASC", ()),
+    ('enterprise_cooperations.admin', 'SELECT * FROM enterprise_cooperations ORDER BY sort_order ASC', ()),
+    ('notifications.list', '''
+        SELECT * FROM notifications
+        ORDER BY order_index ASC, publish_date DESC
+    ''', ()),
+    ('notifications.activities', '''
+        SELECT id, title, excerpt, category, author, publish_date, reading_time, tags
+        FROM notifications
+        WHERE status = 'published'
+        ORDER BY order_index ASC, publish_date DESC
+        LIMIT 3
+    ''', ()),
+    ('notifications.prev', '''
+        SELECT id, title, excerpt FROM notifications
+        WHERE status = 'published' AND (
+            (COALESCE(order_index, 0) < ? OR (COALESCE(order_index, 0) = ? AND publish_date > ?))
+        )
+        ORDER BY COALESCE(order_index, 0) DESC, publish_date ASC
+        LIMIT 1
+    ''', (1, 1, '2024-01-01')),
+    ('notifications.next', '''
+        SELECT id, title, excerpt FROM notifications
+        WHERE status = 'published' AND (
+            (COALESCE(order_index, 0) > ? OR (COALESCE(order_index, 0) = ? AND publish_date < ?))
+        )
+        ORDER BY COALESCE(order_index, 0) ASC, publish_date DESC
+        LIMIT 1
+    ''', (1, 1, '2024-01-01')),
+    ('uploaded_files.by_notification', 'DELETE FROM uploaded_files WHERE notification_id = ?', (1,)),
+    ('users.by_username', 'SELECT * FROM users WHERE username = ?', ('admin',)),
+    # 后台任务：工作线程空闲时定期轮询
+    ('jobs.claim', '''
+        SELECT id FROM jobs
+        WHERE status = 'queued' AND run_after <= ?
+        ORDER BY run_after LIMIT 1
+    ''', (0,)),
+    ('jobs.expired_lease', "SELECT id FROM jobs WHERE status = 'running' AND locked_at < ? LIMIT 1", (0,)),
+    # 访问统计：批量写入时合并草图、管理端按时间范围读取汇总
+    ('visit_daily.merge', 'SELECT path, visitors FROM visit_daily WHERE day = ? AND path IN (?, ?)',
+     ('2024-01-01', '/', '/dynamic')),
+    ('visit_daily.range', 'SELECT day, path, views, visitors FROM visit_daily WHERE day >= ?', ('2024-01-01',)),
+    ('visit_hourly.range', 'SELECT hour, path, views, visitors FROM visit_hourly WHERE hour >= ?',
+     ('2024-01-01 00:00',)),
+    ('visits.expired', 'DELETE FROM visits WHERE visited_at < ?', (0,)),
+    # 浏览器性能指标：写入时按主键合并草图、报表按天读取
+    ('rum_digests.merge', 'SELECT samples, digest FROM rum_digests WHERE day = ? AND page = ? AND metric = ?',
+     ('2024-01-01', '/', 'ttfb')),
+    ('rum_digests.range', 'SELECT page, metric, samples, digest FROM rum_digests WHERE day >= ?', ('2024-01-01',)),
+    # 游标分页：从上一页最后一行的排序键之后继续（pagination_utils 生成的条件形式）
+    ('notifications.page_after', '''
+        SELECT * FROM notifications
+        WHERE (order_index >= ? AND ((order_index > ?) OR (order_index IS ? AND (publish_date < ? OR publish_date IS NULL))
+               OR (order_index IS ? AND publish_date IS ? AND id > ?)))
+        ORDER BY order_index ASC, publish_date DESC, id ASC LIMIT ?
+    ''', (0, 0, 0, '2024-01-01', 0, '2024-01-01', 5, 21)),
+    ('research_areas.category_page_after', '''
+        SELECT * FROM research_areas
+        WHERE (category = ?) AND (order_index >= ? AND ((order_index > ?) OR (order_index IS ? AND (created_at < ? OR created_at IS NULL))
+               OR (order_index IS ? AND created_at IS ? AND id > ?)))
+        ORDER BY order_index ASC, created_at DESC, id ASC LIMIT ?
+    ''', ('算法', 1, 1, 1, '2024-01-01', 1, '2024-01-01', 3, 7)),
+    # 站内搜索：按相关度取一页结果、增量同步时按 rowid 删除旧索引行
+    ('search_index.match', '''
+        SELECT rowid, kind, rank FROM search_index WHERE search_index MATCH ? AND kind IN (?)
+        ORDER BY rank LIMIT ? OFFSET ?
+    ''', ('"动态 态规 规划"', 'notification', 10, 0)),
+    ('search_index.count', 'SELECT COUNT(*) FROM search_index WHERE search_index MATCH ?', ('"graph"*',)),
+    ('search_index.by_rowid', 'DELETE FROM search_index WHERE rowid = ?', (9,)),
+    ('search_pending.delete', 'DELETE FROM search_pending WHERE kind = ? AND ref_id = ?', ('notification', 1)),
+]
+
+
+def find_problems(plan_rows):
+    """从执行计划中找出全表扫描和临时B树排序"""
+    problems = []
+    for row in plan_rows:
+        detail = row[-1]
+        # 虚拟表（FTS5）按 MATCH/rowid 约束查找时为 "VIRTUAL TABLE INDEX n:约束"，约束为空才是全表扫描
+        if detail.startswith('SCAN ') and ' USING ' not in detail \
+                and not re.search(r'VIRTUAL TABLE INDEX \d+:\S', detail):
+            problems.append(f'全表扫描: {detail}')
+        elif 'USE TEMP B-TREE' in detail:
+            problems.append(f'临时B树排序: {detail}')
+    return problems
+
+
+def check(conn, verbose=False):
+    """检查注册表中的全部查询，返回失败数量"""
+    failures = 0
+    for name, sql, params in HOT_QUERIES:
+        try:
+            plan = conn.execute(f'EXPLAIN QUERY PLAN {sql}', params).fetchall()
+        except sqlite3.Error as e:
+            print(f"❌ {name}: 无法生成执行计划 ({e})")
+            failures += 1
+            continue
+
+        problems = find_problems(plan)
+        if problems:
+            failures += 1
+            print(f"❌ {name}")
+            for problem in problems:
+                print(f"   {problem}")
+        else:
+            print(f"✅ {name}")
+        if verbose:
+            for row in plan:
+                print(f"      {row[-1]}")
+    return failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description='热点查询执行计划检查')
+    parser.add_argument('--db', help='检查已有数据库文件（默认在临时数据库上按 init_db 建库）')
+    parser.add_argument('-v', '--verbose', action='store_true', help='输出完整执行计划')
+    args = parser.parse_args()
+
+    if args.db:
+        conn = sqlite3.connect(args.db)
+    else:
+        tmpdir = tempfile.mkdtemp(prefix='query_plans_')
+        os.environ['DB_PATH'] = os.path.join(tmpdir, 'check.db')
+        from db_utils import init_db
+        init_db()
+        conn = sqlite3.connect(os.environ['DB_PATH'])
+
+    print(f"🔍 检查 {len(HOT_QUERIES)} 条热点查询的执行计划")
+    failures = check(conn, verbose=args.verbose)
+    conn.close()
+
+    if failures:
+        print(f"❌ {failures} 条查询存在全表扫描或临时排序")
+        sys.exit(1)
+    print("📊 所有热点查询均命中索引")
+
+
+if __name__ == '__main__':
+    main()
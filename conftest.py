@@ -0,0 +1,61 @@
+"""
+pytest 公共夹具
+在导入 app 之前把数据库、指标库和共享缓存指向临时目录，测试从空库开始（由迁移建表），
+关闭异步日志和后台工作线程，使测试结果不依赖执行顺序之外的后台活动。
+
+用法: python -m pytest -q
+"""
+
+import os
+import sys
+import shutil
+import tempfile
+
+import pytest
+
+# 添加当前目录到Python路径
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+_TEST_DIR = tempfile.mkdtemp(prefix='acm_lab_test_')
+os.environ['DB_PATH'] = os.path.join(_TEST_DIR, 'acm_lab.db')
+os.environ['METRICS_DB_PATH'] = os.path.join(_TEST_DIR, 'metrics.db')
+os.environ['SHARED_CACHE_PATH'] = os.path.join(_TEST_DIR, 'shared_cache.db')
+os.environ['LOG_ASYNC'] = '0'
+os.environ['LOG_LEVEL'] = 'ERROR'
+os.environ['JOB_WORKERS'] = '0'
+os.environ.pop('DB_PROFILE', None)
+os.environ.pop('VERCEL', None)
+
+# 需要运行中服务器的接口脚本，不作为 pytest 用例收集
+collect_ignore = ['test_api_endpoints.py']
+
+
+def pytest_unconfigure(config):
+    shutil.rmtree(_TEST_DIR, ignore_errors=True)
+
+
+@pytest.fixture(scope='session')
+def app():
+    from app import app as flask_app
+    flask_app.config['TESTING'] = True
+    return flask_app
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+@pytest.fixture
+def admin_client(app):
+    test_client = app.test_client()
+    with test_client.session_transaction() as session:
+        session['username'] = 'admin'
+        session['role'] = 'admin'
+    return test_client
+
+
+@pytest.fixture
+def tmp_db(tmp_path):
+    """独立于应用数据库的临时数据库路径"""
+    return str(tmp_path / 'test.db')
@@ -0,0 +1,240 @@
+"""
+计数器缓冲工具模块
+浏览量等只增计数先在内存中按ID累加，由后台线程按时间间隔或累计数量合并成一个事务写入数据库，
+读请求不再逐次执行 UPDATE + COMMIT
+
+可选的追加日志（VIEW_COUNT_LOG）：每次计数先追加一行（ID 和增量）到本进程的日志文件，
+写入数据库后删除对应日志段；进程崩溃时未写入的计数在下次启动时从日志补写（至少一次，
+崩溃恰好发生在提交与删除日志之间时会重复计入该段）。
+
+环境变量:
+    VIEW_COUNT_FLUSH_INTERVAL   写入间隔（秒），默认 5；设为 0 时每次计数立即写入
+    VIEW_COUNT_FLUSH_THRESHOLD  未写入的计数达到该数量时提前写入，默认 200
+    VIEW_COUNT_LOG              追加日志路径前缀，未设置时不记录日志
+"""
+
+import os
+import glob
+import time
+import atexit
+import logging
+import threading
+
+import db_utils
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_FLUSH_INTERVAL = 5.0
+DEFAULT_FLUSH_THRESHOLD = 200
+
+
+def _pid_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+class CounterBuffer:
+    """某个表的只增计数列的写入缓冲（线程安全）"""
+
+    def __init__(self, table, column, flush_interval=DEFAULT_FLUSH_INTERVAL,
+                 flush_threshold=DEFAULT_FLUSH_THRESHOLD):
+        self.table = table
+        self.column = column
+        self.flush_interval = flush_interval
+        self.flush_threshold = flush_threshold
+        self.log_path = None
+        self._sql = f'UPDATE {table} SET {column} = {column} + ? WHERE id = ?'
+        self._lock = threading.Lock()
+        # 同一时刻只有一个线程写数据库，保证日志段按顺序删除
+        self._flush_lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._flusher_pid = None
+        self._reset_local()
+        self.flushes = 0
+        self.flushed = 0
+        self.recovered = 0
+        if hasattr(os, 'register_at_fork'):
+            # 子进程不继承父进程未写入的计数和日志文件
+            os.register_at_fork(after_in_child=self._after_fork)
+
+    def _reset_local(self):
+        self._pending = {}
+        self._pending_total = 0
+        self._log_file = None
+        # 已改名、计数尚未写入数据库的日志段
+        self._segments = []
+
+    def _after_fork(self):
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._reset_local()
+
+    def init_app(self, app):
+        self.flush_interval = float(app.config.get(
+            'VIEW_COUNT_FLUSH_INTERVAL', os.environ.get('VIEW_COUNT_FLUSH_INTERVAL', self.flush_interval)
+        ))
+        self.flush_threshold = int(app.config.get(
+            'VIEW_COUNT_FLUSH_THRESHOLD', os.environ.get('VIEW_COUNT_FLUSH_THRESHOLD', self.flush_threshold)
+        ))
+        self.log_path = app.config.get('VIEW_COUNT_LOG') or os.environ.get('VIEW_COUNT_LOG') or None
+        app.extensions[f'counter_buffer.{self.table}.{self.column}'] = self
+        if self.log_path:
+            self.recover()
+        atexit.register(self.flush)
+
+    # ============ 计数 ============
+
+    def increment(self, row_id, amount=1):
+        """累加计数，由后台线程写入数据库"""
+        if self.flush_interval <= 0:
+            self._apply({row_id: amount})
+            return
+        self._ensure_flusher()
+        with self._lock:
+            if self.log_path:
+                self._append_log(row_id, amount)
+            self._pending[row_id] = self._pending.get(row_id, 0) + amount
+            self._pending_total += amount
+            full = self._pending_total >= self.flush_threshold
+        if full:
+            self._wakeup.set()
+
+    def pending(self, row_id):
+        """本进程中尚未写入数据库的计数"""
+        return self._pending.get(row_id, 0)
+
+    # ============ 追加日志 ============
+
+    def _segment_path(self, suffix):
+        return f'{self.log_path}.{os.getpid()}.{suffix}'
+
+    def _append_log(self, row_id, amount):
+        # 调用方持有 self._lock；行缓冲，每行立即写入操作系统，进程崩溃时不会丢失
+        if self._log_file is None:
+            self._log_file = open(self._segment_path('active'), 'a', buffering=1, encoding='ascii')
+        self._log_file.write(f'{row_id} {amount}\n')
+
+    def _rotate_log(self):
+        """把当前日志改名为待写入段（调用方持有 self._lock）"""
+        if self._log_file is None:
+            return
+        self._log_file.close()
+        self._log_file = None
+        segment = self._segment_path(f'{time.time_ns()}.flushing')
+        os.replace(self._segment_path('active'), segment)
+        self._segments.append(segment)
+
+    @staticmethod
+    def _read_log(path):
+        counts = {}
+        with open(path, encoding='ascii') as log_file:
+            for line in log_file:
+                parts = line.split()
+                # 崩溃时最后一行可能不完整
+                if len(parts) != 2 or not line.endswith('\n'):
+                    continue
+                row_id, amount = int(parts[0]), int(parts[1])
+                counts[row_id] = counts.get(row_id, 0) + amount
+        return counts
+
+    def recover(self):
+        """补写已退出进程遗留的日志，返回补写的计数总数"""
+        recovered = 0
+        for path in sorted(glob.glob(f'{glob.escape(self.log_path)}.*')):
+            try:
+                pid = int(path[len(self.log_path) + 1:].split('.', 1)[0])
+            except ValueError:
+                continue
+            recovering = path.endswith('.recovering')
+            if (pid != os.getpid() or recovering) and _pid_alive(pid):
+                # 运行中的进程的日志，或其他线程正在补写的段
+                continue
+            # 先改名为本进程的段再补写：同时启动的多个进程只有一个能改名成功，避免重复计入；
+            # 补写途中崩溃时该段属于已退出的进程，下次启动时再补写
+            claimed = self._segment_path(f'{time.time_ns()}.recovering')
+            try:
+                os.rename(path, claimed)
+            except FileNotFoundError:
+                continue
+            counts = self._read_log(claimed)
+            if counts:
+                self._apply(counts)
+                recovered += sum(counts.values())
+            os.remove(claimed)
+        if recovered:
+            self.recovered += recovered
+            logger.info(f"已从追加日志补写 {recovered} 次 {self.table}.{self.column} 计数")
+        return recovered
+
+    # ============ 写入 ============
+
+    def _apply(self, counts):
+        with db_utils.get_db() as conn:
+            conn.executemany(self._sql, [(amount, row_id) for row_id, amount in counts.items()])
+            conn.commit()
+
+    def flush(self):
+        """把未写入的计数合并成一个事务写入数据库"""
+        with self._flush_lock:
+            with self._lock:
+                counts, self._pending = self._pending, {}
+                self._pending_total = 0
+                if self.log_path:
+                    self._rotate_log()
+                segments = list(self._segments)
+            if not counts:
+                return
+            try:
+                self._apply(counts)
+            except Exception as e:
+                # 写入失败的计数放回缓冲，下次再写（日志段保留到写入成功，崩溃时由 recover 补写）
+                logger.warning(f"写入 {self.table}.{self.column} 计数失败: {e}")
+                with self._lock:
+                    for row_id, amount in counts.items():
+                        self._pending[row_id] = self._pending.get(row_id, 0) + amount
+                        self._pending_total += amount
+                return
+            with self._lock:
+                del self._segments[:len(segments)]
+            for segment in segments:
+                os.remove(segment)
+            self.flushes += 1
+            self.flushed += sum(counts.values())
+
+    def _ensure_flusher(self):
+        if self._flusher_pid == os.getpid():
+            return
+        with self._lock:
+            if self._flusher_pid == os.getpid():
+                return
+            self._flusher_pid = os.getpid()
+        thread = threading.Thread(target=self._flush_loop, name=f'{self.table}-{self.column}-flusher', daemon=True)
+        thread.start()
+
+    def _flush_loop(self):
+        pid = os.getpid()
+        while self._flusher_pid == pid:
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            self.flush()
+
+    def stats(self):
+        with self._lock:
+            return {
+                'pending': self._pending_total,
+                'pending_rows': len(self._pending),
+                'flushes': self.flushes,
+                'flushed': self.flushed,
+                'recovered': self.recovered,
+                'log': bool(self.log_path),
+            }
+
+
+# 通知浏览量
+view_counter = CounterBuffer('notifications', 'view_count')
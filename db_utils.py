@@ -5,691 +5,1579 @@
 
 import sqlite3
 import os
+import atexit
+import re
+import sys
+import threading
+import logging
+import random
+import time
 from contextlib import contextmanager
+from functools import lru_cache
+
+logger = logging.getLogger(__name__)
+
+# 连接池默认大小，可通过环境变量 DB_POOL_SIZE 或 app.config['DB_POOL_SIZE'] 覆盖
+DEFAULT_POOL_SIZE = 5
+# 连接池耗尽时的最长等待时间（秒），超时后创建临时溢出连接
+DEFAULT_POOL_TIMEOUT = 2.0
 
 def get_db_path():
-    """获取数据库文件路径"""
+    """获取数据库文件路径（可通过环境变量 DB_PATH 指定，便于脚本使用临时库）"""
+    if os.environ.get('DB_PATH'):
+        return os.environ['DB_PATH']
     # Vercel部署时使用只读数据库
     if os.environ.get('VERCEL'):
         # 在Vercel环境中，数据库文件位于项目根目录
         db_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'acm_lab.db')
-        print(f"🔍 Vercel环境数据库路径: {db_path}")
-        print(f"🔍 数据库文件存在: {os.path.exists(db_path)}")
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("🔍 Vercel环境数据库路径: %s", db_path)
+            logger.debug("🔍 数据库文件存在: %s", os.path.exists(db_path))
     else:
         # 本地开发环境
         db_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'acm_lab.db')
     return db_path
 
-@contextmanager
-def get_db():
+# 连接配置档案（连接建立时执行的PRAGMA）
+# - performance: 本地/服务器读写场景，WAL + 较大页缓存 + mmap，读写互不阻塞
+# - readonly: Vercel 只读文件系统，以 immutable 方式打开，免去所有文件锁
+# - default: 保持SQLite默认行为（仅用于对比测试）
+DB_PROFILES = {
+    'performance': {
+        'uri_params': None,
+        'pragmas': [
+            ('journal_mode', 'WAL'),
+            ('synchronous', 'NORMAL'),
+            ('mmap_size', 64 * 1024 * 1024),
+            ('cache_size', -16000),  # 负数表示KB，约16MB
+            ('temp_store', 'MEMORY'),
+            ('busy_timeout', 5000),
+        ],
+    },
+    'readonly': {
+        'uri_params': 'mode=ro&immutable=1',
+        'pragmas': [
+            ('mmap_size', 64 * 1024 * 1024),
+            ('cache_size', -16000),
+            ('temp_store', 'MEMORY'),
+        ],
+    },
+    'default': {
+        'uri_params': None,
+        'pragmas': [],
+    },
+}
+
+# 遇到 database is locked / busy 时的重试参数
+LOCK_RETRY_ATTEMPTS = 5
+LOCK_RETRY_BASE_DELAY = 0.02
+
+def get_db_profile(db_path=None):
     """
-    获取数据库连接的上下文管理器
+    选择连接配置档案
     
-    Yields:
-        sqlite3.Connection: 数据库连接对象
+    优先使用环境变量 DB_PROFILE；Vercel 环境且数据库文件存在时使用只读档案，
+    其余情况使用 performance 档案。
     """
-    db_path = get_db_path()
+    profile = os.environ.get('DB_PROFILE')
+    if profile:
+        if profile not in DB_PROFILES:
+            raise ValueError(f"未知的数据库配置档案: {profile}")
+        return profile
+    if os.environ.get('VERCEL') and os.path.exists(db_path or get_db_path()):
+        return 'readonly'
+    return 'performance'
+
+def _is_lock_error(error):
+    """判断是否为可重试的锁冲突错误"""
+    message = str(error).lower()
+    return 'locked' in message or 'busy' in message
+
+# 语句观察者：每条 execute/executemany 执行后以 (连接, 语句记录) 调用
+# 语句记录为字典：sql、params、duration（秒）、rows（SELECT 的行数随读取累加）
+_statement_observers = []
+
+def add_statement_observer(observer):
+    """注册语句观察者（用于SQL分析、缓存失效等），重复注册会被忽略"""
+    if observer not in _statement_observers:
+        _statement_observers.append(observer)
+
+def remove_statement_observer(observer):
+    """移除语句观察者"""
+    if observer in _statement_observers:
+        _statement_observers.remove(observer)
+
+# 写入监听者：写操作提交后以被修改的表名集合调用，所有蓝图的写路径都会经过这里
+_write_listeners = []
+
+def add_write_listener(listener):
+    """注册写入监听者（如缓存失效总线），重复注册会被忽略"""
+    if listener not in _write_listeners:
+        _write_listeners.append(listener)
+
+def remove_write_listener(listener):
+    """移除写入监听者"""
+    if listener in _write_listeners:
+        _write_listeners.remove(listener)
+
+_WRITE_TARGET = re.compile(
+    r'^\s*(?:INSERT(?:\s+OR\s+\w+)?\s+INTO|REPLACE\s+INTO|UPDATE(?:\s+OR\s+\w+)?|DELETE\s+FROM)\s+["`\[]?(\w+)',
+    re.IGNORECASE
+)
+_FULL_ROLLBACK = re.compile(r'^\s*ROLLBACK(?:\s+TRANSACTION)?\s*;?\s*$', re.IGNORECASE)
+
+_UPDATE_SET = re.compile(r'\bSET\b(.*?)(?:\bWHERE\b|$)', re.IGNORECASE | re.DOTALL)
+_ASSIGNED_COLUMN = re.compile(r'(?:^|,)\s*["`\[]?(\w+)["`\]]?\s*=')
+
+@lru_cache(maxsize=1024)
+def _statement_write_target(sql):
+    """
+    返回 (语句写入的表名或None, 是否回滚整个事务)
+
+    只修改不计入代数的列（GENERATION_IGNORED_COLUMNS，如浏览量）的UPDATE不算写入。
+    """
+    match = _WRITE_TARGET.match(sql)
+    if match:
+        table = match.group(1).lower()
+        ignored = GENERATION_IGNORED_COLUMNS.get(table)
+        if ignored and match.group(0).lstrip()[:6].upper() == 'UPDATE':
+            assignments = _UPDATE_SET.search(sql, match.end())
+            columns = set(_ASSIGNED_COLUMN.findall(assignments.group(1))) if assignments else set()
+            if columns and columns <= set(ignored):
+                return None, False
+        return table, False
+    return None, bool(_FULL_ROLLBACK.match(sql))
+
+class TracingCursor(sqlite3.Cursor):
+    """在读取结果时把行数累加到语句记录中的游标"""
+    trace = None
     
-    # 在Vercel环境中，如果数据库文件不存在，创建一个可写的临时数据库
-    if os.environ.get('VERCEL'):
-        if not os.path.exists(db_path):
-            # 创建可写的临时数据库
-            conn = sqlite3.connect(db_path)
+    def fetchone(self):
+        row = super().fetchone()
+        if row is not None and self.trace is not None:
+            self.trace['rows'] += 1
+        return row
+    
+    def fetchmany(self, *args):
+        rows = super().fetchmany(*args)
+        if self.trace is not None:
+            self.trace['rows'] += len(rows)
+        return rows
+    
+    def fetchall(self):
+        rows = super().fetchall()
+        if self.trace is not None:
+            self.trace['rows'] += len(rows)
+        return rows
+    
+    def __next__(self):
+        row = super().__next__()
+        if self.trace is not None:
+            self.trace['rows'] += 1
+        return row
+
+class PooledConnection(sqlite3.Connection):
+    """
+    连接池使用的连接类型
+    
+    在事务之外遇到锁冲突时按指数退避+随机抖动重试；
+    事务内的语句不重试，由调用方决定回滚。
+    存在语句观察者时记录每条语句的耗时和行数；
+    写操作提交后把涉及的表通知给写入监听者（回滚的写入不通知）。
+    """
+    pool_overflow = False
+    # 由 open_connection 登记的请求级统计，关闭时据此记账
+    accounting = None
+    # 当前事务中已写入、尚未通知写入监听者的表
+    pending_writes = None
+    
+    def close(self):
+        accounting = self.accounting
+        if accounting is not None:
+            self.accounting = None
+            accounting['closed'] += 1
+            accounting['live'].pop(id(self), None)
+        super().close()
+    
+    def _retry(self, func, *args):
+        attempt = 0
+        while True:
+            try:
+                return func(*args)
+            except sqlite3.OperationalError as e:
+                attempt += 1
+                if (attempt >= LOCK_RETRY_ATTEMPTS or self.in_transaction
+                        or not _is_lock_error(e)):
+                    raise
+                delay = LOCK_RETRY_BASE_DELAY * (2 ** (attempt - 1))
+                time.sleep(delay + random.uniform(0, delay))
+    
+    def _traced(self, method, sql, params):
+        cursor = self.cursor(TracingCursor)
+        start = time.perf_counter()
+        self._retry(getattr(cursor, method), sql, params)
+        record = {
+            'sql': sql,
+            'params': params,
+            'duration': time.perf_counter() - start,
+            'rows': max(cursor.rowcount, 0),
+        }
+        cursor.trace = record
+        for observer in list(_statement_observers):
+            observer(self, record)
+        return cursor
+    
+    def _track_write(self, sql):
+        """记录写入的表；不在事务中（自动提交或已执行COMMIT）时立即通知"""
+        table, rolled_back = _statement_write_target(sql)
+        if rolled_back:
+            self.pending_writes = None
+            return
+        if table is not None:
+            if self.pending_writes is None:
+                self.pending_writes = set()
+            self.pending_writes.add(table)
+        if self.pending_writes and not self.in_transaction:
+            self._publish_writes()
+    
+    def _publish_writes(self):
+        tables = self.pending_writes
+        if not tables:
+            return
+        self.pending_writes = None
+        tables = frozenset(tables)
+        for listener in list(_write_listeners):
+            try:
+                listener(tables)
+            except Exception:
+                logger.exception("写入监听者执行失败")
+    
+    def execute(self, sql, parameters=()):
+        if _statement_observers:
+            cursor = self._traced('execute', sql, parameters)
         else:
-            # 使用可写模式连接现有数据库
-            conn = sqlite3.connect(db_path)
-    else:
-        conn = sqlite3.connect(db_path)
+            cursor = self._retry(super().execute, sql, parameters)
+        if _write_listeners:
+            self._track_write(sql)
+        return cursor
+    
+    def executemany(self, sql, seq_of_parameters):
+        if _statement_observers:
+            cursor = self._traced('executemany', sql, seq_of_parameters)
+        else:
+            cursor = self._retry(super().executemany, sql, seq_of_parameters)
+        if _write_listeners:
+            self._track_write(sql)
+        return cursor
+    
+    def commit(self):
+        result = self._retry(super().commit)
+        self._publish_writes()
+        return result
     
+    def rollback(self):
+        self.pending_writes = None
+        return super().rollback()
+
+def _apply_profile(conn, profile):
+    """在新连接上执行配置档案中的PRAGMA"""
+    for name, value in DB_PROFILES[profile]['pragmas']:
+        try:
+            conn.execute(f"PRAGMA {name}={value}")
+        except sqlite3.DatabaseError as e:
+            logger.warning(f"设置 PRAGMA {name}={value} 失败: {e}")
+
+def _connect(db_path, profile=None):
+    """创建一个新的数据库连接并完成统一配置"""
+    profile = profile or get_db_profile(db_path)
+    uri_params = DB_PROFILES[profile]['uri_params']
+    
+    # 连接会在线程之间复用（同一时刻只被一个线程持有），因此关闭同线程检查
+    if uri_params:
+        conn = sqlite3.connect(f'file:{db_path}?{uri_params}', uri=True,
+                               check_same_thread=False, factory=PooledConnection)
+    else:
+        conn = sqlite3.connect(db_path, check_same_thread=False, factory=PooledConnection)
     conn.row_factory = sqlite3.Row  # 使结果可以通过列名访问
     
     # 只在非Vercel环境下启用自动提交模式
     if not os.environ.get('VERCEL'):
         conn.isolation_level = None  # 启用自动提交模式
     
-    try:
-        yield conn
-    finally:
-        conn.close()
+    _apply_profile(conn, profile)
+    return conn
 
-def init_db():
-    """初始化数据库表结构"""
-    print("🔄 开始初始化数据库...")
-    db_path = get_db_path()
-    print(f"📁 数据库路径: {db_path}")
+class ConnectionPool:
+    """
+    SQLite连接池
     
-    with get_db() as conn:
-        print("✅ 数据库连接成功")
-        # 创建用户表
-        conn.execute('''
-            CREATE TABLE IF NOT EXISTS users (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                username TEXT UNIQUE NOT NULL,
-                password TEXT NOT NULL,
-                role TEXT DEFAULT 'admin',
-                display_name TEXT,
-                avatar TEXT,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            )
-        ''')
-        
-        # 创建团队成员表
-        conn.execute('''
-            CREATE TABLE IF NOT EXISTS team_members (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                name TEXT NOT NULL,
-                position TEXT,
-                description TEXT,
-                image_url TEXT,
-                qq TEXT,
-                wechat TEXT,
-                email TEXT,
-                group_name TEXT DEFAULT '算法组',
-                status TEXT DEFAULT '在职',
-                grade TEXT DEFAULT '2024级',
-                order_index INTEGER DEFAULT 0,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            )
-        ''')
+    - 线程亲和：优先把线程上次归还的连接交还给同一线程（缓存更热）
+    - 共享空闲列表：没有亲和连接时取任意空闲连接
+    - 池满时等待，超时后创建溢出连接（用完即关闭），避免嵌套调用死锁
+    - 记录创建时的进程ID，gunicorn fork 出的子进程会丢弃继承的连接重新建池
+    """
+    
+    def __init__(self, db_path, size=DEFAULT_POOL_SIZE, timeout=DEFAULT_POOL_TIMEOUT, profile=None):
+        self.db_path = db_path
+        self.profile = profile or get_db_profile(db_path)
+        self.size = max(1, int(size))
+        self.timeout = timeout
+        self._reset_state()
+    
+    def _reset_state(self):
+        """重置池状态（新建或fork后调用）"""
+        self._pid = os.getpid()
+        self._cond = threading.Condition(threading.Lock())
+        self._idle = []
+        self._local = threading.local()
+        self._open = 0
+        self._stats = {
+            'checkouts': 0,
+            'thread_local_hits': 0,
+            'waits': 0,
+            'overflow': 0,
+            'created': 0,
+            'closed': 0,
+            # 同一请求内复用已借出连接的次数（不经过池）
+            'request_reuses': 0,
+        }
+    
+    def _check_fork(self):
+        """检测进程fork：子进程不能复用父进程的SQLite连接"""
+        if self._pid != os.getpid():
+            # 父进程的连接不在子进程中关闭，直接丢弃引用
+            self._reset_state()
+    
+    def _take_idle(self):
+        """取出一个空闲连接（调用方需持有锁），优先当前线程上次使用的连接"""
+        preferred = getattr(self._local, 'conn', None)
+        if preferred is not None:
+            for i in range(len(self._idle) - 1, -1, -1):
+                if self._idle[i] is preferred:
+                    self._stats['thread_local_hits'] += 1
+                    return self._idle.pop(i)
+        return self._idle.pop()
+    
+    def acquire(self):
+        """从池中取出一个连接"""
+        self._check_fork()
         
-        # 修复现有团队成员的order_index
-        try:
-            # 检查是否有order_index为NULL或0的成员
-            cursor = conn.execute('''
-                SELECT id FROM team_members 
-                WHERE order_index IS NULL OR order_index = 0 
-                ORDER BY created_at ASC
-            ''')
-            members_to_fix = cursor.fetchall()
+        with self._cond:
+            if self._idle:
+                conn = self._take_idle()
+                self._stats['checkouts'] += 1
+                self._local.conn = conn
+                return conn
             
-            if members_to_fix:
-                print(f"🔧 发现 {len(members_to_fix)} 个需要修复order_index的团队成员")
-                
-                # 获取当前最大order_index
-                cursor = conn.execute('SELECT COALESCE(MAX(order_index), 0) FROM team_members')
-                max_order = cursor.fetchone()[0]
-                
-                # 为每个成员设置正确的order_index
-                for index, member in enumerate(members_to_fix):
-                    new_order = max_order + index + 1
-                    conn.execute('''
-                        UPDATE team_members 
-                        SET order_index = ?, updated_at = CURRENT_TIMESTAMP 
-                        WHERE id = ?
-                    ''', (new_order, member[0]))
-                    print(f"  - 成员ID {member[0]} 设置order_index为 {new_order}")
-                
-                conn.commit()
-                print("✅ 团队成员order_index修复完成")
+            if self._open < self.size:
+                # 池未满时新建连接（在锁外完成连接）
+                self._open += 1
+                self._stats['created'] += 1
+                self._stats['checkouts'] += 1
+                create = True
             else:
-                print("✅ 团队成员order_index已正确设置")
-        except Exception as e:
-            print(f"⚠️ 修复团队成员order_index时出错: {e}")
-        
-        # 创建年级表
-        conn.execute('''
-            CREATE TABLE IF NOT EXISTS grades (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                name TEXT NOT NULL UNIQUE,
-                description TEXT,
-                order_index INTEGER DEFAULT 0,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            )
-        ''')
-        
-        # 插入默认年级数据
-        default_grades = [
-            ('2024级', '2024级年级组', 1),
-            ('2023级', '2023级年级组', 2),
-            ('2022级', '2022级年级组', 3),
-            ('2021级', '2021级年级组', 4),
-            ('2020级', '2020级年级组', 5),
-            ('2019级', '2019级年级组', 6),
-            ('2018级', '2018级年级组', 7),
-            ('2017级', '2017级年级组', 8),
-            ('2016级', '2016级年级组', 9)
-        ]
-        
-        # 检查是否已经插入过默认数据
-        existing_grades = conn.execute('SELECT COUNT(*) FROM grades').fetchone()[0]
-        if existing_grades == 0:
-            for grade in default_grades:
-                conn.execute('''
-                    INSERT INTO grades (name, description, order_index)
-                    VALUES (?, ?, ?)
-                ''', grade)
-        
-        # 创建研究项目表
-        conn.execute('''
-            CREATE TABLE IF NOT EXISTS research_projects (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                title TEXT NOT NULL,
-                category TEXT DEFAULT '深度学习',
-                description TEXT,
-                members TEXT,
-                order_index INTEGER DEFAULT 0,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            )
-        ''')
+                # 池已满，等待其他线程归还
+                self._stats['waits'] += 1
+                create = False
+                conn = None
+                if self._cond.wait_for(lambda: self._idle, timeout=self.timeout):
+                    conn = self._take_idle()
+                    self._stats['checkouts'] += 1
+                    self._local.conn = conn
+                    return conn
+                self._stats['overflow'] += 1
+                self._stats['checkouts'] += 1
         
-        # 创建论文类别表
-        conn.execute('''
-            CREATE TABLE IF NOT EXISTS paper_categories (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                name TEXT NOT NULL,
-                level INTEGER NOT NULL,
-                description TEXT,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            )
-        ''')
-        
-        # 插入默认的论文类别数据
-        default_categories = [
-            ('CCF-A', 1, 'CCF推荐会议和期刊A类'),
-            ('CCF-B', 2, 'CCF推荐会议和期刊B类'),
-            ('CCF-C', 3, 'CCF推荐会议和期刊C类'),
-            ('中科院一区', 4, '中科院分区一区'),
-            ('中科院二区', 5, '中科院分区二区'),
-            ('中科院三区', 6, '中科院分区三区'),
-            ('中科院四区', 7, '中科院分区四区'),
-            ('JCR一区', 8, 'JCR分区一区'),
-            ('JCR二区', 9, 'JCR分区二区'),
-            ('JCR三区', 10, 'JCR分区三区'),
-            ('JCR四区', 11, 'JCR分区四区'),
-            ('EI源刊', 12, 'EI收录的期刊'),
-            ('EI会议', 13, 'EI收录的会议'),
-            ('南核', 14, '南大核心期刊'),
-            ('CSCD', 15, '中国科学引文数据库'),
-            ('北核', 16, '北大核心期刊'),
-            ('普刊', 17, '普通期刊')
-        ]
-        
-        # 检查是否已经插入过默认数据
-        existing_categories = conn.execute('SELECT COUNT(*) FROM paper_categories').fetchone()[0]
-        if existing_categories == 0:
-            for category in default_categories:
-                conn.execute('''
-                    INSERT INTO paper_categories (name, level, description)
-                    VALUES (?, ?, ?)
-                ''', category)
-        
-        # 创建论文表
-        conn.execute('''
-            CREATE TABLE IF NOT EXISTS papers (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                title TEXT NOT NULL,
-                authors TEXT,
-                journal TEXT,
-                year INTEGER,
-                abstract TEXT,
-                category_ids TEXT DEFAULT '[]',
-                status TEXT DEFAULT 'published',
-                order_index INTEGER DEFAULT 0,
-                citation_count INTEGER DEFAULT 0,
-                doi TEXT,
-                pdf_url TEXT,
-                code_url TEXT,
-                video_url TEXT,
-                demo_url TEXT,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            )
-        ''')
-        
-        # 创建论文类别关联表
-        conn.execute('''
-            CREATE TABLE IF NOT EXISTS paper_category_relations (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                paper_id INTEGER NOT NULL,
-                category_id INTEGER NOT NULL,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                FOREIGN KEY (paper_id) REFERENCES papers (id) ON DELETE CASCADE,
-                FOREIGN KEY (category_id) REFERENCES paper_categories (id) ON DELETE CASCADE,
-                UNIQUE(paper_id, category_id)
-            )
-        ''')
-        
-        # 创建算法表
-        conn.execute('''
-            CREATE TABLE IF NOT EXISTS algorithms (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                title TEXT NOT NULL,
-                category TEXT NOT NULL,
-                description TEXT,
-                time_complexity TEXT,
-                space_complexity TEXT,
-                code_preview TEXT,
-                pdf_url TEXT,
-                status TEXT DEFAULT 'active',
-                order_index INTEGER DEFAULT 0,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            )
-        ''')
-        
-        # 创建算法竞赛获奖表
-        conn.execute('''
-            CREATE TABLE IF NOT EXISTS algorithm_awards (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                title TEXT NOT NULL,
-                competition_name TEXT NOT NULL,
-                award_level TEXT NOT NULL,
-                winner_name TEXT,
-                competition_date DATE,
-                competition_location TEXT,
-                team_score TEXT,
-                image_url TEXT,
-                description TEXT,
-                status TEXT DEFAULT 'active',
-                order_index INTEGER DEFAULT 0,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            )
-        ''')
-        
-        # 创建项目概览统计表
-        conn.execute('''
-            CREATE TABLE IF NOT EXISTS project_overview (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                name TEXT NOT NULL,
-                value INTEGER DEFAULT 0,
-                icon TEXT,
-                description TEXT,
-                status TEXT DEFAULT 'active',
-                order_index INTEGER DEFAULT 0,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            )
-        ''')
-        
-        # 创建科创项目表
-        conn.execute('''
-            CREATE TABLE IF NOT EXISTS innovation_projects (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                title TEXT NOT NULL,
-                description TEXT,
-                image_url TEXT,
-                category TEXT DEFAULT '国家级创新创业项目',
-                tags TEXT,
-                detail_url TEXT,
-                status TEXT DEFAULT 'active',
-                sort_order INTEGER DEFAULT 0,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            )
-        ''')
-        
-        # 创建指导老师表
-        conn.execute('''
-            CREATE TABLE IF NOT EXISTS advisors (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                name TEXT NOT NULL,
-                position TEXT NOT NULL,
-                description TEXT,
-                image_url TEXT,
-                email TEXT,
-                google_scholar TEXT,
-                github TEXT,
-                border_color TEXT DEFAULT 'primary',
-                status TEXT DEFAULT 'active',
-                sort_order INTEGER DEFAULT 0,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            )
-        ''')
-        
-        # 创建研究领域表
-        conn.execute('''
-            CREATE TABLE IF NOT EXISTS research_areas (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                title TEXT NOT NULL,
-                category TEXT DEFAULT '深度学习',
-                description TEXT,
-                members TEXT,
-                order_index INTEGER DEFAULT 0,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            )
-        ''')
+        if create:
+            try:
+                conn = _connect(self.db_path, self.profile)
+            except Exception:
+                with self._cond:
+                    self._open -= 1
+                raise
+            self._local.conn = conn
+            return conn
         
-        # 插入默认研究领域数据
+        logger.warning(f"数据库连接池已耗尽（size={self.size}），创建溢出连接")
+        conn = _connect(self.db_path, self.profile)
+        conn.pool_overflow = True
+        return conn
+    
+    def release(self, conn):
+        """将连接归还到池中"""
+        # 回滚未提交的事务，保证下一个使用者拿到干净的连接
         try:
-            cursor = conn.execute('SELECT COUNT(*) FROM research_areas')
-            if cursor.fetchone()[0] == 0:
-                conn.execute('''
-                    INSERT INTO research_areas (title, category, description, order_index)
-                    VALUES 
-                    ('自然语言处理', '深度学习', '研究自然语言的理解、生成和处理技术', 1),
-                    ('计算机视觉', '深度学习', '研究图像和视频的识别、分析和理解', 2),
-                    ('机器学习', '深度学习', '研究各种机器学习算法和应用', 3),
-                    ('证据理论', '证据理论', '研究不确定性推理和证据融合方法', 4),
-                    ('文献计量学', '文献计量', '研究学术文献的统计分析和评价方法', 5)
-                ''')
-                print("已插入默认研究领域数据")
-        except Exception as e:
-            print(f"插入研究领域数据时出错: {e}")
-        
-        # 创建通知表
-        conn.execute('''
-            CREATE TABLE IF NOT EXISTS notifications (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                title TEXT NOT NULL,
-                content TEXT,
-                raw_content TEXT,
-                author TEXT,
-                category TEXT DEFAULT '实验室制度',
-                tags TEXT,
-                excerpt TEXT,
-                publish_date DATE,
-                word_count INTEGER DEFAULT 0,
-                reading_time INTEGER DEFAULT 5,
-                status TEXT DEFAULT 'published',
-                source_type TEXT DEFAULT 'online',
-                source_file TEXT,
-                card_style TEXT,
-                order_index INTEGER DEFAULT 0,
-                view_count INTEGER DEFAULT 0,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            )
-        ''')
-        
-        # 创建上传文件记录表
-        conn.execute('''
-            CREATE TABLE IF NOT EXISTS uploaded_files (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                notification_id INTEGER,
-                original_filename TEXT,
-                stored_filename TEXT,
-                file_size INTEGER,
-                upload_status TEXT DEFAULT 'success',
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                FOREIGN KEY (notification_id) REFERENCES notifications (id) ON DELETE CASCADE
-            )
-        ''')
-        
-        # ============ 科创管理相关表 ============
+            if conn.in_transaction:
+                conn.rollback()
+        except sqlite3.Error:
+            self._discard(conn)
+            return
         
-        # 创建项目统计表
-        conn.execute('''
-            CREATE TABLE IF NOT EXISTS innovation_stats (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                name TEXT NOT NULL,
-                value INTEGER DEFAULT 0,
-                icon TEXT,
-                description TEXT,
-                status TEXT DEFAULT 'active',
-                sort_order INTEGER DEFAULT 0,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            )
-        ''')
-        
-        # 创建轮播图表
-        conn.execute('''
-            CREATE TABLE IF NOT EXISTS innovation_carousel (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                title TEXT NOT NULL,
-                description TEXT,
-                image_url TEXT,
-                image_file TEXT,
-                link_url TEXT,
-                text_position TEXT DEFAULT 'bottom-left',
-                overlay_opacity REAL DEFAULT 0.3,
-                status TEXT DEFAULT 'active',
-                sort_order INTEGER DEFAULT 0,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            )
-        ''')
-        
-        # 创建成果与荣誉表
-        conn.execute('''
-            CREATE TABLE IF NOT EXISTS achievements (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                title TEXT NOT NULL,
-                type TEXT DEFAULT 'award',
-                description TEXT,
-                date DATE,
-                icon TEXT,
-                status TEXT DEFAULT 'active',
-                extra_data TEXT,
-                sort_order INTEGER DEFAULT 0,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            )
-        ''')
-        
-        # 创建大学生创新创业训练计划表
-        conn.execute('''
-            CREATE TABLE IF NOT EXISTS innovation_training_projects (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                title TEXT NOT NULL,
-                description TEXT,
-                category TEXT DEFAULT '人工智能',
-                progress INTEGER DEFAULT 0,
-                start_date DATE,
-                end_date DATE,
-                budget TEXT,
-                leader TEXT,
-                members_count INTEGER DEFAULT 0,
-                contact_email TEXT,
-                contact_phone TEXT,
-                contact_wechat TEXT,
-                image_url TEXT,
-                image_file TEXT,
-                status TEXT DEFAULT 'active',
-                sort_order INTEGER DEFAULT 0,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            )
-        ''')
+        if conn.pool_overflow or self._pid != os.getpid():
+            # 溢出连接或fork前的连接直接关闭
+            try:
+                conn.close()
+            except sqlite3.Error:
+                pass
+            with self._cond:
+                self._stats['closed'] += 1
+            return
         
-        # 创建知识产权表
-        conn.execute('''
-            CREATE TABLE IF NOT EXISTS intellectual_properties (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                title TEXT NOT NULL,
-                description TEXT,
-                type TEXT DEFAULT 'patent',
-                category TEXT,
-                application_date DATE,
-                grant_date DATE,
-                patent_number TEXT,
-                inventors TEXT,
-                image_url TEXT,
-                image_file TEXT,
-                status TEXT DEFAULT 'active',
-                sort_order INTEGER DEFAULT 0,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            )
+        with self._cond:
+            self._idle.append(conn)
+            self._cond.notify()
+    
+    def _discard(self, conn):
+        """关闭并丢弃一个损坏的连接"""
+        try:
+            conn.close()
+        except sqlite3.Error:
+            pass
+        with self._cond:
+            self._open -= 1
+            self._stats['closed'] += 1
+    
+    def note_request_reuse(self):
+        """记录一次请求内的连接复用"""
+        with self._cond:
+            self._stats['request_reuses'] += 1
+    
+    def close_all(self, checkpoint=False):
+        """
+        关闭池中所有空闲连接
+
+        Args:
+            checkpoint: 关闭前把 WAL 中的修改写回数据库文件并清空 -wal 文件（进程退出时使用），
+                        否则部署时只复制 .db 文件会丢失尚在 -wal 文件中的修改
+        """
+        with self._cond:
+            conns, self._idle = self._idle, []
+        if checkpoint and conns and self.profile != 'readonly':
+            try:
+                busy, _, _ = conns[0].execute('PRAGMA wal_checkpoint(TRUNCATE)').fetchone()
+                if busy:
+                    logger.warning("WAL 检查点未完成：其他连接仍在使用数据库")
+            except sqlite3.Error as e:
+                logger.warning(f"WAL 检查点失败: {e}")
+        for conn in conns:
+            self._discard(conn)
+    
+    def stats(self):
+        """返回连接池统计信息"""
+        with self._cond:
+            data = dict(self._stats)
+            data['open'] = self._open
+            data['idle'] = len(self._idle)
+        data['size'] = self.size
+        data['profile'] = self.profile
+        data['pid'] = self._pid
+        return data
+
+_pool = None
+_pool_lock = threading.Lock()
+
+def _get_pool_size():
+    """读取连接池大小配置"""
+    try:
+        return int(os.environ.get('DB_POOL_SIZE', DEFAULT_POOL_SIZE))
+    except ValueError:
+        return DEFAULT_POOL_SIZE
+
+def get_pool():
+    """获取（必要时创建）全局连接池"""
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = ConnectionPool(get_db_path(), size=_get_pool_size())
+    return _pool
+
+def configure_pool(size=None, timeout=None):
+    """调整连接池配置，已有的空闲连接会被关闭"""
+    global _pool
+    with _pool_lock:
+        old_pool = _pool
+        _pool = ConnectionPool(
+            get_db_path(),
+            size=size if size is not None else _get_pool_size(),
+            timeout=timeout if timeout is not None else DEFAULT_POOL_TIMEOUT,
+        )
+    if old_pool is not None:
+        old_pool.close_all()
+    return _pool
+
+def get_pool_stats():
+    """获取连接池统计信息（checkouts、waits、open等）"""
+    return get_pool().stats()
+
+def _reset_pool_after_fork():
+    """fork后的子进程立即丢弃继承的连接池"""
+    global _pool_lock
+    _pool_lock = threading.Lock()
+    if _pool is not None:
+        _pool._reset_state()
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_reset_pool_after_fork)
+
+def _close_pool_at_exit():
+    """进程退出时关闭本进程的连接池并执行 WAL 检查点"""
+    pool = _pool
+    if pool is not None and pool._pid == os.getpid():
+        pool.close_all(checkpoint=True)
+
+# 先于其他模块注册，退出时最后执行（计数缓冲等的 atexit 写入之后）
+atexit.register(_close_pool_at_exit)
+
+def _request_scope_enabled():
+    """当前是否处于已启用请求级连接复用的Flask上下文中"""
+    try:
+        from flask import has_app_context, current_app
+    except ImportError:
+        return False
+    return has_app_context() and 'db_utils' in current_app.extensions
+
+def _request_accounting():
+    """当前请求的数据库资源统计，不在请求上下文中时返回None"""
+    if not _request_scope_enabled():
+        return None
+    from flask import g
+    accounting = g.get('_db_accounting')
+    if accounting is None:
+        accounting = g._db_accounting = {
+            'checkouts': 0,
+            'reuses': 0,
+            'opened': 0,
+            'closed': 0,
+            'live': {},
+            'reported': False,
+        }
+    return accounting
+
+def get_request_db_stats():
+    """获取当前请求的连接统计（连接池借出/复用次数、独立连接打开/关闭次数）"""
+    accounting = _request_accounting()
+    if accounting is None:
+        return None
+    stats = {key: accounting[key] for key in ('checkouts', 'reuses', 'opened', 'closed')}
+    stats['unclosed'] = len(accounting['live'])
+    return stats
+
+def _caller_site(stacklevel):
+    """返回调用位置描述（文件:行号 函数名），用于泄漏报告"""
+    frame = sys._getframe(stacklevel + 1)
+    return f"{os.path.basename(frame.f_code.co_filename)}:{frame.f_lineno} {frame.f_code.co_name}()"
+
+def open_connection(db_path=None, profile=None, stacklevel=1):
+    """
+    打开一个不经过连接池的独立连接（调用方负责关闭）
+    
+    在请求上下文中会登记到请求级统计，请求结束时仍未关闭的连接会被报告为泄漏。
+    
+    Args:
+        db_path: 数据库路径，默认使用 get_db_path()
+        profile: 连接配置档案，默认按环境自动选择
+        stacklevel: 泄漏报告中记录的调用层级（封装函数传2即可记录其调用方）
+    """
+    path = db_path or get_db_path()
+    conn = _connect(path, profile or get_db_profile(path))
+    accounting = _request_accounting()
+    if accounting is not None:
+        accounting['opened'] += 1
+        accounting['live'][id(conn)] = (conn, _caller_site(stacklevel))
+        conn.accounting = accounting
+    return conn
+
+def get_request_connection():
+    """
+    获取当前请求共享的连接池连接
+    
+    连接在请求（应用上下文）结束时自动归还，调用方不应关闭它。
+    """
+    from flask import g
+    accounting = _request_accounting()
+    conn = g.get('_db_conn')
+    if conn is None:
+        conn = get_pool().acquire()
+        g._db_conn = conn
+        accounting['checkouts'] += 1
+    else:
+        get_pool().note_request_reuse()
+        accounting['reuses'] += 1
+    return conn
+
+@contextmanager
+def get_db():
+    """
+    获取数据库连接的上下文管理器
+    
+    连接来自连接池；在Flask请求中（已调用 init_app），同一请求内的
+    所有 get_db() 共享一个连接，请求结束时统一归还。
+    
+    Yields:
+        sqlite3.Connection: 数据库连接对象
+    """
+    if _request_scope_enabled():
+        yield get_request_connection()
+        return
+    
+    pool = get_pool()
+    conn = pool.acquire()
+    try:
+        yield conn
+    finally:
+        pool.release(conn)
+
+def _leak_strict():
+    """是否在发现连接泄漏时让请求失败（调试模式或 DB_LEAK_STRICT）"""
+    from flask import current_app
+    if current_app.debug or current_app.config.get('DB_LEAK_STRICT'):
+        return True
+    return os.environ.get('DB_LEAK_STRICT', '').lower() in ('1', 'true', 'yes')
+
+def _format_leaks(accounting):
+    from flask import request, has_request_context
+    sites = ', '.join(site for _, site in accounting['live'].values())
+    where = request.path if has_request_context() else '应用上下文'
+    return f"{where} 结束时仍有 {len(accounting['live'])} 个数据库连接未关闭: {sites}"
+
+def _check_request_leaks(response):
+    """请求结束前检查是否有未关闭的独立连接"""
+    from flask import g
+    accounting = g.get('_db_accounting')
+    if accounting and accounting['live'] and not accounting['reported']:
+        accounting['reported'] = True
+        message = _format_leaks(accounting)
+        logger.warning(message)
+        if _leak_strict():
+            raise RuntimeError(message)
+    return response
+
+def _release_request_connection(exception=None):
+    """应用上下文结束时归还请求级连接，并关闭遗留的独立连接"""
+    from flask import g
+    conn = g.pop('_db_conn', None)
+    if conn is not None:
+        get_pool().release(conn)
+    
+    accounting = g.get('_db_accounting')
+    if accounting and accounting['live']:
+        if not accounting['reported']:
+            logger.warning(_format_leaks(accounting))
+        for leaked, _ in list(accounting['live'].values()):
+            try:
+                leaked.close()
+            except sqlite3.Error:
+                pass
+
+def init_app(app):
+    """在Flask应用上注册请求级连接复用与连接泄漏检查"""
+    size = app.config.get('DB_POOL_SIZE')
+    if size is not None and int(size) != get_pool().size:
+        configure_pool(size=int(size))
+    app.extensions['db_utils'] = get_pool()
+    app.after_request(_check_request_leaks)
+    app.teardown_appcontext(_release_request_connection)
+
+# 二级索引（名称, 表名, 索引列）
+# 按热点查询的 WHERE + ORDER BY 组合设计，check_query_plans.py 会校验这些查询的执行计划
+INDEXES = [
+    # 团队成员：/api/team 排序、首页缓存列表、年级统计与年级改名
+    ('idx_team_members_order', 'team_members', 'COALESCE(order_index, 999999), grade DESC, created_at DESC'),
+    ('idx_team_members_order_created', 'team_members', 'order_index, created_at DESC'),
+    ('idx_team_members_grade', 'team_members', 'grade'),
+    ('idx_grades_order', 'grades', 'order_index, created_at DESC'),
+    # 论文
+    ('idx_papers_order', 'papers', 'order_index, updated_at DESC'),
+    ('idx_paper_categories_level', 'paper_categories', 'level, name'),
+    ('idx_research_projects_order', 'research_projects', 'order_index, created_at'),
+    # 研究领域：全部列表与按分类筛选
+    ('idx_research_areas_order', 'research_areas', 'order_index, created_at DESC'),
+    ('idx_research_areas_category', 'research_areas', 'category, order_index, created_at DESC'),
+    # 算法相关：前端（status过滤）与管理后台共用排序索引
+    ('idx_algorithms_order', 'algorithms', 'COALESCE(order_index, 0), created_at DESC'),
+    ('idx_algorithm_awards_order', 'algorithm_awards', 'COALESCE(order_index, 0), created_at DESC'),
+    ('idx_project_overview_order', 'project_overview', 'COALESCE(order_index, 0), created_at DESC'),
+    # 科创成果与指导老师
+    ('idx_innovation_projects_order', 'innovation_projects', 'COALESCE(sort_order, 0), created_at DESC'),
+    ('idx_innovation_projects_status', 'innovation_projects', 'status, COALESCE(sort_order, 0), created_at DESC'),
+    ('idx_advisors_order', 'advisors', 'COALESCE(sort_order, 0), created_at DESC'),
+    ('idx_advisors_status', 'advisors', 'status, COALESCE(sort_order, 0), created_at DESC'),
+    # 创新平台各展示模块
+    ('idx_innovation_stats_order', 'innovation_stats', 'sort_order'),
+    ('idx_innovation_carousel_order', 'innovation_carousel', 'sort_order'),
+    ('idx_achievements_order', 'achievements', 'sort_order'),
+    ('idx_innovation_training_projects_order', 'innovation_training_projects', 'sort_order'),
+    ('idx_intellectual_properties_order', 'intellectual_properties', 'sort_order'),
+    ('idx_enterprise_cooperations_order', 'enterprise_cooperations', 'sort_order'),
+    # 通知公告：列表、首页动态、详情页上一篇/下一篇
+    ('idx_notifications_order', 'notifications', 'order_index, publish_date DESC'),
+    ('idx_notifications_status_order', 'notifications', 'status, order_index, publish_date DESC'),
+    ('idx_notifications_status_nav', 'notifications', 'status, COALESCE(order_index, 0), publish_date DESC'),
+    ('idx_uploaded_files_notification', 'uploaded_files', 'notification_id'),
+]
+
+def create_indexes(conn):
+    """创建 INDEXES 中定义的全部二级索引（已存在则跳过）"""
+    for name, table, columns in INDEXES:
+        conn.execute(f'CREATE INDEX IF NOT EXISTS {name} ON {table} ({columns})')
+    # 让查询规划器获得最新的统计信息
+    conn.execute('PRAGMA optimize')
+
+def _migration_baseline(conn):
+    """迁移1：基础表结构、默认数据和历史字段补齐"""
+    # 创建用户表
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS users (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            username TEXT UNIQUE NOT NULL,
+            password TEXT NOT NULL,
+            role TEXT DEFAULT 'admin',
+            display_name TEXT,
+            avatar TEXT,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+    
+    # 创建团队成员表
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS team_members (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            name TEXT NOT NULL,
+            position TEXT,
+            description TEXT,
+            image_url TEXT,
+            qq TEXT,
+            wechat TEXT,
+            email TEXT,
+            group_name TEXT DEFAULT '算法组',
+            status TEXT DEFAULT '在职',
+            grade TEXT DEFAULT '2024级',
+            order_index INTEGER DEFAULT 0,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+    
+    # 修复现有团队成员的order_index
+    try:
+        # 检查是否有order_index为NULL或0的成员
+        cursor = conn.execute('''
+            SELECT id FROM team_members 
+            WHERE order_index IS NULL OR order_index = 0 
+            ORDER BY created_at ASC
         ''')
+        members_to_fix = cursor.fetchall()
         
-        # 创建校企合作表
-        conn.execute('''
-            CREATE TABLE IF NOT EXISTS enterprise_cooperations (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                title TEXT NOT NULL,
-                description TEXT,
-                enterprise_name TEXT NOT NULL,
-                category TEXT,
-                start_date DATE,
-                end_date DATE,
-                budget TEXT,
-                leader TEXT,
-                achievement TEXT,
-                enterprise_logo TEXT,
-                image_url TEXT,
-                image_file TEXT,
-                status TEXT DEFAULT 'active',
-                sort_order INTEGER DEFAULT 0,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        if members_to_fix:
+            logger.info(f"🔧 发现 {len(members_to_fix)} 个需要修复order_index的团队成员")
+            
+            # 获取当前最大order_index
+            cursor = conn.execute('SELECT COALESCE(MAX(order_index), 0) FROM team_members')
+            max_order = cursor.fetchone()[0]
+            
+            # 为每个成员设置正确的order_index
+            for index, member in enumerate(members_to_fix):
+                new_order = max_order + index + 1
+                conn.execute('''
+                    UPDATE team_members 
+                    SET order_index = ?, updated_at = CURRENT_TIMESTAMP 
+                    WHERE id = ?
+                ''', (new_order, member[0]))
+                logger.info(f"  - 成员ID {member[0]} 设置order_index为 {new_order}")
+            
+            logger.info("✅ 团队成员order_index修复完成")
+        else:
+            logger.info("✅ 团队成员order_index已正确设置")
+    except Exception as e:
+        logger.warning(f"⚠️ 修复团队成员order_index时出错: {e}")
+    
+    # 创建年级表
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS grades (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            name TEXT NOT NULL UNIQUE,
+            description TEXT,
+            order_index INTEGER DEFAULT 0,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+    
+    # 插入默认年级数据
+    default_grades = [
+        ('2024级', '2024级年级组', 1),
+        ('2023级', '2023级年级组', 2),
+        ('2022级', '2022级年级组', 3),
+        ('2021级', '2021级年级组', 4),
+        ('2020级', '2020级年级组', 5),
+        ('2019级', '2019级年级组', 6),
+        ('2018级', '2018级年级组', 7),
+        ('2017级', '2017级年级组', 8),
+        ('2016级', '2016级年级组', 9)
+    ]
+    
+    # 检查是否已经插入过默认数据
+    existing_grades = conn.execute('SELECT COUNT(*) FROM grades').fetchone()[0]
+    if existing_grades == 0:
+        for grade in default_grades:
+            conn.execute('''
+                INSERT INTO grades (name, description, order_index)
+                VALUES (?, ?, ?)
+            ''', grade)
+    
+    # 创建研究项目表
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS research_projects (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            title TEXT NOT NULL,
+            category TEXT DEFAULT '深度学习',
+            description TEXT,
+            members TEXT,
+            order_index INTEGER DEFAULT 0,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+    
+    # 创建论文类别表
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS paper_categories (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            name TEXT NOT NULL,
+            level INTEGER NOT NULL,
+            description TEXT,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+    
+    # 插入默认的论文类别数据
+    default_categories = [
+        ('CCF-A', 1, 'CCF推荐会议和期刊A类'),
+        ('CCF-B', 2, 'CCF推荐会议和期刊B类'),
+        ('CCF-C', 3, 'CCF推荐会议和期刊C类'),
+        ('中科院一区', 4, '中科院分区一区'),
+        ('中科院二区', 5, '中科院分区二区'),
+        ('中科院三区', 6, '中科院分区三区'),
+        ('中科院四区', 7, '中科院分区四区'),
+        ('JCR一区', 8, 'JCR分区一区'),
+        ('JCR二区', 9, 'JCR分区二区'),
+        ('JCR三区', 10, 'JCR分区三区'),
+        ('JCR四区', 11, 'JCR分区四区'),
+        ('EI源刊', 12, 'EI收录的期刊'),
+        ('EI会议', 13, 'EI收录的会议'),
+        ('南核', 14, '南大核心期刊'),
+        ('CSCD', 15, '中国科学引文数据库'),
+        ('北核', 16, '北大核心期刊'),
+        ('普刊', 17, '普通期刊')
+    ]
+    
+    # 检查是否已经插入过默认数据
+    existing_categories = conn.execute('SELECT COUNT(*) FROM paper_categories').fetchone()[0]
+    if existing_categories == 0:
+        for category in default_categories:
+            conn.execute('''
+                INSERT INTO paper_categories (name, level, description)
+                VALUES (?, ?, ?)
+            ''', category)
+    
+    # 创建论文表
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS papers (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            title TEXT NOT NULL,
+            authors TEXT,
+            journal TEXT,
+            year INTEGER,
+            abstract TEXT,
+            category_ids TEXT DEFAULT '[]',
+            status TEXT DEFAULT 'published',
+            order_index INTEGER DEFAULT 0,
+            citation_count INTEGER DEFAULT 0,
+            doi TEXT,
+            pdf_url TEXT,
+            code_url TEXT,
+            video_url TEXT,
+            demo_url TEXT,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+    
+    # 创建论文类别关联表
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS paper_category_relations (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            paper_id INTEGER NOT NULL,
+            category_id INTEGER NOT NULL,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (paper_id) REFERENCES papers (id) ON DELETE CASCADE,
+            FOREIGN KEY (category_id) REFERENCES paper_categories (id) ON DELETE CASCADE,
+            UNIQUE(paper_id, category_id)
+        )
+    ''')
+    
+    # 创建算法表
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS algorithms (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            title TEXT NOT NULL,
+            category TEXT NOT NULL,
+            description TEXT,
+            time_complexity TEXT,
+            space_complexity TEXT,
+            code_preview TEXT,
+            pdf_url TEXT,
+            status TEXT DEFAULT 'active',
+            order_index INTEGER DEFAULT 0,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+    
+    # 创建算法竞赛获奖表
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS algorithm_awards (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            title TEXT NOT NULL,
+            competition_name TEXT NOT NULL,
+            award_level TEXT NOT NULL,
+            winner_name TEXT,
+            competition_date DATE,
+            competition_location TEXT,
+            team_score TEXT,
+            image_url TEXT,
+            description TEXT,
+            status TEXT DEFAULT 'active',
+            order_index INTEGER DEFAULT 0,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+    
+    # 创建项目概览统计表
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS project_overview (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            name TEXT NOT NULL,
+            value INTEGER DEFAULT 0,
+            icon TEXT,
+            description TEXT,
+            status TEXT DEFAULT 'active',
+            order_index INTEGER DEFAULT 0,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+    
+    # 创建科创项目表
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS innovation_projects (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            title TEXT NOT NULL,
+            description TEXT,
+            image_url TEXT,
+            category TEXT DEFAULT '国家级创新创业项目',
+            tags TEXT,
+            detail_url TEXT,
+            status TEXT DEFAULT 'active',
+            sort_order INTEGER DEFAULT 0,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+    
+    # 创建指导老师表
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS advisors (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            name TEXT NOT NULL,
+            position TEXT NOT NULL,
+            description TEXT,
+            image_url TEXT,
+            email TEXT,
+            google_scholar TEXT,
+            github TEXT,
+            border_color TEXT DEFAULT 'primary',
+            status TEXT DEFAULT 'active',
+            sort_order INTEGER DEFAULT 0,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+    
+    # 创建研究领域表
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS research_areas (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            title TEXT NOT NULL,
+            category TEXT DEFAULT '深度学习',
+            description TEXT,
+            members TEXT,
+            order_index INTEGER DEFAULT 0,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+    
+    # 插入默认研究领域数据
+    try:
+        cursor = conn.execute('SELECT COUNT(*) FROM research_areas')
+        if cursor.fetchone()[0] == 0:
+            conn.execute('''
+                INSERT INTO research_areas (title, category, description, order_index)
+                VALUES 
+                ('自然语言处理', '深度学习', '研究自然语言的理解、生成和处理技术', 1),
+                ('计算机视觉', '深度学习', '研究图像和视频的识别、分析和理解', 2),
+                ('机器学习', '深度学习', '研究各种机器学习算法和应用', 3),
+                ('证据理论', '证据理论', '研究不确定性推理和证据融合方法', 4),
+                ('文献计量学', '文献计量', '研究学术文献的统计分析和评价方法', 5)
+            ''')
+            logger.info("已插入默认研究领域数据")
+    except Exception as e:
+        logger.error(f"插入研究领域数据时出错: {e}")
+    
+    # 创建通知表
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS notifications (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            title TEXT NOT NULL,
+            content TEXT,
+            raw_content TEXT,
+            author TEXT,
+            category TEXT DEFAULT '实验室制度',
+            tags TEXT,
+            excerpt TEXT,
+            publish_date DATE,
+            word_count INTEGER DEFAULT 0,
+            reading_time INTEGER DEFAULT 5,
+            status TEXT DEFAULT 'published',
+            source_type TEXT DEFAULT 'online',
+            source_file TEXT,
+            card_style TEXT,
+            order_index INTEGER DEFAULT 0,
+            view_count INTEGER DEFAULT 0,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+    
+    # 创建上传文件记录表
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS uploaded_files (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            notification_id INTEGER,
+            original_filename TEXT,
+            stored_filename TEXT,
+            file_size INTEGER,
+            upload_status TEXT DEFAULT 'success',
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (notification_id) REFERENCES notifications (id) ON DELETE CASCADE
+        )
+    ''')
+    
+    # ============ 科创管理相关表 ============
+    
+    # 创建项目统计表
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS innovation_stats (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            name TEXT NOT NULL,
+            value INTEGER DEFAULT 0,
+            icon TEXT,
+            description TEXT,
+            status TEXT DEFAULT 'active',
+            sort_order INTEGER DEFAULT 0,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+    
+    # 创建轮播图表
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS innovation_carousel (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            title TEXT NOT NULL,
+            description TEXT,
+            image_url TEXT,
+            image_file TEXT,
+            link_url TEXT,
+            text_position TEXT DEFAULT 'bottom-left',
+            overlay_opacity REAL DEFAULT 0.3,
+            status TEXT DEFAULT 'active',
+            sort_order INTEGER DEFAULT 0,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+    
+    # 创建成果与荣誉表
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS achievements (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            title TEXT NOT NULL,
+            type TEXT DEFAULT 'award',
+            description TEXT,
+            date DATE,
+            icon TEXT,
+            status TEXT DEFAULT 'active',
+            extra_data TEXT,
+            sort_order INTEGER DEFAULT 0,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+    
+    # 创建大学生创新创业训练计划表
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS innovation_training_projects (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            title TEXT NOT NULL,
+            description TEXT,
+            category TEXT DEFAULT '人工智能',
+            progress INTEGER DEFAULT 0,
+            start_date DATE,
+            end_date DATE,
+            budget TEXT,
+            leader TEXT,
+            members_count INTEGER DEFAULT 0,
+            contact_email TEXT,
+            contact_phone TEXT,
+            contact_wechat TEXT,
+            image_url TEXT,
+            image_file TEXT,
+            status TEXT DEFAULT 'active',
+            sort_order INTEGER DEFAULT 0,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+    
+    # 创建知识产权表
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS intellectual_properties (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            title TEXT NOT NULL,
+            description TEXT,
+            type TEXT DEFAULT 'patent',
+            category TEXT,
+            application_date DATE,
+            grant_date DATE,
+            patent_number TEXT,
+            inventors TEXT,
+            image_url TEXT,
+            image_file TEXT,
+            status TEXT DEFAULT 'active',
+            sort_order INTEGER DEFAULT 0,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+    
+    # 创建校企合作表
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS enterprise_cooperations (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            title TEXT NOT NULL,
+            description TEXT,
+            enterprise_name TEXT NOT NULL,
+            category TEXT,
+            start_date DATE,
+            end_date DATE,
+            budget TEXT,
+            leader TEXT,
+            achievement TEXT,
+            enterprise_logo TEXT,
+            image_url TEXT,
+            image_file TEXT,
+            status TEXT DEFAULT 'active',
+            sort_order INTEGER DEFAULT 0,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+    
+    # 插入默认项目统计数据
+    try:
+        cursor = conn.execute('SELECT COUNT(*) FROM innovation_stats')
+        if cursor.fetchone()[0] == 0:
+            conn.execute('''
+                INSERT INTO innovation_stats (name, value, icon, description, status, sort_order)
+                VALUES 
+                ('已完成项目', 25, 'fa-check-circle', '累计完成各类创新项目', 'active', 1),
+                ('获得专利', 8, 'fa-lightbulb-o', '获得发明专利和实用新型专利', 'active', 2),
+                ('发表论文', 15, 'fa-file-text-o', '在核心期刊发表学术论文', 'active', 3),
+                ('获得奖项', 12, 'fa-trophy', '在各类竞赛中获得奖项', 'active', 4)
+            ''')
+            logger.info("已插入默认项目统计数据")
+    except Exception as e:
+        logger.error(f"插入项目统计数据时出错: {e}")
+    
+    # 插入默认轮播图数据
+    try:
+        cursor = conn.execute('SELECT COUNT(*) FROM innovation_carousel')
+        if cursor.fetchone()[0] == 0:
+            conn.execute('''
+                INSERT INTO innovation_carousel (title, description, image_url, status, sort_order)
+                VALUES 
+                ('智能视觉分析系统', '基于深度学习的智能视觉分析系统，可应用于安防监控、工业检测等领域', '/static/images/carousel/sample1.jpg', 'active', 1),
+                ('自然语言处理平台', '大规模预训练语言模型，支持多语言理解和生成任务', '/static/images/carousel/sample2.jpg', 'active', 2)
+            ''')
+            logger.info("已插入默认轮播图数据")
+    except Exception as e:
+        logger.error(f"插入轮播图数据时出错: {e}")
+    
+    # 插入默认成果与荣誉数据
+    try:
+        cursor = conn.execute('SELECT COUNT(*) FROM achievements')
+        if cursor.fetchone()[0] == 0:
+            conn.execute('''
+                INSERT INTO achievements (title, type, description, date, status, sort_order)
+                VALUES 
+                ('全国大学生创新创业大赛金奖', 'award', '在全国大学生创新创业大赛中获得金奖', '2024-06-15', 'active', 1),
+                ('一种基于深度学习的图像识别方法', 'patent', '获得国家发明专利授权', '2024-03-20', 'active', 2)
+            ''')
+            logger.info("已插入默认成果与荣誉数据")
+    except Exception as e:
+        logger.error(f"插入成果与荣誉数据时出错: {e}")
+    
+    # 插入默认训练计划数据
+    try:
+        cursor = conn.execute('SELECT COUNT(*) FROM innovation_training_projects')
+        if cursor.fetchone()[0] == 0:
+            conn.execute('''
+                INSERT INTO innovation_training_projects (title, description, category, progress, leader, status, sort_order)
+                VALUES 
+                ('智能视觉分析系统', '基于深度学习的智能视觉分析系统开发', '人工智能', 85, '李教授', 'active', 1),
+                ('大数据分析平台', '企业级大数据分析平台设计与实现', '大数据', 70, '王教授', 'active', 2)
+            ''')
+            logger.info("已插入默认训练计划数据")
+    except Exception as e:
+        logger.error(f"插入训练计划数据时出错: {e}")
+    
+    # 插入默认知识产权数据
+    try:
+        cursor = conn.execute('SELECT COUNT(*) FROM intellectual_properties')
+        if cursor.fetchone()[0] == 0:
+            conn.execute('''
+                INSERT INTO intellectual_properties (title, description, type, category, inventors, status, sort_order)
+                VALUES 
+                ('一种基于深度学习的图像识别方法', '利用卷积神经网络进行图像特征提取和分类的方法', 'patent', '人工智能', '张三、李四', 'active', 1),
+                ('智能语音识别系统软件', '基于机器学习的语音识别和转换系统', 'copyright', '人工智能', '王五、赵六', 'active', 2)
+            ''')
+            logger.info("已插入默认知识产权数据")
+    except Exception as e:
+        logger.error(f"插入知识产权数据时出错: {e}")
+    
+    # 插入默认校企合作数据
+    try:
+        cursor = conn.execute('SELECT COUNT(*) FROM enterprise_cooperations')
+        if cursor.fetchone()[0] == 0:
+            conn.execute('''
+                INSERT INTO enterprise_cooperations (title, description, enterprise_name, category, leader, status, sort_order)
+                VALUES 
+                ('AI算法优化与芯片适配', '为华为提供AI算法优化和芯片适配服务', '华为技术', '技术研发', '陈教授', 'active', 1),
+                ('大数据分析平台开发', '为腾讯开发企业级大数据分析平台', '腾讯科技', '软件开发', '刘教授', 'active', 2)
+            ''')
+            logger.info("已插入默认校企合作数据")
+    except Exception as e:
+        logger.error(f"插入校企合作数据时出错: {e}")
+    
+    # 检查并添加缺失的字段
+    try:
+        conn.execute('SELECT created_at FROM team_members LIMIT 1')
+    except sqlite3.OperationalError:
+        conn.execute('ALTER TABLE team_members ADD COLUMN created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP')
+        logger.info("已添加created_at字段到team_members表")
+    
+    try:
+        conn.execute('SELECT updated_at FROM team_members LIMIT 1')
+    except sqlite3.OperationalError:
+        conn.execute('ALTER TABLE team_members ADD COLUMN updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP')
+        logger.info("已添加updated_at字段到team_members表")
+    
+    # 插入示例算法数据
+    try:
+        # 检查是否已有数据
+        cursor = conn.execute('SELECT COUNT(*) FROM algorithms')
+        if cursor.fetchone()[0] == 0:
+            conn.execute('''
+                INSERT INTO algorithms (title, category, description, time_complexity, space_complexity, code_preview, status, order_index)
+                VALUES 
+                ('快速排序', '基础算法', '一种高效的排序算法，使用分治策略', 'O(n log n)', 'O(log n)', 'def quicksort(arr):\n    if len(arr) <= 1:\n        return arr\n    pivot = arr[len(arr) // 2]\n    left = [x for x in arr if x < pivot]\n    middle = [x for x in arr if x == pivot]\n    right = [x for x in arr if x > pivot]\n    return quicksort(left) + middle + quicksort(right)', 'active', 1),
+                ('动态规划 - 背包问题', '动态规划', '经典的0-1背包问题解决方案', 'O(nW)', 'O(nW)', 'def knapsack(values, weights, W):\n    n = len(values)\n    dp = [[0] * (W + 1) for _ in range(n + 1)]\n    for i in range(1, n + 1):\n        for w in range(W + 1):\n            if weights[i-1] <= w:\n                dp[i][w] = max(dp[i-1][w], dp[i-1][w-weights[i-1]] + values[i-1])\n            else:\n                dp[i][w] = dp[i-1][w]\n    return dp[n][W]', 'active', 2),
+                ('二叉树遍历', '数据结构', '二叉树的前序、中序、后序遍历', 'O(n)', 'O(h)', 'class TreeNode:\n    def __init__(self, val=0):\n        self.val = val\n        self.left = None\n        self.right = None\n\ndef inorder_traversal(root):\n    if root:\n        inorder_traversal(root.left)\n        print(root.val)\n        inorder_traversal(root.right)', 'active', 3)
+            ''')
+            logger.info("已插入示例算法数据")
+    except Exception as e:
+        logger.error(f"插入算法数据时出错: {e}")
+    
+    # 插入示例获奖记录数据
+    try:
+        cursor = conn.execute('SELECT COUNT(*) FROM algorithm_awards')
+        if cursor.fetchone()[0] == 0:
+            conn.execute('''
+                INSERT INTO algorithm_awards (title, competition_name, award_level, winner_name, competition_date, competition_location, team_score, description, status, order_index)
+                VALUES 
+                ('ACM-ICPC亚洲区域赛', 'ACM-ICPC Asia Regional Contest', '一等奖', '张三、李四、王五', '2023-10-15', '北京', '95.5分', '在激烈的竞争中脱颖而出，展现了优秀的算法设计和编程能力', 'active', 1),
+                ('蓝桥杯全国总决赛', '蓝桥杯全国软件和信息技术专业人才大赛', '特等奖', '赵六', '2023-05-20', '杭州', '98分', '在全国总决赛中获得特等奖，展现了扎实的编程基础和创新能力', 'active', 2),
+                ('CCPC大学生程序设计竞赛', '中国大学生程序设计竞赛', '二等奖', '钱七、孙八', '2023-09-10', '上海', '88分', '在CCPC竞赛中获得二等奖，体现了良好的团队协作能力', 'active', 3)
+            ''')
+            logger.info("已插入示例获奖记录数据")
+    except Exception as e:
+        logger.error(f"插入获奖记录数据时出错: {e}")
+    
+    # 插入示例项目概览数据
+    try:
+        cursor = conn.execute('SELECT COUNT(*) FROM project_overview')
+        if cursor.fetchone()[0] == 0:
+            conn.execute('''
+                INSERT INTO project_overview (name, value, icon, description, status, order_index)
+                VALUES 
+                ('算法总数', 50, 'fa-code', '实验室掌握的算法数量', 'active', 1),
+                ('竞赛获奖', 15, 'fa-trophy', '各类算法竞赛获奖次数', 'active', 2),
+                ('项目完成', 25, 'fa-project-diagram', '完成的算法相关项目数量', 'active', 3),
+                ('团队成员', 12, 'fa-users', '实验室核心成员数量', 'active', 4)
+            ''')
+            logger.info("已插入示例项目概览数据")
+    except Exception as e:
+        logger.error(f"插入项目概览数据时出错: {e}")
+
+def _migration_indexes(conn):
+    """迁移2：热点查询索引"""
+    create_indexes(conn)
+
+# 记录修改代数的内容表；任何 INSERT/UPDATE/DELETE 都会让对应代数加一，
+# 供各进程判断缓存的响应是否仍然有效
+GENERATION_TABLES = [
+    'team_members', 'grades', 'research_areas', 'research_projects',
+    'papers', 'paper_categories', 'paper_category_relations',
+    'notifications', 'uploaded_files', 'advisors',
+    'innovation_projects', 'innovation_stats', 'achievements', 'innovation_carousel',
+    'innovation_training_projects', 'intellectual_properties', 'enterprise_cooperations',
+    'algorithms', 'algorithm_awards', 'project_overview',
+]
+
+# 由内容表派生的表（修改代数、预生成的响应），读写它们不影响响应能否按代数缓存
+DERIVED_TABLES = ('table_generations', 'materialized_payloads')
+
+# 更新这些列不视为内容变化（如通知浏览量），不触发代数递增
+GENERATION_IGNORED_COLUMNS = {
+    'notifications': ('view_count',),
+}
+
+def create_generation_triggers(conn, table):
+    """为表创建（或重建）代数递增触发器；给表新增列后需重新调用"""
+    bump = f"UPDATE table_generations SET generation = generation + 1 WHERE name = '{table}';"
+    ignored = GENERATION_IGNORED_COLUMNS.get(table, ())
+    update_of = ''
+    if ignored:
+        columns = [row[1] for row in conn.execute(f'PRAGMA table_info({table})') if row[1] not in ignored]
+        update_of = ' OF ' + ', '.join(columns)
+    for event, clause in (('insert', 'INSERT'), ('update', f'UPDATE{update_of}'), ('delete', 'DELETE')):
+        trigger = f'trg_{table}_generation_{event}'
+        conn.execute(f'DROP TRIGGER IF EXISTS {trigger}')
+        conn.execute(f'CREATE TRIGGER {trigger} AFTER {clause} ON {table} BEGIN {bump} END')
+
+def _migration_table_generations(conn):
+    """迁移3：表修改代数及触发器"""
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS table_generations (
+            name TEXT PRIMARY KEY,
+            generation INTEGER NOT NULL DEFAULT 0
+        )
+    ''')
+    for table in GENERATION_TABLES:
+        conn.execute('INSERT OR IGNORE INTO table_generations (name) VALUES (?)', (table,))
+        create_generation_triggers(conn, table)
+
+def _migration_materialized_payloads(conn):
+    """迁移4：预生成的前端API响应"""
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS materialized_payloads (
+            path TEXT PRIMARY KEY,
+            stamp TEXT NOT NULL,
+            mimetype TEXT NOT NULL,
+            body BLOB NOT NULL,
+            gzip_body BLOB,
+            built_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+
+def _migration_notification_rendering(conn):
+    """迁移5：通知的预渲染HTML、目录及渲染器版本"""
+    existing = {row[1] for row in conn.execute('PRAGMA table_info(notifications)')}
+    for column, definition in (
+        ('rendered_html', 'TEXT'),
+        ('toc_html', 'TEXT'),
+        ('render_version', 'INTEGER NOT NULL DEFAULT 0'),
+    ):
+        if column not in existing:
+            conn.execute(f'ALTER TABLE notifications ADD COLUMN {column} {definition}')
+    # 触发器的 UPDATE OF 列表在创建时确定，新增列后重建
+    create_generation_triggers(conn, 'notifications')
+
+def _migration_jobs(conn):
+    """迁移6：后台任务队列"""
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS jobs (
+            id TEXT PRIMARY KEY,
+            kind TEXT NOT NULL,
+            payload TEXT NOT NULL DEFAULT '{}',
+            status TEXT NOT NULL DEFAULT 'queued',
+            attempts INTEGER NOT NULL DEFAULT 0,
+            max_attempts INTEGER NOT NULL DEFAULT 3,
+            run_after REAL NOT NULL,
+            idempotency_key TEXT UNIQUE,
+            result TEXT,
+            error TEXT,
+            locked_by TEXT,
+            locked_at REAL,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_jobs_status_run_after ON jobs (status, run_after)')
+
+def _migration_visit_analytics(conn):
+    """迁移7：访问记录及按小时/天汇总的访问统计"""
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS visits (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            path TEXT NOT NULL,
+            session_id TEXT,
+            referrer TEXT,
+            user_agent TEXT,
+            visited_at REAL NOT NULL
+        )
+    ''')
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_visits_visited_at ON visits (visited_at)')
+    # visitors 为独立访客的 HyperLogLog 草图（sketch_utils），可跨小时/天/路径合并
+    for table, bucket in (('visit_hourly', 'hour'), ('visit_daily', 'day')):
+        conn.execute(f'''
+            CREATE TABLE IF NOT EXISTS {table} (
+                {bucket} TEXT NOT NULL,
+                path TEXT NOT NULL,
+                views INTEGER NOT NULL DEFAULT 0,
+                visitors BLOB,
+                PRIMARY KEY ({bucket}, path)
             )
         ''')
-        
-        # 插入默认项目统计数据
-        try:
-            cursor = conn.execute('SELECT COUNT(*) FROM innovation_stats')
-            if cursor.fetchone()[0] == 0:
-                conn.execute('''
-                    INSERT INTO innovation_stats (name, value, icon, description, status, sort_order)
-                    VALUES 
-                    ('已完成项目', 25, 'fa-check-circle', '累计完成各类创新项目', 'active', 1),
-                    ('获得专利', 8, 'fa-lightbulb-o', '获得发明专利和实用新型专利', 'active', 2),
-                    ('发表论文', 15, 'fa-file-text-o', '在核心期刊发表学术论文', 'active', 3),
-                    ('获得奖项', 12, 'fa-trophy', '在各类竞赛中获得奖项', 'active', 4)
-                ''')
-                print("已插入默认项目统计数据")
-        except Exception as e:
-            print(f"插入项目统计数据时出错: {e}")
-        
-        # 插入默认轮播图数据
-        try:
-            cursor = conn.execute('SELECT COUNT(*) FROM innovation_carousel')
-            if cursor.fetchone()[0] == 0:
-                conn.execute('''
-                    INSERT INTO innovation_carousel (title, description, image_url, status, sort_order)
-                    VALUES 
-                    ('智能视觉分析系统', '基于深度学习的智能视觉分析系统，可应用于安防监控、工业检测等领域', '/static/images/carousel/sample1.jpg', 'active', 1),
-                    ('自然语言处理平台', '大规模预训练语言模型，支持多语言理解和生成任务', '/static/images/carousel/sample2.jpg', 'active', 2)
-                ''')
-                print("已插入默认轮播图数据")
-        except Exception as e:
-            print(f"插入轮播图数据时出错: {e}")
-        
-        # 插入默认成果与荣誉数据
-        try:
-            cursor = conn.execute('SELECT COUNT(*) FROM achievements')
-            if cursor.fetchone()[0] == 0:
-                conn.execute('''
-                    INSERT INTO achievements (title, type, description, date, status, sort_order)
-                    VALUES 
-                    ('全国大学生创新创业大赛金奖', 'award', '在全国大学生创新创业大赛中获得金奖', '2024-06-15', 'active', 1),
-                    ('一种基于深度学习的图像识别方法', 'patent', '获得国家发明专利授权', '2024-03-20', 'active', 2)
-                ''')
-                print("已插入默认成果与荣誉数据")
-        except Exception as e:
-            print(f"插入成果与荣誉数据时出错: {e}")
-        
-        # 插入默认训练计划数据
-        try:
-            cursor = conn.execute('SELECT COUNT(*) FROM innovation_training_projects')
-            if cursor.fetchone()[0] == 0:
-                conn.execute('''
-                    INSERT INTO innovation_training_projects (title, description, category, progress, leader, status, sort_order)
-                    VALUES 
-                    ('智能视觉分析系统', '基于深度学习的智能视觉分析系统开发', '人工智能', 85, '李教授', 'active', 1),
-                    ('大数据分析平台', '企业级大数据分析平台设计与实现', '大数据', 70, '王教授', 'active', 2)
-                ''')
-                print("已插入默认训练计划数据")
-        except Exception as e:
-            print(f"插入训练计划数据时出错: {e}")
-        
-        # 插入默认知识产权数据
-        try:
-            cursor = conn.execute('SELECT COUNT(*) FROM intellectual_properties')
-            if cursor.fetchone()[0] == 0:
-                conn.execute('''
-                    INSERT INTO intellectual_properties (title, description, type, category, inventors, status, sort_order)
-                    VALUES 
-                    ('一种基于深度学习的图像识别方法', '利用卷积神经网络进行图像特征提取和分类的方法', 'patent', '人工智能', '张三、李四', 'active', 1),
-                    ('智能语音识别系统软件', '基于机器学习的语音识别和转换系统', 'copyright', '人工智能', '王五、赵六', 'active', 2)
-                ''')
-                print("已插入默认知识产权数据")
-        except Exception as e:
-            print(f"插入知识产权数据时出错: {e}")
-        
-        # 插入默认校企合作数据
-        try:
-            cursor = conn.execute('SELECT COUNT(*) FROM enterprise_cooperations')
-            if cursor.fetchone()[0] == 0:
-                conn.execute('''
-                    INSERT INTO enterprise_cooperations (title, description, enterprise_name, category, leader, status, sort_order)
-                    VALUES 
-                    ('AI算法优化与芯片适配', '为华为提供AI算法优化和芯片适配服务', '华为技术', '技术研发', '陈教授', 'active', 1),
-                    ('大数据分析平台开发', '为腾讯开发企业级大数据分析平台', '腾讯科技', '软件开发', '刘教授', 'active', 2)
-                ''')
-                print("已插入默认校企合作数据")
-        except Exception as e:
-            print(f"插入校企合作数据时出错: {e}")
-        
-        # 检查并添加缺失的字段
-        try:
-            conn.execute('SELECT created_at FROM team_members LIMIT 1')
-        except sqlite3.OperationalError:
-            conn.execute('ALTER TABLE team_members ADD COLUMN created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP')
-            print("已添加created_at字段到team_members表")
-        
-        try:
-            conn.execute('SELECT updated_at FROM team_members LIMIT 1')
-        except sqlite3.OperationalError:
-            conn.execute('ALTER TABLE team_members ADD COLUMN updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP')
-            print("已添加updated_at字段到team_members表")
-        
-        # 插入示例算法数据
+
+def _migration_rum_digests(conn):
+    """迁移8：浏览器性能指标的分位数草图（按天、页面、指标累积，不保存原始数据）"""
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS rum_digests (
+            day TEXT NOT NULL,
+            page TEXT NOT NULL,
+            metric TEXT NOT NULL,
+            samples INTEGER NOT NULL DEFAULT 0,
+            digest BLOB NOT NULL,
+            PRIMARY KEY (day, page, metric)
+        )
+    ''')
+
+def _migration_search_index(conn):
+    """迁移9：站内全文搜索索引（FTS5）及源表触发器，已有内容全部记为待索引"""
+    # 索引结构与分词规则定义在 search_utils，在此延迟导入避免循环依赖
+    import search_utils
+    search_utils.create_search_schema(conn)
+
+def get_table_generations(conn):
+    """
+    读取所有内容表的修改代数
+
+    Returns:
+        dict: 表名 -> 代数；数据库尚未迁移（如只读部署包）时返回空字典
+    """
+    try:
+        return dict(conn.execute('SELECT name, generation FROM table_generations').fetchall())
+    except sqlite3.OperationalError:
+        return {}
+
+# 有序的数据库迁移步骤：(版本号, 说明, 执行函数)
+# 新增迁移只能追加到末尾，版本号严格递增；已发布的步骤不要修改
+MIGRATIONS = [
+    (1, '基础表结构与默认数据', _migration_baseline),
+    (2, '热点查询索引', _migration_indexes),
+    (3, '表修改代数', _migration_table_generations),
+    (4, '预生成的前端API响应', _migration_materialized_payloads),
+    (5, '通知预渲染', _migration_notification_rendering),
+    (6, '后台任务队列', _migration_jobs),
+    (7, '访问统计', _migration_visit_analytics),
+    (8, '浏览器性能指标', _migration_rum_digests),
+    (9, '站内全文搜索', _migration_search_index),
+]
+
+SCHEMA_VERSION = MIGRATIONS[-1][0]
+
+def get_schema_version(conn):
+    """读取数据库当前结构版本（PRAGMA user_version）"""
+    return conn.execute('PRAGMA user_version').fetchone()[0]
+
+def migrate(conn):
+    """
+    执行尚未应用的迁移步骤
+    
+    每个步骤在独立的 IMMEDIATE 事务中执行并同时写入 user_version，
+    多个worker同时启动时只有一个会真正执行，其余在拿到写锁后发现已是最新版本。
+    
+    Returns:
+        list: 本次执行的迁移版本号
+    """
+    applied = []
+    for version, description, step in MIGRATIONS:
+        if get_schema_version(conn) >= version:
+            continue
+        conn.execute('BEGIN IMMEDIATE')
         try:
-            # 检查是否已有数据
-            cursor = conn.execute('SELECT COUNT(*) FROM algorithms')
-            if cursor.fetchone()[0] == 0:
-                conn.execute('''
-                    INSERT INTO algorithms (title, category, description, time_complexity, space_complexity, code_preview, status, order_index)
-                    VALUES 
-                    ('快速排序', '基础算法', '一种高效的排序算法，使用分治策略', 'O(n log n)', 'O(log n)', 'def quicksort(arr):\n    if len(arr) <= 1:\n        return arr\n    pivot = arr[len(arr) // 2]\n    left = [x for x in arr if x < pivot]\n    middle = [x for x in arr if x == pivot]\n    right = [x for x in arr if x > pivot]\n    return quicksort(left) + middle + quicksort(right)', 'active', 1),
-                    ('动态规划 - 背包问题', '动态规划', '经典的0-1背包问题解决方案', 'O(nW)', 'O(nW)', 'def knapsack(values, weights, W):\n    n = len(values)\n    dp = [[0] * (W + 1) for _ in range(n + 1)]\n    for i in range(1, n + 1):\n        for w in range(W + 1):\n            if weights[i-1] <= w:\n                dp[i][w] = max(dp[i-1][w], dp[i-1][w-weights[i-1]] + values[i-1])\n            else:\n                dp[i][w] = dp[i-1][w]\n    return dp[n][W]', 'active', 2),
-                    ('二叉树遍历', '数据结构', '二叉树的前序、中序、后序遍历', 'O(n)', 'O(h)', 'class TreeNode:\n    def __init__(self, val=0):\n        self.val = val\n        self.left = None\n        self.right = None\n\ndef inorder_traversal(root):\n    if root:\n        inorder_traversal(root.left)\n        print(root.val)\n        inorder_traversal(root.right)', 'active', 3)
-                ''')
-                print("已插入示例算法数据")
-        except Exception as e:
-            print(f"插入算法数据时出错: {e}")
+            # 拿到写锁后再确认一次，避免并发重复执行
+            if get_schema_version(conn) >= version:
+                conn.execute('ROLLBACK')
+                continue
+            logger.info(f"🔧 执行数据库迁移 {version}: {description}")
+            step(conn)
+            conn.execute(f'PRAGMA user_version = {int(version)}')
+            conn.execute('COMMIT')
+        except Exception:
+            if conn.in_transaction:
+                conn.execute('ROLLBACK')
+            raise
+        applied.append(version)
+    return applied
+
+def init_db():
+    """初始化数据库：结构已是最新版本时直接返回，否则按顺序执行迁移"""
+    db_path = get_db_path()
+    
+    with get_db() as conn:
+        version = get_schema_version(conn)
         
-        # 插入示例获奖记录数据
-        try:
-            cursor = conn.execute('SELECT COUNT(*) FROM algorithm_awards')
-            if cursor.fetchone()[0] == 0:
-                conn.execute('''
-                    INSERT INTO algorithm_awards (title, competition_name, award_level, winner_name, competition_date, competition_location, team_score, description, status, order_index)
-                    VALUES 
-                    ('ACM-ICPC亚洲区域赛', 'ACM-ICPC Asia Regional Contest', '一等奖', '张三、李四、王五', '2023-10-15', '北京', '95.5分', '在激烈的竞争中脱颖而出，展现了优秀的算法设计和编程能力', 'active', 1),
-                    ('蓝桥杯全国总决赛', '蓝桥杯全国软件和信息技术专业人才大赛', '特等奖', '赵六', '2023-05-20', '杭州', '98分', '在全国总决赛中获得特等奖，展现了扎实的编程基础和创新能力', 'active', 2),
-                    ('CCPC大学生程序设计竞赛', '中国大学生程序设计竞赛', '二等奖', '钱七、孙八', '2023-09-10', '上海', '88分', '在CCPC竞赛中获得二等奖，体现了良好的团队协作能力', 'active', 3)
-                ''')
-                print("已插入示例获奖记录数据")
-        except Exception as e:
-            print(f"插入获奖记录数据时出错: {e}")
+        if version >= SCHEMA_VERSION:
+            # 常量时间检查：冷启动时不再执行任何DDL
+            logger.info(f"✅ 数据库结构已是最新版本 (v{version})")
+            return
         
-        # 插入示例项目概览数据
-        try:
-            cursor = conn.execute('SELECT COUNT(*) FROM project_overview')
-            if cursor.fetchone()[0] == 0:
-                conn.execute('''
-                    INSERT INTO project_overview (name, value, icon, description, status, order_index)
-                    VALUES 
-                    ('算法总数', 50, 'fa-code', '实验室掌握的算法数量', 'active', 1),
-                    ('竞赛获奖', 15, 'fa-trophy', '各类算法竞赛获奖次数', 'active', 2),
-                    ('项目完成', 25, 'fa-project-diagram', '完成的算法相关项目数量', 'active', 3),
-                    ('团队成员', 12, 'fa-users', '实验室核心成员数量', 'active', 4)
-                ''')
-                print("已插入示例项目概览数据")
-        except Exception as e:
-            print(f"插入项目概览数据时出错: {e}")
+        if get_pool().profile == 'readonly':
+            # 只读档案下数据库随部署包发布，不能也无需写入
+            logger.warning(f"⚠️ 只读数据库结构版本 v{version} 落后于 v{SCHEMA_VERSION}，请在本地迁移后重新部署")
+            return
         
-        conn.commit()
+        logger.info("🔄 开始初始化数据库...")
+        logger.info(f"📁 数据库路径: {db_path}")
+        applied = migrate(conn)
+        logger.info(f"✅ 已应用迁移: {applied}")
         
         # 验证关键表是否存在
-        print("🔍 验证数据库表...")
+        logger.debug("🔍 验证数据库表...")
         required_tables = ['users', 'team_members', 'grades', 'research_areas', 'innovation_stats']
         for table in required_tables:
             try:
                 cursor = conn.execute(f"SELECT COUNT(*) FROM {table}")
                 count = cursor.fetchone()[0]
-                print(f"✅ 表 {table}: {count} 条记录")
+                logger.info(f"✅ 表 {table}: {count} 条记录")
             except Exception as e:
-                print(f"❌ 表 {table} 验证失败: {e}")
+                logger.error(f"❌ 表 {table} 验证失败: {e}")
         
-        print("📊 数据库初始化完成") 
\ No newline at end of file
+        logger.info("📊 数据库初始化完成") 
\ No newline at end of file
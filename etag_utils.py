@@ -0,0 +1,187 @@
+"""
+条件请求工具模块
+为 /api/ 下的GET请求生成基于表修改代数的强ETag，If-None-Match 命中时在视图执行前返回304
+
+端点依赖的表无需声明：响应生成时通过语句观察者记录读取的表，之后的请求按这些表的代数计算ETag。
+执行过写操作、读取了未记录代数的表或没有执行任何查询的端点不参与。
+"""
+
+import os
+import re
+import hashlib
+import logging
+import threading
+from functools import lru_cache
+
+from flask import current_app, g, request, session, has_request_context
+
+import db_utils
+from cache_utils import cached_table_reads, current_generations
+
+logger = logging.getLogger(__name__)
+
+_TABLE_REFERENCE = re.compile(r'\b(?:FROM|JOIN|INTO|UPDATE)\s+["`\[]?([A-Za-z_][A-Za-z0-9_]*)', re.IGNORECASE)
+_FIRST_KEYWORD = re.compile(r'^\s*([A-Za-z]+)')
+
+# 不读写表数据的语句（连接初始化、事务控制）
+_NEUTRAL_STATEMENTS = frozenset({'pragma', 'begin', 'commit', 'rollback', 'savepoint', 'release', 'end'})
+
+# 端点被判定为不可缓存的标记
+_UNCACHEABLE = object()
+
+_GZIP_SUFFIX = '-gzip'
+
+
+@lru_cache(maxsize=1024)
+def classify_statement(sql):
+    """
+    分析语句类型和引用的表
+
+    Returns:
+        tuple: ('read' | 'write' | 'neutral', 引用的表名集合)
+    """
+    match = _FIRST_KEYWORD.match(sql)
+    keyword = match.group(1).lower() if match else ''
+    if keyword in _NEUTRAL_STATEMENTS:
+        return 'neutral', frozenset()
+    tables = frozenset(name.lower() for name in _TABLE_REFERENCE.findall(sql))
+    if keyword in ('select', 'with'):
+        return 'read', tables
+    return 'write', tables
+
+
+class ConditionalGet:
+    """基于表修改代数的 ETag / If-None-Match 处理"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        # 端点规则 -> 依赖的表（frozenset）或 _UNCACHEABLE
+        self._dependencies = {}
+        # 派生表（代数表、预生成响应）也可读取，其内容完全由内容表的代数决定
+        self._tracked = frozenset(db_utils.GENERATION_TABLES) | frozenset(db_utils.DERIVED_TABLES)
+        self._derived = frozenset(db_utils.DERIVED_TABLES)
+        self.not_modified = 0
+
+    def init_app(self, app):
+        """注册请求钩子（应在鉴权类 before_request 之后注册，304 会跳过之后的钩子）"""
+        enabled = app.config.get('ETAG_ENABLED', os.environ.get('ETAG_ENABLED', '1'))
+        if str(enabled).lower() in ('0', 'false', 'no', 'off'):
+            return
+        app.extensions['conditional_get'] = self
+        app.before_request(self._check_request)
+        app.after_request(self._tag_response)
+        db_utils.add_statement_observer(self._record_statement)
+
+    @staticmethod
+    def _applies():
+        return request.method in ('GET', 'HEAD') and request.path.startswith('/api/') \
+            and request.url_rule is not None
+
+    def _compute_etag(self, tables, generations):
+        session_user = f"{session.get('username', '')}|{session.get('role', '')}"
+        parts = [request.path, request.query_string.decode('latin-1'), session_user]
+        parts.extend(f'{table}={generations.get(table, 0)}' for table in sorted(tables))
+        return hashlib.sha1('\n'.join(parts).encode('utf-8')).hexdigest()
+
+    def _check_request(self):
+        if not self._applies():
+            return None
+        rule = request.url_rule.rule
+        tables = self._dependencies.get(rule)
+        if tables is _UNCACHEABLE:
+            return None
+
+        generations = current_generations()
+        if not generations:
+            # 数据库尚未迁移到带修改代数的版本
+            return None
+        g._etag_generations = generations
+        g._etag_reads = set()
+        g._etag_cacheable = True
+
+        if tables and request.if_none_match:
+            etag = self._compute_etag(tables, generations)
+            # gzip 编码的响应使用带后缀的ETag（同一资源不同编码的强ETag不能相同）
+            for candidate in (etag, etag + _GZIP_SUFFIX):
+                if request.if_none_match.contains_weak(candidate):
+                    response = current_app.response_class(status=304)
+                    response.set_etag(candidate)
+                    with self._lock:
+                        self.not_modified += 1
+                    return response
+        return None
+
+    def _record_statement(self, conn, record):
+        if not has_request_context():
+            return
+        reads = g.get('_etag_reads')
+        if reads is None:
+            return
+        kind, tables = classify_statement(record['sql'])
+        if kind == 'neutral':
+            return
+        if kind == 'write' and tables and tables <= self._derived:
+            # 读请求中刷新预生成响应等派生数据，不算修改内容
+            return
+        if kind == 'write' or not tables <= self._tracked:
+            g._etag_cacheable = False
+        reads.update(tables)
+
+    def _tag_response(self, response):
+        generations = g.pop('_etag_generations', None)
+        reads = g.pop('_etag_reads', None)
+        cacheable = g.pop('_etag_cacheable', False)
+        if generations is None or response.status_code != 200 or response.is_streamed:
+            return response
+
+        # 缓存命中时没有执行SQL，依赖表由缓存声明
+        from_cache = cached_table_reads()
+        if from_cache:
+            reads = reads | from_cache
+            cacheable = cacheable and from_cache <= self._tracked
+
+        rule = request.url_rule.rule
+        if not cacheable or not reads:
+            # 有写操作、读取未记录代数的表或不查询数据库（结果可能来自文件等）的端点不生成ETag
+            with self._lock:
+                self._dependencies[rule] = _UNCACHEABLE
+            return response
+
+        with self._lock:
+            known = self._dependencies.get(rule)
+            if known is _UNCACHEABLE:
+                return response
+            tables = frozenset(reads) | (known or frozenset())
+            self._dependencies[rule] = tables
+
+        # 使用视图执行前读取的代数，执行期间发生的修改会在下次请求时使ETag失效
+        etag = self._compute_etag(tables, generations)
+        if response.content_encoding == 'gzip':
+            etag += _GZIP_SUFFIX
+        response.set_etag(etag)
+        return response.make_conditional(request)
+
+    def stats(self):
+        """已学习的端点依赖和304次数"""
+        with self._lock:
+            return {
+                'not_modified': self.not_modified,
+                'endpoints': {
+                    rule: sorted(tables) if tables is not _UNCACHEABLE else None
+                    for rule, tables in sorted(self._dependencies.items())
+                },
+            }
+
+
+conditional_get = ConditionalGet()
+
+
+def skip_etag():
+    """
+    本端点不生成ETag，也不再以304应答
+
+    用于每次请求都有副作用（如累加浏览量）或响应中含有不随表修改代数变化的数据的端点：
+    304 在视图执行前返回，会跳过这些副作用。
+    """
+    if has_request_context():
+        g._etag_cacheable = False
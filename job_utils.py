@@ -0,0 +1,320 @@
+"""
+后台任务工具模块
+基于 SQLite jobs 表的进程内任务队列：请求中只登记任务并返回任务ID，由工作线程执行耗时操作
+
+任务在表中持久保存，进程重启或其他worker进程登记的任务同样会被执行；
+失败时按指数退避重试，超过最大次数后标记为失败；相同幂等键只登记一次。
+执行中的任务超过租约时间未完成（如进程崩溃）会被重新领取。
+注册时指定 interval 的任务为周期任务：每次执行结束后自动登记下一周期。
+
+环境变量:
+    JOB_WORKERS  工作线程数，默认 2；设为 0 时在登记任务的请求中同步执行
+                 （Vercel 等无常驻进程的环境默认同步执行）
+"""
+
+import os
+import json
+import time
+import uuid
+import random
+import socket
+import logging
+import threading
+
+import db_utils
+
+logger = logging.getLogger(__name__)
+
+# 重试退避的基础延迟（秒），第 n 次失败后等待 base * 2^(n-1)，带随机抖动
+RETRY_BASE_DELAY = 5.0
+# 空闲时轮询其他进程登记的任务的间隔（秒）
+POLL_INTERVAL = 2.0
+# 执行中任务的租约（秒），超时视为执行者已退出
+LEASE_SECONDS = 600
+# 每日维护任务的周期（秒）
+DAILY = 86400
+
+JOB_STATUSES = ('queued', 'running', 'succeeded', 'failed')
+
+
+class PermanentJobError(Exception):
+    """不应重试的任务错误（如上传的文件内容无效），抛出后任务直接标记为失败"""
+
+
+class JobQueue:
+    """持久化任务队列和工作线程池"""
+
+    def __init__(self):
+        # 任务类型 -> (处理函数, 最大尝试次数, 周期秒数或None)
+        self._handlers = {}
+        self._app = None
+        self._wakeup = threading.Event()
+        self._lock = threading.Lock()
+        self._threads = []
+        self._started_pid = None
+        self.worker_count = 0
+        self.completed = 0
+        self.failed = 0
+        self.retried = 0
+
+    def handler(self, kind, max_attempts=3, interval=None):
+        """
+        注册任务处理函数
+
+        处理函数在应用上下文中执行，参数为登记时的 payload（dict），返回值（可JSON序列化）保存为任务结果。
+        同一任务可能被重试，处理函数应能安全地重复执行；抛出 PermanentJobError 时不再重试。
+
+        Args:
+            interval: 周期任务的间隔（秒），通过 schedule() 开始循环
+        """
+        def decorator(func):
+            self._handlers[kind] = (func, max_attempts, interval)
+            return func
+        return decorator
+
+    def init_app(self, app):
+        self._app = app
+        default_workers = '0' if os.environ.get('VERCEL') else '2'
+        self.worker_count = int(app.config.get('JOB_WORKERS', os.environ.get('JOB_WORKERS', default_workers)))
+        app.extensions['job_queue'] = self
+        if self.worker_count > 0:
+            # 首个请求时启动工作线程（避免在预加载后 fork 的父进程中启动）
+            app.before_request(self._ensure_started)
+
+    # ============ 登记与查询 ============
+
+    def enqueue(self, kind, payload=None, idempotency_key=None, delay=0):
+        """
+        登记任务
+
+        Args:
+            kind: 任务类型（需已注册处理函数）
+            payload: 任务参数（可JSON序列化的dict）
+            idempotency_key: 幂等键，已存在相同键的任务时直接返回该任务ID
+            delay: 延迟执行的秒数
+
+        Returns:
+            str: 任务ID
+        """
+        if kind not in self._handlers:
+            raise ValueError(f"未注册的任务类型: {kind}")
+        _, max_attempts, _ = self._handlers[kind]
+        job_id = uuid.uuid4().hex
+        with db_utils.get_db() as conn:
+            cursor = conn.execute('''
+                INSERT OR IGNORE INTO jobs (id, kind, payload, max_attempts, run_after, idempotency_key)
+                VALUES (?, ?, ?, ?, ?, ?)
+            ''', (job_id, kind, json.dumps(payload or {}, ensure_ascii=False), max_attempts,
+                  time.time() + delay, idempotency_key))
+            conn.commit()
+            if cursor.rowcount == 0:
+                row = conn.execute('SELECT id FROM jobs WHERE idempotency_key = ?', (idempotency_key,)).fetchone()
+                logger.info(f"任务 {kind} 已存在（幂等键 {idempotency_key}）: {row['id']}")
+                return row['id']
+
+        logger.info(f"已登记任务 {kind}: {job_id}")
+        if self.worker_count <= 0:
+            self._run_inline(job_id)
+        else:
+            # 工作线程在首个请求时启动，启动前登记的任务之后再执行
+            self._wakeup.set()
+        return job_id
+
+    def schedule(self, kind, payload=None):
+        """
+        登记周期任务的本周期执行，返回任务ID
+
+        幂等键按周期编号生成，多个进程启动时同一周期只登记一次；之后每次执行结束（成功或最终失败）
+        都会延迟一个周期登记下一次。无工作线程时不登记（同步执行的环境没有常驻进程执行延迟任务）。
+        """
+        if self.worker_count <= 0:
+            return None
+        interval = self._handlers[kind][2]
+        if not interval:
+            raise ValueError(f"任务类型 {kind} 不是周期任务")
+        return self.enqueue(kind, payload, idempotency_key=_period_key(kind, interval, time.time()))
+
+    def _reschedule(self, job):
+        """周期任务执行结束后登记下一周期"""
+        handler = self._handlers.get(job['kind'])
+        interval = handler[2] if handler else None
+        if not interval or self.worker_count <= 0:
+            return
+        try:
+            self.enqueue(job['kind'], json.loads(job['payload']),
+                         idempotency_key=_period_key(job['kind'], interval, time.time() + interval),
+                         delay=interval)
+        except Exception as e:
+            logger.warning(f"登记周期任务 {job['kind']} 的下一次执行失败: {e}")
+
+    def find(self, idempotency_key):
+        """按幂等键查找已登记的任务ID"""
+        with db_utils.get_db() as conn:
+            row = conn.execute('SELECT id FROM jobs WHERE idempotency_key = ?', (idempotency_key,)).fetchone()
+        return row['id'] if row else None
+
+    def get(self, job_id):
+        """查询任务状态，不存在时返回 None"""
+        with db_utils.get_db() as conn:
+            row = conn.execute('''
+                SELECT id, kind, status, attempts, max_attempts, result, error, created_at, updated_at
+                FROM jobs WHERE id = ?
+            ''', (job_id,)).fetchone()
+        if row is None:
+            return None
+        job = dict(row)
+        job['result'] = json.loads(job['result']) if job['result'] else None
+        return job
+
+    def purge(self, older_than_days=7):
+        """删除早于指定天数的已结束任务，返回删除数量"""
+        with db_utils.get_db() as conn:
+            cursor = conn.execute('''
+                DELETE FROM jobs
+                WHERE status IN ('succeeded', 'failed') AND updated_at < datetime('now', ?)
+            ''', (f'-{int(older_than_days)} days',))
+            conn.commit()
+            return cursor.rowcount
+
+    # ============ 执行 ============
+
+    def _ensure_started(self):
+        pid = os.getpid()
+        if self._started_pid == pid:
+            return
+        with self._lock:
+            if self._started_pid == pid:
+                return
+            self._started_pid = pid
+            self._threads = []
+            for index in range(self.worker_count):
+                thread = threading.Thread(target=self._worker_loop, name=f'job-worker-{index}', daemon=True)
+                thread.start()
+                self._threads.append(thread)
+        logger.info(f"后台任务工作线程已启动: {self.worker_count} 个")
+
+    def _claim(self, worker_id, job_id=None):
+        """领取一个到期任务（或指定任务），返回任务行；没有可领取的任务时返回 None"""
+        now = time.time()
+        with db_utils.get_db() as conn:
+            if job_id is None:
+                row = conn.execute('''
+                    SELECT id FROM jobs
+                    WHERE status = 'queued' AND run_after <= ?
+                    ORDER BY run_after LIMIT 1
+                ''', (now,)).fetchone()
+                if row is None:
+                    row = conn.execute('''
+                        SELECT id FROM jobs
+                        WHERE status = 'running' AND locked_at < ?
+                        LIMIT 1
+                    ''', (now - LEASE_SECONDS,)).fetchone()
+                if row is None:
+                    return None
+                job_id = row['id']
+            # 条件更新保证多个线程/进程中只有一个领取成功
+            cursor = conn.execute('''
+                UPDATE jobs
+                SET status = 'running', attempts = attempts + 1, locked_by = ?, locked_at = ?,
+                    updated_at = CURRENT_TIMESTAMP
+                WHERE id = ? AND (status = 'queued' OR (status = 'running' AND locked_at < ?))
+            ''', (worker_id, now, job_id, now - LEASE_SECONDS))
+            conn.commit()
+            if cursor.rowcount == 0:
+                return None
+            return dict(conn.execute('SELECT * FROM jobs WHERE id = ?', (job_id,)).fetchone())
+
+    def _execute(self, job, retry=True):
+        """执行已领取的任务并记录结果或安排重试"""
+        handler = self._handlers.get(job['kind'])
+        start = time.perf_counter()
+        try:
+            if handler is None:
+                raise ValueError(f"未注册的任务类型: {job['kind']}")
+            with self._app.app_context():
+                result = handler[0](json.loads(job['payload']))
+        except Exception as e:
+            if self._record_failure(job, e, retry and not isinstance(e, PermanentJobError)):
+                self._reschedule(job)
+            return
+        with db_utils.get_db() as conn:
+            conn.execute('''
+                UPDATE jobs SET status = 'succeeded', result = ?, error = NULL, locked_by = NULL,
+                    updated_at = CURRENT_TIMESTAMP
+                WHERE id = ?
+            ''', (json.dumps(result, ensure_ascii=False, default=str), job['id']))
+            conn.commit()
+        with self._lock:
+            self.completed += 1
+        logger.info(f"任务 {job['kind']} 完成: {job['id']}，耗时 {(time.perf_counter() - start) * 1000:.1f}ms")
+        self._reschedule(job)
+
+    def _record_failure(self, job, error, retry=True):
+        """记录失败并安排重试，返回是否为最终失败"""
+        attempts = job['attempts']
+        final = not retry or attempts >= job['max_attempts']
+        delay = RETRY_BASE_DELAY * (2 ** (attempts - 1))
+        with db_utils.get_db() as conn:
+            conn.execute('''
+                UPDATE jobs SET status = ?, error = ?, run_after = ?, locked_by = NULL,
+                    updated_at = CURRENT_TIMESTAMP
+                WHERE id = ?
+            ''', ('failed' if final else 'queued', f'{type(error).__name__}: {error}',
+                  time.time() + delay + random.uniform(0, delay), job['id']))
+            conn.commit()
+        with self._lock:
+            if final:
+                self.failed += 1
+            else:
+                self.retried += 1
+        if final:
+            logger.error(f"任务 {job['kind']} 失败（已尝试 {attempts} 次）: {job['id']}: {error}", exc_info=error)
+        else:
+            logger.warning(f"任务 {job['kind']} 第 {attempts} 次执行失败，{delay:.0f}s 后重试: {error}")
+        return final
+
+    def _run_inline(self, job_id):
+        """无工作线程时在当前请求中执行（失败直接标记为失败，不在请求中等待重试）"""
+        job = self._claim(f'inline-{os.getpid()}', job_id)
+        if job is not None:
+            self._execute(job, retry=False)
+
+    def _worker_loop(self):
+        worker_id = f'{socket.gethostname()}-{os.getpid()}-{threading.current_thread().name}'
+        while True:
+            try:
+                job = self._claim(worker_id)
+            except Exception as e:
+                logger.warning(f"领取后台任务失败: {e}")
+                job = None
+            if job is None:
+                self._wakeup.wait(POLL_INTERVAL)
+                self._wakeup.clear()
+                continue
+            self._execute(job)
+
+    def stats(self):
+        with db_utils.get_db() as conn:
+            counts = dict(conn.execute('SELECT status, COUNT(*) FROM jobs GROUP BY status').fetchall())
+        with self._lock:
+            return {
+                'workers': self.worker_count,
+                'completed': self.completed,
+                'failed': self.failed,
+                'retried': self.retried,
+                'jobs': {status: counts.get(status, 0) for status in JOB_STATUSES},
+            }
+
+
+def _period_key(kind, interval, at):
+    """周期任务的幂等键：任务类型 + 时间 at 所在的周期编号"""
+    return f'{kind}@{int(at // interval)}'
+
+
+job_queue = JobQueue()
+
+
+@job_queue.handler('jobs.purge', max_attempts=1, interval=DAILY)
+def purge_finished_jobs(payload):
+    """维护任务：清理已结束的旧任务"""
+    return {'deleted': job_queue.purge(payload.get('older_than_days', 7))}
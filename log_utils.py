@@ -0,0 +1,187 @@
+"""
+日志工具模块
+提供结构化(JSON)日志、基于队列的异步输出、按模块设置级别以及高频调试日志采样
+
+环境变量:
+    LOG_LEVEL          根日志级别，默认 INFO
+    LOG_LEVELS         按模块设置级别，如 "db_utils=WARNING,api.notifications=DEBUG"
+    LOG_FORMAT         json（默认）或 text
+    LOG_ASYNC          是否通过后台线程输出，默认开启（Vercel 环境默认关闭）
+    LOG_SAMPLE_RATE    DEBUG 日志的采样比例 0~1，默认 0.1（调试模式下为 1）
+"""
+
+import os
+import sys
+import json
+import queue
+import atexit
+import random
+import logging
+import logging.handlers
+from datetime import datetime, timezone
+
+# LogRecord 自带的属性，其余属性视为结构化字段输出
+_RESERVED_ATTRS = frozenset(vars(logging.LogRecord('', 0, '', 0, '', (), None))) | {'message', 'asctime'}
+
+_listener = None
+_configured = False
+
+
+class JsonFormatter(logging.Formatter):
+    """把日志记录格式化为单行JSON"""
+
+    def format(self, record):
+        payload = {
+            'time': datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec='milliseconds'),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage(),
+        }
+        for key, value in record.__dict__.items():
+            if key not in _RESERVED_ATTRS and not key.startswith('_'):
+                payload[key] = value
+        if record.exc_info:
+            payload['exception'] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            payload['exception'] = record.exc_text
+        return json.dumps(payload, ensure_ascii=False, default=str)
+
+
+class RequestContextFilter(logging.Filter):
+    """在请求上下文中为日志附加请求方法和路径"""
+
+    def filter(self, record):
+        try:
+            from flask import has_request_context, request
+        except ImportError:
+            return True
+        if has_request_context() and not hasattr(record, 'path'):
+            record.method = request.method
+            record.path = request.path
+        return True
+
+
+class SamplingFilter(logging.Filter):
+    """按比例采样 DEBUG 级别日志，INFO 及以上全部保留"""
+
+    def __init__(self, rate):
+        super().__init__()
+        self.rate = rate
+
+    def filter(self, record):
+        if record.levelno > logging.DEBUG or self.rate >= 1:
+            return True
+        return random.random() < self.rate
+
+
+class _QueueHandler(logging.handlers.QueueHandler):
+    """只在调用线程合并消息参数，格式化和I/O都交给后台线程"""
+
+    def prepare(self, record):
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            # 异常对象不跨线程传递，提前生成文本
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+
+def _parse_levels(spec):
+    """解析 "模块=级别,模块=级别" 形式的配置"""
+    levels = {}
+    for item in (spec or '').split(','):
+        if '=' not in item:
+            continue
+        name, level = item.split('=', 1)
+        levels[name.strip()] = level.strip().upper()
+    return levels
+
+
+def _env_flag(name, default):
+    value = os.environ.get(name)
+    if value is None:
+        return default
+    return value.lower() in ('1', 'true', 'yes', 'on')
+
+
+def _build_output_handler(log_format):
+    handler = logging.StreamHandler(sys.stdout)
+    if log_format == 'text':
+        handler.setFormatter(logging.Formatter('%(asctime)s %(levelname)s %(name)s: %(message)s'))
+    else:
+        handler.setFormatter(JsonFormatter())
+    return handler
+
+
+def _start_listener(output_handler):
+    global _listener
+    log_queue = queue.SimpleQueue()
+    _listener = logging.handlers.QueueListener(log_queue, output_handler, respect_handler_level=True)
+    _listener.start()
+    return _QueueHandler(log_queue)
+
+
+def stop_logging():
+    """停止后台日志线程并输出队列中剩余的日志"""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+def setup_logging(app=None):
+    """
+    配置根日志记录器（重复调用只生效一次）
+
+    Args:
+        app: Flask应用，可选；调试模式下默认输出全部 DEBUG 日志
+    """
+    global _configured
+    if _configured:
+        return
+    _configured = True
+
+    config = app.config if app is not None else {}
+    debug = bool(app is not None and app.debug)
+
+    level = config.get('LOG_LEVEL') or os.environ.get('LOG_LEVEL', 'INFO')
+    log_format = (config.get('LOG_FORMAT') or os.environ.get('LOG_FORMAT', 'json')).lower()
+    use_async = _env_flag('LOG_ASYNC', not os.environ.get('VERCEL'))
+    sample_rate = float(config.get('LOG_SAMPLE_RATE') or os.environ.get('LOG_SAMPLE_RATE', 1 if debug else 0.1))
+
+    output_handler = _build_output_handler(log_format)
+    handler = _start_listener(output_handler) if use_async else output_handler
+    handler.addFilter(RequestContextFilter())
+    handler.addFilter(SamplingFilter(sample_rate))
+
+    root = logging.getLogger()
+    # 替换默认的 basicConfig 输出，避免重复打印
+    for existing in list(root.handlers):
+        root.removeHandler(existing)
+    root.addHandler(handler)
+    root.setLevel(level.upper())
+
+    levels = dict(_parse_levels(os.environ.get('LOG_LEVELS')))
+    levels.update(config.get('LOG_LEVELS') or {})
+    for name, module_level in levels.items():
+        logging.getLogger(name).setLevel(module_level)
+
+    # werkzeug 访问日志量大，默认只保留警告
+    if 'werkzeug' not in levels:
+        logging.getLogger('werkzeug').setLevel(logging.WARNING)
+
+    if use_async:
+        atexit.register(stop_logging)
+        if hasattr(os, 'register_at_fork'):
+            os.register_at_fork(after_in_child=lambda: _restart_after_fork(output_handler, handler))
+
+
+def _restart_after_fork(output_handler, queue_handler):
+    """fork 后后台线程不会被继承，在子进程中重新启动"""
+    global _listener
+    if _listener is None:
+        return
+    _listener = None
+    new_handler = _start_listener(output_handler)
+    queue_handler.queue = new_handler.queue
@@ -0,0 +1,105 @@
+"""
+Markdown转换工具模块
+复用预先配置好的 markdown.Markdown 实例，避免每次转换都重新加载扩展、构建处理器注册表
+
+实例按扩展配置分池保存；取出的实例只由当前线程使用，归还前调用 reset() 清除上次转换的状态
+（目录、脚注、引用链接等），转换出错的实例直接丢弃。
+"""
+
+import json
+import logging
+import threading
+from collections import deque
+from contextlib import contextmanager
+
+import markdown
+
+logger = logging.getLogger(__name__)
+
+# 每种配置最多保留的空闲实例数（超出的归还时丢弃）
+DEFAULT_POOL_SIZE = 8
+
+
+class ConverterPool:
+    """同一扩展配置的 Markdown 实例池（线程安全）"""
+
+    def __init__(self, extensions, extension_configs=None, maxsize=DEFAULT_POOL_SIZE):
+        self.extensions = list(extensions)
+        self.extension_configs = extension_configs or {}
+        self.maxsize = maxsize
+        self._idle = deque()
+        self._lock = threading.Lock()
+        self.created = 0
+        self.reused = 0
+        self.discarded = 0
+
+    def _create(self):
+        with self._lock:
+            self.created += 1
+        return markdown.Markdown(extensions=self.extensions, extension_configs=self.extension_configs)
+
+    @contextmanager
+    def converter(self):
+        """
+        取出一个实例，用完自动重置并归还
+
+        用法:
+            with pool.converter() as md:
+                html = md.convert(text)
+                toc_tokens = md.toc_tokens
+        """
+        with self._lock:
+            md = self._idle.pop() if self._idle else None
+            if md is not None:
+                self.reused += 1
+        if md is None:
+            md = self._create()
+
+        try:
+            yield md
+        except BaseException:
+            # 转换中途出错的实例状态不可靠，不再复用
+            with self._lock:
+                self.discarded += 1
+            raise
+        md.reset()
+        with self._lock:
+            if len(self._idle) < self.maxsize:
+                self._idle.append(md)
+            else:
+                self.discarded += 1
+
+    def stats(self):
+        with self._lock:
+            return {
+                'extensions': self.extensions,
+                'idle': len(self._idle),
+                'created': self.created,
+                'reused': self.reused,
+                'discarded': self.discarded,
+            }
+
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def _config_key(extensions, extension_configs):
+    return tuple(extensions), json.dumps(extension_configs or {}, sort_keys=True, default=repr)
+
+
+def get_pool(extensions, extension_configs=None):
+    """获取（首次使用时创建）指定扩展配置的实例池"""
+    key = _config_key(extensions, extension_configs)
+    pool = _pools.get(key)
+    if pool is None:
+        with _pools_lock:
+            pool = _pools.get(key)
+            if pool is None:
+                pool = _pools[key] = ConverterPool(extensions, extension_configs)
+    return pool
+
+
+def pool_stats():
+    """所有实例池的创建/复用/丢弃次数"""
+    return [pool.stats() for pool in list(_pools.values())]
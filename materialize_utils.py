@@ -0,0 +1,294 @@
+"""
+预生成响应工具模块
+前端公开API（/api/frontend/* 等）读多写少：源表有写入时重新生成最终的JSON字节和gzip副本，
+保存在 materialized_payloads 表中，GET请求在视图执行前直接返回这些字节，不再查询和编码。
+
+每份响应记录生成时源表的修改代数；代数变化（包括其他进程的写入）后首次请求时重新生成，
+因此即使写入时未能立即重建，也不会返回过期数据。
+
+命令行:
+    flask --app app materialize rebuild [--path /api/frontend/advisors]
+    flask --app app materialize check      # 存在过期或缺失的响应时返回非零退出码
+
+环境变量:
+    MATERIALIZE_ENABLED  设为 0 时关闭（GET请求照常执行视图）
+"""
+
+import os
+import gzip
+import logging
+import sqlite3
+import threading
+
+import click
+from flask import current_app, g, request, has_request_context
+from flask.cli import AppGroup
+
+import db_utils
+from cache_utils import (SingleFlight, cache_skips, current_generations, generation_stamp, note_cached_read,
+                         skipped_since)
+
+logger = logging.getLogger(__name__)
+
+# 小于此大小的响应不生成gzip副本
+GZIP_MIN_SIZE = 512
+
+
+class Materializer:
+    """按源表代数维护前端API的预生成响应"""
+
+    def __init__(self):
+        # 路径 -> 依赖的表
+        self._endpoints = {}
+        # 表 -> 依赖该表的路径
+        self._dependents = {}
+        # 进程内副本：路径 -> (代数版本, mimetype, 响应体, gzip响应体)
+        self._payloads = {}
+        self._lock = threading.Lock()
+        self._flights = SingleFlight()
+        self.served = 0
+        self.rebuilds = 0
+        self.errors = 0
+
+    def register(self, path, tables):
+        """
+        登记一个预生成的GET端点
+
+        视图不能依赖查询参数和会话（预生成的响应对所有请求相同）。
+        """
+        self._endpoints[path] = frozenset(tables)
+        for table in tables:
+            self._dependents.setdefault(table, set()).add(path)
+
+    def init_app(self, app):
+        """注册请求钩子和命令行（应在 ETag 钩子之后注册，304 优先于预生成响应）"""
+        enabled = app.config.get('MATERIALIZE_ENABLED', os.environ.get('MATERIALIZE_ENABLED', '1'))
+        app.cli.add_command(materialize_cli)
+        if str(enabled).lower() in ('0', 'false', 'no', 'off'):
+            return
+        app.extensions['materializer'] = self
+        app.before_request(self._serve)
+        app.after_request(self._rebuild_pending)
+        db_utils.add_write_listener(self._on_write)
+
+    # ============ 生成 ============
+
+    def _render(self, path):
+        """
+        在当前请求上下文中调用视图
+
+        Returns:
+            tuple: (状态码, mimetype, 响应体, 是否为兜底数据)；视图捕获异常后调用了 skip_cache 即为兜底数据
+        """
+        adapter = current_app.url_map.bind('localhost')
+        endpoint, view_args = adapter.match(path, method='GET')
+        mark = cache_skips()
+        response = current_app.make_response(current_app.view_functions[endpoint](**view_args))
+        return response.status_code, response.mimetype, response.get_data(), skipped_since(mark)
+
+    def build(self, path, generations=None):
+        """
+        重新生成一个端点的响应并保存
+
+        Returns:
+            tuple: (代数版本, mimetype, 响应体, gzip响应体)；视图未返回200或返回了兜底数据时为 None
+        """
+        if generations is None:
+            with db_utils.get_db() as conn:
+                generations = db_utils.get_table_generations(conn)
+        stamp = generation_stamp(self._endpoints[path], generations)
+        status, mimetype, body, fallback = self._render(path)
+        if status != 200:
+            logger.warning(f"预生成 {path} 失败，状态码 {status}")
+            return None
+        if fallback:
+            logger.warning(f"预生成 {path} 时视图返回了兜底数据，不保存")
+            return None
+        gzip_body = gzip.compress(body, compresslevel=6) if len(body) >= GZIP_MIN_SIZE else None
+        payload = (stamp, mimetype, body, gzip_body)
+
+        try:
+            with db_utils.get_db() as conn:
+                conn.execute('''
+                    INSERT OR REPLACE INTO materialized_payloads (path, stamp, mimetype, body, gzip_body, built_at)
+                    VALUES (?, ?, ?, ?, ?, CURRENT_TIMESTAMP)
+                ''', (path, stamp, mimetype, body, gzip_body))
+                conn.commit()
+        except sqlite3.Error as e:
+            # 只读部署时只保留进程内副本
+            with self._lock:
+                self.errors += 1
+            logger.warning(f"保存预生成响应 {path} 失败: {e}")
+
+        with self._lock:
+            self._payloads[path] = payload
+            self.rebuilds += 1
+        return payload
+
+    def _load(self, path, stamp):
+        """取代数版本一致的响应：进程内副本 -> materialized_payloads 表 -> 重新生成"""
+        payload = self._payloads.get(path)
+        if payload is not None and payload[0] == stamp:
+            return payload
+
+        with db_utils.get_db() as conn:
+            try:
+                row = conn.execute(
+                    'SELECT stamp, mimetype, body, gzip_body FROM materialized_payloads WHERE path = ?', (path,)
+                ).fetchone()
+            except sqlite3.OperationalError:
+                # 数据库尚未迁移
+                row = None
+        if row is not None and row['stamp'] == stamp:
+            payload = (row['stamp'], row['mimetype'], bytes(row['body']),
+                       bytes(row['gzip_body']) if row['gzip_body'] is not None else None)
+            with self._lock:
+                self._payloads[path] = payload
+            return payload
+
+        payload, _ = self._flights.do(('materialize', path), lambda: self.build(path))
+        return payload
+
+    # ============ 请求钩子 ============
+
+    def _serve(self):
+        if request.method not in ('GET', 'HEAD') or request.path not in self._endpoints:
+            return None
+        tables = self._endpoints[request.path]
+        generations = current_generations()
+        if not generations:
+            return None
+        try:
+            payload = self._load(request.path, generation_stamp(tables, generations))
+        except Exception as e:
+            logger.exception(f"读取预生成响应 {request.path} 失败，改为执行视图: {e}")
+            return None
+        if payload is None:
+            return None
+
+        _, mimetype, body, gzip_body = payload
+        note_cached_read(tables)
+        if gzip_body is not None and 'gzip' in request.accept_encodings:
+            response = current_app.response_class(gzip_body, mimetype=mimetype)
+            response.headers['Content-Encoding'] = 'gzip'
+        else:
+            response = current_app.response_class(body, mimetype=mimetype)
+        response.vary.add('Accept-Encoding')
+        response.headers['X-Materialized'] = '1'
+        with self._lock:
+            self.served += 1
+        return response
+
+    def _on_write(self, tables):
+        if not has_request_context():
+            # 脚本中的写入由之后的首次请求按代数重新生成
+            return
+        paths = set()
+        for table in tables:
+            paths.update(self._dependents.get(table, ()))
+        if paths:
+            pending = g.get('_materialize_pending')
+            if pending is None:
+                pending = g._materialize_pending = set()
+            pending.update(paths)
+
+    def _rebuild_pending(self, response):
+        """写请求结束时重新生成受影响的端点，之后的读请求直接命中"""
+        pending = g.pop('_materialize_pending', None)
+        if not pending:
+            return response
+        with db_utils.get_db() as conn:
+            generations = db_utils.get_table_generations(conn)
+        for path in sorted(pending):
+            try:
+                self.build(path, generations)
+            except Exception as e:
+                with self._lock:
+                    self.errors += 1
+                logger.exception(f"重新生成 {path} 失败: {e}")
+        return response
+
+    # ============ 检查与统计 ============
+
+    def check(self):
+        """
+        检查已保存的响应是否与源表代数一致
+
+        Returns:
+            dict: 路径 -> 'fresh' | 'stale' | 'missing'
+        """
+        with db_utils.get_db() as conn:
+            generations = db_utils.get_table_generations(conn)
+            try:
+                stored = dict(conn.execute('SELECT path, stamp FROM materialized_payloads').fetchall())
+            except sqlite3.OperationalError:
+                stored = {}
+        result = {}
+        for path, tables in sorted(self._endpoints.items()):
+            if path not in stored:
+                result[path] = 'missing'
+            elif stored[path] != generation_stamp(tables, generations):
+                result[path] = 'stale'
+            else:
+                result[path] = 'fresh'
+        return result
+
+    def stats(self):
+        with self._lock:
+            return {
+                'served': self.served,
+                'rebuilds': self.rebuilds,
+                'errors': self.errors,
+                'endpoints': {path: sorted(tables) for path, tables in sorted(self._endpoints.items())},
+            }
+
+
+materializer = Materializer()
+
+materializer.register('/api/frontend/advisors', ['advisors'])
+materializer.register('/api/frontend/papers', ['papers'])
+materializer.register('/api/frontend/activities', ['notifications'])
+materializer.register('/api/frontend/innovation-projects', ['innovation_projects'])
+materializer.register('/api/frontend/algorithms', ['algorithms'])
+materializer.register('/api/frontend/algorithm-awards', ['algorithm_awards'])
+materializer.register('/api/frontend/project-overview', ['project_overview'])
+materializer.register('/api/innovation/frontend/stats', ['innovation_stats'])
+materializer.register('/api/innovation/frontend/achievements', ['achievements'])
+materializer.register('/api/innovation/frontend/carousel', ['innovation_carousel'])
+materializer.register('/api/innovation/frontend/training-projects', ['innovation_training_projects'])
+materializer.register('/api/innovation/frontend/intellectual-properties', ['intellectual_properties'])
+materializer.register('/api/innovation/frontend/enterprise-cooperations', ['enterprise_cooperations'])
+
+
+# ============ 命令行 ============
+
+materialize_cli = AppGroup('materialize', help='预生成前端API响应')
+
+
+@materialize_cli.command('rebuild')
+@click.option('--path', 'paths', multiple=True, help='只重新生成指定路径（可重复）')
+def rebuild_command(paths):
+    """重新生成预生成响应"""
+    unknown = [path for path in paths if path not in materializer._endpoints]
+    if unknown:
+        raise click.BadParameter(f"未登记的路径: {', '.join(unknown)}", param_hint='--path')
+    for path in paths or sorted(materializer._endpoints):
+        with current_app.test_request_context(path):
+            payload = materializer.build(path)
+        if payload is None:
+            click.echo(f"❌ {path}")
+        else:
+            gzip_size = len(payload[3]) if payload[3] is not None else '-'
+            click.echo(f"✅ {path}  {len(payload[2])} B / gzip {gzip_size} B")
+
+
+@materialize_cli.command('check')
+def check_command():
+    """检查预生成响应是否过期"""
+    result = materializer.check()
+    for path, state in result.items():
+        click.echo(f"{'✅' if state == 'fresh' else '⚠️'} {state:8} {path}")
+    outdated = [path for path, state in result.items() if state != 'fresh']
+    if outdated:
+        click.echo(f"{len(outdated)} 个响应需要重新生成: flask --app app materialize rebuild")
+        raise SystemExit(1)
@@ -0,0 +1,294 @@
+"""
+请求指标工具模块
+记录每个端点的延迟直方图、响应大小和进行中请求数，
+以 Prometheus 文本格式输出；多个worker进程通过共享SQLite文件汇总
+"""
+
+import os
+import time
+import atexit
+import sqlite3
+import logging
+import tempfile
+import threading
+import uuid
+from bisect import bisect_left
+
+from flask import g, request, has_request_context
+
+logger = logging.getLogger(__name__)
+
+# 延迟直方图桶上界（秒）
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.075, 0.1, 0.25, 0.5, 0.75, 1.0, 2.5, 5.0, 10.0)
+# 进程本地指标写入共享存储的间隔（秒）
+DEFAULT_FLUSH_INTERVAL = 5.0
+
+# 指标说明：名称 -> (类型, 帮助信息)
+METRIC_HELP = {
+    'http_request_duration_seconds': ('histogram', '请求处理耗时'),
+    'http_response_size_bytes': ('summary', '响应体大小'),
+    'http_requests_in_flight': ('gauge', '正在处理的请求数'),
+}
+
+
+def get_metrics_db_path():
+    """共享指标存储路径（可通过 METRICS_DB_PATH 指定）"""
+    return os.environ.get('METRICS_DB_PATH') or os.path.join(tempfile.gettempdir(), 'acm_lab_metrics.db')
+
+
+def _format_labels(labels):
+    return ','.join(f'{key}="{value}"' for key, value in labels)
+
+
+def _pid_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+class MetricsRegistry:
+    """
+    进程内指标注册表
+
+    请求路径上只做内存累加；后台线程定期把本进程的累计值写入共享SQLite，
+    导出时汇总所有进程的数据（计数类累加，进行中请求只统计存活进程）。
+    """
+
+    def __init__(self, db_path=None, flush_interval=DEFAULT_FLUSH_INTERVAL):
+        self.db_path = db_path
+        self.flush_interval = flush_interval
+        self._lock = threading.Lock()
+        self._flusher_pid = None
+        self._reset_local()
+        if hasattr(os, 'register_at_fork'):
+            # 子进程不继承父进程的计数，避免重复汇总
+            os.register_at_fork(after_in_child=self._after_fork)
+
+    def _reset_local(self):
+        self._pid = os.getpid()
+        # 进程标识附带随机后缀，避免PID复用时覆盖已退出进程的累计值
+        self._process = f'{self._pid}-{uuid.uuid4().hex[:8]}'
+        # (endpoint, method, status) -> [各桶计数..., 总数, 耗时总和]
+        self._latency = {}
+        # (endpoint, method, status) -> [次数, 字节总和]
+        self._sizes = {}
+        self._in_flight = 0
+
+    def _after_fork(self):
+        self._lock = threading.Lock()
+        self._reset_local()
+
+    # ---- 请求钩子 ----
+
+    def init_app(self, app):
+        """注册请求钩子（应尽早调用，使其覆盖其他 before_request 提前返回的请求）"""
+        if self.db_path is None:
+            self.db_path = app.config.get('METRICS_DB_PATH') or get_metrics_db_path()
+        self.flush_interval = float(app.config.get(
+            'METRICS_FLUSH_INTERVAL',
+            os.environ.get('METRICS_FLUSH_INTERVAL', self.flush_interval)
+        ))
+        app.extensions['metrics'] = self
+        app.before_request(self._start_request)
+        app.after_request(self._finish_request)
+        app.teardown_request(self._teardown_request)
+        atexit.register(self.flush)
+
+    def _start_request(self):
+        self._ensure_flusher()
+        g._metrics_start = time.perf_counter()
+        g._metrics_recorded = False
+        with self._lock:
+            self._in_flight += 1
+
+    def _finish_request(self, response):
+        start = g.get('_metrics_start')
+        if start is not None and not g.get('_metrics_recorded'):
+            size = response.content_length
+            self.observe(
+                self._endpoint_label(), request.method, response.status_code,
+                time.perf_counter() - start, size
+            )
+            g._metrics_recorded = True
+        return response
+
+    def _teardown_request(self, exception=None):
+        start = g.pop('_metrics_start', None)
+        if start is None:
+            return
+        if not g.pop('_metrics_recorded', False):
+            # 未经过 after_request（未处理的异常），按500记录
+            self.observe(self._endpoint_label(), request.method, 500, time.perf_counter() - start, None)
+        with self._lock:
+            self._in_flight -= 1
+
+    @staticmethod
+    def _endpoint_label():
+        # 使用路由规则而非实际路径，避免 /notification/<id> 产生无限多的标签
+        if has_request_context() and request.url_rule is not None:
+            return request.url_rule.rule
+        return 'unmatched'
+
+    # ---- 记录 ----
+
+    def observe(self, endpoint, method, status_code, duration, size=None):
+        """记录一次请求的耗时和响应大小"""
+        key = (endpoint, method, f'{status_code // 100}xx')
+        index = bisect_left(LATENCY_BUCKETS, duration)
+        with self._lock:
+            series = self._latency.get(key)
+            if series is None:
+                series = self._latency[key] = [0] * (len(LATENCY_BUCKETS) + 3)
+            series[index] += 1
+            series[-2] += 1
+            series[-1] += duration
+            if size is not None:
+                sizes = self._sizes.get(key)
+                if sizes is None:
+                    sizes = self._sizes[key] = [0, 0]
+                sizes[0] += 1
+                sizes[1] += size
+
+    def _local_rows(self):
+        """把本进程的累计值展开为 (名称, 标签, 值) 行"""
+        rows = []
+        with self._lock:
+            for (endpoint, method, status), series in self._latency.items():
+                base = (('endpoint', endpoint), ('method', method), ('status', status))
+                cumulative = 0
+                for bound, count in zip(LATENCY_BUCKETS, series):
+                    cumulative += count
+                    rows.append(('http_request_duration_seconds_bucket',
+                                 _format_labels(base + (('le', repr(bound)),)), cumulative))
+                rows.append(('http_request_duration_seconds_bucket',
+                             _format_labels(base + (('le', '+Inf'),)), series[-2]))
+                rows.append(('http_request_duration_seconds_count', _format_labels(base), series[-2]))
+                rows.append(('http_request_duration_seconds_sum', _format_labels(base), series[-1]))
+            for (endpoint, method, status), (count, total) in self._sizes.items():
+                labels = _format_labels((('endpoint', endpoint), ('method', method), ('status', status)))
+                rows.append(('http_response_size_bytes_count', labels, count))
+                rows.append(('http_response_size_bytes_sum', labels, total))
+            rows.append(('http_requests_in_flight', '', self._in_flight))
+        return rows
+
+    # ---- 共享存储 ----
+
+    def _connect(self):
+        conn = sqlite3.connect(self.db_path or get_metrics_db_path(), timeout=5)
+        conn.execute('''
+            CREATE TABLE IF NOT EXISTS metric_samples (
+                process TEXT NOT NULL,
+                pid INTEGER NOT NULL,
+                name TEXT NOT NULL,
+                labels TEXT NOT NULL,
+                value REAL NOT NULL,
+                updated_at REAL NOT NULL,
+                PRIMARY KEY (process, name, labels)
+            )
+        ''')
+        return conn
+
+    def flush(self):
+        """把本进程的累计值写入共享存储"""
+        rows = self._local_rows()
+        now = time.time()
+        try:
+            conn = self._connect()
+            try:
+                with conn:
+                    conn.executemany(
+                        'INSERT OR REPLACE INTO metric_samples (process, pid, name, labels, value, updated_at) '
+                        'VALUES (?, ?, ?, ?, ?, ?)',
+                        [(self._process, self._pid, name, labels, value, now) for name, labels, value in rows]
+                    )
+            finally:
+                conn.close()
+        except sqlite3.Error as e:
+            logger.warning(f"写入共享指标失败: {e}")
+
+    def _ensure_flusher(self):
+        if self._flusher_pid == os.getpid():
+            return
+        with self._lock:
+            if self._flusher_pid == os.getpid():
+                return
+            self._flusher_pid = os.getpid()
+        thread = threading.Thread(target=self._flush_loop, name='metrics-flusher', daemon=True)
+        thread.start()
+
+    def _flush_loop(self):
+        pid = os.getpid()
+        while self._flusher_pid == pid:
+            time.sleep(self.flush_interval)
+            self.flush()
+
+    # ---- 导出 ----
+
+    def collect(self):
+        """汇总所有进程的指标，返回 {(名称, 标签): 值}"""
+        self.flush()
+        totals = {}
+        conn = self._connect()
+        try:
+            rows = conn.execute('SELECT pid, name, labels, value FROM metric_samples').fetchall()
+            alive = {}
+            dead = []
+            for pid, name, labels, value in rows:
+                if name == 'http_requests_in_flight':
+                    # 进行中请求数只统计存活的进程
+                    if pid not in alive:
+                        alive[pid] = _pid_alive(pid)
+                    if not alive[pid]:
+                        dead.append(pid)
+                        continue
+                totals[(name, labels)] = totals.get((name, labels), 0) + value
+            if dead:
+                with conn:
+                    conn.executemany(
+                        "DELETE FROM metric_samples WHERE pid = ? AND name = 'http_requests_in_flight'",
+                        [(pid,) for pid in set(dead)]
+                    )
+        finally:
+            conn.close()
+        return totals
+
+    def render(self):
+        """输出 Prometheus 文本格式"""
+        totals = self.collect()
+        lines = []
+        for family, (metric_type, help_text) in METRIC_HELP.items():
+            lines.append(f'# HELP {family} {help_text}')
+            lines.append(f'# TYPE {family} {metric_type}')
+            samples = sorted(
+                (name, labels, value) for (name, labels), value in totals.items()
+                if name == family or name.startswith(family + '_')
+            )
+            if family == 'http_request_duration_seconds':
+                # 同一序列的桶按上界排序输出
+                samples.sort(key=lambda item: (item[0] != family + '_bucket', _series_key(item[1]), item[0]))
+            for name, labels, value in samples:
+                value_text = repr(float(value)) if isinstance(value, float) and not value.is_integer() else str(int(value))
+                lines.append(f'{name}{{{labels}}} {value_text}' if labels else f'{name} {value_text}')
+        lines.append('')
+        return '\n'.join(lines)
+
+
+def _series_key(labels):
+    """桶排序键：去掉 le 后的标签 + le 数值"""
+    parts = labels.split(',')
+    le = float('inf')
+    rest = []
+    for part in parts:
+        if part.startswith('le='):
+            value = part[4:-1]
+            le = float('inf') if value == '+Inf' else float(value)
+        else:
+            rest.append(part)
+    return (','.join(rest), le)
+
+
+metrics = MetricsRegistry()
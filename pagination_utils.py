@@ -0,0 +1,212 @@
+"""
+游标分页工具模块
+列表API按各自的排序键（如 sort_order/order_index、created_at，末尾补 id 保证顺序唯一）做键集分页：
+下一页从上一页最后一行的排序键之后开始查找，不使用 OFFSET，翻到多深都只读取一页的行。
+
+请求带 limit 或 cursor 参数时返回统一的分页格式，否则保持原来的完整列表响应:
+    {"success": true, "data": [...],
+     "page": {"limit": 20, "next_cursor": "...", "has_more": true, "total": 135}}
+
+cursor 为不透明字符串（排序键值的编码），客户端原样传回即可；total 仅在 total=1 时返回，
+来自按表修改代数缓存的计数，表被写入后的首次重新计数期间可能返回旧值。
+"""
+
+import json
+import base64
+import hashlib
+import threading
+
+from flask import abort, jsonify, make_response, request
+
+import db_utils
+from cache_utils import cached
+
+DEFAULT_LIMIT = 20
+MAX_LIMIT = 100
+# 分页查询中附加的排序键列的别名前缀
+_KEY_PREFIX = '_page_key'
+
+# 表名 -> 带缓存的计数函数
+_counters = {}
+_counters_lock = threading.Lock()
+
+
+class PageRequest:
+    """一次分页请求：每页条数、游标中的排序键值（第一页为 None）、是否返回总数"""
+
+    __slots__ = ('limit', 'after', 'with_total')
+
+    def __init__(self, limit, after=None, with_total=False):
+        self.limit = limit
+        self.after = after
+        self.with_total = with_total
+
+
+def _bad_request(message):
+    abort(make_response(jsonify({"error": message}), 400))
+
+
+def _order_signature(table, order):
+    """排序方式的短摘要，写入游标中，拒绝其他列表的游标"""
+    spec = table + '|' + ','.join(f'{expression} {direction}' for expression, direction in order)
+    return hashlib.sha1(spec.encode('utf-8')).hexdigest()[:8]
+
+
+def encode_cursor(table, order, values):
+    data = json.dumps([_order_signature(table, order)] + list(values), ensure_ascii=False, separators=(',', ':'))
+    return base64.urlsafe_b64encode(data.encode('utf-8')).decode('ascii').rstrip('=')
+
+
+def decode_cursor(table, order, cursor):
+    """解析游标，返回排序键值列表（末尾为 id）；无效或不属于该列表时返回 None"""
+    try:
+        data = json.loads(base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)).decode('utf-8'))
+    except (ValueError, UnicodeDecodeError):
+        return None
+    if not isinstance(data, list) or len(data) != len(order) + 2 or data[0] != _order_signature(table, order):
+        return None
+    values = data[1:]
+    if not all(value is None or isinstance(value, (str, int, float)) for value in values):
+        return None
+    return values
+
+
+def page_request(table, order, default_limit=DEFAULT_LIMIT, max_limit=MAX_LIMIT):
+    """
+    从查询参数读取分页请求；没有 limit 和 cursor 参数时返回 None（返回完整列表）
+
+    table/order 与之后 fetch_page 的参数相同，用于校验游标。
+    参数无效时直接以 400 结束请求，应在视图的 try 块之外调用。
+    """
+    if 'limit' not in request.args and 'cursor' not in request.args:
+        return None
+    try:
+        limit = int(request.args.get('limit', default_limit))
+    except ValueError:
+        _bad_request("limit 必须为整数")
+    if not 1 <= limit <= max_limit:
+        _bad_request(f"limit 应在 1-{max_limit} 之间")
+    with_total = request.args.get('total', '').lower() in ('1', 'true', 'yes')
+    after = None
+    cursor = request.args.get('cursor')
+    if cursor:
+        after = decode_cursor(table, order, cursor)
+        if after is None:
+            _bad_request("无效的分页游标")
+    return PageRequest(limit, after, with_total)
+
+
+def _after_clause(order, values):
+    """排在游标之后的行的条件：按排序键逐级比较，NULL 与 SQLite 排序一致（升序在前、降序在后）"""
+    alternatives = []
+    params = []
+    for position, (expression, direction) in enumerate(order):
+        value = values[position]
+        terms = [f'{previous} IS ?' for previous, _ in order[:position]]
+        term_params = list(values[:position])
+        if direction == 'DESC':
+            if value is None:
+                # 降序时 NULL 排在最后，同一级别之后没有更多的行
+                continue
+            terms.append(f'({expression} < ? OR {expression} IS NULL)')
+            term_params.append(value)
+        elif value is None:
+            terms.append(f'{expression} IS NOT NULL')
+        else:
+            terms.append(f'{expression} > ?')
+            term_params.append(value)
+        alternatives.append(' AND '.join(terms))
+        params.extend(term_params)
+
+    clause = '(' + ' OR '.join(f'({alternative})' for alternative in alternatives) + ')' if alternatives else '0'
+    # 第一个排序键的范围条件，让索引直接定位到游标位置而不是从头扫描
+    expression, direction = order[0]
+    if direction == 'ASC' and values[0] is not None:
+        clause = f'{expression} >= ? AND {clause}'
+        params.insert(0, values[0])
+    return clause, params
+
+
+def fetch_page(conn, page, table, order, where='', params=(), columns='*'):
+    """
+    查询列表的全部行（page 为 None）或一页
+
+    Args:
+        page: page_request() 的返回值
+        order: 排序键 [(表达式, 'ASC' | 'DESC')]，末尾自动补 id 升序保证顺序唯一；
+               应与表上的排序索引一致
+        where: 过滤条件（不含 WHERE 关键字），params 为其参数
+
+    Returns:
+        tuple: (行列表, 分页信息)；返回全部行时分页信息为 None。
+               分页时的行为字典（按列名访问与完整列表的行相同）
+    """
+    order = list(order) + [('id', 'ASC')]
+    order_by = ', '.join(f'{expression} {direction}' for expression, direction in order)
+    conditions = [where] if where else []
+    query_params = list(params)
+
+    if page is None:
+        sql = f"SELECT {columns} FROM {table}{' WHERE ' + where if where else ''} ORDER BY {order_by}"
+        return conn.execute(sql, query_params).fetchall(), None
+
+    if page.after is not None:
+        clause, clause_params = _after_clause(order, page.after)
+        conditions.append(clause)
+        query_params.extend(clause_params)
+
+    # 排序键可能是表达式，作为附加列一并查出，用最后一行的键值生成游标
+    key_columns = ', '.join(f'{expression} AS {_KEY_PREFIX}{position}' for position, (expression, _) in enumerate(order))
+    sql = f"SELECT {columns}, {key_columns} FROM {table}"
+    if conditions:
+        sql += ' WHERE ' + ' AND '.join(f'({condition})' for condition in conditions)
+    sql += f' ORDER BY {order_by} LIMIT ?'
+    rows = conn.execute(sql, query_params + [page.limit + 1]).fetchall()
+
+    has_more = len(rows) > page.limit
+    rows = rows[:page.limit]
+    next_cursor = None
+    if has_more:
+        next_cursor = encode_cursor(table, order[:-1], tuple(rows[-1][-len(order):]))
+    rows = _without_keys(rows, len(order))
+
+    info = {'limit': page.limit, 'next_cursor': next_cursor, 'has_more': has_more}
+    if page.with_total:
+        info['total'] = count_rows(table, where, tuple(params))
+    return rows, info
+
+
+def _without_keys(rows, count):
+    """去掉附加的排序键列，返回与完整列表相同字段的字典"""
+    if not rows:
+        return []
+    names = rows[0].keys()[:-count]
+    return [dict(zip(names, tuple(row)[:-count])) for row in rows]
+
+
+def count_rows(table, where='', params=()):
+    """表（或过滤后）的行数，按表修改代数缓存"""
+    counter = _counters.get(table)
+    if counter is None:
+        with _counters_lock:
+            counter = _counters.get(table)
+            if counter is None:
+                counter = _counters[table] = _make_counter(table)
+    return counter(where, params)
+
+
+def _make_counter(table):
+    def count(where, params):
+        with db_utils.get_db() as conn:
+            sql = f"SELECT COUNT(*) FROM {table}{' WHERE ' + where if where else ''}"
+            return conn.execute(sql, params).fetchone()[0]
+
+    count.__qualname__ = f'count_rows.{table}'
+    return cached(tables=[table], maxsize=32, stale_while_revalidate=True)(count)
+
+
+def page_response(items, info):
+    """分页时返回统一格式，否则返回原来的列表"""
+    if info is None:
+        return jsonify(items)
+    return jsonify({"success": True, "data": items, "page": info})
@@ -0,0 +1,182 @@
+"""
+SQL分析工具模块
+按请求记录每条SQL的规范化语句、耗时和行数，检测N+1查询，
+输出 Server-Timing 响应头，并按端点汇总供 /debug/queries 查看
+"""
+
+import os
+import re
+import threading
+import time
+import logging
+from collections import deque
+from functools import lru_cache
+
+from flask import g, request, has_request_context
+
+import db_utils
+
+logger = logging.getLogger(__name__)
+
+# 同一请求内同一语句形态执行次数达到该值即视为N+1
+DEFAULT_N_PLUS_ONE_THRESHOLD = 5
+# 保留最近的N+1事件数量
+RECENT_INCIDENTS = 50
+
+_STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_LITERAL = re.compile(r'\b\d+(?:\.\d+)?\b')
+_IN_LIST = re.compile(r'\bIN\s*\(\s*\?(?:\s*,\s*\?)*\s*\)', re.IGNORECASE)
+_WHITESPACE = re.compile(r'\s+')
+
+
+@lru_cache(maxsize=1024)
+def normalize_sql(sql):
+    """把SQL规范化为语句形态：合并空白，字面量替换为?，IN列表折叠"""
+    shape = _STRING_LITERAL.sub('?', sql)
+    shape = _NUMBER_LITERAL.sub('?', shape)
+    shape = _WHITESPACE.sub(' ', shape).strip()
+    return _IN_LIST.sub('IN (...)', shape)
+
+
+class QueryProfiler:
+    """请求级SQL分析器，同时维护按端点的汇总统计"""
+
+    def __init__(self, threshold=DEFAULT_N_PLUS_ONE_THRESHOLD):
+        self.threshold = threshold
+        self._lock = threading.Lock()
+        self._endpoints = {}
+        self._incidents = deque(maxlen=RECENT_INCIDENTS)
+
+    def init_app(self, app):
+        """注册请求钩子和语句观察者"""
+        self.threshold = int(app.config.get(
+            'SQL_N_PLUS_ONE_THRESHOLD',
+            os.environ.get('SQL_N_PLUS_ONE_THRESHOLD', self.threshold)
+        ))
+        app.extensions['query_profiler'] = self
+        app.before_request(self._start_request)
+        app.after_request(self._finish_request)
+        db_utils.add_statement_observer(self._record_statement)
+
+    def _start_request(self):
+        g._sql_trace = []
+        g._sql_trace_start = time.perf_counter()
+
+    def _record_statement(self, conn, record):
+        if has_request_context():
+            trace = g.get('_sql_trace')
+            if trace is not None:
+                trace.append(record)
+
+    def _finish_request(self, response):
+        trace = g.pop('_sql_trace', None)
+        if trace is None:
+            return response
+
+        total_ms = (time.perf_counter() - g.pop('_sql_trace_start')) * 1000
+        db_ms = sum(record['duration'] for record in trace) * 1000
+
+        # 按语句形态分组
+        shapes = {}
+        for record in trace:
+            shape = normalize_sql(record['sql'])
+            entry = shapes.setdefault(shape, {'count': 0, 'duration': 0.0, 'rows': 0})
+            entry['count'] += 1
+            entry['duration'] += record['duration']
+            entry['rows'] += record['rows']
+
+        endpoint = request.url_rule.rule if request.url_rule else request.path
+        endpoint = f"{request.method} {endpoint}"
+        repeated = {shape: entry for shape, entry in shapes.items() if entry['count'] >= self.threshold}
+        if repeated:
+            for shape, entry in repeated.items():
+                logger.warning(f"检测到N+1查询 {endpoint}: 同一语句执行 {entry['count']} 次: {shape}")
+
+        self._aggregate(endpoint, len(trace), db_ms, total_ms, shapes, repeated)
+
+        response.headers.add(
+            'Server-Timing',
+            f'db;desc="SQLite {len(trace)} queries";dur={db_ms:.2f}'
+        )
+        response.headers.add('Server-Timing', f'app;dur={total_ms:.2f}')
+        return response
+
+    def _aggregate(self, endpoint, query_count, db_ms, total_ms, shapes, repeated):
+        with self._lock:
+            stats = self._endpoints.get(endpoint)
+            if stats is None:
+                stats = self._endpoints[endpoint] = {
+                    'endpoint': endpoint,
+                    'requests': 0,
+                    'queries': 0,
+                    'db_ms': 0.0,
+                    'max_db_ms': 0.0,
+                    'total_ms': 0.0,
+                    'n_plus_one_requests': 0,
+                    'shapes': {},
+                }
+            stats['requests'] += 1
+            stats['queries'] += query_count
+            stats['db_ms'] += db_ms
+            stats['total_ms'] += total_ms
+            stats['max_db_ms'] = max(stats['max_db_ms'], db_ms)
+            for shape, entry in shapes.items():
+                shape_stats = stats['shapes'].setdefault(shape, {'count': 0, 'duration_ms': 0.0, 'rows': 0})
+                shape_stats['count'] += entry['count']
+                shape_stats['duration_ms'] += entry['duration'] * 1000
+                shape_stats['rows'] += entry['rows']
+            if repeated:
+                stats['n_plus_one_requests'] += 1
+                self._incidents.append({
+                    'endpoint': endpoint,
+                    'time': time.strftime('%Y-%m-%d %H:%M:%S'),
+                    'statements': [
+                        {'sql': shape, 'count': entry['count']}
+                        for shape, entry in repeated.items()
+                    ],
+                })
+
+    def report(self, limit=20):
+        """按平均数据库耗时排序的端点汇总和最近的N+1事件"""
+        with self._lock:
+            endpoints = []
+            for stats in self._endpoints.values():
+                requests = stats['requests']
+                top_shapes = sorted(
+                    stats['shapes'].items(), key=lambda item: item[1]['duration_ms'], reverse=True
+                )[:5]
+                endpoints.append({
+                    'endpoint': stats['endpoint'],
+                    'requests': requests,
+                    'avg_queries': round(stats['queries'] / requests, 2),
+                    'avg_db_ms': round(stats['db_ms'] / requests, 3),
+                    'max_db_ms': round(stats['max_db_ms'], 3),
+                    'avg_total_ms': round(stats['total_ms'] / requests, 3),
+                    'n_plus_one_requests': stats['n_plus_one_requests'],
+                    'top_statements': [
+                        {
+                            'sql': shape,
+                            'count': entry['count'],
+                            'duration_ms': round(entry['duration_ms'], 3),
+                            'rows': entry['rows'],
+                        }
+                        for shape, entry in top_shapes
+                    ],
+                })
+            incidents = list(self._incidents)
+
+        endpoints.sort(key=lambda item: item['avg_db_ms'], reverse=True)
+        return {
+            'threshold': self.threshold,
+            'endpoints': endpoints[:limit],
+            'n_plus_one_incidents': incidents[::-1],
+        }
+
+    def reset(self):
+        """清空汇总统计"""
+        with self._lock:
+            self._endpoints.clear()
+            self._incidents.clear()
+
+
+query_profiler = QueryProfiler()
@@ -0,0 +1,390 @@
+"""
+全文搜索工具模块
+基于 SQLite FTS5 的站内搜索，覆盖通知、论文、算法和研究领域
+
+中文没有空格分词，写入索引前把连续的中日韩字符展开为相邻二元组（"动态规划" -> "动态 态规 规划 划"），
+其余文本交给 unicode61 分词器；查询时中文词按二元组短语匹配，单个汉字按前缀匹配。
+
+源表上的触发器只把变更行的 (类型, ID) 记入 search_pending，由 sync() 增量地重新写入这些行，
+搜索前也会先处理积压的变更，因此索引不会落后于源表。重建索引同样只是把全部行记为待处理，分批提交。
+
+命令行:
+    flask --app app search sync      # 处理积压的变更
+    flask --app app search rebuild   # 全部重新索引（分批提交，期间搜索可用）
+"""
+
+import re
+import html
+import logging
+import sqlite3
+
+import click
+from flask.cli import AppGroup
+
+import db_utils
+from job_utils import job_queue
+
+logger = logging.getLogger(__name__)
+
+# 可搜索的内容：类型 -> 源表、标题列、正文列、可见条件、页面地址
+# watch 为会影响索引内容的列（只改浏览量等其他列的UPDATE不触发重新索引）
+SEARCH_SOURCES = {
+    'notification': {
+        'code': 1,
+        'table': 'notifications',
+        'title': 'title',
+        'body': ('excerpt', 'raw_content'),
+        'where': "status = 'published'",
+        'watch': ('title', 'excerpt', 'raw_content', 'status'),
+        'url': '/notification/{id}',
+    },
+    'paper': {
+        'code': 2,
+        'table': 'papers',
+        'title': 'title',
+        'body': ('authors', 'journal', 'abstract'),
+        'where': None,
+        'watch': ('title', 'authors', 'journal', 'abstract'),
+        'url': '/paper',
+    },
+    'algorithm': {
+        'code': 3,
+        'table': 'algorithms',
+        'title': 'title',
+        'body': ('description', 'code_preview'),
+        'where': "status = 'active'",
+        'watch': ('title', 'description', 'code_preview', 'status'),
+        'url': '/algorithm',
+    },
+    'research_area': {
+        'code': 4,
+        'table': 'research_areas',
+        'title': 'title',
+        'body': ('category', 'description'),
+        'where': None,
+        'watch': ('title', 'category', 'description'),
+        'url': '/team',
+    },
+}
+
+# 索引行的 rowid = 源行ID × 8 + 类型编号，按源行定位索引行时不需要额外的映射表
+_KIND_BITS = 3
+_KINDS_BY_CODE = {source['code']: kind for kind, source in SEARCH_SOURCES.items()}
+
+# 标题列的 bm25 权重（正文为 1）
+TITLE_WEIGHT = 10.0
+SYNC_BATCH_SIZE = 500
+SNIPPET_WIDTH = 80
+MAX_QUERY_TERMS = 8
+
+_CJK_RUN = re.compile(r'[㐀-䶿一-鿿豈-﫿]+')
+# 中日韩字符与字母数字分开成词，与 tokenize() 的切分一致（"C语言" -> "C"、"语言"）
+_QUERY_TERM = re.compile(r'[㐀-䶿一-鿿豈-﫿]+|[^\W_㐀-䶿一-鿿豈-﫿]+')
+_HTML_TAG = re.compile(r'<[^>]+>')
+_WHITESPACE = re.compile(r'\s+')
+
+
+def _rowid(kind, ref_id):
+    return (ref_id << _KIND_BITS) | SEARCH_SOURCES[kind]['code']
+
+
+def _expand_cjk(match):
+    run = match.group(0)
+    if len(run) == 1:
+        return f' {run} '
+    # 末字单独再出现一次，使单字前缀查询也能匹配到词尾的字
+    return ' ' + ' '.join(run[i:i + 2] for i in range(len(run) - 1)) + f' {run[-1]} '
+
+
+def tokenize(text):
+    """把文本转换为索引用的形式：中日韩字符展开为二元组，其余保持不变"""
+    return _CJK_RUN.sub(_expand_cjk, text or '')
+
+
+def parse_query(query):
+    """
+    把用户输入转换为 FTS5 查询表达式
+
+    Returns:
+        tuple: (MATCH 表达式或 None, 用于高亮的原始词列表)
+    """
+    terms = _QUERY_TERM.findall(query or '')[:MAX_QUERY_TERMS]
+    clauses = []
+    for term in terms:
+        if _CJK_RUN.fullmatch(term) and len(term) > 1:
+            # 二元组按顺序相邻，等价于原文中的连续子串
+            clauses.append('"' + ' '.join(term[i:i + 2] for i in range(len(term) - 1)) + '"')
+        else:
+            clauses.append(f'"{term}"*')
+    return (' '.join(clauses) or None), terms
+
+
+def plain_text(text):
+    """去掉HTML标签并合并空白"""
+    return _WHITESPACE.sub(' ', _HTML_TAG.sub(' ', text or '')).strip()
+
+
+def highlight(text, terms, width=None):
+    """
+    转义文本并用 <mark> 标出查询词
+
+    Args:
+        width: 截取匹配位置附近的字符数，None 时不截取
+    """
+    text = plain_text(text)
+    pattern = re.compile('|'.join(re.escape(term) for term in sorted(terms, key=len, reverse=True)), re.IGNORECASE) \
+        if terms else None
+    if width is not None and len(text) > width:
+        match = pattern.search(text) if pattern else None
+        start = max(0, match.start() - width // 3) if match else 0
+        segment = text[start:start + width]
+        prefix = '…' if start > 0 else ''
+        suffix = '…' if start + width < len(text) else ''
+    else:
+        segment, prefix, suffix = text, '', ''
+
+    if pattern is None:
+        return prefix + html.escape(segment) + suffix
+    parts = []
+    position = 0
+    for match in pattern.finditer(segment):
+        parts.append(html.escape(segment[position:match.start()]))
+        parts.append(f'<mark>{html.escape(match.group(0))}</mark>')
+        position = match.end()
+    parts.append(html.escape(segment[position:]))
+    return prefix + ''.join(parts) + suffix
+
+
+# ============ 索引结构 ============
+
+def create_search_schema(conn):
+    """创建索引表、待处理表及源表触发器（由数据库迁移调用），FTS5 不可用时返回 False"""
+    try:
+        conn.execute('''
+            CREATE VIRTUAL TABLE IF NOT EXISTS search_index USING fts5(
+                kind UNINDEXED, title, body, tokenize = 'unicode61 remove_diacritics 2'
+            )
+        ''')
+    except sqlite3.OperationalError as e:
+        logger.warning(f"⚠️ SQLite 未启用 FTS5，站内搜索不可用: {e}")
+        return False
+    # 默认排序：bm25 相关度，标题列权重更高（ORDER BY rank 由 FTS5 内部排序，不需要临时B树）
+    conn.execute(
+        "INSERT INTO search_index (search_index, rank) VALUES ('rank', ?)", (f'bm25(0.0, {TITLE_WEIGHT}, 1.0)',)
+    )
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS search_pending (
+            kind TEXT NOT NULL,
+            ref_id INTEGER NOT NULL,
+            PRIMARY KEY (kind, ref_id)
+        ) WITHOUT ROWID
+    ''')
+    for kind, source in SEARCH_SOURCES.items():
+        table = source['table']
+        enqueue = f"INSERT OR IGNORE INTO search_pending (kind, ref_id) VALUES ('{kind}', {{}}.id);"
+        for event, clause, row in (
+            ('insert', 'INSERT', 'NEW'),
+            ('update', f"UPDATE OF {', '.join(source['watch'])}", 'NEW'),
+            ('delete', 'DELETE', 'OLD'),
+        ):
+            trigger = f'trg_{table}_search_{event}'
+            conn.execute(f'DROP TRIGGER IF EXISTS {trigger}')
+            conn.execute(f'CREATE TRIGGER {trigger} AFTER {clause} ON {table} BEGIN {enqueue.format(row)} END')
+        # 已有的行全部待索引
+        conn.execute(f"INSERT OR IGNORE INTO search_pending (kind, ref_id) SELECT '{kind}', id FROM {table}")
+    return True
+
+
+def is_available(conn):
+    """数据库中是否已建立搜索索引（FTS5 不可用或尚未迁移时为 False）"""
+    return conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'search_index'"
+    ).fetchone() is not None
+
+
+# ============ 增量同步 ============
+
+def _index_rows(conn, kind, ids):
+    """重新写入一种类型的若干行（不可见或已删除的行只删除索引）"""
+    source = SEARCH_SOURCES.get(kind)
+    if source is None:
+        return
+    conn.executemany('DELETE FROM search_index WHERE rowid = ?', [(_rowid(kind, ref_id),) for ref_id in ids])
+    columns = ', '.join((source['title'],) + source['body'])
+    where = f"id IN ({', '.join('?' * len(ids))})"
+    if source['where']:
+        where += f" AND {source['where']}"
+    rows = conn.execute(f"SELECT id, {columns} FROM {source['table']} WHERE {where}", ids).fetchall()
+    conn.executemany('INSERT INTO search_index (rowid, kind, title, body) VALUES (?, ?, ?, ?)', [
+        (
+            _rowid(kind, row['id']),
+            kind,
+            tokenize(plain_text(row[source['title']])),
+            tokenize('\n'.join(plain_text(row[column]) for column in source['body'] if row[column])),
+        )
+        for row in rows
+    ])
+
+
+def has_pending(conn):
+    """是否有待索引的变更（只读查询）"""
+    return conn.execute('SELECT 1 FROM search_pending LIMIT 1').fetchone() is not None
+
+
+def sync(limit=None):
+    """
+    把 search_pending 中记录的变更行重新写入索引（每批一个事务）
+
+    Args:
+        limit: 最多处理的行数，None 时处理全部
+
+    Returns:
+        int: 处理的行数
+    """
+    processed = 0
+    with db_utils.get_db() as conn:
+        while limit is None or processed < limit:
+            # 先在事务外确认有积压：没有变更时（绝大多数搜索请求）不获取写锁
+            if not has_pending(conn):
+                break
+            batch_size = SYNC_BATCH_SIZE if limit is None else min(SYNC_BATCH_SIZE, limit - processed)
+            if not conn.in_transaction:
+                conn.execute('BEGIN IMMEDIATE')
+            try:
+                pending = conn.execute(
+                    'SELECT kind, ref_id FROM search_pending LIMIT ?', (batch_size,)
+                ).fetchall()
+                if not pending:
+                    conn.commit()
+                    break
+                by_kind = {}
+                for row in pending:
+                    by_kind.setdefault(row['kind'], []).append(row['ref_id'])
+                for kind, ids in by_kind.items():
+                    _index_rows(conn, kind, ids)
+                conn.executemany('DELETE FROM search_pending WHERE kind = ? AND ref_id = ?',
+                                 [(row['kind'], row['ref_id']) for row in pending])
+                conn.commit()
+            except Exception:
+                conn.rollback()
+                raise
+            processed += len(pending)
+    if processed:
+        logger.info(f"搜索索引已更新 {processed} 行")
+    return processed
+
+
+def mark_all():
+    """把全部源行及现有索引行记为待处理（重建索引），返回待处理行数"""
+    with db_utils.get_db() as conn:
+        for kind, source in SEARCH_SOURCES.items():
+            conn.execute(
+                f"INSERT OR IGNORE INTO search_pending (kind, ref_id) SELECT ?, id FROM {source['table']}", (kind,)
+            )
+        # 索引中残留的行（源行已删除）也重新处理，处理时会被删除
+        conn.execute(f'''
+            INSERT OR IGNORE INTO search_pending (kind, ref_id)
+            SELECT kind, rowid >> {_KIND_BITS} FROM search_index
+        ''')
+        conn.commit()
+        return conn.execute('SELECT COUNT(*) FROM search_pending').fetchone()[0]
+
+
+def pending_count():
+    """积压的待索引行数（搜索索引不可用时为 0）"""
+    with db_utils.get_db() as conn:
+        if not is_available(conn):
+            return 0
+        return conn.execute('SELECT COUNT(*) FROM search_pending').fetchone()[0]
+
+
+@job_queue.handler('search.sync', max_attempts=3)
+def sync_job(payload):
+    """后台任务：处理积压的搜索索引变更"""
+    return {'indexed': sync()}
+
+
+# ============ 搜索 ============
+
+def search(query, kinds=None, limit=10, offset=0):
+    """
+    按 bm25 相关度搜索
+
+    Args:
+        query: 用户输入
+        kinds: 限定的内容类型列表（SEARCH_SOURCES 的键），None 为全部
+
+    Returns:
+        dict: total（匹配总数）、results（title/snippet 为带 <mark> 高亮的HTML）
+    """
+    match, terms = parse_query(query)
+    if match is None:
+        return {'total': 0, 'results': []}
+
+    where = 'search_index MATCH ?'
+    params = [match]
+    if kinds:
+        where += f" AND kind IN ({', '.join('?' * len(kinds))})"
+        params.extend(kinds)
+
+    with db_utils.get_db() as conn:
+        total = conn.execute(f'SELECT COUNT(*) FROM search_index WHERE {where}', params).fetchone()[0]
+        hits = conn.execute(f'''
+            SELECT rowid, kind, rank FROM search_index WHERE {where}
+            ORDER BY rank LIMIT ? OFFSET ?
+        ''', params + [limit, offset]).fetchall()
+
+        # 高亮和摘要基于源表原文（索引中是二元组形式）
+        ids_by_kind = {}
+        for hit in hits:
+            ids_by_kind.setdefault(hit['kind'], []).append(hit['rowid'] >> _KIND_BITS)
+        sources = {}
+        for kind, ids in ids_by_kind.items():
+            source = SEARCH_SOURCES[kind]
+            columns = ', '.join((source['title'],) + source['body'])
+            rows = conn.execute(
+                f"SELECT id, {columns} FROM {source['table']} WHERE id IN ({', '.join('?' * len(ids))})", ids
+            ).fetchall()
+            sources.update({(kind, row['id']): row for row in rows})
+
+    results = []
+    for hit in hits:
+        kind = hit['kind']
+        ref_id = hit['rowid'] >> _KIND_BITS
+        row = sources.get((kind, ref_id))
+        if row is None:
+            continue
+        source = SEARCH_SOURCES[kind]
+        body = ' '.join(plain_text(row[column]) for column in source['body'] if row[column])
+        results.append({
+            'type': kind,
+            'id': ref_id,
+            'title': highlight(row[source['title']], terms),
+            'snippet': highlight(body, terms, SNIPPET_WIDTH),
+            'url': source['url'].format(id=ref_id),
+            'score': round(-hit['rank'], 4),
+        })
+    return {'total': total, 'results': results}
+
+
+def init_app(app):
+    """注册命令行"""
+    app.cli.add_command(search_cli)
+
+
+# ============ 命令行 ============
+
+search_cli = AppGroup('search', help='站内搜索索引')
+
+
+@search_cli.command('sync')
+def sync_command():
+    """处理积压的索引变更"""
+    click.echo(f"✅ 已更新 {sync()} 行")
+
+
+@search_cli.command('rebuild')
+def rebuild_command():
+    """全部重新索引"""
+    click.echo(f"🔁 待处理 {mark_all()} 行")
+    click.echo(f"✅ 已更新 {sync()} 行")
@@ -0,0 +1,215 @@
+"""
+概率数据结构工具模块
+- HyperLogLog 基数估计：用固定大小的寄存器数组估计不同元素的个数（如独立访客数），
+  多个草图可以逐寄存器取最大值合并，跨小时/天/路径汇总时不需要保存原始ID，也不需要 COUNT(DISTINCT)
+- t-digest 分位数估计：用少量质心近似数据分布，流式加入、可合并，不需要保存原始数据点
+"""
+
+import math
+import zlib
+import struct
+import hashlib
+from array import array
+
+# 默认精度：2^12 个寄存器，标准误差约 1.04 / sqrt(4096) ≈ 1.6%
+DEFAULT_PRECISION = 12
+
+# 2^-r 查表，估计时避免逐个计算幂
+_INVERSE_POWERS = tuple(2.0 ** -r for r in range(65))
+
+
+def _hash64(value):
+    if isinstance(value, str):
+        value = value.encode('utf-8')
+    return int.from_bytes(hashlib.blake2b(value, digest_size=8).digest(), 'big')
+
+
+class HyperLogLog:
+    """HyperLogLog 草图"""
+
+    __slots__ = ('precision', 'registers')
+
+    def __init__(self, precision=DEFAULT_PRECISION, registers=None):
+        if not 4 <= precision <= 16:
+            raise ValueError(f"精度应在 4-16 之间: {precision}")
+        self.precision = precision
+        self.registers = bytearray(registers) if registers is not None else bytearray(1 << precision)
+        if len(self.registers) != 1 << precision:
+            raise ValueError("寄存器数量与精度不符")
+
+    def add(self, value):
+        """加入一个元素（str 或 bytes）"""
+        x = _hash64(value)
+        width = 64 - self.precision
+        index = x >> width
+        # 剩余位中第一个1出现的位置（从1开始），全为0时取 width + 1
+        rank = width - (x & ((1 << width) - 1)).bit_length() + 1
+        if rank > self.registers[index]:
+            self.registers[index] = rank
+
+    def update(self, values):
+        for value in values:
+            self.add(value)
+        return self
+
+    def merge(self, other):
+        """合并另一个同精度草图（原地），结果等价于两个集合的并集"""
+        if other.precision != self.precision:
+            raise ValueError("只能合并相同精度的草图")
+        self.registers = bytearray(map(max, self.registers, other.registers))
+        return self
+
+    def count(self):
+        """估计不同元素的个数"""
+        m = len(self.registers)
+        alpha = 0.7213 / (1 + 1.079 / m)
+        estimate = alpha * m * m / sum(_INVERSE_POWERS[r] for r in self.registers)
+        zeros = self.registers.count(0)
+        if estimate <= 2.5 * m and zeros:
+            # 小基数时改用线性计数
+            estimate = m * math.log(m / zeros)
+        return int(round(estimate))
+
+    def __len__(self):
+        return self.count()
+
+    def to_bytes(self):
+        """序列化（压缩后保存，低基数草图大部分寄存器为0）"""
+        return bytes([self.precision]) + zlib.compress(bytes(self.registers))
+
+    @classmethod
+    def from_bytes(cls, data):
+        """从 to_bytes 的结果恢复；data 为空时返回空草图"""
+        if not data:
+            return cls()
+        return cls(data[0], zlib.decompress(data[1:]))
+
+
+# t-digest 默认压缩参数：越大保留的质心越多、分位数越精确
+DEFAULT_COMPRESSION = 100
+# 未合并的数据点达到 压缩参数 × 该倍数 时合并一次
+_BUFFER_FACTOR = 5
+# 序列化头部：压缩参数、总权重、最小值、最大值
+_DIGEST_HEADER = struct.Struct('<dddd')
+
+
+class TDigest:
+    """
+    t-digest 流式分位数草图（合并式实现，k1 尺度函数）
+
+    数据点先进入缓冲，定期排序后合并为质心；两端的质心更小，尾部分位数（p95/p99）误差也较小。
+    多个草图可以合并，适合按天/页面分别累积后再汇总。
+    """
+
+    __slots__ = ('compression', 'count', 'min', 'max', '_centroids', '_buffer')
+
+    def __init__(self, compression=DEFAULT_COMPRESSION):
+        self.compression = compression
+        self.count = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+        # [(均值, 权重)]，按均值排序
+        self._centroids = []
+        self._buffer = []
+
+    def add(self, value, weight=1.0):
+        """加入一个数据点（权重可用于按采样率放大）"""
+        self._buffer.append((value, weight))
+        self.count += weight
+        if value < self.min:
+            self.min = value
+        if value > self.max:
+            self.max = value
+        if len(self._buffer) >= self.compression * _BUFFER_FACTOR:
+            self._compress()
+        return self
+
+    def update(self, values, weight=1.0):
+        for value in values:
+            self.add(value, weight)
+        return self
+
+    def merge(self, other):
+        """合并另一个草图（原地）"""
+        if not other.count:
+            return self
+        other._compress()
+        self._buffer.extend(other._centroids)
+        self.count += other.count
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        self._compress()
+        return self
+
+    def _scale(self, q):
+        return self.compression / (2 * math.pi) * math.asin(2 * q - 1)
+
+    def _compress(self):
+        if not self._buffer:
+            return
+        points = sorted(self._centroids + self._buffer)
+        self._buffer = []
+        total = self.count
+        merged = []
+        mean, weight = points[0]
+        before = 0.0
+        k_left = self._scale(0.0)
+        for value, value_weight in points[1:]:
+            q = min((before + weight + value_weight) / total, 1.0)
+            if self._scale(q) - k_left <= 1:
+                weight += value_weight
+                mean += (value - mean) * value_weight / weight
+            else:
+                merged.append((mean, weight))
+                before += weight
+                k_left = self._scale(min(before / total, 1.0))
+                mean, weight = value, value_weight
+        merged.append((mean, weight))
+        self._centroids = merged
+
+    def quantile(self, q):
+        """估计分位数（q 取 0-1），没有数据时返回 None"""
+        if not self.count:
+            return None
+        self._compress()
+        centroids = self._centroids
+        if len(centroids) == 1:
+            return centroids[0][0]
+        target = q * self.count
+        # 在相邻质心中心之间线性插值，两端插值到最小/最大值
+        previous_mean, previous_center = self.min, 0.0
+        cumulative = 0.0
+        for mean, weight in centroids:
+            center = cumulative + weight / 2
+            if target < center:
+                span = center - previous_center
+                fraction = (target - previous_center) / span if span > 0 else 0.0
+                return previous_mean + (mean - previous_mean) * fraction
+            previous_mean, previous_center = mean, center
+            cumulative += weight
+        span = self.count - previous_center
+        fraction = (target - previous_center) / span if span > 0 else 1.0
+        return previous_mean + (self.max - previous_mean) * min(fraction, 1.0)
+
+    def to_bytes(self):
+        """序列化：头部 + 压缩后的质心数组"""
+        self._compress()
+        values = array('d')
+        for mean, weight in self._centroids:
+            values.append(mean)
+            values.append(weight)
+        header = _DIGEST_HEADER.pack(self.compression, self.count, self.min, self.max)
+        return header + zlib.compress(values.tobytes())
+
+    @classmethod
+    def from_bytes(cls, data):
+        """从 to_bytes 的结果恢复；data 为空时返回空草图"""
+        if not data:
+            return cls()
+        compression, count, minimum, maximum = _DIGEST_HEADER.unpack_from(data)
+        digest = cls(int(compression))
+        digest.count, digest.min, digest.max = count, minimum, maximum
+        values = array('d')
+        values.frombytes(zlib.decompress(data[_DIGEST_HEADER.size:]))
+        digest._centroids = list(zip(values[0::2], values[1::2]))
+        return digest
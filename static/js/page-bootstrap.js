@@ -0,0 +1,76 @@
+// 首屏数据预取 - 通过 /api/frontend/bootstrap 一次获取页面需要的全部数据区块
+//
+// 用法:
+//   <script src="/static/js/page-bootstrap.js" data-preset="index"></script>
+//   const response = await pageBootstrap.fetch('team', getApiUrl('/api/team'), options);
+//
+// 每个区块只在首次加载时使用一次，之后的刷新和轮询仍直接请求原API；
+// 预取失败或区块缺失时自动回退为普通 fetch。
+// 带 data-inline 时数据由服务端内联在 #page-bootstrap-data 中，不再发起预取请求。
+(function () {
+    const script = document.currentScript;
+    const preset = script ? script.dataset.preset : null;
+    const inline = script ? script.hasAttribute('data-inline') : false;
+    const consumed = new Set();
+    let sections = null;
+
+    function apiUrl(path) {
+        return typeof getApiUrl === 'function' ? getApiUrl(path) : path;
+    }
+
+    function requestBootstrap() {
+        return fetch(apiUrl(`/api/frontend/bootstrap?preset=${encodeURIComponent(preset)}`))
+            .then(res => (res.ok ? res.json() : null))
+            .then(data => { sections = data; })
+            .catch(error => { console.warn('首屏数据预取失败，改为逐个请求:', error); });
+    }
+
+    function readInlineData() {
+        const element = document.getElementById('page-bootstrap-data');
+        if (!element) {
+            return null;
+        }
+        try {
+            return JSON.parse(element.textContent);
+        } catch (error) {
+            console.warn('内联首屏数据解析失败:', error);
+            return null;
+        }
+    }
+
+    function domReady() {
+        if (document.readyState !== 'loading') {
+            return Promise.resolve();
+        }
+        return new Promise(resolve => document.addEventListener('DOMContentLoaded', resolve, { once: true }));
+    }
+
+    let ready = Promise.resolve();
+    if (inline) {
+        // 内联数据在文档末尾输出，缺失时（如服务端生成失败）再请求API
+        ready = domReady().then(() => {
+            sections = readInlineData();
+            if (!sections && preset) {
+                return requestBootstrap();
+            }
+        });
+    } else if (preset) {
+        ready = requestBootstrap();
+    }
+
+    window.pageBootstrap = {
+        ready,
+
+        async fetch(name, url, options) {
+            await ready;
+            if (sections && Object.prototype.hasOwnProperty.call(sections, name) && !consumed.has(name)) {
+                consumed.add(name);
+                return new Response(JSON.stringify(sections[name]), {
+                    status: 200,
+                    headers: { 'Content-Type': 'application/json' }
+                });
+            }
+            return fetch(url, options);
+        }
+    };
+})();
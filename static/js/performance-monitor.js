@@ -1,14 +1,120 @@
 // 性能监控器
+// 按采样率把导航耗时、LCP 和资源加载耗时用 sendBeacon 上报到 /api/rum/collect（服务端按页面汇总分位数），
+// 本地开发环境下额外在控制台输出性能报告
+const RUM_ENDPOINT = '/api/rum/collect';
+// 发送失败（如 sendBeacon 队列已满）的数据暂存，随下一个页面的上报一起发送
+const RUM_PENDING_KEY = 'rum_pending_events';
+const RUM_MAX_PENDING = 10;
+const RUM_MAX_RESOURCES = 50;
+// 资源类型 -> 上报时使用的类型名
+const RUM_RESOURCE_TYPES = {
+    CSS: 'css',
+    JavaScript: 'js',
+    Image: 'image',
+    Font: 'font',
+    Other: 'other'
+};
+
 class PerformanceMonitor {
     constructor() {
         this.metrics = {};
+        this.isDevelopment = window.location.hostname === 'localhost' || window.location.hostname === '127.0.0.1';
+        // 采样率可通过 window.RUM_SAMPLE_RATE 覆盖
+        this.sampleRate = typeof window.RUM_SAMPLE_RATE === 'number' ? window.RUM_SAMPLE_RATE : 0.1;
+        this.sampled = Math.random() < this.sampleRate;
+        this.sent = false;
         this.init();
     }
 
     init() {
         this.measurePageLoad();
         this.measureResourceLoading();
-        this.logPerformanceMetrics();
+        if (this.sampled) {
+            this.measureLargestContentfulPaint();
+            // 页面隐藏（切换标签、关闭、跳转）时上报，此时导航各阶段均已完成
+            document.addEventListener('visibilitychange', () => {
+                if (document.visibilityState === 'hidden') this.sendMetrics();
+            });
+            window.addEventListener('pagehide', () => this.sendMetrics());
+        }
+        if (this.isDevelopment) {
+            this.logPerformanceMetrics();
+        }
+    }
+
+    measureLargestContentfulPaint() {
+        try {
+            new PerformanceObserver((list) => {
+                const entries = list.getEntries();
+                this.metrics.lcp = entries[entries.length - 1].startTime;
+            }).observe({ type: 'largest-contentful-paint', buffered: true });
+        } catch (e) {
+            // 浏览器不支持 LCP
+        }
+    }
+
+    // 上报数据：导航各阶段耗时（毫秒，相对导航开始）及按类型分组的资源加载耗时
+    buildEvent() {
+        const navigation = performance.getEntriesByType('navigation')[0];
+        if (!navigation) return null;
+        const metrics = {
+            dns: navigation.domainLookupEnd - navigation.domainLookupStart,
+            tcp: navigation.connectEnd - navigation.connectStart,
+            ttfb: navigation.responseStart - navigation.startTime,
+            response: navigation.responseEnd - navigation.responseStart,
+            dom_content_loaded: navigation.domContentLoadedEventEnd - navigation.startTime
+        };
+        if (navigation.loadEventEnd > 0) {
+            metrics.load = navigation.loadEventEnd - navigation.startTime;
+        }
+        if (this.metrics.lcp) {
+            metrics.lcp = this.metrics.lcp;
+        }
+        const resources = {};
+        (this.metrics.resources || []).forEach(resource => {
+            const type = RUM_RESOURCE_TYPES[resource.type] || 'other';
+            if (!resources[type]) resources[type] = [];
+            if (resources[type].length < RUM_MAX_RESOURCES) {
+                resources[type].push(Math.round(resource.duration * 10) / 10);
+            }
+        });
+        Object.keys(metrics).forEach(name => {
+            metrics[name] = Math.round(metrics[name] * 10) / 10;
+        });
+        return { page: window.location.pathname, metrics, resources };
+    }
+
+    sendMetrics() {
+        if (this.sent) return;
+        const event = this.buildEvent();
+        if (!event) return;
+        this.sent = true;
+
+        let pending = [];
+        try {
+            pending = JSON.parse(localStorage.getItem(RUM_PENDING_KEY) || '[]');
+        } catch (e) {
+            pending = [];
+        }
+        const events = pending.concat([event]).slice(-RUM_MAX_PENDING);
+        const body = JSON.stringify({ sample_rate: this.sampleRate, events });
+
+        let queued = false;
+        if (navigator.sendBeacon) {
+            queued = navigator.sendBeacon(RUM_ENDPOINT, new Blob([body], { type: 'text/plain' }));
+        } else {
+            fetch(RUM_ENDPOINT, { method: 'POST', body, keepalive: true }).catch(() => {});
+            queued = true;
+        }
+        try {
+            if (queued) {
+                localStorage.removeItem(RUM_PENDING_KEY);
+            } else {
+                localStorage.setItem(RUM_PENDING_KEY, JSON.stringify(events));
+            }
+        } catch (e) {
+            // 隐私模式等情况下 localStorage 不可用
+        }
     }
 
     measurePageLoad() {
@@ -150,7 +256,5 @@ class PerformanceMonitor {
     }
 }
 
-// 在开发环境下启用性能监控
-if (window.location.hostname === 'localhost' || window.location.hostname === '127.0.0.1') {
-    new PerformanceMonitor();
-} 
\ No newline at end of file
+// 所有页面启用（按采样率上报；控制台报告只在开发环境输出）
+window.performanceMonitor = new PerformanceMonitor(); 
\ No newline at end of file
@@ -0,0 +1,277 @@
+"""
+输入联想工具模块
+在进程内为成员姓名、论文标题、论文作者、算法标题和通知标题建立前缀索引，供 /api/suggest 逐键查询
+
+每类内容按匹配类型分别建立按键排序的数组，查询时用 bisect 定位前缀区间，不访问数据库。
+除完整文本外，文本中每个词的开头和中文的拼音首字母（"张三" -> "zs"）也作为键。
+拼音首字母按 GB2312 一级汉字的拼音排序区间换算，不依赖第三方库；二级汉字和生僻字没有首字母键。
+
+失效：本进程的写入由 db_utils 写入监听者立即标记，其他worker的写入通过表修改代数发现；
+查询时只重新加载受影响的那一类内容，其余索引保持不变。
+"""
+
+import re
+import bisect
+import logging
+import threading
+
+from flask import has_app_context
+
+import db_utils
+from cache_utils import current_generations
+
+logger = logging.getLogger(__name__)
+
+# GB2312 一级汉字按拼音排序，各声母首字母的起始编码（A-Z，没有 I/U/V）
+_INITIAL_BOUNDARIES = (
+    (0xB0A1, 'a'), (0xB0C5, 'b'), (0xB2C1, 'c'), (0xB4EE, 'd'), (0xB6EA, 'e'), (0xB7A2, 'f'),
+    (0xB8C1, 'g'), (0xB9FE, 'h'), (0xBBF7, 'j'), (0xBFA6, 'k'), (0xC0AC, 'l'), (0xC2E8, 'm'),
+    (0xC4C3, 'n'), (0xC5B6, 'o'), (0xC5BE, 'p'), (0xC6DA, 'q'), (0xC8BB, 'r'), (0xC8F6, 's'),
+    (0xCBFA, 't'), (0xCDDA, 'w'), (0xCEF4, 'x'), (0xD1B9, 'y'), (0xD4D1, 'z'),
+)
+_INITIAL_CODES = [code for code, _ in _INITIAL_BOUNDARIES]
+_LEVEL1_END = 0xD7F9
+# 多音字作姓氏时的读音（只用于姓名的第一个字）
+_SURNAME_INITIALS = {
+    '曾': 'z', '单': 's', '解': 'x', '仇': 'q', '查': 'z', '朴': 'p',
+    '区': 'o', '盖': 'g', '缪': 'm', '覃': 'q', '尉': 'y', '长': 'z',
+}
+
+_WORD = re.compile(r'[^\W_]+')
+_CJK = re.compile(r'[㐀-䶿一-鿿豈-﫿]')
+_AUTHOR_SEPARATORS = re.compile(r'\s*[,，、;；]\s*|\s+and\s+', re.IGNORECASE)
+
+# 匹配类型的排序：标题/姓名开头 < 词开头 < 拼音首字母
+MATCH_PREFIX, MATCH_WORD, MATCH_INITIALS = 0, 1, 2
+
+DEFAULT_LIMIT = 8
+
+
+def char_initial(char):
+    """单个汉字的拼音首字母，无法换算时返回 None"""
+    try:
+        encoded = char.encode('gb2312')
+    except UnicodeEncodeError:
+        return None
+    if len(encoded) != 2:
+        return None
+    code = (encoded[0] << 8) | encoded[1]
+    if not _INITIAL_CODES[0] <= code < _LEVEL1_END:
+        return None
+    return _INITIAL_BOUNDARIES[bisect.bisect_right(_INITIAL_CODES, code) - 1][1]
+
+
+def pinyin_initials(text, surname=False):
+    """
+    文本中汉字的拼音首字母串（"动态规划" -> "dtgh"），字母数字原样保留（小写），其他字符忽略
+
+    Args:
+        surname: 文本为姓名，第一个字按姓氏读音
+    """
+    initials = []
+    for position, char in enumerate(text):
+        if _CJK.match(char):
+            initial = (_SURNAME_INITIALS.get(char) if surname and position == 0 else None) or char_initial(char)
+            if initial is None:
+                # 有字无法换算时整串不可靠，不生成首字母键
+                return ''
+            initials.append(initial)
+        elif char.isalnum():
+            initials.append(char.lower())
+    return ''.join(initials)
+
+
+def normalize(text):
+    return ' '.join((text or '').lower().split())
+
+
+def index_keys(text, person=False):
+    """一条文本的全部索引键：[(键, 匹配类型)]"""
+    normalized = normalize(text)
+    if not normalized:
+        return []
+    keys = [(normalized, MATCH_PREFIX)]
+    words = list(_WORD.finditer(normalized))
+    for word in words[1:]:
+        keys.append((normalized[word.start():], MATCH_WORD))
+    if _CJK.search(normalized):
+        initials = pinyin_initials(normalized, surname=person)
+        if initials:
+            keys.append((initials, MATCH_INITIALS))
+        # 标题中间的中文词也可按首字母匹配（"经典动态规划" 输入 "dt"）
+        for word in words[1:]:
+            initials = pinyin_initials(word.group(0))
+            if initials and _CJK.match(word.group(0)):
+                keys.append((initials, MATCH_INITIALS))
+    return keys
+
+
+def _split_authors(authors):
+    return [name for name in _AUTHOR_SEPARATORS.split(authors or '') if name]
+
+
+# 可联想的内容：类型 -> (依赖的表, 加载函数)
+# 加载函数返回 [(ID, 文本, 是否为人名)]；只包含前台可见的内容
+def _load_members(conn):
+    return [(row['id'], row['name'], True) for row in conn.execute('SELECT id, name FROM team_members')]
+
+def _load_papers(conn):
+    return [(row['id'], row['title'], False) for row in conn.execute('SELECT id, title FROM papers')]
+
+def _load_authors(conn):
+    # 同一作者出现在多篇论文中只保留一条（ID 为第一篇论文）
+    authors = {}
+    for row in conn.execute('SELECT id, authors FROM papers ORDER BY id'):
+        for name in _split_authors(row['authors']):
+            authors.setdefault(name, row['id'])
+    return [(paper_id, name, True) for name, paper_id in authors.items()]
+
+def _load_algorithms(conn):
+    return [(row['id'], row['title'], False)
+            for row in conn.execute("SELECT id, title FROM algorithms WHERE status = 'active'")]
+
+def _load_notifications(conn):
+    return [(row['id'], row['title'], False)
+            for row in conn.execute("SELECT id, title FROM notifications WHERE status = 'published'")]
+
+SUGGEST_SOURCES = {
+    'member': ('team_members', _load_members, '/team'),
+    'paper': ('papers', _load_papers, '/paper'),
+    'author': ('papers', _load_authors, '/paper'),
+    'algorithm': ('algorithms', _load_algorithms, '/algorithm'),
+    'notification': ('notifications', _load_notifications, '/notification/{id}'),
+}
+
+
+class _SourceIndex:
+    """一类内容的前缀索引：每种匹配类型一个按键排序的键数组和对应的条目序号"""
+
+    __slots__ = ('generation', 'keys', 'refs', 'entries')
+
+    def __init__(self, generation, rows):
+        self.generation = generation
+        # 条目：(ID, 原文)
+        self.entries = []
+        pairs = []
+        for ref_id, text, person in rows:
+            if not text:
+                continue
+            position = len(self.entries)
+            self.entries.append((ref_id, text.strip()))
+            for key, match in index_keys(text, person):
+                pairs.append((match, key, position))
+        pairs.sort()
+        # 按匹配类型分开：keys[匹配类型] 为排序后的键，refs[匹配类型] 为对应的条目序号
+        self.keys = tuple([] for _ in range(MATCH_INITIALS + 1))
+        self.refs = tuple([] for _ in range(MATCH_INITIALS + 1))
+        for match, key, position in pairs:
+            self.keys[match].append(key)
+            self.refs[match].append(position)
+
+    def lookup(self, prefix, limit):
+        """
+        前缀为 prefix 的条目：{条目序号: 最优匹配类型}
+
+        按匹配类型从优到劣查找，每种类型取出前缀区间内的全部条目（同类型内还要按长度排序），
+        已找到 limit 个条目后不再查找更差的类型。
+        """
+        found = {}
+        for match in range(MATCH_INITIALS + 1):
+            keys = self.keys[match]
+            start = bisect.bisect_left(keys, prefix)
+            end = bisect.bisect_left(keys, prefix + '\uffff', start)
+            for position in self.refs[match][start:end]:
+                found.setdefault(position, match)
+            if len(found) >= limit:
+                break
+        return found
+
+    def key_count(self):
+        return sum(len(keys) for keys in self.keys)
+
+
+class SuggestIndex:
+    """所有可联想内容的进程内前缀索引（按类型分别构建、分别失效）"""
+
+    def __init__(self):
+        self._sources = {}
+        # 本进程写入后待重新加载的内容类型（只在重新加载后移除，未查询的类型保留标记）
+        self._dirty_kinds = set()
+        self._lock = threading.Lock()
+        self.builds = 0
+        self.lookups = 0
+
+    def init_app(self, app):
+        app.extensions['suggest_index'] = self
+        db_utils.add_write_listener(self._on_write)
+
+    def _on_write(self, tables):
+        with self._lock:
+            self._dirty_kinds.update(kind for kind, (table, _, _) in SUGGEST_SOURCES.items() if table in tables)
+
+    def _refresh(self, kinds):
+        """重新加载已失效的内容类型（表修改代数变化或本进程有写入）"""
+        generations = current_generations() if has_app_context() else {}
+        with self._lock:
+            stale = []
+            for kind in kinds:
+                table = SUGGEST_SOURCES[kind][0]
+                index = self._sources.get(kind)
+                if index is None or kind in self._dirty_kinds or index.generation != generations.get(table, 0):
+                    stale.append(kind)
+            if not stale:
+                return
+            with db_utils.get_db() as conn:
+                for kind in stale:
+                    table, load, _ = SUGGEST_SOURCES[kind]
+                    self._sources[kind] = _SourceIndex(generations.get(table, 0), load(conn))
+                    self._dirty_kinds.discard(kind)
+                    self.builds += 1
+            logger.debug(f"联想索引已重新加载: {', '.join(stale)}")
+
+    def suggest(self, query, kinds=None, limit=DEFAULT_LIMIT):
+        """
+        前缀联想
+
+        Args:
+            kinds: 限定的内容类型列表（SUGGEST_SOURCES 的键），None 为全部
+
+        Returns:
+            list: [{type, id, text, url, match}]，按匹配类型、文本长度排序
+        """
+        prefix = normalize(query)
+        if not prefix:
+            return []
+        kinds = list(kinds or SUGGEST_SOURCES)
+        self._refresh(kinds)
+        self.lookups += 1
+
+        candidates = []
+        for kind in kinds:
+            index = self._sources[kind]
+            for position, match in index.lookup(prefix, limit).items():
+                ref_id, text = index.entries[position]
+                candidates.append((match, len(text), text, kind, ref_id))
+        candidates.sort()
+
+        match_names = ('prefix', 'word', 'initials')
+        return [{
+            'type': kind,
+            'id': ref_id,
+            'text': text,
+            'url': SUGGEST_SOURCES[kind][2].format(id=ref_id),
+            'match': match_names[match],
+        } for match, _, text, kind, ref_id in candidates[:limit]]
+
+    def stats(self):
+        with self._lock:
+            return {
+                'sources': {kind: {'entries': len(index.entries), 'keys': index.key_count(),
+                                   'generation': index.generation}
+                            for kind, index in self._sources.items()},
+                'builds': self.builds,
+                'lookups': self.lookups,
+            }
+
+
+suggest_index = SuggestIndex()
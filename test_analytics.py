@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+访问统计测试：环形缓冲、批量写入访问记录和汇总表、跨批次合并独立访客、管理端汇总接口
+
+用法: python -m pytest -q test_analytics.py
+"""
+
+import db_utils
+from api.analytics import VisitRecorder
+
+
+def _daily(path):
+    with db_utils.get_db() as conn:
+        return conn.execute('SELECT day, views, visitors FROM visit_daily WHERE path = ?', (path,)).fetchall()
+
+
+def test_buffer_drops_oldest_when_full():
+    recorder = VisitRecorder(size=2, flush_interval=3600)
+    for path in ('/a', '/b', '/c'):
+        recorder.record(path, 's1')
+    assert [visit[0] for visit in recorder._buffer] == ['/b', '/c']
+    assert recorder.stats()['dropped'] == 1
+
+
+def test_flush_writes_visits_and_rollups(app):
+    recorder = VisitRecorder(flush_interval=3600)
+    for session_id in ('s1', 's2', 's1'):
+        recorder.record('/test-rollup', session_id, referrer='https://example.com/')
+
+    assert recorder.flush() == 3
+    assert recorder.flush() == 0
+    with db_utils.get_db() as conn:
+        assert conn.execute("SELECT COUNT(*) FROM visits WHERE path = '/test-rollup'").fetchone()[0] == 3
+        hourly = conn.execute("SELECT views FROM visit_hourly WHERE path = '/test-rollup'").fetchall()
+    assert [row['views'] for row in hourly] == [3]
+    rows = _daily('/test-rollup')
+    assert len(rows) == 1 and rows[0]['views'] == 3
+
+
+def test_visitors_merged_across_batches(app):
+    from sketch_utils import HyperLogLog
+
+    recorder = VisitRecorder(flush_interval=3600)
+    recorder.record('/test-merge', 's1')
+    recorder.record('/test-merge', 's2')
+    recorder.flush()
+    # 第二批中 s1 已计入，只新增 s3
+    recorder.record('/test-merge', 's1')
+    recorder.record('/test-merge', 's3')
+    recorder.flush()
+
+    row = _daily('/test-merge')[0]
+    assert row['views'] == 4
+    assert HyperLogLog.from_bytes(row['visitors']).count() == 3
+
+
+def test_summary_requires_admin(client):
+    assert client.get('/api/analytics/summary').status_code == 401
+
+
+def test_summary_reads_rollups(admin_client):
+    recorder = VisitRecorder(flush_interval=3600)
+    for session_id in ('a', 'b', 'c', 'a'):
+        recorder.record('/test-summary', session_id)
+    recorder.flush()
+
+    data = admin_client.get('/api/analytics/summary?days=1&top=100').get_json()['data']
+    entry = next(item for item in data['paths'] if item['path'] == '/test-summary')
+    assert entry == {'path': '/test-summary', 'views': 4, 'visitors': 3}
+    assert data['views'] >= 4
+
+
+def test_page_requests_are_buffered(client):
+    from api.analytics import visit_recorder
+
+    before = visit_recorder.stats()['buffered'] + visit_recorder.stats()['flushed']
+    client.get('/dynamic')
+    client.get('/api/grades')
+    after = visit_recorder.stats()['buffered'] + visit_recorder.stats()['flushed']
+    # 只记录页面访问，API请求不计入
+    assert after == before + 1
@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""
+首屏数据API测试：区块拼接与缓存、写入后失效，以及生成失败（兜底数据）的区块不缓存也不输出
+
+用法: python -m pytest -q test_bootstrap.py
+"""
+
+import json
+
+import pytest
+
+import app as app_module
+from api import bootstrap
+
+
+@pytest.fixture(autouse=True)
+def clear_sections():
+    bootstrap.clear_cache()
+    yield
+    bootstrap.clear_cache()
+
+
+def _broken_get_db():
+    raise RuntimeError('数据库不可用')
+
+
+def test_sections_match_standalone_apis(client):
+    response = client.get('/api/frontend/bootstrap?sections=team,activities')
+    assert response.status_code == 200
+    data = json.loads(response.data)
+    assert list(data) == ['team', 'activities']
+    assert data['team'] == client.get('/api/team').get_json()
+    assert response.headers['X-Bootstrap-Cache'] == '0/2'
+
+    assert client.get('/api/frontend/bootstrap?sections=team,activities').headers['X-Bootstrap-Cache'] == '2/2'
+
+
+def test_write_invalidates_section(admin_client):
+    admin_client.get('/api/frontend/bootstrap?sections=grades')
+    response = admin_client.post('/api/grades', json={'name': '2030级', 'description': '测试'})
+    assert response.status_code in (200, 201)
+
+    response = admin_client.get('/api/frontend/bootstrap?sections=grades')
+    assert response.headers['X-Bootstrap-Cache'] == '0/1'
+    assert '2030级' in [grade['name'] for grade in response.get_json()['grades']]
+
+
+def test_unknown_section_rejected(client):
+    assert client.get('/api/frontend/bootstrap?sections=nope').status_code == 400
+    assert client.get('/api/frontend/bootstrap?preset=nope').status_code == 400
+    assert client.get('/api/frontend/bootstrap').status_code == 400
+
+
+def test_fallback_section_not_cached_or_embedded(client, monkeypatch):
+    monkeypatch.setattr(app_module, 'get_db', _broken_get_db)
+    response = client.get('/api/frontend/bootstrap?sections=activities,team')
+    assert response.status_code == 200
+    assert list(response.get_json()) == ['team']
+    assert 'activities' not in bootstrap._cache
+
+    monkeypatch.undo()
+    data = client.get('/api/frontend/bootstrap?sections=activities').get_json()
+    assert 'activities' in data
+
+
+def test_error_section_not_embedded(client, monkeypatch):
+    from api import innovation
+    monkeypatch.setattr(innovation, 'get_db', _broken_get_db)
+    response = client.get('/api/frontend/bootstrap?sections=innovation_stats')
+    assert response.get_json() == {}
+    assert 'innovation_stats' not in bootstrap._cache
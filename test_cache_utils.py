@@ -0,0 +1,242 @@
+#!/usr/bin/env python3
+"""
+缓存工具测试：写入驱动的失效（本进程写入与其他进程写入）、skip_cache 兜底结果不缓存、多进程共享缓存、并发未命中合并
+
+用法: python -m pytest -q test_cache_utils.py
+"""
+
+import time
+import sqlite3
+import threading
+
+import pytest
+from flask import jsonify
+
+import db_utils
+from cache_utils import SharedCache, SingleFlight, cached, skip_cache, cache_skips, skipped_since, invalidate_tables
+
+
+@pytest.fixture
+def grade_counter(app):
+    calls = []
+
+    @cached(tables=['grades'])
+    def count_grades():
+        calls.append(1)
+        with db_utils.get_db() as conn:
+            return conn.execute('SELECT COUNT(*) FROM grades').fetchone()[0]
+
+    return count_grades, calls
+
+
+def _insert_grade(conn, name):
+    conn.execute("INSERT INTO grades (name, description, order_index) VALUES (?, '', 0)", (name,))
+
+
+def test_hit_until_table_written(grade_counter):
+    count_grades, calls = grade_counter
+    before = count_grades()
+    assert count_grades() == before
+    assert len(calls) == 1
+
+    with db_utils.get_db() as conn:
+        _insert_grade(conn, '缓存测试-本进程')
+    assert count_grades() == before + 1
+    assert len(calls) == 2
+    assert count_grades.cache.stats()['invalidations'] == 1
+
+
+def test_write_from_other_process_detected_by_generation(grade_counter):
+    count_grades, calls = grade_counter
+    before = count_grades()
+
+    # 不经过连接池（没有写入监听者），模拟其他worker的写入
+    conn = sqlite3.connect(db_utils.get_db_path())
+    _insert_grade(conn, '缓存测试-其他进程')
+    conn.commit()
+    conn.close()
+
+    assert count_grades() == before + 1
+    assert len(calls) == 2
+
+
+def test_rolled_back_write_keeps_cache(grade_counter):
+    count_grades, calls = grade_counter
+    count_grades()
+    with db_utils.get_db() as conn:
+        conn.execute('BEGIN')
+        _insert_grade(conn, '缓存测试-回滚')
+        conn.rollback()
+    count_grades()
+    assert len(calls) == 1
+
+
+def test_unrelated_table_write_keeps_cache(grade_counter):
+    count_grades, calls = grade_counter
+    count_grades()
+    invalidate_tables({'papers'})
+    count_grades()
+    assert len(calls) == 1
+
+
+def test_skip_cache_result_not_stored(app):
+    calls = []
+
+    @cached(tables=['grades'])
+    def fallback():
+        calls.append(1)
+        skip_cache()
+        return []
+
+    with app.test_request_context('/'):
+        fallback()
+        fallback()
+    assert len(calls) == 2
+
+
+def test_skipped_since_sees_consumed_skip(app):
+    @cached(tables=['grades'])
+    def fallback():
+        skip_cache()
+        return []
+
+    with app.test_request_context('/'):
+        mark = cache_skips()
+        fallback()
+        assert skipped_since(mark)
+        assert not skipped_since(cache_skips())
+
+
+# ---- 多进程共享缓存 ----
+
+def test_shared_cache_stamp_and_eviction(tmp_path):
+    cache = SharedCache(str(tmp_path / 'shared.db'), max_bytes=10)
+    cache.put('a', 'grades=1', b'12345')
+    assert cache.get('a', 'grades=1') == (b'12345', True)
+    assert cache.get('a', 'grades=2') == (None, False)
+    assert cache.get('a', 'grades=2', allow_stale=True) == (b'12345', False)
+
+    cache.put('b', 'grades=1', b'678901')
+    assert cache.get('a', 'grades=1') == (None, False)
+    assert cache.stats()['evictions'] == 1
+
+
+def test_shared_view_response_survives_process_cache(app):
+    calls = []
+
+    @cached(tables=['grades'], shared=True)
+    def grade_names():
+        calls.append(1)
+        with db_utils.get_db() as conn:
+            return jsonify([row[0] for row in conn.execute('SELECT name FROM grades ORDER BY id')])
+
+    with app.test_request_context('/'):
+        first = grade_names().get_json()
+    # 共享缓存保存的是编码后的字节，进程内缓存清空后仍然命中
+    grade_names.cache_clear()
+    with app.test_request_context('/'):
+        second = grade_names()
+    assert second.get_json() == first
+    assert second.mimetype == 'application/json'
+    assert len(calls) == 1
+
+    with db_utils.get_db() as conn:
+        _insert_grade(conn, '共享缓存测试')
+    with app.test_request_context('/'):
+        assert grade_names().get_json() == first + ['共享缓存测试']
+    assert len(calls) == 2
+
+
+def test_shared_cache_skips_error_responses(app):
+    calls = []
+
+    @cached(tables=['grades'], shared=True)
+    def failing():
+        calls.append(1)
+        return jsonify({'error': 'x'}), 500
+
+    for _ in range(2):
+        with app.test_request_context('/'):
+            assert failing().status_code == 500
+    assert len(calls) == 2
+
+
+# ---- 并发未命中合并 ----
+
+def test_single_flight_coalesces_concurrent_calls():
+    flights = SingleFlight()
+    started = threading.Event()
+    release = threading.Event()
+    calls = []
+    results = []
+
+    def compute():
+        calls.append(1)
+        started.set()
+        release.wait(5)
+        return 'value'
+
+    def follower():
+        results.append(flights.do('key', compute))
+
+    leader = threading.Thread(target=follower)
+    leader.start()
+    started.wait(5)
+    followers = [threading.Thread(target=follower) for _ in range(3)]
+    for thread in followers:
+        thread.start()
+    # 等待者进入等待后再让计算结束
+    time.sleep(0.1)
+    release.set()
+    for thread in [leader] + followers:
+        thread.join(5)
+
+    assert len(calls) == 1
+    assert sorted(leader for _, leader in results) == [False, False, False, True]
+    assert not flights.in_flight('key')
+
+
+def test_single_flight_clears_failed_key():
+    flights = SingleFlight()
+
+    def broken():
+        raise ValueError('boom')
+
+    with pytest.raises(ValueError):
+        flights.do('key', broken)
+    assert flights.do('key', lambda: 1) == (1, True)
+
+
+@pytest.fixture
+def slow_grade_counter(app):
+    calls = []
+    entered = threading.Event()
+    release = threading.Event()
+
+    @cached(tables=['grades'], stale_while_revalidate=True)
+    def count_grades():
+        calls.append(1)
+        if len(calls) > 1:
+            entered.set()
+            release.wait(5)
+        with db_utils.get_db() as conn:
+            return conn.execute('SELECT COUNT(*) FROM grades').fetchone()[0]
+
+    return count_grades, calls, entered, release
+
+
+def test_stale_value_served_while_recomputing(slow_grade_counter):
+    count_grades, calls, entered, release = slow_grade_counter
+    before = count_grades()
+    with db_utils.get_db() as conn:
+        _insert_grade(conn, '合并测试')
+
+    recompute = threading.Thread(target=count_grades)
+    recompute.start()
+    entered.wait(5)
+    # 重新计算进行中，其他调用者直接拿到旧值
+    assert count_grades() == before
+    release.set()
+    recompute.join(5)
+    assert count_grades() == before + 1
+    assert len(calls) == 2
@@ -0,0 +1,38 @@
+#!/usr/bin/env python3
+"""
+查询计划检查测试：热点查询在迁移后的数据库上均命中索引，以及 find_problems 的判定
+
+用法: python -m pytest -q test_check_query_plans.py
+"""
+
+import pytest
+
+import db_utils
+from check_query_plans import HOT_QUERIES, check, find_problems
+
+
+@pytest.fixture
+def migrated_conn(tmp_db):
+    conn = db_utils._connect(tmp_db, 'default')
+    db_utils.migrate(conn)
+    yield conn
+    conn.close()
+
+
+def test_find_problems():
+    assert find_problems([(2, 0, 0, 'SEARCH papers USING INDEX idx_papers_order (order_index>?)')]) == []
+    assert find_problems([(2, 0, 0, 'SCAN papers USING INDEX idx_papers_order')]) == []
+    assert find_problems([(2, 0, 0, 'SCAN search_index VIRTUAL TABLE INDEX 0:M1')]) == []
+    assert find_problems([(2, 0, 0, 'SCAN papers')]) == ['全表扫描: SCAN papers']
+    assert find_problems([(2, 0, 0, 'SCAN search_index VIRTUAL TABLE INDEX 0:')]) != []
+    assert find_problems([(2, 0, 0, 'USE TEMP B-TREE FOR ORDER BY')]) != []
+
+
+def test_hot_queries_use_indexes(migrated_conn, capsys):
+    failures = check(migrated_conn)
+    assert failures == 0, capsys.readouterr().out
+
+
+def test_hot_query_names_unique():
+    names = [name for name, _, _ in HOT_QUERIES]
+    assert len(names) == len(set(names))
@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+计数器缓冲测试：浏览量合并写入、写入失败时保留计数、追加日志补写，详情页不被缓存
+
+用法: python -m pytest -q test_counter_utils.py
+"""
+
+import pytest
+
+import db_utils
+from counter_utils import CounterBuffer
+
+
+@pytest.fixture
+def notification_id(app):
+    with db_utils.get_db() as conn:
+        row_id = conn.execute(
+            "INSERT INTO notifications (title, content, status) VALUES ('计数', '正文', 'published')"
+        ).lastrowid
+        conn.commit()
+    yield row_id
+    # 不留下未渲染的通知，避免影响其他测试
+    with db_utils.get_db() as conn:
+        conn.execute('DELETE FROM notifications WHERE id = ?', (row_id,))
+        conn.commit()
+
+
+def _views(notification_id):
+    with db_utils.get_db() as conn:
+        return conn.execute('SELECT view_count FROM notifications WHERE id = ?', (notification_id,)).fetchone()[0]
+
+
+def test_increments_are_buffered_then_flushed(notification_id):
+    counter = CounterBuffer('notifications', 'view_count', flush_interval=3600)
+    for _ in range(5):
+        counter.increment(notification_id)
+
+    assert counter.pending(notification_id) == 5
+    assert _views(notification_id) == 0
+
+    counter.flush()
+    assert counter.pending(notification_id) == 0
+    assert _views(notification_id) == 5
+    assert counter.stats()['flushes'] == 1 and counter.stats()['flushed'] == 5
+
+
+def test_zero_interval_writes_immediately(notification_id):
+    counter = CounterBuffer('notifications', 'view_count', flush_interval=0)
+    counter.increment(notification_id)
+    assert _views(notification_id) == 1
+
+
+def test_failed_flush_keeps_counts(notification_id, monkeypatch):
+    counter = CounterBuffer('notifications', 'view_count', flush_interval=3600)
+    counter.increment(notification_id, 2)
+
+    def broken(counts):
+        raise RuntimeError('database is locked')
+
+    monkeypatch.setattr(counter, '_apply', broken)
+    counter.flush()
+    assert counter.pending(notification_id) == 2
+
+    monkeypatch.undo()
+    counter.flush()
+    assert _views(notification_id) == 2
+
+
+def test_log_recovered_after_crash(notification_id, tmp_path):
+    log_path = str(tmp_path / 'views')
+    crashed = CounterBuffer('notifications', 'view_count', flush_interval=3600)
+    crashed.log_path = log_path
+    crashed.increment(notification_id)
+    crashed.increment(notification_id)
+    crashed._log_file.close()
+
+    # 同一进程中重新启动：遗留的日志补写到数据库后删除
+    counter = CounterBuffer('notifications', 'view_count', flush_interval=3600)
+    counter.log_path = log_path
+    assert counter.recover() == 2
+    assert _views(notification_id) == 2
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_detail_page_not_cached(client, notification_id):
+    response = client.get(f'/notification/{notification_id}')
+    assert response.status_code == 200
+    assert response.cache_control.no_store
+    assert response.cache_control.max_age is None
+
+
+def test_concurrent_recovery_counts_once(notification_id, tmp_path, monkeypatch):
+    """多个进程同时启动时，已退出进程的日志只补写一次"""
+    log_path = str(tmp_path / 'views')
+    dead_pid = 4194303 + 1000
+    with open(f'{log_path}.{dead_pid}.active', 'w', encoding='ascii') as log_file:
+        log_file.write(f'{notification_id} 1\n{notification_id} 2\n')
+
+    first = CounterBuffer('notifications', 'view_count', flush_interval=3600)
+    second = CounterBuffer('notifications', 'view_count', flush_interval=3600)
+    first.log_path = second.log_path = log_path
+    read_log = CounterBuffer._read_log
+    results = []
+
+    def read_while_other_recovers(path):
+        # 第一个进程读取日志期间，另一个进程也开始补写
+        if not results:
+            results.append(second.recover())
+        return read_log(path)
+
+    monkeypatch.setattr(first, '_read_log', read_while_other_recovers)
+    assert first.recover() == 3
+    assert results == [0]
+    assert _views(notification_id) == 3
+    assert list(tmp_path.iterdir()) == []
@@ -0,0 +1,300 @@
+#!/usr/bin/env python3
+"""
+db_utils 测试：连接池、连接配置档案、结构迁移、连接泄漏检测
+
+用法: python -m pytest -q test_db_utils.py
+"""
+
+import sqlite3
+import threading
+
+import pytest
+
+import db_utils
+from db_utils import ConnectionPool
+
+
+def test_pool_reuses_thread_connection(tmp_db):
+    pool = ConnectionPool(tmp_db, size=2)
+    first = pool.acquire()
+    pool.release(first)
+    second = pool.acquire()
+    pool.release(second)
+
+    assert second is first
+    stats = pool.stats()
+    assert stats['created'] == 1
+    assert stats['checkouts'] == 2
+    assert stats['thread_local_hits'] == 1
+    pool.close_all()
+
+
+def test_pool_overflow_when_exhausted(tmp_db):
+    pool = ConnectionPool(tmp_db, size=1, timeout=0.05)
+    held = pool.acquire()
+    overflow = pool.acquire()
+
+    assert overflow is not held
+    assert overflow.pool_overflow
+    pool.release(overflow)
+    pool.release(held)
+    stats = pool.stats()
+    assert stats['waits'] == 1
+    assert stats['overflow'] == 1
+    assert stats['open'] == 1 and stats['idle'] == 1
+    pool.close_all()
+
+
+def test_pool_waiter_gets_released_connection(tmp_db):
+    pool = ConnectionPool(tmp_db, size=1, timeout=5)
+    held = pool.acquire()
+    got = []
+
+    def worker():
+        conn = pool.acquire()
+        got.append(conn)
+        pool.release(conn)
+
+    thread = threading.Thread(target=worker)
+    thread.start()
+    pool.release(held)
+    thread.join(5)
+
+    assert got == [held]
+    assert pool.stats()['overflow'] == 0
+    pool.close_all()
+
+
+def test_release_rolls_back_open_transaction(tmp_db):
+    pool = ConnectionPool(tmp_db, size=1)
+    conn = pool.acquire()
+    conn.execute('CREATE TABLE t (x INTEGER)')
+    conn.execute('BEGIN')
+    conn.execute('INSERT INTO t VALUES (1)')
+    pool.release(conn)
+
+    conn = pool.acquire()
+    assert not conn.in_transaction
+    assert conn.execute('SELECT COUNT(*) FROM t').fetchone()[0] == 0
+    pool.release(conn)
+    pool.close_all()
+
+
+def test_request_shares_one_connection(app):
+    with app.test_request_context('/'):
+        with db_utils.get_db() as first:
+            pass
+        with db_utils.get_db() as second:
+            pass
+        assert second is first
+        assert db_utils.get_request_db_stats()['checkouts'] == 1
+        assert db_utils.get_request_db_stats()['reuses'] == 1
+
+
+# ---- 连接配置档案 ----
+
+def test_profile_selection(monkeypatch, tmp_db):
+    monkeypatch.delenv('DB_PROFILE', raising=False)
+    monkeypatch.delenv('VERCEL', raising=False)
+    assert db_utils.get_db_profile(tmp_db) == 'performance'
+
+    open(tmp_db, 'w').close()
+    monkeypatch.setenv('VERCEL', '1')
+    assert db_utils.get_db_profile(tmp_db) == 'readonly'
+
+    monkeypatch.setenv('DB_PROFILE', 'default')
+    assert db_utils.get_db_profile(tmp_db) == 'default'
+
+
+def test_unknown_profile_rejected(monkeypatch, tmp_db):
+    monkeypatch.setenv('DB_PROFILE', 'fastest')
+    with pytest.raises(ValueError):
+        db_utils.get_db_profile(tmp_db)
+
+
+def test_performance_profile_pragmas(tmp_db):
+    conn = db_utils._connect(tmp_db, 'performance')
+    try:
+        assert conn.execute('PRAGMA journal_mode').fetchone()[0] == 'wal'
+        assert conn.execute('PRAGMA synchronous').fetchone()[0] == 1  # NORMAL
+        assert conn.execute('PRAGMA busy_timeout').fetchone()[0] == 5000
+        assert conn.execute('PRAGMA temp_store').fetchone()[0] == 2  # MEMORY
+    finally:
+        conn.close()
+
+
+def test_readonly_profile_rejects_writes(tmp_db):
+    setup = sqlite3.connect(tmp_db)
+    setup.execute('CREATE TABLE t (x INTEGER)')
+    setup.commit()
+    setup.close()
+
+    conn = db_utils._connect(tmp_db, 'readonly')
+    try:
+        assert conn.execute('SELECT COUNT(*) FROM t').fetchone()[0] == 0
+        with pytest.raises(sqlite3.OperationalError):
+            conn.execute('INSERT INTO t VALUES (1)')
+    finally:
+        conn.close()
+
+
+def test_lock_errors_are_retried(tmp_db, monkeypatch):
+    monkeypatch.setattr(db_utils, 'LOCK_RETRY_BASE_DELAY', 0)
+    conn = db_utils._connect(tmp_db, 'default')
+    calls = []
+
+    def flaky():
+        calls.append(1)
+        if len(calls) < 3:
+            raise sqlite3.OperationalError('database is locked')
+        return 'ok'
+
+    try:
+        assert conn._retry(flaky) == 'ok'
+        assert len(calls) == 3
+    finally:
+        conn.close()
+
+
+# ---- 结构迁移 ----
+
+def test_migrate_from_version_zero(tmp_db):
+    conn = db_utils._connect(tmp_db, 'default')
+    try:
+        assert db_utils.get_schema_version(conn) == 0
+        applied = db_utils.migrate(conn)
+        assert applied == [version for version, _, _ in db_utils.MIGRATIONS]
+        assert db_utils.get_schema_version(conn) == db_utils.SCHEMA_VERSION
+        tables = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+        assert {'users', 'team_members', 'notifications', 'table_generations', 'jobs'} <= tables
+
+        # 已是最新版本时不再执行任何步骤
+        assert db_utils.migrate(conn) == []
+    finally:
+        conn.close()
+
+
+def test_migrate_legacy_database_without_version(tmp_db):
+    """迁移机制之前建立的数据库（有表、user_version 为 0）补齐字段和索引"""
+    legacy = db_utils._connect(tmp_db, 'default')
+    db_utils._migration_baseline(legacy)
+    legacy.execute("INSERT INTO notifications (title, content) VALUES ('旧通知', '正文')")
+    legacy.close()
+
+    conn = db_utils._connect(tmp_db, 'default')
+    try:
+        assert db_utils.get_schema_version(conn) == 0
+        db_utils.migrate(conn)
+        columns = {row['name'] for row in conn.execute('PRAGMA table_info(notifications)')}
+        assert {'rendered_html', 'render_version'} <= columns
+        assert conn.execute("SELECT COUNT(*) FROM notifications WHERE title = '旧通知'").fetchone()[0] == 1
+        assert db_utils.get_schema_version(conn) == db_utils.SCHEMA_VERSION
+    finally:
+        conn.close()
+
+
+def test_failed_migration_rolls_back(tmp_db, monkeypatch):
+    def broken(conn):
+        conn.execute('CREATE TABLE half_done (x INTEGER)')
+        raise RuntimeError('boom')
+
+    monkeypatch.setattr(db_utils, 'MIGRATIONS', db_utils.MIGRATIONS[:1] + [(2, '失败的步骤', broken)])
+    conn = db_utils._connect(tmp_db, 'default')
+    try:
+        with pytest.raises(RuntimeError):
+            db_utils.migrate(conn)
+        assert db_utils.get_schema_version(conn) == 1
+        assert conn.execute("SELECT COUNT(*) FROM sqlite_master WHERE name = 'half_done'").fetchone()[0] == 0
+    finally:
+        conn.close()
+
+
+# ---- 连接泄漏检测与请求级统计 ----
+
+def test_request_accounting_counts_connections(app):
+    before = db_utils.get_pool_stats()['request_reuses']
+    with app.test_request_context('/'):
+        with db_utils.get_db():
+            pass
+        with db_utils.get_db():
+            pass
+        conn = db_utils.open_connection()
+        conn.close()
+        stats = db_utils.get_request_db_stats()
+    assert stats == {'checkouts': 1, 'reuses': 1, 'opened': 1, 'closed': 1, 'unclosed': 0}
+    assert db_utils.get_pool_stats()['request_reuses'] == before + 1
+
+
+def test_unclosed_connection_reported_and_closed(app, caplog):
+    with app.test_request_context('/leaky'):
+        leaked = db_utils.open_connection()
+        assert db_utils.get_request_db_stats()['unclosed'] == 1
+        with caplog.at_level('WARNING', logger='db_utils'):
+            db_utils._check_request_leaks(app.response_class())
+    assert any('/leaky' in record.getMessage() and '未关闭' in record.getMessage() for record in caplog.records)
+    # 应用上下文结束时遗留连接已被关闭
+    with pytest.raises(sqlite3.ProgrammingError):
+        leaked.execute('SELECT 1')
+
+
+def test_strict_mode_fails_request_on_leak(app, monkeypatch):
+    monkeypatch.setenv('DB_LEAK_STRICT', '1')
+    with app.test_request_context('/leaky'):
+        db_utils.open_connection()
+        with pytest.raises(RuntimeError):
+            db_utils._check_request_leaks(app.response_class())
+
+
+def test_request_reuse_counter_is_thread_safe(tmp_db):
+    pool = ConnectionPool(tmp_db, size=1)
+
+    def worker():
+        for _ in range(1000):
+            pool.note_request_reuse()
+
+    threads = [threading.Thread(target=worker) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert pool.stats()['request_reuses'] == 8000
+
+
+def test_close_all_checkpoints_wal(tmp_db, monkeypatch):
+    import os
+
+    monkeypatch.delenv('DB_PROFILE', raising=False)
+    monkeypatch.delenv('VERCEL', raising=False)
+    pool = ConnectionPool(tmp_db, size=1)
+    assert pool.profile == 'performance'
+    conn = pool.acquire()
+    conn.execute('CREATE TABLE t (x INTEGER)')
+    conn.execute('INSERT INTO t VALUES (1)')
+    conn.commit()
+    pool.release(conn)
+    assert os.path.getsize(tmp_db + '-wal') > 0
+
+    # 另一个连接仍打开时也把修改写回数据库文件
+    reader = sqlite3.connect(tmp_db)
+    reader.execute('SELECT 1').fetchone()
+    monkeypatch.setattr(db_utils, '_pool', pool)
+    db_utils._close_pool_at_exit()
+    assert pool.stats()['open'] == 0
+    assert not os.path.exists(tmp_db + '-wal') or os.path.getsize(tmp_db + '-wal') == 0
+    reader.close()
+
+    # 只复制数据库文件（不含 -wal）也能读到修改
+    copy = tmp_db + '.copy'
+    with open(tmp_db, 'rb') as source, open(copy, 'wb') as target:
+        target.write(source.read())
+    assert sqlite3.connect(copy).execute('SELECT x FROM t').fetchone()[0] == 1
+
+
+def test_pool_stats_only_for_admin(client, admin_client):
+    health = client.get('/health').get_json()
+    assert health['status'] == 'healthy'
+    assert 'db_pool' not in health
+
+    assert client.get('/debug/db-pool').status_code == 401
+    stats = admin_client.get('/debug/db-pool').get_json()['data']
+    assert {'checkouts', 'open', 'idle', 'size'} <= set(stats)
@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""
+条件请求测试：只读API返回ETag，If-None-Match 命中时返回304，写入后ETag变化
+
+用法: python -m pytest -q test_etag_utils.py
+"""
+
+from etag_utils import classify_statement, conditional_get
+
+
+def test_classify_statement():
+    assert classify_statement('SELECT * FROM papers JOIN paper_categories ON 1') == \
+        ('read', frozenset({'papers', 'paper_categories'}))
+    assert classify_statement('UPDATE notifications SET view_count = 1') == ('write', frozenset({'notifications'}))
+    assert classify_statement('PRAGMA user_version') == ('neutral', frozenset())
+
+
+def test_read_api_gets_etag_then_304(client):
+    first = client.get('/api/grades')
+    assert first.status_code == 200
+    etag = first.headers['ETag']
+
+    second = client.get('/api/grades', headers={'If-None-Match': etag})
+    assert second.status_code == 304
+    assert second.data == b''
+    assert conditional_get.stats()['endpoints']['/api/grades'] == ['grades', 'team_members']
+
+
+def test_write_changes_etag(admin_client):
+    etag = admin_client.get('/api/grades').headers['ETag']
+    response = admin_client.post('/api/grades', json={'name': '2031级', 'description': 'ETag'})
+    assert response.status_code in (200, 201)
+
+    response = admin_client.get('/api/grades', headers={'If-None-Match': etag})
+    assert response.status_code == 200
+    assert response.headers['ETag'] != etag
+
+
+def test_etag_depends_on_query_and_session(client, admin_client):
+    etag = client.get('/api/grades').headers['ETag']
+    assert client.get('/api/grades?x=1').headers['ETag'] != etag
+    assert admin_client.get('/api/grades', headers={'If-None-Match': etag}).status_code == 200
+
+
+def test_endpoint_without_queries_not_tagged(client):
+    response = client.get('/api/suggest?q=')
+    assert response.status_code == 200
+    assert 'ETag' not in response.headers
+
+
+def test_notification_detail_counts_every_view(client):
+    """详情接口每次请求都累加浏览量，不能在视图执行前以304应答"""
+    from db_utils import get_db
+    from counter_utils import view_counter
+
+    with get_db() as conn:
+        notification_id = conn.execute(
+            "INSERT INTO notifications (title, content, status) VALUES ('浏览量', '正文', 'published')"
+        ).lastrowid
+        conn.commit()
+
+    for _ in range(3):
+        response = client.get(f'/api/notifications/{notification_id}', headers={'If-None-Match': '*'})
+        assert response.status_code == 200
+        assert 'ETag' not in response.headers
+        assert response.cache_control.no_store
+
+    view_counter.flush()
+    with get_db() as conn:
+        views = conn.execute('SELECT view_count FROM notifications WHERE id = ?', (notification_id,)).fetchone()[0]
+        conn.execute('DELETE FROM notifications WHERE id = ?', (notification_id,))
+        conn.commit()
+    assert views == 3
+    assert conditional_get.stats()['endpoints']['/api/notifications/<int:notification_id>'] is None
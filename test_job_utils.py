@@ -0,0 +1,180 @@
+#!/usr/bin/env python3
+"""
+后台任务队列测试：幂等登记、失败重试与最终失败、不可重试的错误、周期任务的自动续登记，
+以及上传文档任务在内容无效时不再重试
+
+用法: python -m pytest -q test_job_utils.py
+"""
+
+import os
+import uuid
+import sqlite3
+
+import pytest
+
+import db_utils
+from job_utils import JobQueue, PermanentJobError, job_queue
+
+
+@pytest.fixture
+def queue(app):
+    """有工作线程配置、但由测试手动领取和执行任务的队列"""
+    jobs = JobQueue()
+    jobs._app = app
+    jobs.worker_count = 1
+    return jobs
+
+
+def _run(jobs, job_id):
+    job = jobs._claim('test', job_id)
+    assert job is not None
+    jobs._execute(job)
+    return jobs.get(job_id)
+
+
+def _job_row(job_id):
+    with db_utils.get_db() as conn:
+        return dict(conn.execute('SELECT * FROM jobs WHERE id = ?', (job_id,)).fetchone())
+
+
+def test_idempotent_enqueue(queue):
+    queue.handler('test.echo')(lambda payload: payload)
+    key = f'echo:{uuid.uuid4().hex}'
+    first = queue.enqueue('test.echo', {'x': 1}, idempotency_key=key)
+    assert queue.enqueue('test.echo', {'x': 2}, idempotency_key=key) == first
+    assert queue.find(key) == first
+    assert _run(queue, first)['result'] == {'x': 1}
+
+
+def test_unknown_kind_rejected(queue):
+    with pytest.raises(ValueError):
+        queue.enqueue('test.missing')
+
+
+def test_failure_retried_then_failed(queue):
+    calls = []
+
+    @queue.handler('test.flaky', max_attempts=2)
+    def flaky(payload):
+        calls.append(1)
+        raise RuntimeError('暂时失败')
+
+    job_id = queue.enqueue('test.flaky')
+    job = _run(queue, job_id)
+    assert (job['status'], job['attempts']) == ('queued', 1)
+    assert _job_row(job_id)['run_after'] > _job_row(job_id)['locked_at']
+
+    job = _run(queue, job_id)
+    assert (job['status'], job['attempts']) == ('failed', 2)
+    assert job['error'] == 'RuntimeError: 暂时失败'
+    assert queue.retried == 1 and queue.failed == 1
+
+
+def test_permanent_error_not_retried(queue):
+    @queue.handler('test.invalid', max_attempts=3)
+    def invalid(payload):
+        raise PermanentJobError('内容无效')
+
+    job = _run(queue, queue.enqueue('test.invalid'))
+    assert (job['status'], job['attempts']) == ('failed', 1)
+
+
+def test_inline_execution_without_workers(app):
+    jobs = JobQueue()
+    jobs._app = app
+    jobs.handler('test.inline')(lambda payload: {'ok': True})
+    job_id = jobs.enqueue('test.inline')
+    assert jobs.get(job_id)['status'] == 'succeeded'
+
+
+def test_periodic_job_rescheduled_after_each_run(queue):
+    queue.handler('test.daily', max_attempts=1, interval=3600)(lambda payload: {'done': True})
+    first = queue.schedule('test.daily', {'days': 7})
+    # 同一周期内重复登记（多个进程启动）只保留一个任务
+    assert queue.schedule('test.daily', {'days': 7}) == first
+
+    _run(queue, first)
+    with db_utils.get_db() as conn:
+        following = conn.execute(
+            "SELECT * FROM jobs WHERE kind = 'test.daily' AND status = 'queued'"
+        ).fetchall()
+    assert len(following) == 1
+    assert following[0]['payload'] == '{"days": 7}'
+    assert following[0]['run_after'] > _job_row(first)['locked_at'] + 3500
+
+
+def test_periodic_job_rescheduled_after_final_failure(queue):
+    @queue.handler('test.daily_failing', max_attempts=1, interval=3600)
+    def failing(payload):
+        raise RuntimeError('失败')
+
+    _run(queue, queue.schedule('test.daily_failing'))
+    with db_utils.get_db() as conn:
+        assert conn.execute(
+            "SELECT COUNT(*) FROM jobs WHERE kind = 'test.daily_failing' AND status = 'queued'"
+        ).fetchone()[0] == 1
+
+
+def test_schedule_requires_workers(app):
+    jobs = JobQueue()
+    jobs.handler('test.periodic', interval=60)(lambda payload: None)
+    assert jobs.schedule('test.periodic') is None
+
+
+def test_maintenance_jobs_are_periodic():
+    assert job_queue._handlers['jobs.purge'][2] == 86400
+    assert job_queue._handlers['analytics.purge'][2] == 86400
+
+
+@pytest.fixture
+def upload(queue, app):
+    """已保存的上传文件和使用真实处理函数的导入任务"""
+    from api import notifications
+    queue._handlers['notifications.import_document'] = job_queue._handlers['notifications.import_document']
+    stored = f'{uuid.uuid4()}_doc.md'
+    with app.app_context():
+        path = os.path.join(notifications.ensure_upload_dir(), stored)
+    payload = {'stored_filename': stored, 'original_filename': 'doc.md', 'title': '上传文档',
+               'category': '实验室制度', 'card_style': ''}
+    yield queue, path, payload
+    if os.path.exists(path):
+        os.remove(path)
+
+
+def test_invalid_upload_not_retried(upload):
+    jobs, path, payload = upload
+    open(path, 'w').close()
+    job = _run(jobs, jobs.enqueue('notifications.import_document', payload))
+    assert (job['status'], job['attempts']) == ('failed', 1)
+    assert not os.path.exists(path)
+
+
+def test_upload_kept_for_retry_on_transient_error(upload, monkeypatch):
+    from api import notifications
+    jobs, path, payload = upload
+    with open(path, 'w', encoding='utf-8') as file:
+        file.write('# 文档\n\n正文')
+
+    def locked(*args, **kwargs):
+        raise sqlite3.OperationalError('database is locked')
+
+    job_id = jobs.enqueue('notifications.import_document', payload)
+    monkeypatch.setattr(notifications, 'render_content', locked)
+    assert _run(jobs, job_id)['status'] == 'queued'
+    assert os.path.exists(path)
+
+    monkeypatch.undo()
+    job = _run(jobs, job_id)
+    assert job['status'] == 'succeeded'
+    assert job['result']['id']
+
+
+def test_job_status_requires_admin(client, admin_client):
+    from job_utils import job_queue
+
+    job_id = job_queue.enqueue('jobs.purge')
+    assert client.get(f'/api/jobs/{job_id}').status_code == 401
+    response = admin_client.get(f'/api/jobs/{job_id}')
+    assert response.status_code == 200
+    assert response.get_json()['data']['status'] == 'succeeded'
+    assert admin_client.get('/api/jobs/missing').status_code == 404
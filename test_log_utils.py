@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""
+日志工具测试：JSON格式、请求上下文字段、DEBUG采样和异步队列输出
+
+用法: python -m pytest -q test_log_utils.py
+"""
+
+import sys
+import json
+import queue
+import logging
+
+from flask import Flask
+
+from log_utils import JsonFormatter, RequestContextFilter, SamplingFilter, _QueueHandler, _parse_levels
+
+
+def _record(message, *args, level=logging.INFO, **extra):
+    record = logging.LogRecord('api.test', level, __file__, 1, message, args, None)
+    record.__dict__.update(extra)
+    return record
+
+
+def test_json_formatter_includes_extra_fields():
+    payload = json.loads(JsonFormatter().format(_record('加载 %d 条通知', 3, notification_id=7)))
+    assert payload['message'] == '加载 3 条通知'
+    assert payload['level'] == 'INFO'
+    assert payload['logger'] == 'api.test'
+    assert payload['notification_id'] == 7
+
+
+def test_json_formatter_exception():
+    try:
+        raise ValueError('坏数据')
+    except ValueError:
+        record = logging.LogRecord('api.test', logging.ERROR, __file__, 1, '失败', (), sys.exc_info())
+    payload = json.loads(JsonFormatter().format(record))
+    assert 'ValueError: 坏数据' in payload['exception']
+
+
+def test_request_context_filter():
+    flask_app = Flask(__name__)
+    record = _record('请求内')
+    with flask_app.test_request_context('/api/papers', method='POST'):
+        assert RequestContextFilter().filter(record)
+    assert (record.method, record.path) == ('POST', '/api/papers')
+
+
+def test_sampling_keeps_info_and_above():
+    never = SamplingFilter(0)
+    assert never.filter(_record('info'))
+    assert never.filter(_record('warning', level=logging.WARNING))
+    assert not never.filter(_record('debug', level=logging.DEBUG))
+    assert SamplingFilter(1).filter(_record('debug', level=logging.DEBUG))
+
+
+def test_queue_handler_formats_message_in_caller():
+    log_queue = queue.SimpleQueue()
+    handler = _QueueHandler(log_queue)
+    handler.emit(_record('第 %s 页', 2))
+    record = log_queue.get_nowait()
+    assert record.msg == '第 2 页'
+    assert record.args is None
+
+
+def test_parse_levels():
+    assert _parse_levels('db_utils=warning, api.notifications=DEBUG,bad') == {
+        'db_utils': 'WARNING',
+        'api.notifications': 'DEBUG',
+    }
@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+"""
+Markdown实例池测试：实例复用、归还时重置状态（脚注、目录不串到下一次转换）、出错的实例丢弃
+
+用法: python -m pytest -q test_markdown_utils.py
+"""
+
+import threading
+
+import pytest
+
+from markdown_utils import ConverterPool, get_pool
+
+
+def test_converter_reused_and_reset():
+    pool = ConverterPool(['footnotes', 'toc'])
+    with pool.converter() as md:
+        first = md
+        html = md.convert('正文[^1]\n\n[^1]: 脚注内容\n\n## 小节')
+        assert '脚注内容' in html
+        assert md.toc_tokens[0]['name'] == '小节'
+
+    with pool.converter() as md:
+        assert md is first
+        html = md.convert('没有脚注')
+        assert '脚注内容' not in html
+        assert md.toc_tokens == []
+
+    stats = pool.stats()
+    assert (stats['created'], stats['reused'], stats['idle']) == (1, 1, 1)
+
+
+def test_failed_converter_discarded():
+    pool = ConverterPool(['toc'])
+    with pytest.raises(RuntimeError):
+        with pool.converter():
+            raise RuntimeError('转换失败')
+    stats = pool.stats()
+    assert stats['discarded'] == 1 and stats['idle'] == 0
+
+
+def test_pool_size_bounded():
+    pool = ConverterPool(['toc'], maxsize=2)
+    barrier = threading.Barrier(4)
+
+    def convert():
+        with pool.converter() as md:
+            barrier.wait(5)
+            md.convert('# 标题')
+
+    threads = [threading.Thread(target=convert) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(5)
+    stats = pool.stats()
+    assert stats['created'] == 4
+    assert stats['idle'] == 2 and stats['discarded'] == 2
+
+
+def test_get_pool_by_config():
+    assert get_pool(['toc'], {'toc': {'permalink': False}}) is get_pool(['toc'], {'toc': {'permalink': False}})
+    assert get_pool(['toc']) is not get_pool(['toc', 'tables'])
@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+预生成响应测试：首次请求生成并保存、之后直接返回保存的字节、写入后重新生成，
+以及视图返回兜底数据或错误时不保存
+
+用法: python -m pytest -q test_materialize_utils.py
+"""
+
+import gzip
+
+import pytest
+
+import db_utils
+import app as app_module
+from materialize_utils import materializer
+
+
+def _stored(path):
+    with db_utils.get_db() as conn:
+        return conn.execute('SELECT stamp, body FROM materialized_payloads WHERE path = ?', (path,)).fetchone()
+
+
+@pytest.fixture(autouse=True)
+def reset_payloads(app):
+    def clear():
+        materializer._payloads.clear()
+        with db_utils.get_db() as conn:
+            conn.execute('DELETE FROM materialized_payloads')
+    clear()
+    yield
+    clear()
+
+
+def _broken_get_db():
+    raise RuntimeError('数据库不可用')
+
+
+def test_payload_built_once_and_served(client):
+    first = client.get('/api/frontend/activities')
+    assert first.status_code == 200
+    assert _stored('/api/frontend/activities') is not None
+
+    second = client.get('/api/frontend/activities')
+    assert second.headers['X-Materialized'] == '1'
+    assert second.data == first.data
+
+
+def _add_advisor(name):
+    with db_utils.get_db() as conn:
+        conn.execute("INSERT INTO advisors (name, position, description) VALUES (?, '教授', ?)", (name, '简介' * 100))
+
+
+def test_gzip_copy_served_when_accepted(client):
+    _add_advisor('压缩测试')
+    plain = client.get('/api/frontend/advisors')
+    compressed = client.get('/api/frontend/advisors', headers={'Accept-Encoding': 'gzip'})
+    assert compressed.headers['Content-Encoding'] == 'gzip'
+    assert gzip.decompress(compressed.data) == plain.data
+
+
+def test_write_rebuilds_payload(client):
+    client.get('/api/frontend/advisors')
+    stamp = _stored('/api/frontend/advisors')['stamp']
+    _add_advisor('重新生成测试')
+    response = client.get('/api/frontend/advisors')
+    assert '重新生成测试' in [advisor['name'] for advisor in response.get_json()]
+    assert _stored('/api/frontend/advisors')['stamp'] != stamp
+
+
+def test_fallback_response_not_persisted(client, monkeypatch):
+    monkeypatch.setattr(app_module, 'get_db', _broken_get_db)
+    response = client.get('/api/frontend/activities')
+    assert response.status_code == 200
+    assert response.get_json() == []
+    assert 'X-Materialized' not in response.headers
+    assert _stored('/api/frontend/activities') is None
+    assert '/api/frontend/activities' not in materializer._payloads
+
+    monkeypatch.undo()
+    client.get('/api/frontend/activities')
+    assert _stored('/api/frontend/activities') is not None
+
+
+def test_error_response_not_persisted(client, monkeypatch):
+    from api import innovation
+    monkeypatch.setattr(innovation, 'get_db', _broken_get_db)
+    assert client.get('/api/innovation/frontend/stats').status_code == 500
+    assert _stored('/api/innovation/frontend/stats') is None
@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+请求指标测试：直方图累计、多进程汇总和 /metrics 输出格式
+
+用法: python -m pytest -q test_metrics_utils.py
+"""
+
+from metrics_utils import MetricsRegistry
+
+
+def test_histogram_buckets_are_cumulative(tmp_path):
+    registry = MetricsRegistry(db_path=str(tmp_path / 'metrics.db'))
+    registry.observe('/api/papers', 'GET', 200, 0.003, 100)
+    registry.observe('/api/papers', 'GET', 204, 0.2, 50)
+    registry.observe('/api/papers', 'GET', 500, 20.0)
+
+    totals = registry.collect()
+    ok = 'endpoint="/api/papers",method="GET",status="2xx"'
+    assert totals[('http_request_duration_seconds_bucket', ok + ',le="0.005"')] == 1
+    assert totals[('http_request_duration_seconds_bucket', ok + ',le="0.25"')] == 2
+    assert totals[('http_request_duration_seconds_bucket', ok + ',le="+Inf"')] == 2
+    assert totals[('http_request_duration_seconds_count', ok)] == 2
+    assert totals[('http_response_size_bytes_sum', ok)] == 150
+
+    error = 'endpoint="/api/papers",method="GET",status="5xx"'
+    assert totals[('http_request_duration_seconds_bucket', error + ',le="10.0"')] == 0
+    assert totals[('http_request_duration_seconds_bucket', error + ',le="+Inf"')] == 1
+
+
+def test_processes_are_summed(tmp_path):
+    path = str(tmp_path / 'metrics.db')
+    first = MetricsRegistry(db_path=path)
+    second = MetricsRegistry(db_path=path)
+    first.observe('/api/team', 'GET', 200, 0.01)
+    second.observe('/api/team', 'GET', 200, 0.02)
+    first.flush()
+
+    totals = second.collect()
+    assert totals[('http_request_duration_seconds_count', 'endpoint="/api/team",method="GET",status="2xx"')] == 2
+
+
+def test_render_orders_buckets(tmp_path):
+    registry = MetricsRegistry(db_path=str(tmp_path / 'metrics.db'))
+    registry.observe('/x', 'GET', 200, 0.05)
+    lines = registry.render().splitlines()
+
+    assert '# TYPE http_request_duration_seconds histogram' in lines
+    buckets = [line for line in lines if line.startswith('http_request_duration_seconds_bucket')]
+    assert buckets[0].endswith('le="0.005"} 0')
+    assert buckets[-1].endswith('le="+Inf"} 1')
+    assert 'http_requests_in_flight 0' in lines
+
+
+def test_metrics_endpoint(admin_client):
+    admin_client.get('/api/papers')
+    response = admin_client.get('/metrics')
+    assert response.status_code == 200
+    assert response.mimetype == 'text/plain'
+    assert response.cache_control.no_store
+    assert 'endpoint="/api/papers",method="GET",status="2xx"' in response.get_data(as_text=True)
+
+
+def test_metrics_requires_admin_by_default(client, monkeypatch):
+    monkeypatch.delenv('METRICS_TOKEN', raising=False)
+    monkeypatch.delenv('METRICS_PUBLIC', raising=False)
+    assert client.get('/metrics').status_code == 401
+
+
+def test_metrics_token(client, monkeypatch):
+    monkeypatch.setenv('METRICS_TOKEN', 'secret')
+    assert client.get('/metrics').status_code == 401
+    assert client.get('/metrics', headers={'Authorization': 'Bearer wrong'}).status_code == 401
+    assert client.get('/metrics', headers={'Authorization': 'Bearer secret'}).status_code == 200
+
+
+def test_metrics_public_opt_in(client, monkeypatch):
+    monkeypatch.setenv('METRICS_PUBLIC', '1')
+    assert client.get('/metrics').status_code == 200
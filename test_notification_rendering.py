@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+"""
+通知预渲染测试：创建时保存渲染结果，详情页直接使用，渲染器版本升级后批量重新渲染
+
+用法: python -m pytest -q test_notification_rendering.py
+"""
+
+import db_utils
+from api.notifications import RENDERER_VERSION, ensure_rendered, render_content, rerender_outdated
+
+MARKDOWN = '# 标题\n\n## 第一节\n\n正文 **加粗**\n\n- 列表项\n'
+
+
+def _create(admin_client, content=MARKDOWN):
+    response = admin_client.post('/api/notifications', json={'title': '渲染测试', 'content': content})
+    assert response.status_code == 201
+    return response.get_json()['id']
+
+
+def _row(notification_id):
+    with db_utils.get_db() as conn:
+        return dict(conn.execute('SELECT * FROM notifications WHERE id = ?', (notification_id,)).fetchone())
+
+
+def test_render_content_markdown():
+    rendered = render_content(MARKDOWN)
+    assert rendered['markdown']
+    assert '<strong>加粗</strong>' in rendered['html']
+    assert '>第一节</a>' in rendered['toc']
+    assert rendered['version'] == RENDERER_VERSION
+
+
+def test_render_content_plain_text():
+    rendered = render_content('第一段\n\n第二段')
+    assert not rendered['markdown']
+    assert rendered['html'] == '<p>第一段</p><p>第二段</p>'
+    assert rendered['toc'] == ''
+
+
+def test_rendered_at_write_time(admin_client):
+    notification_id = _create(admin_client)
+    row = _row(notification_id)
+    assert row['render_version'] == RENDERER_VERSION
+    assert '<strong>加粗</strong>' in row['rendered_html']
+
+    page = admin_client.get(f'/notification/{notification_id}')
+    assert page.status_code == 200
+    assert '<strong>加粗</strong>' in page.get_data(as_text=True)
+
+
+def test_outdated_rendering_refreshed(admin_client):
+    notification_id = _create(admin_client)
+    with db_utils.get_db() as conn:
+        conn.execute('UPDATE notifications SET rendered_html = NULL, render_version = 0 WHERE id = ?', (notification_id,))
+        notification = ensure_rendered(conn, _row(notification_id))
+    assert notification['render_version'] == RENDERER_VERSION
+    assert _row(notification_id)['rendered_html'] == notification['rendered_html']
+
+
+def test_rerender_outdated_batch(admin_client):
+    ids = [_create(admin_client) for _ in range(3)]
+    with db_utils.get_db() as conn:
+        conn.execute('UPDATE notifications SET render_version = 0 WHERE id IN (?, ?)', ids[:2])
+    assert rerender_outdated(workers=0) == 2
+    assert all(_row(notification_id)['render_version'] == RENDERER_VERSION for notification_id in ids)
+    assert rerender_outdated(workers=0) == 0
@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+optimize_html_content 输出一致性测试
+固定输入的期望输出（golden），以及与旧版多次 re.sub 实现在Markdown语料上的逐字节对比
+（旧版把无属性的 h2-h6 改成 h1 的问题已修正，golden 中是修正后的输出）
+
+用法: python -m pytest -q test_optimize_html_content.py
+"""
+
+import os
+import sys
+
+import pytest
+
+# 添加当前目录到Python路径
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from api.notifications import markdown_to_html, optimize_html_content, preprocess_markdown_images
+from bench_html_postprocess import legacy_optimize_html_content
+from bench_markdown import LONG_SECTION, SHORT_NOTICE
+
+GOLDEN = [
+    (
+        '<h2>第一章 动态规划</h2>',
+        '<h2 id="第一章-动态规划">第一章 动态规划</h2>',
+    ),
+    (
+        '<h3>C++ & <em>STL</em></h3>',
+        '<h3 id="c-em-stl-em">C++ & <em>STL</em></h3>',
+    ),
+    (
+        '<h2 id="_1">已有属性的标题不变</h2>',
+        '<h2 id="_1">已有属性的标题不变</h2>',
+    ),
+    (
+        '<table>\n<tr><td>1</td></tr>\n</table>',
+        '<div class="table-responsive"><table class="table table-striped">\n<tr><td>1</td></tr>\n</table></div>',
+    ),
+    (
+        '<pre><code class="language-cpp">int a;\n</code></pre>',
+        '<div class="code-block-container"><pre><code class="language-cpp">int a;\n</code></pre></div>',
+    ),
+    (
+        '<img alt="图" src="/static/a.png" />',
+        '<img alt="图" src="/static/a.png" / loading="lazy" class="responsive-image" '
+        'onclick="openImageModal(this)" style="cursor: pointer;">',
+    ),
+    (
+        '<img src="a.png" class="x" style="width: 50%">',
+        '<img src="a.png" class="x responsive-image" style="width: 50%; cursor: pointer;" loading="lazy" '
+        'onclick="openImageModal(this)">',
+    ),
+    (
+        '<img class="x" src="a.png" loading="eager">',
+        '<img class="x" src="a.png" loading="eager" onclick="openImageModal(this)" style="cursor: pointer;">',
+    ),
+    (
+        '<blockquote>\n<p>引用</p>\n</blockquote><p></p>',
+        '<blockquote class="blockquote">\n<p>引用</p>\n</blockquote>',
+    ),
+    (
+        '<h2>图示 <img src="b.png"></h2>',
+        '<h2 id="图示-img-src-b-png">图示 <img src="b.png" loading="lazy" class="responsive-image" '
+        'onclick="openImageModal(this)" style="cursor: pointer;"></h2>',
+    ),
+    (
+        '<h1>未闭合\n</h1>',
+        '<h1>未闭合\n</h1>',
+    ),
+    ('', ''),
+]
+
+
+@pytest.mark.parametrize('html, expected', GOLDEN)
+def test_golden_output(html, expected):
+    assert optimize_html_content(html) == expected
+
+
+def test_legacy_heading_level_bug_is_fixed():
+    # 旧版用 len(级别数字) 作为级别，无属性的 h2-h6 会被改成 h1；Markdown输出的标题都带 id，不受影响
+    assert legacy_optimize_html_content('<h2>a</h2>') == '<h1 id="a">a</h1>'
+    assert optimize_html_content('<h2>a</h2>') == '<h2 id="a">a</h2>'
+
+
+MARKDOWN_CORPUS = [
+    SHORT_NOTICE,
+    '# 集训讲义\n\n' + ''.join(LONG_SECTION.format(n=n) for n in range(1, 6)),
+    '## 图片\n\n![配图](uploads/a.png "标题")\n\n![外链](https://example.com/b.png)\n\n<p></p>\n',
+    '> 引用\n>\n> - 列表\n\n| a | b |\n|---|---|\n| 1 | 2 |\n\n```python\nprint("<h1>x</h1>")\n```\n',
+    '### 行内 `code` 与 **粗体** 标题\n\n正文\n换行\n',
+]
+
+
+@pytest.mark.parametrize('text', MARKDOWN_CORPUS)
+def test_matches_legacy_on_markdown(text):
+    # 取Markdown转换后、后处理前的HTML，与旧版逐字节对比
+    import markdown
+    from api.notifications import MARKDOWN_EXTENSIONS, MARKDOWN_EXTENSION_CONFIGS
+
+    md = markdown.Markdown(extensions=MARKDOWN_EXTENSIONS, extension_configs=MARKDOWN_EXTENSION_CONFIGS)
+    html = md.convert(preprocess_markdown_images(text))
+    assert optimize_html_content(html) == legacy_optimize_html_content(html)
+
+
+def test_markdown_to_html_uses_post_processor():
+    html = markdown_to_html('| a |\n|---|\n| 1 |\n')
+    assert html.startswith('<div class="table-responsive"><table class="table table-striped">')
+    assert html.endswith('</table></div>')
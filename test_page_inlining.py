@@ -0,0 +1,52 @@
+#!/usr/bin/env python3
+"""
+页面内联首屏数据测试：?inline=1 时页面中嵌入转义后的区块数据，关闭时不嵌入
+
+用法: python -m pytest -q test_page_inlining.py
+"""
+
+import re
+import json
+
+from markupsafe import Markup
+
+from api import bootstrap
+
+_DATA_SCRIPT = re.compile(r'<script type="application/json" id="page-bootstrap-data">(.*?)</script>', re.S)
+
+
+def test_inline_page_embeds_preset_sections(client):
+    response = client.get('/team?inline=1')
+    assert response.status_code == 200
+    match = _DATA_SCRIPT.search(response.get_data(as_text=True))
+    assert match is not None
+    data = json.loads(match.group(1))
+    assert set(data) == set(bootstrap.PAGE_PRESETS['team'])
+    assert data['team'] == client.get('/api/team').get_json()
+    # 内联了数据的页面只短时间缓存
+    assert response.cache_control.max_age == 300
+
+
+def test_page_without_inline(client):
+    response = client.get('/team?inline=0')
+    assert response.status_code == 200
+    assert _DATA_SCRIPT.search(response.get_data(as_text=True)) is None
+
+
+def test_inline_data_is_script_safe(app, monkeypatch):
+    monkeypatch.setattr(bootstrap, 'build_payload', lambda names: (b'{"x":"</script><b>&\'"}', 0))
+    with app.test_request_context('/'):
+        script = bootstrap.page_data_script('index')
+    assert isinstance(script, Markup)
+    body = _DATA_SCRIPT.search(str(script)).group(1)
+    assert '</script>' not in body and '<b>' not in body
+    assert json.loads(body) == {'x': "</script><b>&'"}
+
+
+def test_inline_failure_falls_back(app, monkeypatch):
+    def broken(names):
+        raise RuntimeError('boom')
+
+    monkeypatch.setattr(bootstrap, 'build_payload', broken)
+    with app.test_request_context('/'):
+        assert bootstrap.page_data_script('index') == ''
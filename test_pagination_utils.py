@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+游标分页测试：游标编码与校验、含 NULL 排序键时逐页遍历不重不漏、排序键随页查询一并取出、
+分页接口的参数校验和总数
+
+用法: python -m pytest -q test_pagination_utils.py
+"""
+
+import sqlite3
+
+import pytest
+
+import db_utils
+from pagination_utils import PageRequest, fetch_page, encode_cursor, decode_cursor
+
+ORDER = [('COALESCE(sort_order, 0)', 'ASC'), ('created_at', 'DESC')]
+
+
+@pytest.fixture
+def conn():
+    connection = sqlite3.connect(':memory:')
+    connection.row_factory = sqlite3.Row
+    connection.execute('CREATE TABLE items (id INTEGER PRIMARY KEY, name TEXT, sort_order INTEGER, created_at TEXT)')
+    rows = []
+    for i in range(1, 24):
+        # 排序值和时间都有 NULL 和重复值
+        sort_order = None if i % 5 == 0 else i % 3
+        created_at = None if i % 4 == 0 else f'2024-01-{i % 7 + 1:02d}'
+        rows.append((i, f'item{i}', sort_order, created_at))
+    connection.executemany('INSERT INTO items VALUES (?, ?, ?, ?)', rows)
+    yield connection
+    connection.close()
+
+
+def _walk(conn, order, limit):
+    pages = []
+    after = None
+    while True:
+        rows, info = fetch_page(conn, PageRequest(limit, after), 'items', order)
+        pages.append([row['id'] for row in rows])
+        if not info['has_more']:
+            assert info['next_cursor'] is None
+            return pages
+        after = decode_cursor('items', order, info['next_cursor'])
+        assert after is not None
+
+
+@pytest.mark.parametrize('order', [
+    ORDER,
+    [('sort_order', 'ASC'), ('created_at', 'DESC')],
+    [('created_at', 'ASC'), ('sort_order', 'DESC')],
+])
+@pytest.mark.parametrize('limit', [1, 4, 23])
+def test_pages_match_full_list(conn, order, limit):
+    """NULL 排序键（升序在前、降序在后）逐页遍历的结果与一次查询完整列表相同"""
+    full, info = fetch_page(conn, None, 'items', order)
+    assert info is None
+    pages = _walk(conn, order, limit)
+    assert [item for page in pages for item in page] == [row['id'] for row in full]
+    assert all(len(page) <= limit for page in pages)
+
+
+def test_page_rows_have_only_requested_columns(conn):
+    rows, info = fetch_page(conn, PageRequest(2), 'items', ORDER, columns='id, name')
+    assert [sorted(row) for row in rows] == [['id', 'name'], ['id', 'name']]
+    assert info['has_more']
+
+
+def test_page_uses_a_single_query(conn):
+    statements = []
+    conn.set_trace_callback(statements.append)
+    fetch_page(conn, PageRequest(3), 'items', ORDER, where='id > ?', params=(2,))
+    conn.set_trace_callback(None)
+    assert len(statements) == 1
+
+
+def test_cursor_rejects_other_lists_and_garbage():
+    cursor = encode_cursor('items', ORDER, (1, None, 7))
+    assert decode_cursor('items', ORDER, cursor) == [1, None, 7]
+    assert decode_cursor('papers', ORDER, cursor) is None
+    assert decode_cursor('items', ORDER[:1], cursor) is None
+    assert decode_cursor('items', ORDER, 'not-a-cursor') is None
+
+
+def test_paged_api(admin_client):
+    with db_utils.get_db() as conn:
+        conn.executemany(
+            "INSERT INTO innovation_projects (title, status, sort_order) VALUES (?, 'active', ?)",
+            [(f'分页项目{i}', None if i % 2 else i) for i in range(5)]
+        )
+        conn.commit()
+        expected = [row['id'] for row in conn.execute('''
+            SELECT id FROM innovation_projects WHERE status = 'active'
+            ORDER BY COALESCE(sort_order, 0) ASC, created_at DESC, id ASC
+        ''')]
+
+    seen = []
+    url = '/api/innovation-projects?limit=2&total=1'
+    while url:
+        body = admin_client.get(url).get_json()
+        assert body['page']['total'] == len(expected)
+        assert all(not key.startswith('_page_key') for item in body['data'] for key in item)
+        seen.extend(item['id'] for item in body['data'])
+        cursor = body['page']['next_cursor']
+        url = f'/api/innovation-projects?limit=2&total=1&cursor={cursor}' if cursor else None
+    assert seen == expected
+
+    # 未分页时保持完整列表格式，顺序相同
+    assert [item['id'] for item in admin_client.get('/api/innovation-projects').get_json()] == expected
+
+
+def test_bad_page_arguments(client):
+    assert client.get('/api/innovation-projects?limit=abc').status_code == 400
+    assert client.get('/api/innovation-projects?limit=0').status_code == 400
+    assert client.get('/api/innovation-projects?limit=101').status_code == 400
+    other = encode_cursor('papers', [('created_at', 'DESC')], ('2024-01-01',))
+    assert client.get(f'/api/innovation-projects?cursor={other}').status_code == 400
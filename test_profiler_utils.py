@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""
+SQL分析器测试：语句规范化、N+1检测和 Server-Timing 响应头
+
+用法: python -m pytest -q test_profiler_utils.py
+"""
+
+import pytest
+from flask import Flask
+
+import db_utils
+from profiler_utils import QueryProfiler, normalize_sql, query_profiler
+
+
+@pytest.fixture
+def profiled_app():
+    # 语句观察者是全局的，应用自身的分析器也会写入同一请求的记录，测试期间先移除
+    registered = query_profiler._record_statement in db_utils._statement_observers
+    db_utils.remove_statement_observer(query_profiler._record_statement)
+    profiler = QueryProfiler(threshold=3)
+    flask_app = Flask(__name__)
+    profiler.init_app(flask_app)
+
+    @flask_app.route('/items')
+    def items():
+        with db_utils.get_db() as conn:
+            for item_id in range(4):
+                conn.execute('SELECT ? AS id', (item_id,)).fetchall()
+        return 'ok'
+
+    @flask_app.route('/single')
+    def single():
+        with db_utils.get_db() as conn:
+            conn.execute('SELECT 1').fetchall()
+        return 'ok'
+
+    # 第一次请求可能新建连接（建连时的PRAGMA也会计入），先预热连接池再清空统计
+    flask_app.test_client().get('/single')
+    profiler.reset()
+    yield flask_app, profiler
+    db_utils.remove_statement_observer(profiler._record_statement)
+    if registered:
+        db_utils.add_statement_observer(query_profiler._record_statement)
+
+
+def test_normalize_sql():
+    assert normalize_sql("SELECT * FROM t WHERE id = 12 AND name = 'a''b'") == \
+        'SELECT * FROM t WHERE id = ? AND name = ?'
+    assert normalize_sql('SELECT *\n  FROM t WHERE id IN (?, ?,?)') == 'SELECT * FROM t WHERE id IN (...)'
+
+
+def test_server_timing_header(profiled_app):
+    flask_app, _ = profiled_app
+    response = flask_app.test_client().get('/single')
+    timings = response.headers.getlist('Server-Timing')
+    assert any(timing.startswith('db;desc="SQLite 1 queries"') for timing in timings)
+    assert any(timing.startswith('app;dur=') for timing in timings)
+
+
+def test_n_plus_one_detected(profiled_app):
+    flask_app, profiler = profiled_app
+    test_client = flask_app.test_client()
+    test_client.get('/items')
+    test_client.get('/single')
+
+    report = profiler.report()
+    by_endpoint = {entry['endpoint']: entry for entry in report['endpoints']}
+    assert by_endpoint['GET /items']['n_plus_one_requests'] == 1
+    assert by_endpoint['GET /items']['avg_queries'] == 4
+    assert by_endpoint['GET /single']['n_plus_one_requests'] == 0
+    assert report['n_plus_one_incidents'][0]['statements'] == [{'sql': 'SELECT ? AS id', 'count': 4}]
+
+    profiler.reset()
+    assert profiler.report()['endpoints'] == []
@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""
+浏览器性能数据测试：上报校验、路径归并为路由规则、按采样率加权、草图写入后管理端报表
+
+用法: python -m pytest -q test_rum.py
+"""
+
+import json
+
+import db_utils
+from api.rum import rum_aggregator
+
+
+def _collect(client, payload):
+    # sendBeacon 发送的请求不带 application/json
+    return client.post('/api/rum/collect', data=json.dumps(payload), content_type='text/plain')
+
+
+def _clear():
+    rum_aggregator.flush()
+    with db_utils.get_db() as conn:
+        conn.execute('DELETE FROM rum_digests')
+        conn.commit()
+
+
+def test_invalid_payload_rejected(client):
+    assert client.post('/api/rum/collect', data='not json').status_code == 400
+    assert _collect(client, {'events': 'x'}).status_code == 400
+
+
+def test_oversized_payload_rejected(client):
+    response = client.post('/api/rum/collect', data=b'x' * (64 * 1024 + 1))
+    assert response.status_code == 413
+
+
+def test_page_key_uses_route_rule(app):
+    with app.test_request_context('/'):
+        assert rum_aggregator.page_key('/notification/3?from=list') == '/notification/<int:notification_id>'
+        assert rum_aggregator.page_key('/api/grades') is None
+        assert rum_aggregator.page_key('/no-such-page') is None
+        assert rum_aggregator.page_key(42) is None
+
+
+def test_report_requires_admin(client):
+    assert client.get('/api/rum/report').status_code == 401
+
+
+def test_collected_metrics_reported(client, admin_client):
+    _clear()
+    events = [{'page': f'/notification/{i}', 'metrics': {'ttfb': 100 + i, 'lcp': 'bad', 'load': -1},
+               'resources': {'css': [10, 20, 1e9]}} for i in range(1, 101)]
+    assert _collect(client, {'sample_rate': 0.5, 'events': events[:20]}).status_code == 204
+    # 第二批与已写入的草图合并
+    rum_aggregator.flush()
+    assert _collect(client, {'sample_rate': 0.5, 'events': events[20:40]}).status_code == 204
+
+    data = admin_client.get('/api/rum/report?days=1').get_json()['data']
+    page = next(item for item in data['pages'] if item['page'] == '/notification/<int:notification_id>')
+    assert set(page['metrics']) == {'ttfb', 'resource.css'}
+    ttfb = page['metrics']['ttfb']
+    assert ttfb['samples'] == 40 and page['samples'] == 40
+    # 采样率 0.5：每个数据点代表两次访问
+    assert ttfb['estimated_views'] == 80
+    assert 100 < ttfb['p50'] < ttfb['p95'] <= 140
+    # 超过上限的资源耗时被丢弃
+    assert page['metrics']['resource.css']['samples'] == 80
+    _clear()
@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+"""
+站内搜索测试：中文二元组分词和查询解析、高亮转义、触发器记录变更后增量同步、
+没有积压时搜索请求不开启写事务、积压超出上限时交给后台任务
+
+用法: python -m pytest -q test_search_utils.py
+"""
+
+import pytest
+
+import db_utils
+import search_utils
+from api import search as search_api
+
+
+@pytest.fixture
+def statements():
+    """记录执行的SQL语句"""
+    seen = []
+
+    def observer(conn, record):
+        seen.append(record['sql'].strip().upper())
+
+    db_utils.add_statement_observer(observer)
+    yield seen
+    db_utils.remove_statement_observer(observer)
+
+
+@pytest.fixture
+def notification(app):
+    with db_utils.get_db() as conn:
+        row_id = conn.execute(
+            "INSERT INTO notifications (title, content, raw_content, status) "
+            "VALUES ('动态规划讲座', '正文', '本周讲解背包问题 <b>knapsack</b>', 'published')"
+        ).lastrowid
+        conn.commit()
+    yield row_id
+    with db_utils.get_db() as conn:
+        conn.execute('DELETE FROM notifications WHERE id = ?', (row_id,))
+        conn.commit()
+    search_utils.sync()
+
+
+def test_tokenize_and_parse_query():
+    assert search_utils.tokenize('动态规划 DP').split() == ['动态', '态规', '规划', '划', 'DP']
+    match, terms = search_utils.parse_query('规划 knap 图')
+    assert match == '"规划" "knap"* "图"*'
+    assert terms == ['规划', 'knap', '图']
+    assert search_utils.parse_query('  ,, ') == (None, [])
+    # 中文与字母数字相连时分开成词，与索引中的切分一致
+    assert search_utils.parse_query('C语言') == ('"C"* "语言"', ['C', '语言'])
+
+
+def test_highlight_escapes_html():
+    assert search_utils.highlight('<p>A & B 规划</p>', ['规划']) == 'A &amp; B <mark>规划</mark>'
+    snippet = search_utils.highlight('前' * 100 + '规划' + '后' * 100, ['规划'], width=30)
+    assert snippet.startswith('…') and snippet.endswith('…') and '<mark>规划</mark>' in snippet
+
+
+def test_changes_indexed_through_pending_queue(app, notification):
+    assert search_utils.pending_count() >= 1
+    search_utils.sync()
+    assert search_utils.pending_count() == 0
+
+    result = search_utils.search('规划')
+    hit = next(item for item in result['results'] if item['id'] == notification)
+    assert hit['type'] == 'notification'
+    assert hit['title'] == '动态<mark>规划</mark>讲座'
+    assert hit['url'] == f'/notification/{notification}'
+    assert search_utils.search('knap')['total'] >= 1
+
+    # 下线后从索引中删除
+    with db_utils.get_db() as conn:
+        conn.execute("UPDATE notifications SET status = 'draft' WHERE id = ?", (notification,))
+        conn.commit()
+    search_utils.sync()
+    assert all(item['id'] != notification for item in search_utils.search('规划')['results'])
+
+
+def test_view_count_update_not_queued(app, notification):
+    search_utils.sync()
+    with db_utils.get_db() as conn:
+        conn.execute('UPDATE notifications SET view_count = view_count + 1 WHERE id = ?', (notification,))
+        conn.commit()
+    assert search_utils.pending_count() == 0
+
+
+def test_search_without_backlog_does_not_write(client, statements):
+    search_utils.sync()
+    statements.clear()
+    response = client.get('/api/search?q=规划')
+    assert response.status_code == 200
+    assert not any(sql.startswith(('BEGIN', 'INSERT', 'DELETE', 'UPDATE')) for sql in statements)
+
+
+def test_search_api_catches_up_pending_changes(client, notification):
+    response = client.get('/api/search?q=动态规划&type=notification')
+    assert response.status_code == 200
+    ids = [item['id'] for item in response.get_json()['data']['results']]
+    assert notification in ids
+    assert search_utils.pending_count() == 0
+
+
+def test_large_backlog_handed_to_job(client, notification, monkeypatch):
+    queued = []
+    monkeypatch.setattr(search_api, 'SYNC_LIMIT', 1)
+    monkeypatch.setattr(search_api.job_queue, 'worker_count', 1)
+    monkeypatch.setattr(search_api.job_queue, 'enqueue', lambda kind, **kwargs: queued.append(kind))
+
+    assert client.get('/api/search?q=规划').status_code == 200
+    assert queued == ['search.sync']
+
+
+def test_search_api_validates_arguments(client):
+    assert client.get('/api/search').status_code == 400
+    assert client.get('/api/search?q=' + 'x' * 101).status_code == 400
+    assert client.get('/api/search?q=a&type=video').status_code == 400
+
+
+def test_mixed_script_query_matches(app):
+    with db_utils.get_db() as conn:
+        row_id = conn.execute(
+            "INSERT INTO notifications (title, content, raw_content, status) "
+            "VALUES ('C语言程序设计竞赛', '正文', 'ACM竞赛报名', 'published')"
+        ).lastrowid
+        conn.commit()
+    try:
+        search_utils.sync()
+        for query in ('C语言', 'ACM竞赛', 'c语言 竞赛'):
+            assert row_id in [item['id'] for item in search_utils.search(query)['results']], query
+    finally:
+        with db_utils.get_db() as conn:
+            conn.execute('DELETE FROM notifications WHERE id = ?', (row_id,))
+            conn.commit()
+        search_utils.sync()
@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""
+概率数据结构测试：HyperLogLog 基数估计、t-digest 分位数估计的误差、合并和序列化
+
+用法: python -m pytest -q test_sketch_utils.py
+"""
+
+import random
+
+import pytest
+
+from sketch_utils import HyperLogLog, TDigest
+
+
+def test_hyperloglog_small_counts_are_exact_enough():
+    sketch = HyperLogLog().update(f'session-{i}' for i in range(100))
+    assert sketch.count() == pytest.approx(100, abs=2)
+    # 重复加入不改变估计
+    sketch.update(f'session-{i}' for i in range(100))
+    assert sketch.count() == pytest.approx(100, abs=2)
+
+
+def test_hyperloglog_large_count_within_error():
+    sketch = HyperLogLog().update(f'visitor-{i}' for i in range(50000))
+    assert sketch.count() == pytest.approx(50000, rel=0.05)
+
+
+def test_hyperloglog_merge_is_union():
+    left = HyperLogLog().update(f'v{i}' for i in range(0, 3000))
+    right = HyperLogLog().update(f'v{i}' for i in range(2000, 5000))
+    assert left.merge(right).count() == pytest.approx(5000, rel=0.05)
+
+    with pytest.raises(ValueError):
+        left.merge(HyperLogLog(precision=10))
+
+
+def test_hyperloglog_round_trip():
+    sketch = HyperLogLog().update(['a', 'b', b'c'])
+    restored = HyperLogLog.from_bytes(sketch.to_bytes())
+    assert restored.registers == sketch.registers
+    assert restored.count() == 3
+    assert HyperLogLog.from_bytes(None).count() == 0
+
+
+def test_tdigest_quantiles_within_error():
+    rng = random.Random(7)
+    values = [rng.expovariate(1 / 200.0) for _ in range(20000)]
+    digest = TDigest().update(values)
+    values.sort()
+    for q in (0.5, 0.75, 0.95, 0.99):
+        exact = values[int(q * len(values))]
+        assert digest.quantile(q) == pytest.approx(exact, rel=0.03)
+    assert digest.quantile(0) == values[0]
+    assert digest.quantile(1) == values[-1]
+
+
+def test_tdigest_merge_and_weights():
+    low = TDigest().update(range(0, 500))
+    high = TDigest().update(range(500, 1000))
+    merged = TDigest().merge(low).merge(high)
+    assert merged.count == 1000
+    assert merged.quantile(0.5) == pytest.approx(500, abs=10)
+
+    # 采样率 0.1 上报的数据点按权重 10 计入
+    weighted = TDigest().update([100.0, 200.0], weight=10)
+    assert weighted.count == 20
+
+
+def test_tdigest_round_trip():
+    digest = TDigest().update(range(1000))
+    restored = TDigest.from_bytes(digest.to_bytes())
+    assert restored.count == digest.count
+    assert (restored.min, restored.max) == (0, 999)
+    assert restored.quantile(0.95) == pytest.approx(digest.quantile(0.95))
+    assert TDigest.from_bytes(b'').quantile(0.5) is None
@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+输入联想测试：拼音首字母换算、索引键、前缀查找和排序、写入后按类型重新加载
+
+用法: python -m pytest -q test_suggest_utils.py
+"""
+
+import sqlite3
+
+import pytest
+
+import db_utils
+from suggest_utils import (
+    SuggestIndex, _SourceIndex, pinyin_initials, index_keys, char_initial, MATCH_PREFIX, MATCH_WORD, MATCH_INITIALS,
+)
+
+
+@pytest.fixture
+def member(app):
+    with db_utils.get_db() as conn:
+        row_id = conn.execute("INSERT INTO team_members (name) VALUES ('曾联想')").lastrowid
+        conn.commit()
+    yield row_id
+    with db_utils.get_db() as conn:
+        conn.execute('DELETE FROM team_members WHERE id = ?', (row_id,))
+        conn.commit()
+
+
+def test_pinyin_initials():
+    assert char_initial('张') == 'z'
+    assert char_initial('a') is None
+    assert pinyin_initials('动态规划') == 'dtgh'
+    assert pinyin_initials('C++ 图论') == 'ctl'
+    # 多音字作姓氏时按姓氏读音
+    assert pinyin_initials('单一') == 'dy'
+    assert pinyin_initials('单一', surname=True) == 'sy'
+    # 有无法换算的字时不生成首字母键
+    assert pinyin_initials('犇犇') == ''
+
+
+def test_index_keys():
+    keys = index_keys('经典 动态规划')
+    assert ('经典 动态规划', MATCH_PREFIX) in keys
+    assert ('动态规划', MATCH_WORD) in keys
+    assert ('jddtgh', MATCH_INITIALS) in keys
+    assert ('dtgh', MATCH_INITIALS) in keys
+    assert index_keys('  ') == []
+
+
+def test_title_prefix_ranked_before_many_word_matches():
+    """词开头的键在字典序上排在前面且数量很多时，标题开头的匹配仍然排在最前"""
+    rows = [(i, f'the data {i:02d}', False) for i in range(40)] + [(99, 'deep learning', False)]
+    index = _SourceIndex(0, rows)
+    found = index.lookup('d', 8)
+    assert found[40] == MATCH_PREFIX
+    assert index.entries[40] == (99, 'deep learning')
+
+
+def test_suggest_ranks_and_refreshes(app, member):
+    index = SuggestIndex()
+    with app.app_context():
+        first = index.suggest('zlx', ['member'])
+        assert [(item['id'], item['match'], item['url']) for item in first] == [(member, 'initials', '/team')]
+        assert index.suggest('曾', ['member'])[0]['match'] == 'prefix'
+        builds = index.builds
+
+        # 没有写入时不重新加载
+        index.suggest('z', ['member'])
+        assert index.builds == builds
+
+        # 本进程写入：写入监听者标记失效
+        with db_utils.get_db() as conn:
+            conn.execute("UPDATE team_members SET name = '曾改名' WHERE id = ?", (member,))
+            conn.commit()
+        index._on_write({'team_members'})
+        assert index.suggest('zgm', ['member'])[0]['text'] == '曾改名'
+        assert index.builds == builds + 1
+
+
+def test_write_mark_kept_for_kinds_not_queried(app, member):
+    index = SuggestIndex()
+    # 同一请求内表修改代数只在请求开始时读取一次，成员的更新只能靠失效标记发现
+    with app.test_request_context('/'):
+        index.suggest('z', ['member', 'paper'])
+        conn = sqlite3.connect(db_utils.get_db_path())
+        conn.execute("UPDATE team_members SET name = '曾标记' WHERE id = ?", (member,))
+        conn.commit()
+        conn.close()
+        index._on_write({'team_members'})
+
+        # 只查询论文时不取走成员的失效标记
+        index.suggest('z', ['paper'])
+        assert index.suggest('zbj', ['member'])[0]['text'] == '曾标记'
+
+
+def test_write_from_other_process_detected(app, member):
+    index = SuggestIndex()
+    with app.app_context():
+        index.suggest('z', ['member', 'paper'])
+        builds = index.builds
+
+        conn = sqlite3.connect(db_utils.get_db_path())
+        conn.execute("UPDATE team_members SET name = '曾别处' WHERE id = ?", (member,))
+        conn.commit()
+        conn.close()
+
+        assert index.suggest('zbc', ['member', 'paper'])[0]['id'] == member
+        # 只重新加载受影响的类型
+        assert index.builds == builds + 1
+
+
+def test_suggest_api(client, member):
+    response = client.get('/api/suggest?q=ZLX&type=member')
+    assert response.status_code == 200
+    assert [item['text'] for item in response.get_json()['data']['suggestions']] == ['曾联想']
+    assert client.get('/api/suggest?q=a&type=video').status_code == 400
+    assert client.get('/api/suggest?q=').get_json()['data']['suggestions'] == []